@@ -3,15 +3,17 @@ from __future__ import annotations
 
 import argparse
 import gzip
+import importlib.util
 import ipaddress
 import json
 import math
 import re
+import sys
 import time
 from collections import Counter, defaultdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 
 APP_ROOT = Path(__file__).resolve().parents[2]
@@ -21,6 +23,7 @@ DEFAULT_STATE_DIR = APP_ROOT / "bitcoin" / "bitnodes" / "data" / "state"
 DEFAULT_AGGREGATE_DIR = DEFAULT_API_DIR / "aggregate"
 
 SCHEMA = "zzx-bitnodes-aggregate-v4"
+SNAPSHOT_STREAM_MODULE = "zzx_bitnodes_snapshot_stream"
 
 UNKNOWN_VALUES = {
     "",
@@ -134,7 +137,8 @@ def read_json(path: Path, fallback: Any = None) -> Any:
 
 def write_json(path: Path, payload: Any, compact: bool = False) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(
+    temp = path.with_name(f".{path.name}.tmp")
+    temp.write_text(
         json.dumps(
             payload,
             ensure_ascii=False,
@@ -146,6 +150,7 @@ def write_json(path: Path, payload: Any, compact: bool = False) -> None:
         + "\n",
         encoding="utf-8",
     )
+    temp.replace(path)
 
 
 def deep_get(row: dict[str, Any], *keys: str) -> Any:
@@ -253,6 +258,16 @@ def node_array_to_record(address: str, data: list[Any]) -> dict[str, Any]:
     return normalize_node_record(record)
 
 
+def node_record(address: str, data: Any) -> dict[str, Any]:
+    if isinstance(data, dict):
+        return normalize_node_record({"address": address, **data})
+
+    if isinstance(data, list):
+        return node_array_to_record(str(address), data)
+
+    return normalize_node_record({"address": address, "value": data})
+
+
 def extract_nodes(payload: Any) -> list[dict[str, Any]]:
     if isinstance(payload, list):
         return [normalize_node_record(item) for item in payload]
@@ -266,17 +281,7 @@ def extract_nodes(payload: Any) -> list[dict[str, Any]]:
         return [normalize_node_record(item) for item in nodes]
 
     if isinstance(nodes, dict):
-        output = []
-
-        for address, data in nodes.items():
-            if isinstance(data, dict):
-                output.append(normalize_node_record({"address": address, **data}))
-            elif isinstance(data, list):
-                output.append(node_array_to_record(str(address), data))
-            else:
-                output.append(normalize_node_record({"address": address, "value": data}))
-
-        return output
+        return [node_record(address, data) for address, data in nodes.items()]
 
     for key in ("rows", "results", "data", "reachable", "unreachable", "node_records", "peers"):
         value = payload.get(key)
@@ -295,6 +300,68 @@ def extract_nodes(payload: Any) -> list[dict[str, Any]]:
     return []
 
 
+def load_snapshot_stream() -> Any | None:
+    module = sys.modules.get(SNAPSHOT_STREAM_MODULE)
+
+    if module is not None:
+        return module
+
+    path = Path(__file__).resolve().with_name("snapshot_stream.py")
+
+    if not path.exists():
+        return None
+
+    spec = importlib.util.spec_from_file_location(SNAPSHOT_STREAM_MODULE, str(path))
+
+    if spec is None or spec.loader is None:
+        return None
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[SNAPSHOT_STREAM_MODULE] = module
+
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        sys.modules.pop(SNAPSHOT_STREAM_MODULE, None)
+        return None
+
+    return module
+
+
+def iter_nodes(path: Path, stats: dict[str, int] | None = None) -> Iterator[dict[str, Any]]:
+    stats = stats if stats is not None else {}
+    stats.setdefault("count", 0)
+    stream = load_snapshot_stream()
+
+    if stream is None:
+        rows: Iterable[dict[str, Any]] = extract_nodes(read_json(path, fallback={}))
+    elif not path.exists():
+        rows = []
+    else:
+        rows = iter_reader_nodes(stream.SnapshotReader(path))
+
+    for row in rows:
+        stats["count"] += 1
+        yield row
+
+
+def iter_reader_nodes(reader: Any) -> Iterator[dict[str, Any]]:
+    try:
+        for address, data in reader:
+            if reader.container == "array":
+                yield normalize_node_record(data)
+            else:
+                yield node_record(address, data)
+    except (OSError, ValueError):
+        if reader.count:
+            raise
+
+        return
+
+    if not reader.node_key and reader.header:
+        yield from extract_nodes(reader.header)
+
+
 def split_host_port(address: str, default_port: int = 8333) -> tuple[str, int]:
     value = str(address or "").strip()
 
@@ -800,34 +867,51 @@ def numeric_summary(values: list[float]) -> dict[str, Any]:
     }
 
 
-def duplicate_groups(nodes: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    groups: dict[str, list[dict[str, Any]]] = defaultdict(list)
+def track_duplicate(groups: dict[str, dict[str, Any]], row: dict[str, Any]) -> None:
+    host = node_host(row)
 
-    for row in nodes:
-        host = node_host(row)
+    if not host:
+        return
 
-        if host:
-            groups[host].append(row)
+    group = groups.get(host)
 
-    output = []
+    if group is None:
+        group = groups[host] = {"count": 0, "ports": set(), "addresses": set(), "agents": set()}
 
-    for host, rows in groups.items():
-        if len(rows) <= 1:
-            continue
+    agent = field(row, "agent", "user_agent")
+    group["count"] += 1
+    group["ports"].add(node_port(row))
+    group["addresses"].add(node_address(row))
+
+    if agent:
+        group["agents"].add(agent)
 
-        output.append(
-            {
-                "host": host,
-                "count": len(rows),
-                "ports": sorted({node_port(row) for row in rows}),
-                "addresses": sorted({node_address(row) for row in rows}),
-                "agents": sorted({field(row, "agent", "user_agent") for row in rows if field(row, "agent", "user_agent")}),
-            }
-        )
+
+def duplicate_summary(groups: dict[str, dict[str, Any]]) -> list[dict[str, Any]]:
+    output = [
+        {
+            "host": host,
+            "count": group["count"],
+            "ports": sorted(group["ports"]),
+            "addresses": sorted(group["addresses"]),
+            "agents": sorted(group["agents"]),
+        }
+        for host, group in groups.items()
+        if group["count"] > 1
+    ]
 
     return sorted(output, key=lambda item: (-item["count"], item["host"]))
 
 
+def duplicate_groups(nodes: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    groups: dict[str, dict[str, Any]] = {}
+
+    for row in nodes:
+        track_duplicate(groups, row)
+
+    return duplicate_summary(groups)
+
+
 def count_flag(nodes: list[dict[str, Any]], *keys: str) -> int:
     total = 0
 
@@ -912,11 +996,17 @@ def normalized_node(row: dict[str, Any], source: str) -> dict[str, Any]:
     }
 
 
-def aggregate(nodes: list[dict[str, Any]], *, source: str = "zzxbitnodes", include_nodes: bool = True) -> dict[str, Any]:
-    normalized = [normalized_node(row, source) for row in nodes if is_known(row)]
-
+def aggregate(nodes: Iterable[dict[str, Any]], *, source: str = "zzxbitnodes", include_nodes: bool = True) -> dict[str, Any]:
     deduped: dict[str, dict[str, Any]] = {}
-    for row in normalized:
+    groups: dict[str, dict[str, Any]] = {}
+
+    for raw in nodes:
+        track_duplicate(groups, raw)
+
+        if not is_known(raw):
+            continue
+
+        row = normalized_node(raw, source)
         key = row.get("canonical_address") or row.get("address")
         if key:
             deduped[str(key)] = row
@@ -957,7 +1047,7 @@ def aggregate(nodes: list[dict[str, Any]], *, source: str = "zzxbitnodes", inclu
     synced = sum(1 for row in normalized if int(number(row.get("height"), 0) or 0) >= max_height - 2 and max_height > 0)
     not_synced = sum(1 for row in normalized if 0 < int(number(row.get("height"), 0) or 0) < max_height - 2)
 
-    duplicates = duplicate_groups(nodes)
+    duplicates = duplicate_summary(groups)
 
     def ratio(value: int) -> float:
         return round(value / total, 8) if total else 0
@@ -1103,24 +1193,23 @@ def main() -> int:
     state_dir = Path(args.state_dir).resolve()
     input_path = find_input(api_dir, state_dir, args.input)
 
-    payload = read_json(input_path, fallback={})
-    nodes = extract_nodes(payload)
+    stats = {"count": 0}
 
     summary = aggregate(
-        nodes,
+        iter_nodes(input_path, stats),
         source=args.source,
         include_nodes=not args.no_nodes,
     )
 
     summary["input"] = str(input_path)
-    summary["node_count"] = len(nodes)
+    summary["node_count"] = stats["count"]
 
     output_path = Path(args.output).resolve()
     write_json(output_path, summary, compact=args.compact)
 
     print(
         "aggregate complete: "
-        f"{len(nodes)} raw nodes, "
+        f"{stats['count']} raw nodes, "
         f"{summary['total_nodes']} normalized nodes, "
         f"reachable={summary['counts']['reachable']}, "
         f"reachable_now={summary['counts']['reachable_now']}, "
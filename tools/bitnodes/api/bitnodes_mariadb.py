@@ -4,10 +4,12 @@ from __future__ import annotations
 import argparse
 import gzip
 import hashlib
+import importlib.util
 import json
 import os
 import re
 import sqlite3
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Mapping
@@ -34,6 +36,9 @@ NODE_TABLE = "bitnodes_api_nodes"
 METADATA_TABLE = "bitnodes_api_metadata"
 SHARD_TABLE = "bitnodes_api_shards"
 
+NODE_TABLE_PATH = Path(__file__).resolve().parents[1] / "node_table.py"
+NODE_TABLE_MODULE = "zzx_bitnodes_node_table"
+
 
 def utc_now() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
@@ -358,6 +363,29 @@ def iter_nodes(payload: Any, source: str) -> list[dict[str, Any]]:
     return records
 
 
+def load_node_table() -> Any:
+    module = sys.modules.get(NODE_TABLE_MODULE)
+
+    if module is not None:
+        return module
+
+    spec = importlib.util.spec_from_file_location(NODE_TABLE_MODULE, str(NODE_TABLE_PATH))
+
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"cannot load {NODE_TABLE_PATH}")
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[NODE_TABLE_MODULE] = module
+
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        sys.modules.pop(NODE_TABLE_MODULE, None)
+        raise
+
+    return module
+
+
 def infer_source(path: Path, payload: Any) -> str:
     if isinstance(payload, Mapping):
         source = clean(payload.get("source") or payload.get("crawler"))
@@ -629,9 +657,10 @@ def split_sql(lines: list[str], max_bytes: int, header: str) -> list[list[str]]:
     return shards
 
 
-def build_rows(inputs: list[Path]) -> tuple[list[str], dict[str, int]]:
-    lines: list[str] = []
-    counts: dict[str, int] = {}
+def load_nodes(inputs: list[Path]) -> tuple[Any, list[str], dict[str, int]]:
+    records: list[dict[str, Any]] = []
+    metadata: list[str] = []
+    sources: dict[str, int] = {}
 
     for input_path in inputs:
         if not input_path.exists():
@@ -641,13 +670,18 @@ def build_rows(inputs: list[Path]) -> tuple[list[str], dict[str, int]]:
         source = infer_source(input_path, payload)
         rows = iter_nodes(payload, source)
 
-        counts[source] = counts.get(source, 0) + len(rows)
-        lines.append(insert_metadata_sql(source, input_path, len(rows), payload))
+        sources.setdefault(source, 0)
+        metadata.append(insert_metadata_sql(source, input_path, len(rows), payload))
+        records.extend(rows)
 
-        for row in rows:
-            lines.append(insert_node_sql(row))
+    table = load_node_table().NodeTable(records)
+    sources.update(table.counts("source"))
+    return table, metadata, sources
 
-    return lines, counts
+
+def build_rows(inputs: list[Path], nodes: tuple[Any, list[str], dict[str, int]] | None = None) -> tuple[list[str], dict[str, int]]:
+    table, metadata, counts = nodes if nodes is not None else load_nodes(inputs)
+    return metadata + [insert_node_sql(row) for row in table], counts
 
 
 def build_mariadb_gz(
@@ -657,9 +691,10 @@ def build_mariadb_gz(
     shards_dir: Path,
     max_mb: float,
     no_shards: bool = False,
+    nodes: tuple[Any, list[str], dict[str, int]] | None = None,
 ) -> dict[str, Any]:
     header = schema_sql() + "\n\n"
-    lines, source_counts = build_rows(inputs)
+    lines, source_counts = build_rows(inputs, nodes)
     max_bytes = int(max_mb * 1024 * 1024)
 
     shards_dir.mkdir(parents=True, exist_ok=True)
@@ -775,7 +810,11 @@ CREATE INDEX IF NOT EXISTS idx_bitnodes_api_geo ON bitnodes_api_nodes(latitude,
 """.strip()
 
 
-def build_sqlite(inputs: list[Path], output: Path) -> dict[str, Any]:
+def build_sqlite(
+    inputs: list[Path],
+    output: Path,
+    nodes: tuple[Any, list[str], dict[str, int]] | None = None,
+) -> dict[str, Any]:
     output.parent.mkdir(parents=True, exist_ok=True)
 
     if output.exists():
@@ -795,66 +834,56 @@ INSERT OR REPLACE INTO bitnodes_api_nodes (
 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
 """
 
-    total = 0
-    source_counts: dict[str, int] = {}
-
-    for input_path in inputs:
-        if not input_path.exists():
-            continue
-
-        payload = read_json(input_path)
-        source = infer_source(input_path, payload)
-        rows = iter_nodes(payload, source)
-        source_counts[source] = source_counts.get(source, 0) + len(rows)
-        total += len(rows)
-
-        for row in rows:
-            conn.execute(insert_sql, (
-                row["node_id"],
-                row["source"],
-                row["address"],
-                row["host"],
-                safe_int(row["port"]),
-                row["network"],
-                row["agent"],
-                safe_int(row["protocol"]),
-                row["services"],
-                safe_int(row["height"]),
-                row["city"],
-                row["country_code"],
-                row["country_name"],
-                row["continent"],
-                row["region"],
-                row["territory"],
-                row["county"],
-                row["zip_code"],
-                row["timezone"],
-                safe_float(row["latitude"]),
-                safe_float(row["longitude"]),
-                row["asn"],
-                row["organization"],
-                row["provider"],
-                row["w3w"],
-                row["zzxgcs"],
-                row["geohash"],
-                row["geohashid"],
-                bool_or_none(row["reachable"]),
-                bool_or_none(row["reachable_now"]),
-                bool_or_none(row["reachable_24h"]),
-                safe_float(row["latency_ms"]),
-                row["last_seen"],
-                bool_or_none(row["is_tor"]),
-                bool_or_none(row["is_i2p"]),
-                bool_or_none(row["is_vpn"]),
-                bool_or_none(row["is_proxy"]),
-                bool_or_none(row["is_sanctioned_node"]),
-                bool_or_none(row["is_policy_restricted_node"]),
-                bool_or_none(row["is_threat_infrastructure"]),
-                row["threat_level"],
-                row["raw_hash"],
-                row["raw_json"],
-                utc_now(),
-            ))
+    table, _metadata, source_counts = nodes if nodes is not None else load_nodes(inputs)
+    total = len(table)
+
+    for row in table:
+        conn.execute(insert_sql, (
+            row["node_id"],
+            row["source"],
+            row["address"],
+            row["host"],
+            safe_int(row["port"]),
+            row["network"],
+            row["agent"],
+            safe_int(row["protocol"]),
+            row["services"],
+            safe_int(row["height"]),
+            row["city"],
+            row["country_code"],
+            row["country_name"],
+            row["continent"],
+            row["region"],
+            row["territory"],
+            row["county"],
+            row["zip_code"],
+            row["timezone"],
+            safe_float(row["latitude"]),
+            safe_float(row["longitude"]),
+            row["asn"],
+            row["organization"],
+            row["provider"],
+            row["w3w"],
+            row["zzxgcs"],
+            row["geohash"],
+            row["geohashid"],
+            bool_or_none(row["reachable"]),
+            bool_or_none(row["reachable_now"]),
+            bool_or_none(row["reachable_24h"]),
+            safe_float(row["latency_ms"]),
+            row["last_seen"],
+            bool_or_none(row["is_tor"]),
+            bool_or_none(row["is_i2p"]),
+            bool_or_none(row["is_vpn"]),
+            bool_or_none(row["is_proxy"]),
+            bool_or_none(row["is_sanctioned_node"]),
+            bool_or_none(row["is_policy_restricted_node"]),
+            bool_or_none(row["is_threat_infrastructure"]),
+            row["threat_level"],
+            row["raw_hash"],
+            row["raw_json"],
+            utc_now(),
+        ))
 
     conn.commit()
     conn.close()
@@ -928,9 +957,10 @@ def main() -> int:
         return 0
 
     manifests: dict[str, Any] = {}
+    nodes = load_nodes(inputs)
 
     if args.only_sqlite:
-        manifests["sqlite"] = build_sqlite(inputs, Path(args.sqlite or DEFAULT_SQLITE))
+        manifests["sqlite"] = build_sqlite(inputs, Path(args.sqlite or DEFAULT_SQLITE), nodes)
     else:
         manifests["mariadb"] = build_mariadb_gz(
             inputs=inputs,
@@ -938,10 +968,11 @@ def main() -> int:
             shards_dir=Path(args.shards_dir),
             max_mb=args.max_mb,
             no_shards=args.no_shards,
+            nodes=nodes,
         )
 
         if args.sqlite:
-            manifests["sqlite"] = build_sqlite(inputs, Path(args.sqlite))
+            manifests["sqlite"] = build_sqlite(inputs, Path(args.sqlite), nodes)
 
     print(json.dumps(manifests, ensure_ascii=False, indent=2, sort_keys=True))
     return 0
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import asyncio
 import base64
 import hashlib
 import ipaddress
@@ -8,7 +9,7 @@ import random
 import socket
 import struct
 import time
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, field
 from typing import Any
 
 
@@ -164,13 +165,12 @@ def recv_exact(sock: socket.socket, size: int) -> bytes:
     return data
 
 
-def read_message(
-    sock: socket.socket,
+def parse_message_header(
+    header: bytes,
     *,
     network: str = "mainnet",
     max_payload: int = MAX_HEADER_PAYLOAD,
-) -> tuple[str, bytes]:
-    header = recv_exact(sock, 24)
+) -> tuple[str, int, bytes]:
     magic, command_raw, length, msg_checksum = struct.unpack("<4s12sI4s", header)
 
     expected_magic = magic_bytes(network)
@@ -181,12 +181,49 @@ def read_message(
     if length > max_payload:
         raise ValueError(f"oversized bitcoin message payload: {length}")
 
-    payload = recv_exact(sock, length)
+    command = command_raw.rstrip(b"\x00").decode("ascii", errors="replace")
+
+    return command, length, msg_checksum
+
 
+def verify_payload(payload: bytes, msg_checksum: bytes) -> None:
     if checksum(payload) != msg_checksum:
         raise ValueError("invalid bitcoin message checksum")
 
-    command = command_raw.rstrip(b"\x00").decode("ascii", errors="replace")
+
+def read_message(
+    sock: socket.socket,
+    *,
+    network: str = "mainnet",
+    max_payload: int = MAX_HEADER_PAYLOAD,
+) -> tuple[str, bytes]:
+    header = recv_exact(sock, 24)
+    command, length, msg_checksum = parse_message_header(header, network=network, max_payload=max_payload)
+
+    payload = recv_exact(sock, length)
+    verify_payload(payload, msg_checksum)
+
+    return command, payload
+
+
+async def read_exact_async(reader: asyncio.StreamReader, size: int) -> bytes:
+    try:
+        return await reader.readexactly(size)
+    except asyncio.IncompleteReadError as exc:
+        raise ConnectionError("socket closed") from exc
+
+
+async def read_message_async(
+    reader: asyncio.StreamReader,
+    *,
+    network: str = "mainnet",
+    max_payload: int = MAX_HEADER_PAYLOAD,
+) -> tuple[str, bytes]:
+    header = await read_exact_async(reader, 24)
+    command, length, msg_checksum = parse_message_header(header, network=network, max_payload=max_payload)
+
+    payload = await read_exact_async(reader, length)
+    verify_payload(payload, msg_checksum)
 
     return command, payload
 
@@ -401,24 +438,48 @@ def service_flags(services: int | None) -> dict[str, bool]:
     }
 
 
-def handshake(
-    address: str,
-    timeout: float = 5.0,
-    user_agent: str = DEFAULT_USER_AGENT,
-    network: str = "mainnet",
-) -> VersionInfo:
+def apply_version_payload(info: VersionInfo, payload: bytes, started: float) -> None:
+    parsed = parse_version_payload(payload)
+
+    info.connected = True
+    info.reachable = True
+    info.protocol_version = parsed.get("protocol_version")
+    info.user_agent = parsed.get("user_agent")
+    info.services = parsed.get("services")
+    info.height = parsed.get("height")
+    info.relay = parsed.get("relay")
+    info.connected_since = int(time.time())
+    info.latency_ms = round((time.time() - started) * 1000.0, 2)
+    info.services_flags = service_flags(info.services)
+    info.supports_addrv2 = bool(
+        info.protocol_version is not None
+        and int(info.protocol_version) >= 70016
+    )
+
+
+def new_version_info(address: str, network: str = "mainnet") -> VersionInfo:
     host, port = split_host_port(address, default_port(network))
-    formatted = format_address(host, port)
-    started = time.time()
 
-    info = VersionInfo(
-        address=formatted,
+    return VersionInfo(
+        address=format_address(host, port),
         host=host,
         port=port,
         network=address_network(host),
         magic=network,
     )
 
+
+def handshake(
+    address: str,
+    timeout: float = 5.0,
+    user_agent: str = DEFAULT_USER_AGENT,
+    network: str = "mainnet",
+) -> VersionInfo:
+    started = time.time()
+    info = new_version_info(address, network)
+    host = str(info.host)
+    port = int(info.port or default_port(network))
+
     if not supports_direct_socket(host):
         info.error = f"direct socket unsupported for {info.network}; use Tor/I2P proxy transport"
         return info
@@ -442,22 +503,7 @@ def handshake(
                 command, payload = read_message(sock, network=network)
 
                 if command == "version":
-                    parsed = parse_version_payload(payload)
-
-                    info.connected = True
-                    info.reachable = True
-                    info.protocol_version = parsed.get("protocol_version")
-                    info.user_agent = parsed.get("user_agent")
-                    info.services = parsed.get("services")
-                    info.height = parsed.get("height")
-                    info.relay = parsed.get("relay")
-                    info.connected_since = int(time.time())
-                    info.latency_ms = round((time.time() - started) * 1000.0, 2)
-                    info.services_flags = service_flags(info.services)
-                    info.supports_addrv2 = bool(
-                        info.protocol_version is not None
-                        and int(info.protocol_version) >= 70016
-                    )
+                    apply_version_payload(info, payload, started)
 
                     sock.sendall(make_message("verack", network=network))
                     got_version = True
@@ -479,6 +525,43 @@ def handshake(
     return info
 
 
+def effective_deadline(timeout: float, deadline: float | None) -> float:
+    if deadline is not None and float(deadline) > 0:
+        return float(deadline)
+
+    return float(timeout) * 2.0
+
+
+async def open_connection_async(
+    host: str,
+    port: int,
+    timeout: float,
+) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    return await asyncio.wait_for(asyncio.open_connection(host, port), timeout=timeout)
+
+
+async def close_writer_async(writer: asyncio.StreamWriter | None) -> None:
+    if writer is None:
+        return
+
+    try:
+        writer.close()
+        await writer.wait_closed()
+    except Exception:
+        pass
+
+
+async def send_message_async(
+    writer: asyncio.StreamWriter,
+    command: str,
+    payload: bytes = b"",
+    *,
+    network: str = "mainnet",
+) -> None:
+    writer.write(make_message(command, payload, network=network))
+    await writer.drain()
+
+
 def parse_netaddr(payload: bytes, offset: int, has_time: bool = True) -> tuple[str | None, int | None, int]:
     if has_time:
         require_len(payload, offset, 4)
@@ -662,6 +745,268 @@ def getaddr(
     return sorted(set(discovered))[:max_addresses]
 
 
+@dataclass
+class PeerSessionResult:
+    info: VersionInfo
+    addresses: list[str] = field(default_factory=list)
+    latency_ms: float | None = None
+    sent_getaddr: bool = False
+
+
+class PeerSession:
+    def __init__(
+        self,
+        address: str,
+        timeout: float = 5.0,
+        *,
+        user_agent: str = DEFAULT_USER_AGENT,
+        network: str = "mainnet",
+        harvest: bool = True,
+        max_addresses: int = MAX_ADDR_ITEMS,
+        deadline: float | None = None,
+    ) -> None:
+        self.timeout = float(timeout)
+        self.user_agent = user_agent
+        self.network = network
+        self.harvest = bool(harvest)
+        self.max_addresses = int(max_addresses)
+        self.deadline = effective_deadline(self.timeout, deadline)
+
+        self.info = new_version_info(address, network)
+        self.host = str(self.info.host)
+        self.port = int(self.info.port or default_port(network))
+
+        self.started = 0.0
+        self.got_version = False
+        self.got_verack = False
+        self.sent_getaddr = False
+        self.addr_complete = False
+        self.discovered: list[str] = []
+
+    def version_message(self) -> tuple[str, bytes]:
+        return "version", build_version_payload(self.host, self.port, user_agent=self.user_agent)
+
+    def feed(self, command: str, payload: bytes) -> list[tuple[str, bytes]]:
+        outgoing: list[tuple[str, bytes]] = []
+
+        if command == "version" and not self.got_version:
+            apply_version_payload(self.info, payload, self.started)
+            self.got_version = True
+
+            if self.harvest:
+                outgoing.append(("sendaddrv2", b""))
+
+            outgoing.append(("verack", b""))
+
+        elif command == "verack" and self.got_version:
+            self.got_verack = True
+
+        elif command == "ping" and len(payload) == 8:
+            outgoing.append(("pong", payload))
+
+        elif command in {"addr", "addrv2"}:
+            parser = parse_addr_payload if command == "addr" else parse_addrv2_payload
+            found = parser(payload, limit=self.max_addresses)
+            self.discovered.extend(found)
+
+            if self.sent_getaddr and len(found) > 1:
+                self.addr_complete = True
+
+        if self.harvest and self.got_version and self.got_verack and not self.sent_getaddr:
+            outgoing.append(("getaddr", b""))
+            self.sent_getaddr = True
+
+        return outgoing
+
+    def finished(self) -> bool:
+        if not self.got_version:
+            return False
+
+        if not self.harvest:
+            return True
+
+        return self.addr_complete or len(set(self.discovered)) >= self.max_addresses
+
+    def fail(self, error: str) -> None:
+        if self.got_version:
+            return
+
+        self.info.connected = False
+        self.info.reachable = False
+        self.info.error = error
+
+    def result(self) -> PeerSessionResult:
+        return PeerSessionResult(
+            info=self.info,
+            addresses=sorted(set(self.discovered))[:self.max_addresses],
+            latency_ms=self.info.latency_ms,
+            sent_getaddr=self.sent_getaddr,
+        )
+
+    def unsupported(self) -> bool:
+        if supports_direct_socket(self.host):
+            return False
+
+        self.info.error = f"direct socket unsupported for {self.info.network}; use Tor/I2P proxy transport"
+        return True
+
+    def run(self) -> PeerSessionResult:
+        self.started = time.time()
+
+        if self.unsupported():
+            return self.result()
+
+        stop_at = self.started + self.deadline
+
+        try:
+            with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
+                command, payload = self.version_message()
+                sock.sendall(make_message(command, payload, network=self.network))
+
+                while not self.finished():
+                    remaining = stop_at - time.time()
+
+                    if remaining <= 0:
+                        self.fail("session deadline exceeded")
+                        break
+
+                    sock.settimeout(min(self.timeout, remaining))
+                    command, payload = read_message(sock, network=self.network)
+
+                    for reply, reply_payload in self.feed(command, payload):
+                        sock.sendall(make_message(reply, reply_payload, network=self.network))
+
+        except Exception as exc:
+            self.fail(str(exc))
+
+        return self.result()
+
+    async def _exchange_async(self) -> None:
+        writer = None
+
+        try:
+            reader, writer = await open_connection_async(self.host, self.port, self.timeout)
+
+            command, payload = self.version_message()
+            await send_message_async(writer, command, payload, network=self.network)
+
+            stop_at = self.started + self.deadline
+
+            while not self.finished():
+                remaining = stop_at - time.time()
+
+                if remaining <= 0:
+                    self.fail("session deadline exceeded")
+                    break
+
+                command, payload = await asyncio.wait_for(
+                    read_message_async(reader, network=self.network),
+                    timeout=min(self.timeout, remaining),
+                )
+
+                for reply, reply_payload in self.feed(command, payload):
+                    await send_message_async(writer, reply, reply_payload, network=self.network)
+
+        finally:
+            await close_writer_async(writer)
+
+    async def run_async(self) -> PeerSessionResult:
+        self.started = time.time()
+
+        if self.unsupported():
+            return self.result()
+
+        try:
+            await asyncio.wait_for(self._exchange_async(), timeout=self.deadline)
+        except asyncio.TimeoutError:
+            self.fail("session deadline exceeded")
+        except Exception as exc:
+            self.fail(str(exc))
+
+        if not self.finished() and not self.info.error:
+            self.fail("session ended before version")
+
+        return self.result()
+
+
+def peer_session(
+    address: str,
+    timeout: float = 5.0,
+    user_agent: str = DEFAULT_USER_AGENT,
+    network: str = "mainnet",
+    harvest: bool = True,
+    max_addresses: int = MAX_ADDR_ITEMS,
+    deadline: float | None = None,
+) -> PeerSessionResult:
+    return PeerSession(
+        address,
+        timeout,
+        user_agent=user_agent,
+        network=network,
+        harvest=harvest,
+        max_addresses=max_addresses,
+        deadline=deadline,
+    ).run()
+
+
+async def peer_session_async(
+    address: str,
+    timeout: float = 5.0,
+    user_agent: str = DEFAULT_USER_AGENT,
+    network: str = "mainnet",
+    harvest: bool = True,
+    max_addresses: int = MAX_ADDR_ITEMS,
+    deadline: float | None = None,
+) -> PeerSessionResult:
+    return await PeerSession(
+        address,
+        timeout,
+        user_agent=user_agent,
+        network=network,
+        harvest=harvest,
+        max_addresses=max_addresses,
+        deadline=deadline,
+    ).run_async()
+
+
+async def handshake_async(
+    address: str,
+    timeout: float = 5.0,
+    user_agent: str = DEFAULT_USER_AGENT,
+    network: str = "mainnet",
+    deadline: float | None = None,
+) -> VersionInfo:
+    result = await peer_session_async(
+        address,
+        timeout,
+        user_agent=user_agent,
+        network=network,
+        harvest=False,
+        deadline=deadline,
+    )
+    return result.info
+
+
+async def getaddr_async(
+    address: str,
+    timeout: float = 8.0,
+    user_agent: str = DEFAULT_USER_AGENT,
+    network: str = "mainnet",
+    max_addresses: int = MAX_ADDR_ITEMS,
+    deadline: float | None = None,
+) -> list[str]:
+    result = await peer_session_async(
+        address,
+        timeout,
+        user_agent=user_agent,
+        network=network,
+        harvest=True,
+        max_addresses=max_addresses,
+        deadline=deadline,
+    )
+    return result.addresses
+
+
 def version_info_to_record(info: VersionInfo) -> dict[str, Any]:
     payload = asdict(info)
     payload["services_flags"] = service_flags(info.services)
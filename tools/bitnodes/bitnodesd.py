@@ -2,11 +2,14 @@
 from __future__ import annotations
 
 import argparse
+import importlib.util
 import json
 import os
+import re
 import signal
 import subprocess
 import sys
+import threading
 import time
 from datetime import datetime, timezone
 from pathlib import Path
@@ -25,6 +28,12 @@ ENRICH = TOOLS_DIR / "enrich.py"
 MAPS = TOOLS_DIR / "maps.py"
 BUILD_GEO_INDEXES = TOOLS_DIR / "build_geo_indexes.py"
 PUSH_IPDB = TOOLS_DIR / "push_ipdb.py"
+ZZXBITNODES = TOOLS_DIR / "zzxbitnodes.py"
+AGGREGATE = TOOLS_DIR / "aggregate.py"
+DATAPLANE = TOOLS_DIR / "dataplane.py"
+PIPELINE = TOOLS_DIR / "pipeline.py"
+PROFILING = TOOLS_DIR / "profiling.py"
+MAP_MAPS = TOOLS_DIR / "map" / "maps.py"
 
 CONFIG_PATH = TOOLS_DIR / "config.json"
 CONFIG_EXAMPLE_PATH = TOOLS_DIR / "config.example.json"
@@ -34,6 +43,7 @@ LOG_DIR = APP_ROOT / "log" / "bitnodes"
 
 PID_PATH = RUN_DIR / "bitnodesd.pid"
 STATUS_PATH = RUN_DIR / "bitnodesd.status.json"
+BATCH_DIR = RUN_DIR / "batches"
 LOG_PATH = LOG_DIR / "bitnodesd.log"
 
 DEFAULT_API_DIR = APP_ROOT / "bitcoin" / "bitnodes" / "api"
@@ -48,6 +58,13 @@ DEFAULT_ENRICHMENT_REPORT = DEFAULT_ENRICHED_DIR / "enrichment-report.json"
 DEFAULT_MAP_DIR = APP_ROOT / "bitcoin" / "bitnodes" / "maps"
 DEFAULT_LIVE_MAP_DIR = APP_ROOT / "bitcoin" / "bitnodes" / "live-map"
 
+DEFAULT_METRICS_PATH = APP_ROOT / "bitcoin" / "bitnodes" / "data" / "metrics" / "bitnodesd.prom"
+
+DEFAULT_PIPELINE_ENGINE = "dag"
+DEFAULT_PIPELINE_MODE = "sequential"
+DEFAULT_PIPELINE_WORKERS = 4
+DEFAULT_PIPELINE_QUEUE_SIZE = 1
+
 
 def utc_now() -> int:
     return int(time.time())
@@ -585,7 +602,432 @@ def maybe_push_ipdb(config: dict[str, Any]) -> int:
     return result.returncode
 
 
+def load_tool(path: Path) -> Any:
+    import_name = "zzx_bitnodes_daemon_" + re.sub(r"[^a-zA-Z0-9_]", "_", path.stem)
+    module = sys.modules.get(import_name)
+
+    if module is not None:
+        return module
+
+    spec = importlib.util.spec_from_file_location(import_name, str(path))
+
+    if spec is None or spec.loader is None:
+        raise ImportError(f"cannot load {path}")
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[import_name] = module
+
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        sys.modules.pop(import_name, None)
+        raise
+
+    return module
+
+
+def crawl_plan(config: dict[str, Any], daemon_cycle: bool = False) -> tuple[Any, dict[str, Any]]:
+    crawler = load_tool(ZZXBITNODES)
+    wrapper = load_tool(CRAWLER)
+
+    argv = wrapper.strip_wrapper_args(build_crawl_command(config, daemon_cycle=daemon_cycle)[2:])
+    argv = wrapper.force_crawler_paths("zzxbitnodes", argv)
+    wrapper.ensure_runtime_dirs()
+
+    return crawler, crawler.crawl_kwargs(crawler.build_parser().parse_args(argv))
+
+
+def enriched_output(config: dict[str, Any]) -> Path:
+    return Path(cfg_get(config, ["enrichment", "output"], str(DEFAULT_ENRICHED_LATEST)))
+
+
+def cycle_profiler(config: dict[str, Any], name: str) -> Any:
+    if not bool_cfg(config, ["profiling", "enabled"], True):
+        return None
+
+    try:
+        return load_tool(PROFILING).Profiler(name)
+    except Exception as err:
+        log(f"Profiling unavailable ({err}).")
+        return None
+
+
+def publish_profile(config: dict[str, Any], profiler: Any) -> dict[str, Any] | None:
+    if profiler is None:
+        return None
+
+    report = profiler.report()
+    path = APP_ROOT / str(cfg_get(config, ["profiling", "prometheus"], "") or DEFAULT_METRICS_PATH)
+
+    try:
+        load_tool(PROFILING).write_prometheus(path, report)
+    except OSError as err:
+        log(f"Failed to write Prometheus metrics to {path}: {err}")
+
+    slowest = [entry for entry in report["stages"] if entry["group"] != "pipeline"][:5]
+    log("Slowest stages: " + " ".join(f"{entry['group']}/{entry['stage']}={entry['seconds']:.1f}s" for entry in slowest))
+    return report
+
+
+def pipeline_crawl(crawler: Any, kwargs: dict[str, Any], profiler: Any = None) -> Any:
+    return crawler.crawl_once(
+        **{
+            **kwargs,
+            "run_enrich_after": False,
+            "run_aggregate_after": False,
+            "run_exports_after": False,
+            "run_ipdb_after": False,
+            "run_maps": False,
+            "registry_backup": False,
+            "git_push": False,
+            "profiler": profiler,
+        }
+    )
+
+
+def pipeline_ipdb_push(config: dict[str, Any]) -> int:
+    code = maybe_push_ipdb(config)
+
+    if code != 0:
+        raise RuntimeError(f"push_ipdb exited with code {code}")
+
+    return code
+
+
+def pipeline_enrich(config: dict[str, Any], payload: Any, profiler: Any = None) -> Any:
+    enrich = load_tool(ENRICH)
+    args = enrich.build_parser().parse_args(build_enrich_command(config)[2:])
+    output, _report = enrich.run_from_args(args, payload=payload, profiler=profiler)
+    return output
+
+
+def pipeline_aggregate(crawler: Any, input_path: Path, payload: Any) -> dict[str, Any]:
+    aggregate = load_tool(AGGREGATE)
+    stats = {"count": 0}
+
+    if payload is None:
+        nodes = aggregate.iter_nodes(input_path, stats)
+    else:
+        nodes = aggregate.extract_nodes(payload)
+        stats["count"] = len(nodes)
+
+    summary = aggregate.aggregate(nodes, source=crawler.SOURCE)
+    summary["input"] = str(input_path)
+    summary["node_count"] = stats["count"]
+
+    aggregate.write_json(crawler.DEFAULT_AGGREGATE_LATEST, summary)
+    return summary
+
+
+def pipeline_ipdb(crawler: Any, kwargs: dict[str, Any], input_path: Path) -> int:
+    code = crawler.run_ipdb(
+        input_path=input_path,
+        output_path=crawler.DEFAULT_ENRICHED_DIR / "latest.ipdb-enriched.json",
+        ipdb_dir=kwargs["geoip_dir"],
+        max_segment_bytes=kwargs["max_segment_bytes"],
+        compact=not kwargs["pretty"],
+    )
+
+    if code != 0:
+        raise RuntimeError(f"ip_db exited with code {code}")
+
+    return crawler.run_push_ipdb(source_dir=kwargs["geoip_dir"], compact=not kwargs["pretty"])
+
+
+def pipeline_exports(crawler: Any, kwargs: dict[str, Any], summary: Any, profiler: Any = None) -> dict[str, Any]:
+    dataplane = load_tool(DATAPLANE)
+    input_path = crawler.DEFAULT_AGGREGATE_LATEST
+
+    argv = [
+        "--input",
+        str(input_path),
+        "--output-dir",
+        str(crawler.DEFAULT_EXPORT_DIR),
+        "--database",
+        crawler.DEFAULT_DATAPLANE_DATABASE,
+        "--max-bytes",
+        str(crawler.DEFAULT_MAX_PUBLIC_JSON_BYTES),
+        "--strict",
+    ]
+
+    if not kwargs["pretty"]:
+        argv.append("--compact")
+
+    records = None
+
+    if summary is not None:
+        with dataplane.profile_stage(profiler, "records") as span:
+            records = dataplane.export_db.dedupe_records(dataplane.export_db.payload_records(input_path, summary))
+            span["nodes_out"] = len(records)
+
+    return dataplane.run_dataplane(dataplane.build_parser().parse_args(argv), records=records, profiler=profiler)
+
+
+def pipeline_maps(config: dict[str, Any], payload: Any, profiler: Any = None) -> dict[str, Any]:
+    maps = load_tool(MAPS if MAPS.exists() else MAP_MAPS)
+    args = maps.build_parser().parse_args(build_maps_command(config)[2:])
+    return maps.run_from_args(args, payload=payload, profiler=profiler)
+
+
+def pipeline_registry(crawler: Any, kwargs: dict[str, Any]) -> int:
+    code = crawler.run_registry_backup(
+        input_dir=kwargs["archive_dir"],
+        api_dir=crawler.API_DIR,
+        output_dir=kwargs["registry_root"],
+        latest_dir=kwargs["registry_latest_dir"],
+        enabled=True,
+    )
+
+    if code != 0:
+        raise RuntimeError(f"registry backup exited with code {code}")
+
+    return crawler.run_registry_index(registry_root=kwargs["registry_root"], enabled=True)
+
+
+def build_cycle_pipeline(
+    engine: Any,
+    config: dict[str, Any],
+    crawler: Any,
+    kwargs: dict[str, Any],
+    profiler: Any = None,
+) -> Any:
+    checkpoint_dir = str(cfg_get(config, ["pipeline", "checkpoint_dir"], "") or "")
+    strict = bool(kwargs["strict"])
+    latest_path = Path(kwargs["output_dir"]) / "latest.json"
+    enriched_path = enriched_output(config)
+
+    pipeline = engine.Pipeline(
+        "cycle",
+        workers=int(cfg_get(config, ["pipeline", "workers"], DEFAULT_PIPELINE_WORKERS)),
+        checkpoint_dir=Path(checkpoint_dir) if checkpoint_dir else None,
+        compact=not kwargs["pretty"],
+        log=log,
+        profiler=profiler,
+    )
+
+    pipeline.add(
+        "crawl",
+        lambda inputs: pipeline_crawl(crawler, kwargs, profiler),
+        enabled=bool_cfg(config, ["crawler", "enabled"], True),
+    )
+    pipeline.add(
+        "ipdb_push",
+        lambda inputs: pipeline_ipdb_push(config),
+        after=["crawl"],
+    )
+    pipeline.add(
+        "registry",
+        lambda inputs: pipeline_registry(crawler, kwargs),
+        after=["crawl"],
+        enabled=bool(kwargs["registry_backup"]),
+        required=strict,
+    )
+    pipeline.add(
+        "enrich",
+        lambda inputs: pipeline_enrich(config, inputs.get("crawl"), profiler),
+        after=["crawl"],
+        enabled=bool_cfg(config, ["enrichment", "enabled"], True),
+        checkpoint=enriched_path,
+    )
+    pipeline.add(
+        "ipdb",
+        lambda inputs: pipeline_ipdb(crawler, kwargs, enriched_path if enriched_path.exists() else latest_path),
+        after=["enrich"],
+        enabled=bool(kwargs["run_ipdb_after"]),
+        required=strict,
+    )
+    pipeline.add(
+        "aggregate",
+        lambda inputs: pipeline_aggregate(crawler, enriched_path if enriched_path.exists() else latest_path, inputs.get("enrich")),
+        after=["enrich"],
+        enabled=bool(kwargs["run_aggregate_after"]),
+        required=strict,
+    )
+    pipeline.add(
+        "exports",
+        lambda inputs: pipeline_exports(crawler, kwargs, inputs.get("aggregate"), profiler),
+        after=["aggregate"],
+        enabled=bool(kwargs["run_exports_after"]),
+        required=strict,
+    )
+    pipeline.add(
+        "maps",
+        lambda inputs: pipeline_maps(config, inputs.get("enrich"), profiler),
+        after=["enrich", "aggregate"],
+        enabled=bool_cfg(config, ["maps", "enabled"], True),
+    )
+
+    return pipeline
+
+
+def run_pipeline_cycle(config: dict[str, Any], daemon_cycle: bool = False) -> int | None:
+    started = utc_now()
+
+    try:
+        engine = load_tool(PIPELINE)
+        crawler, kwargs = crawl_plan(config, daemon_cycle=daemon_cycle)
+    except (Exception, SystemExit) as err:
+        log(f"In-process pipeline unavailable ({err}); running subprocess stages.")
+        return None
+
+    profiler = cycle_profiler(config, "cycle")
+    pipeline = build_cycle_pipeline(engine, config, crawler, kwargs, profiler)
+
+    write_status(config, "cycle-started", {"cycle_started_at": utc_iso(started), "pipeline_levels": pipeline.levels()})
+
+    report = pipeline.run()
+    log("Pipeline stages: " + engine.stage_summary(report))
+    profile = publish_profile(config, profiler)
+
+    if not report["ok"]:
+        failed = next(name for name in report["failed"] if pipeline.stages[name].required)
+
+        write_status(
+            config,
+            f"{failed}-failed",
+            {
+                "last_exit_code": 1,
+                "cycle_runtime_seconds": utc_now() - started,
+                "pipeline": report,
+                "profile": profile,
+            },
+        )
+        return 1
+
+    crawler.push_snapshots(enabled=bool(kwargs["git_push"]), message="Update ZZX Bitnodes global node dataplane snapshots")
+
+    git_commit_and_push(config)
+
+    write_status(
+        config,
+        "cycle-complete",
+        {
+            "last_exit_code": 0,
+            "cycle_started_at": utc_iso(started),
+            "cycle_finished_at": utc_iso(),
+            "cycle_runtime_seconds": utc_now() - started,
+            "pipeline": report,
+            "profile": profile,
+        },
+    )
+
+    return 0
+
+
+def publish_batch(config: dict[str, Any], crawler: Any, kwargs: dict[str, Any], batch: dict[str, Any], report: dict[str, Any]) -> None:
+    extra = {
+        "pipeline_mode": "overlapped",
+        "last_batch": batch["batch"],
+        "last_batch_latency_seconds": batch["latency_seconds"],
+        "stream": report,
+        "profile": publish_profile(config, batch.get("profiler")),
+    }
+
+    batch_path = batch.get("enriched_path")
+
+    if batch_path is not None:
+        Path(batch_path).unlink(missing_ok=True)
+
+    if batch.get("failed"):
+        write_status(config, f"{batch['failed']}-failed", {"last_exit_code": 1, **extra})
+        return
+
+    crawler.push_snapshots(enabled=bool(kwargs["git_push"]), message="Update ZZX Bitnodes global node dataplane snapshots")
+    git_commit_and_push(config)
+    write_status(config, "batch-complete", {"last_exit_code": 0, "last_batch_finished_at": utc_iso(), **extra})
+
+
+def run_overlapped(config: dict[str, Any], stop: threading.Event) -> dict[str, Any] | None:
+    try:
+        engine = load_tool(PIPELINE)
+        crawler, kwargs = crawl_plan(config, daemon_cycle=True)
+    except (Exception, SystemExit) as err:
+        log(f"Overlapped pipeline unavailable ({err}); running sequential cycles.")
+        return None
+
+    latest_path = Path(kwargs["output_dir"]) / "latest.json"
+    interval = int(cfg_get(config, ["crawler", "crawl_interval_seconds"], 900))
+
+    stream = engine.StreamPipeline(
+        "overlapped",
+        queue_size=int(cfg_get(config, ["pipeline", "queue_size"], DEFAULT_PIPELINE_QUEUE_SIZE)),
+        log=log,
+    )
+
+    def enrich_batch(batch: dict[str, Any]) -> Any:
+        output = pipeline_enrich(config, batch.get("crawl"), batch.get("profiler"))
+        batch_path = BATCH_DIR / f"enriched-{batch['batch']}.json"
+        engine.write_json(batch_path, output, compact=True)
+        batch["enriched_path"] = batch_path
+        return output
+
+    def batch_input(batch: dict[str, Any]) -> Path:
+        return Path(batch.get("enriched_path") or latest_path)
+
+    stream.add(
+        "ipdb_push",
+        lambda batch: pipeline_ipdb_push(config),
+        after="crawl",
+    )
+    stream.add(
+        "registry",
+        lambda batch: pipeline_registry(crawler, kwargs),
+        enabled=bool(kwargs["registry_backup"]),
+        after="crawl",
+    )
+    stream.add(
+        "enrich",
+        enrich_batch,
+        enabled=bool_cfg(config, ["enrichment", "enabled"], True),
+    )
+    stream.add(
+        "ipdb",
+        lambda batch: pipeline_ipdb(crawler, kwargs, batch_input(batch)),
+        enabled=bool(kwargs["run_ipdb_after"]),
+    )
+    stream.add(
+        "aggregate",
+        lambda batch: pipeline_aggregate(crawler, batch_input(batch), batch.get("enrich")),
+        enabled=bool(kwargs["run_aggregate_after"]),
+    )
+    stream.add(
+        "maps",
+        lambda batch: pipeline_maps(config, batch.get("enrich"), batch.get("profiler")),
+        enabled=bool_cfg(config, ["maps", "enabled"], True),
+    )
+    stream.add(
+        "exports",
+        lambda batch: pipeline_exports(crawler, kwargs, batch.get("aggregate"), batch.get("profiler")),
+        enabled=bool(kwargs["run_exports_after"]),
+    )
+
+    def crawl_batch(batch: dict[str, Any]) -> Any:
+        batch["profiler"] = cycle_profiler(config, "overlapped")
+
+        if not bool_cfg(config, ["crawler", "enabled"], True):
+            return None
+
+        return pipeline_crawl(crawler, kwargs, batch["profiler"])
+
+    crawl = engine.Stage("crawl", crawl_batch)
+
+    write_status(config, "overlapped-started", {"pipeline_mode": "overlapped", "stream_stages": [stage.name for stage in stream.stages if stage.enabled]})
+
+    return stream.run(
+        crawl,
+        stop,
+        interval=interval,
+        on_batch=lambda batch, report: publish_batch(config, crawler, kwargs, batch, report),
+    )
+
+
 def run_cycle(config: dict[str, Any], daemon_cycle: bool = False) -> int:
+    if str(cfg_get(config, ["pipeline", "engine"], DEFAULT_PIPELINE_ENGINE)) == "dag":
+        code = run_pipeline_cycle(config, daemon_cycle=daemon_cycle)
+
+        if code is not None:
+            return code
+
     started = utc_now()
 
     write_status(config, "cycle-started", {"cycle_started_at": utc_iso(started)})
@@ -786,10 +1228,12 @@ def daemon_loop() -> int:
     interval = int(cfg_get(config, ["crawler", "crawl_interval_seconds"], 900))
 
     stop_requested = False
+    stop_event = threading.Event()
 
     def stop_handler(_signum, _frame) -> None:
         nonlocal stop_requested
         stop_requested = True
+        stop_event.set()
         log("Stop signal received.")
 
     signal.signal(signal.SIGTERM, stop_handler)
@@ -799,6 +1243,9 @@ def daemon_loop() -> int:
     write_status(config, "started")
 
     try:
+        if str(cfg_get(config, ["pipeline", "mode"], DEFAULT_PIPELINE_MODE)) == "overlapped":
+            run_overlapped(config, stop_event)
+
         while not stop_requested:
             config = load_config()
             interval = int(cfg_get(config, ["crawler", "crawl_interval_seconds"], interval))
@@ -965,6 +1412,17 @@ def write_config_example() -> int:
             "strict": False,
             "no_modules": False,
         },
+        "pipeline": {
+            "engine": DEFAULT_PIPELINE_ENGINE,
+            "mode": DEFAULT_PIPELINE_MODE,
+            "workers": DEFAULT_PIPELINE_WORKERS,
+            "queue_size": DEFAULT_PIPELINE_QUEUE_SIZE,
+            "checkpoint_dir": "",
+        },
+        "profiling": {
+            "enabled": True,
+            "prometheus": str(DEFAULT_METRICS_PATH),
+        },
         "github": {
             "auto_push": False,
             "auto_push_from_crawler": False,
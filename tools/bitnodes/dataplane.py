@@ -2,11 +2,12 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
 import json
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 
 APP_ROOT = Path(__file__).resolve().parents[2]
@@ -51,24 +52,51 @@ def write_json(path: Path, payload: Any, compact: bool = False) -> int:
     return path.stat().st_size
 
 
-def run_dataplane(args: argparse.Namespace) -> dict[str, Any]:
+def profile_stage(profiler: Any, name: str, *, nodes_in: int | None = None) -> Any:
+    if profiler is None:
+        return contextlib.nullcontext({})
+
+    return profiler.stage("exports", name, nodes_in=nodes_in)
+
+
+def run_exporter(profiler: Any, name: str, fn: Callable[..., Any], records: Any, *args: Any) -> Any:
+    with profile_stage(profiler, name, nodes_in=len(records)) as span:
+        manifest = fn(records, *args)
+        span["nodes_out"] = manifest.get("node_count") if isinstance(manifest, dict) else None
+
+    return manifest
+
+
+def run_dataplane(
+    args: argparse.Namespace,
+    records: list[dict[str, Any]] | None = None,
+    profiler: Any = None,
+) -> dict[str, Any]:
     inputs = export_db.parse_inputs(args.input)
 
-    if not inputs:
-        if args.strict:
-            raise SystemExit("dataplane: no input files found")
-        print("dataplane: no input files found")
-        return {}
+    if records is None:
+        if not inputs:
+            if args.strict:
+                raise SystemExit("dataplane: no input files found")
+            print("dataplane: no input files found")
+            return {}
 
-    records = export_db.load_records(inputs)
+        with profile_stage(profiler, "load") as span:
+            records = export_db.load_records(inputs)
+            span["nodes_out"] = len(records)
 
     if not records and args.strict:
         raise SystemExit("dataplane: no node records found")
 
+    records = export_db.node_table(records)
+
     out_dir = Path(args.output_dir).expanduser().resolve()
     mkdir(out_dir)
 
-    mariadb_manifest = export_db.export_mariadb_shards(
+    mariadb_manifest = run_exporter(
+        profiler,
+        "mariadb",
+        export_db.export_mariadb_shards,
         records,
         out_dir,
         args.database,
@@ -78,22 +106,22 @@ def run_dataplane(args: argparse.Namespace) -> dict[str, Any]:
 
     sqlite_manifest = None
     if not args.no_sqlite:
-        sqlite_manifest = export_db.export_sqlite(records, out_dir, args.compact)
+        sqlite_manifest = run_exporter(profiler, "sqlite", export_db.export_sqlite, records, out_dir, args.compact)
 
     duckdb_manifest = None
     if args.duckdb and hasattr(export_db, "export_duckdb"):
-        duckdb_manifest = export_db.export_duckdb(records, out_dir, args.compact)
+        duckdb_manifest = run_exporter(profiler, "duckdb", export_db.export_duckdb, records, out_dir, args.compact)
 
     parquet_manifest = None
     if args.parquet and hasattr(export_db, "export_parquet"):
-        parquet_manifest = export_db.export_parquet(records, out_dir, args.compact)
-
-    json_manifest = export_db.export_json_artifacts(records, out_dir, args.compact)
-    csv_manifest = export_db.export_csv_artifacts(records, out_dir)
-    xml_manifest = export_db.export_xml_artifacts(records, out_dir)
-    redis_manifest = export_db.export_redis_artifacts(records, out_dir)
-    geo_manifest = export_db.export_geo_indexes(records, out_dir, args.compact)
-    map_manifest = export_db.export_map_artifacts(records, out_dir, args.compact)
+        parquet_manifest = run_exporter(profiler, "parquet", export_db.export_parquet, records, out_dir, args.compact)
+
+    json_manifest = run_exporter(profiler, "json", export_db.export_json_artifacts, records, out_dir, args.compact)
+    csv_manifest = run_exporter(profiler, "csv", export_db.export_csv_artifacts, records, out_dir)
+    xml_manifest = run_exporter(profiler, "xml", export_db.export_xml_artifacts, records, out_dir)
+    redis_manifest = run_exporter(profiler, "redis", export_db.export_redis_artifacts, records, out_dir)
+    geo_manifest = run_exporter(profiler, "geo", export_db.export_geo_indexes, records, out_dir, args.compact)
+    map_manifest = run_exporter(profiler, "map", export_db.export_map_artifacts, records, out_dir, args.compact)
 
     manifest = {
         "schema": DATAPLANE_SCHEMA,
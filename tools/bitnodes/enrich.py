@@ -2,22 +2,44 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
+import functools
 import gzip
 import importlib.util
+import itertools
 import json
 import math
+import multiprocessing
 import os
 import re
 import sys
+import threading
 import traceback
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Callable, Mapping
+from typing import Any, Callable, Iterable, Iterator, Mapping, MutableMapping
 
 
 APP_ROOT = Path(__file__).resolve().parents[2]
 TOOLS_DIR = APP_ROOT / "tools" / "bitnodes"
 
+
+def load_tool(filename: str) -> Any:
+    module_name = "zzx_bitnodes_" + Path(filename).stem
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, TOOLS_DIR / filename)
+        sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules[module_name])
+
+    return sys.modules[module_name]
+
+
+kv_cache = load_tool("kv_cache.py")
+
+
 BITNODES_ROOT = Path(os.environ.get("BITNODES_ROOT", str(APP_ROOT / "bitcoin" / "bitnodes")))
 BITNODES_DATA = Path(os.environ.get("BITNODES_DATA", str(BITNODES_ROOT / "data")))
 
@@ -28,6 +50,19 @@ DEFAULT_W3W_CACHE = DEFAULT_GEO_ROOT / "w3w" / "w3w-cache.json"
 DEFAULT_GEOHASH_CACHE = DEFAULT_GEO_ROOT / "geohash" / "geohash-cache.json"
 DEFAULT_SANCTIONS_POLICY = TOOLS_DIR / "data" / "policy" / "sanctioned-jurisdictions.json"
 
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_WORKERS = 1
+WORKER_CLOSE_TIMEOUT = 60.0
+
+SNAPSHOT_STREAM_MODULE = "zzx_bitnodes_snapshot_stream"
+PROFILING_MODULE = "zzx_bitnodes_profiling"
+
+STATUS_RANK = {"skipped": 0, "fallback": 1, "ok": 2, "error": 3}
+
+WORKER_STAGES: list[dict[str, Any]] = []
+WORKER_REPORTS: list[dict[str, Any]] = []
+WORKER_OPTIONS: dict[str, Any] = {}
+
 ENRICHMENT_ORDER = [
     "ip_db",
     "ipv4",
@@ -114,7 +149,8 @@ def read_json(path: Path, fallback: Any = None) -> Any:
 
 def write_json(path: Path, payload: Any, compact: bool = False) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(
+    temp = path.with_name(f".{path.name}.tmp")
+    temp.write_text(
         json.dumps(
             payload,
             ensure_ascii=False,
@@ -126,6 +162,48 @@ def write_json(path: Path, payload: Any, compact: bool = False) -> None:
         + "\n",
         encoding="utf-8",
     )
+    temp.replace(path)
+
+
+def json_text(value: Any, compact: bool, depth: int = 0) -> str:
+    text = json.dumps(
+        value,
+        ensure_ascii=False,
+        indent=None if compact else 2,
+        separators=(",", ":") if compact else None,
+        sort_keys=not compact,
+        default=str,
+    )
+
+    return text if compact else text.replace("\n", "\n" + "  " * depth)
+
+
+def write_json_members(
+    handle: Any,
+    members: Iterable[tuple[str | None, Any]],
+    brackets: str,
+    compact: bool,
+    depth: int,
+) -> None:
+    pad = "" if compact else "\n" + "  " * (depth + 1)
+    colon = ":" if compact else ": "
+    count = 0
+
+    handle.write(brackets[0])
+
+    for key, value in members:
+        handle.write(("," if count else "") + pad)
+
+        if key is not None:
+            handle.write(json_text(key, compact) + colon)
+
+        handle.write(json_text(value, compact, depth + 1))
+        count += 1
+
+    if count and not compact:
+        handle.write("\n" + "  " * depth)
+
+    handle.write(brackets[1])
 
 
 def clean_address(value: Any) -> str:
@@ -479,6 +557,16 @@ def bitnodes_array_to_record(address: str, data: list[Any]) -> dict[str, Any]:
     return normalize_node_record(record)
 
 
+def node_record(address: str, data: Any) -> dict[str, Any]:
+    if isinstance(data, list):
+        return bitnodes_array_to_record(str(address), data)
+
+    if isinstance(data, Mapping):
+        return normalize_node_record({"address": address, **dict(data)})
+
+    return normalize_node_record({"address": address, "value": data})
+
+
 def extract_nodes(payload: Any) -> list[dict[str, Any]]:
     if isinstance(payload, list):
         return [normalize_node_record(item) for item in payload]
@@ -492,17 +580,7 @@ def extract_nodes(payload: Any) -> list[dict[str, Any]]:
         return [normalize_node_record(item) for item in nodes]
 
     if isinstance(nodes, Mapping):
-        output: list[dict[str, Any]] = []
-
-        for address, data in nodes.items():
-            if isinstance(data, list):
-                output.append(bitnodes_array_to_record(str(address), data))
-            elif isinstance(data, Mapping):
-                output.append(normalize_node_record({"address": address, **dict(data)}))
-            else:
-                output.append(normalize_node_record({"address": address, "value": data}))
-
-        return output
+        return [node_record(address, data) for address, data in nodes.items()]
 
     for key in ("rows", "results", "data", "reachable", "unreachable", "node_records", "peers", "reachable_nodes"):
         value = payload.get(key)
@@ -524,6 +602,111 @@ def extract_nodes(payload: Any) -> list[dict[str, Any]]:
     return []
 
 
+def load_snapshot_stream() -> Any | None:
+    module = sys.modules.get(SNAPSHOT_STREAM_MODULE)
+
+    if module is not None:
+        return module
+
+    path = TOOLS_DIR / "snapshot_stream.py"
+
+    if not path.exists():
+        return None
+
+    spec = importlib.util.spec_from_file_location(SNAPSHOT_STREAM_MODULE, str(path))
+
+    if spec is None or spec.loader is None:
+        return None
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[SNAPSHOT_STREAM_MODULE] = module
+
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        sys.modules.pop(SNAPSHOT_STREAM_MODULE, None)
+        return None
+
+    return module
+
+
+def load_profiling() -> Any | None:
+    module = sys.modules.get(PROFILING_MODULE)
+
+    if module is not None:
+        return module
+
+    path = TOOLS_DIR / "profiling.py"
+
+    if not path.exists():
+        return None
+
+    spec = importlib.util.spec_from_file_location(PROFILING_MODULE, str(path))
+
+    if spec is None or spec.loader is None:
+        return None
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[PROFILING_MODULE] = module
+
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        sys.modules.pop(PROFILING_MODULE, None)
+        return None
+
+    return module
+
+
+def profile_stage(profiler: Any, group: str, name: str, *, nodes_in: int | None = None) -> Any:
+    if profiler is None:
+        return contextlib.nullcontext({})
+
+    return profiler.stage(group, name, nodes_in=nodes_in)
+
+
+def iter_reader_nodes(reader: Any) -> Iterator[dict[str, Any]]:
+    try:
+        for address, data in reader:
+            if reader.container == "array":
+                yield normalize_node_record(data)
+            else:
+                yield node_record(address, data)
+    except (OSError, ValueError):
+        if reader.count:
+            raise
+
+        return
+
+    if not reader.node_key and reader.header:
+        yield from extract_nodes(reader.header)
+
+
+def open_snapshot(path: Path) -> tuple[Any, Iterable[dict[str, Any]] | None]:
+    stream = load_snapshot_stream()
+
+    if stream is None:
+        return read_json(path, fallback={}), None
+
+    reader = stream.SnapshotReader(path)
+    return reader, iter_reader_nodes(reader)
+
+
+def snapshot_shell(payload: Any) -> Any:
+    if not hasattr(payload, "container"):
+        return payload
+
+    if payload.container == "array" and not payload.node_key:
+        return []
+
+    shell = dict(payload.header or {})
+
+    if payload.node_key == "nodes":
+        shell["nodes"] = {} if payload.container == "object" else []
+
+    return shell
+
+
 def put_nodes(payload: Any, nodes: list[dict[str, Any]]) -> Any:
     if isinstance(payload, list):
         return nodes
@@ -623,223 +806,547 @@ def call_enricher(name: str, fn: Callable[..., Any], nodes: list[dict[str, Any]]
     return nodes
 
 
+def fallback_enrich_node(name: str, node: dict[str, Any]) -> dict[str, Any]:
+    normalize_enrichment(node)
+    normalize_metadata(node)
+
+    address = str(node.get("address", "")).lower()
+    host = str(node.get("host") or node.get("hostname") or "").lower()
+
+    if name == "ipv4":
+        node["is_ipv4"] = host.count(".") == 3 and ":" not in host and ".onion" not in host and ".i2p" not in host
+
+    elif name == "ipv6":
+        node["is_ipv6"] = ":" in host and ".onion" not in host and ".i2p" not in host
+
+    elif name == "tor":
+        node["is_tor"] = ".onion" in address or host.endswith(".onion")
+
+    elif name == "i2p":
+        node["is_i2p"] = ".i2p" in address or host.endswith(".i2p")
+
+    elif name == "proxy":
+        node.setdefault("suspected_proxy", False)
+        node.setdefault("is_proxy", False)
+
+    elif name == "vpn":
+        text = " ".join(
+            str(node.get(key, ""))
+            for key in ("provider", "organization", "org", "hostname", "hosting_type", "network_type", "asn")
+        ).lower()
+
+        suspected = any(
+            token in text
+            for token in ("vpn", "proxy", "mullvad", "proton", "nordvpn", "expressvpn", "surfshark", "private internet access", "pia")
+        )
+
+        node["suspected_vpn"] = suspected
+        node["is_vpn"] = suspected
+
+    elif name == "timezone":
+        node.setdefault("timezone", "Unknown")
+
+    elif name == "w3w_lookup":
+        node.setdefault("w3w", "")
+        node.setdefault("what3words", node.get("w3w", ""))
+
+    elif name == "geohashid_lookup":
+        node.setdefault("geohashid", node.get("geohash", ""))
+
+    elif name == "sanctioned_nodes":
+        node.setdefault("is_sanctioned_node", False)
+        node.setdefault("is_policy_restricted_node", False)
+        node.setdefault("is_policy_watch_node", False)
+        node.setdefault("jurisdiction_risk_level", "unknown")
+
+    elif name == "peer_index":
+        latency = number(node.get("latency_ms"))
+        latency_score = 0.0 if latency is None else max(0.0, 100.0 - min(100.0, latency / 5.0))
+        reachable_score = 50.0 if boolish(node.get("reachable") or node.get("reachable_now")) is True else 0.0
+        height_score = 25.0 if number(node.get("height")) else 0.0
+        services_score = 25.0 if number(node.get("services")) else 0.0
+        node.setdefault("peer_index", round(latency_score + reachable_score + height_score + services_score, 4))
+
+    elif name == "peer_health":
+        peer_health = node.get("peer_health")
+        if not isinstance(peer_health, dict):
+            peer_health = {}
+
+        peer_health.setdefault("reachable", node.get("reachable"))
+        peer_health.setdefault("reachable_now", node.get("reachable_now"))
+        peer_health.setdefault("reachable_24h", node.get("reachable_24h"))
+        peer_health.setdefault("latency_ms", node.get("latency_ms"))
+        peer_health.setdefault("success_count", node.get("success_count"))
+        peer_health.setdefault("failure_count", node.get("failure_count"))
+        peer_health.setdefault("first_seen", node.get("first_seen"))
+        peer_health.setdefault("last_seen", node.get("last_seen"))
+        node["peer_health"] = peer_health
+
+    node["enrichment"][name] = {
+        "status": "fallback",
+        "updated_at": utc_now(),
+        "module_path": str(module_path(name)),
+    }
+
+    host_port_mirrors(node)
+    network_fallback(node)
+    preserve_coordinate_mirrors(node)
+
+    return node
+
+
 def fallback_enrich(name: str, nodes: list[dict[str, Any]]) -> list[dict[str, Any]]:
     for node in nodes:
-        normalize_enrichment(node)
-        normalize_metadata(node)
+        fallback_enrich_node(name, node)
 
-        address = str(node.get("address", "")).lower()
-        host = str(node.get("host") or node.get("hostname") or "").lower()
+    return [normalize_node_record(node) for node in nodes]
 
-        if name == "ipv4":
-            node["is_ipv4"] = host.count(".") == 3 and ":" not in host and ".onion" not in host and ".i2p" not in host
 
-        elif name == "ipv6":
-            node["is_ipv6"] = ":" in host and ".onion" not in host and ".i2p" not in host
+def find_node_hook(module: Any, context: dict[str, Any]) -> Callable[[MutableMapping[str, Any]], Any] | None:
+    factory = getattr(module, "node_enricher", None)
 
-        elif name == "tor":
-            node["is_tor"] = ".onion" in address or host.endswith(".onion")
+    if not callable(factory):
+        return None
 
-        elif name == "i2p":
-            node["is_i2p"] = ".i2p" in address or host.endswith(".i2p")
+    hook = factory(context)
+    return hook if callable(hook) else None
 
-        elif name == "proxy":
-            node.setdefault("suspected_proxy", False)
-            node.setdefault("is_proxy", False)
 
-        elif name == "vpn":
-            text = " ".join(
-                str(node.get(key, ""))
-                for key in ("provider", "organization", "org", "hostname", "hosting_type", "network_type", "asn")
-            ).lower()
+def close_node_hook(hook: Any) -> None:
+    close = getattr(hook, "close", None)
 
-            suspected = any(
-                token in text
-                for token in ("vpn", "proxy", "mullvad", "proton", "nordvpn", "expressvpn", "surfshark", "private internet access", "pia")
-            )
+    if callable(close):
+        close()
 
-            node["suspected_vpn"] = suspected
-            node["is_vpn"] = suspected
-
-        elif name == "timezone":
-            node.setdefault("timezone", "Unknown")
-
-        elif name == "w3w_lookup":
-            node.setdefault("w3w", "")
-            node.setdefault("what3words", node.get("w3w", ""))
-
-        elif name == "geohashid_lookup":
-            node.setdefault("geohashid", node.get("geohash", ""))
-
-        elif name == "sanctioned_nodes":
-            node.setdefault("is_sanctioned_node", False)
-            node.setdefault("is_policy_restricted_node", False)
-            node.setdefault("is_policy_watch_node", False)
-            node.setdefault("jurisdiction_risk_level", "unknown")
-
-        elif name == "peer_index":
-            latency = number(node.get("latency_ms"))
-            latency_score = 0.0 if latency is None else max(0.0, 100.0 - min(100.0, latency / 5.0))
-            reachable_score = 50.0 if boolish(node.get("reachable") or node.get("reachable_now")) is True else 0.0
-            height_score = 25.0 if number(node.get("height")) else 0.0
-            services_score = 25.0 if number(node.get("services")) else 0.0
-            node.setdefault("peer_index", round(latency_score + reachable_score + height_score + services_score, 4))
-
-        elif name == "peer_health":
-            peer_health = node.get("peer_health")
-            if not isinstance(peer_health, dict):
-                peer_health = {}
-
-            peer_health.setdefault("reachable", node.get("reachable"))
-            peer_health.setdefault("reachable_now", node.get("reachable_now"))
-            peer_health.setdefault("reachable_24h", node.get("reachable_24h"))
-            peer_health.setdefault("latency_ms", node.get("latency_ms"))
-            peer_health.setdefault("success_count", node.get("success_count"))
-            peer_health.setdefault("failure_count", node.get("failure_count"))
-            peer_health.setdefault("first_seen", node.get("first_seen"))
-            peer_health.setdefault("last_seen", node.get("last_seen"))
-            node["peer_health"] = peer_health
-
-        node["enrichment"][name] = {
-            "status": "fallback",
-            "updated_at": utc_now(),
-            "module_path": str(module_path(name)),
-        }
 
-        host_port_mirrors(node)
-        network_fallback(node)
-        preserve_coordinate_mirrors(node)
+def prepare_stage(name: str, context: dict[str, Any], strict: bool) -> dict[str, Any]:
+    module_report = {
+        "name": name,
+        "module_path": str(module_path(name)),
+        "status": "skipped",
+        "message": "",
+        "updated_at": utc_now(),
+        "coordinate_count_before": 0,
+        "coordinate_count_after": 0,
+        "node_errors": 0,
+    }
 
-    return [normalize_node_record(node) for node in nodes]
+    stage = {
+        "name": name,
+        "report": module_report,
+        "hook": None,
+        "batch": None,
+        "fallback": functools.partial(fallback_enrich_node, name),
+        "status": {
+            "status": "ok",
+            "updated_at": module_report["updated_at"],
+            "module_path": module_report["module_path"],
+        },
+    }
+
+    try:
+        module = load_module(name)
+    except Exception as err:
+        module_report["status"] = "error"
+        module_report["message"] = f"{name} failed to load: {err}"
+        module_report["traceback"] = traceback.format_exc(limit=5)
 
+        if strict:
+            raise
 
-def enrich_nodes(
-    nodes: list[dict[str, Any]],
+        return stage
+
+    if module is None:
+        module_report["status"] = "fallback"
+        module_report["message"] = f"{name} module not found; fallback enrichment applied."
+        return stage
+
+    try:
+        stage["hook"] = find_node_hook(module, context)
+    except Exception as err:
+        module_report["status"] = "error"
+        module_report["message"] = f"{name} node hook failed to initialize: {err}"
+        module_report["traceback"] = traceback.format_exc(limit=5)
+
+        if strict:
+            raise
+
+        return stage
+
+    if stage["hook"] is None:
+        stage["batch"] = find_enricher(module)
+
+    if stage["hook"] is None and stage["batch"] is None:
+        module_report["status"] = "fallback"
+        module_report["message"] = f"{name} has no supported enrichment function; fallback applied."
+        return stage
+
+    module_report["status"] = "ok"
+    module_report["message"] = f"{name} enrichment completed."
+    module_report["mode"] = "node" if stage["hook"] else "batch"
+    return stage
+
+
+def stage_error(stage: dict[str, Any], err: Exception, strict: bool) -> None:
+    module_report = stage["report"]
+    module_report["node_errors"] += 1
+
+    if module_report["status"] != "error":
+        module_report["status"] = "error"
+        module_report["message"] = str(err)
+        module_report["traceback"] = traceback.format_exc(limit=5)
+
+    if strict:
+        raise err
+
+
+def finish_stage_node(stage: dict[str, Any], node: dict[str, Any]) -> dict[str, Any]:
+    normalize_enrichment(node)
+    preserve_coordinate_mirrors(node)
+    host_port_mirrors(node)
+    network_fallback(node)
+    node["enrichment"][stage["name"]] = dict(stage["status"])
+    return normalize_node_record(node)
+
+
+def fallback_stage_node(stage: dict[str, Any], node: dict[str, Any]) -> dict[str, Any]:
+    return normalize_node_record(stage["fallback"](node))
+
+
+def run_stage(stage: dict[str, Any], chunk: list[dict[str, Any]], context: dict[str, Any], strict: bool) -> list[dict[str, Any]]:
+    hook = stage["hook"]
+
+    if stage["batch"] is not None:
+        try:
+            chunk = call_enricher(stage["name"], stage["batch"], chunk, context)
+        except Exception as err:
+            stage_error(stage, err, strict)
+            return [fallback_stage_node(stage, node) for node in chunk]
+
+        return [finish_stage_node(stage, node) for node in chunk]
+
+    if hook is None:
+        return [fallback_stage_node(stage, node) for node in chunk]
+
+    output: list[dict[str, Any]] = []
+
+    for node in chunk:
+        try:
+            result = hook(node)
+        except Exception as err:
+            stage_error(stage, err, strict)
+            output.append(fallback_stage_node(stage, node))
+            continue
+
+        if isinstance(result, dict):
+            node = result
+
+        output.append(finish_stage_node(stage, node))
+
+    return output
+
+
+def iter_chunks(nodes: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    chunk: list[Any] = []
+
+    for node in nodes:
+        chunk.append(node)
+
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def enrich_chunk(
+    raw_chunk: list[Any],
+    stages: list[dict[str, Any]],
+    report: dict[str, Any],
     *,
-    modules: list[str] | None = None,
-    context: dict[str, Any] | None = None,
+    context: dict[str, Any],
     strict: bool = False,
-) -> tuple[list[dict[str, Any]], dict[str, Any]]:
-    selected_modules = modules or ENRICHMENT_ORDER
-    context = context or {}
+    profiler: Any = None,
+) -> list[dict[str, Any]]:
+    chunk = [normalize_node_record(node) for node in raw_chunk]
+    coords = coordinate_count(chunk)
 
-    report = {
-        "schema": "zzx-bitnodes-enrichment-report-v8",
-        "generated_at": utc_now(),
-        "node_count": len(nodes),
-        "initial_coordinate_count": coordinate_count(nodes),
-        "selected_modules": selected_modules,
-        "modules": [],
-        "context": {
-            key: context.get(key, "")
-            for key in (
-                "source", "input", "output", "api_dir", "state_dir",
-                "geo_root", "geoip_dir", "city_db", "asn_db", "country_db",
-            )
-        },
-    }
+    report["node_count"] += len(chunk)
+    report["chunk_count"] += 1
+    report["initial_coordinate_count"] += coords
+
+    for stage in stages:
+        stage["report"]["coordinate_count_before"] += coords
+
+        with profile_stage(profiler, "enrich", stage["name"], nodes_in=len(chunk)) as span:
+            chunk = run_stage(stage, chunk, context, strict)
+            span["nodes_out"] = len(chunk)
+
+        coords = coordinate_count(chunk)
+        stage["report"]["coordinate_count_after"] += coords
+
+    output = [normalize_node_record(node) for node in chunk]
+    report["final_coordinate_count"] += coordinate_count(output)
+    return output
+
+
+def stream_enriched_nodes(
+    nodes: Iterable[Any],
+    stages: list[dict[str, Any]],
+    report: dict[str, Any],
+    *,
+    context: dict[str, Any],
+    strict: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    profiler: Any = None,
+) -> Iterator[dict[str, Any]]:
+    for raw_chunk in iter_chunks(nodes, max(1, int(chunk_size))):
+        yield from enrich_chunk(raw_chunk, stages, report, context=context, strict=strict, profiler=profiler)
+
+
+def close_stages(stages: list[dict[str, Any]]) -> None:
+    for stage in stages:
+        close_node_hook(stage["hook"])
+        stage["hook"] = None
+
+
+def init_enrich_worker(
+    modules: list[str],
+    context: dict[str, Any],
+    strict: bool,
+    profile: bool = False,
+    barrier: Any = None,
+) -> None:
+    WORKER_OPTIONS.update(
+        {
+            "context": context,
+            "strict": strict,
+            "profiling": load_profiling() if profile else None,
+            "barrier": barrier,
+        }
+    )
+    WORKER_STAGES[:] = [prepare_stage(name, context, strict) for name in modules]
+    WORKER_REPORTS[:] = [dict(stage["report"]) for stage in WORKER_STAGES]
 
-    enriched = [normalize_node_record(node) for node in nodes]
 
-    for name in selected_modules:
-        before_coords = coordinate_count(enriched)
+def close_enrich_worker() -> int:
+    close_stages(WORKER_STAGES)
+    kv_cache.close_caches()
 
-        module_report = {
+    barrier = WORKER_OPTIONS.get("barrier")
+
+    if barrier is not None:
+        try:
+            barrier.wait(WORKER_CLOSE_TIMEOUT)
+        except threading.BrokenBarrierError:
+            pass
+
+    return os.getpid()
+
+
+def enrich_chunk_worker(
+    raw_chunk: list[Any],
+) -> tuple[list[dict[str, Any]], dict[str, Any], list[dict[str, Any]], list[dict[str, Any]]]:
+    report = {"node_count": 0, "chunk_count": 0, "initial_coordinate_count": 0, "final_coordinate_count": 0}
+    profiling = WORKER_OPTIONS.get("profiling")
+    profiler = profiling.Profiler("enrich-worker") if profiling is not None else None
+
+    for stage, base in zip(WORKER_STAGES, WORKER_REPORTS):
+        stage["report"] = dict(base)
+
+    nodes = enrich_chunk(
+        raw_chunk,
+        WORKER_STAGES,
+        report,
+        context=WORKER_OPTIONS["context"],
+        strict=WORKER_OPTIONS["strict"],
+        profiler=profiler,
+    )
+
+    return nodes, report, [stage["report"] for stage in WORKER_STAGES], profiler.entries() if profiler is not None else []
+
+
+def merge_module_report(target: dict[str, Any], chunk_report: Mapping[str, Any]) -> None:
+    for key in ("coordinate_count_before", "coordinate_count_after", "node_errors"):
+        target[key] = int(target.get(key) or 0) + int(chunk_report.get(key) or 0)
+
+    if STATUS_RANK.get(chunk_report.get("status"), 0) > STATUS_RANK.get(target.get("status"), 0):
+        for key in ("status", "message", "traceback", "mode"):
+            if key in chunk_report:
+                target[key] = chunk_report[key]
+
+
+def merge_chunk_result(
+    report: dict[str, Any],
+    result: tuple[list[dict[str, Any]], dict[str, Any], list[dict[str, Any]], list[dict[str, Any]]],
+    profiler: Any = None,
+) -> list[dict[str, Any]]:
+    nodes, chunk_report, module_reports, profile_entries = result
+
+    for key in ("node_count", "chunk_count", "initial_coordinate_count", "final_coordinate_count"):
+        report[key] += chunk_report[key]
+
+    for target, module_report in zip(report["modules"], module_reports):
+        merge_module_report(target, module_report)
+
+    if profiler is not None:
+        profiler.merge(profile_entries)
+
+    return nodes
+
+
+def parallel_enriched_nodes(
+    nodes: Iterable[Any],
+    report: dict[str, Any],
+    *,
+    modules: list[str],
+    context: dict[str, Any],
+    strict: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    profiler: Any = None,
+) -> Iterator[dict[str, Any]]:
+    report["modules"] = [
+        {
             "name": name,
             "module_path": str(module_path(name)),
             "status": "skipped",
             "message": "",
             "updated_at": utc_now(),
-            "coordinate_count_before": before_coords,
-            "coordinate_count_after": before_coords,
+            "coordinate_count_before": 0,
+            "coordinate_count_after": 0,
+            "node_errors": 0,
         }
-
+        for name in modules
+    ]
+
+    pending: deque[Future] = deque()
+    mp_context = multiprocessing.get_context()
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp_context,
+        initializer=init_enrich_worker,
+        initargs=(modules, context, strict, profiler is not None, mp_context.Barrier(workers)),
+    ) as pool:
         try:
-            module = load_module(name)
-        except Exception as err:
-            module = None
-            module_report["status"] = "error"
-            module_report["message"] = f"{name} failed to load: {err}"
-            module_report["traceback"] = traceback.format_exc(limit=5)
-
-            if strict:
-                report["modules"].append(module_report)
-                raise
-
-            enriched = fallback_enrich(name, enriched)
-            module_report["coordinate_count_after"] = coordinate_count(enriched)
-            report["modules"].append(module_report)
-            continue
+            for raw_chunk in iter_chunks(nodes, max(1, int(chunk_size))):
+                pending.append(pool.submit(enrich_chunk_worker, raw_chunk))
 
-        if module is None:
-            enriched = fallback_enrich(name, enriched)
-            module_report["status"] = "fallback"
-            module_report["message"] = f"{name} module not found; fallback enrichment applied."
-            module_report["coordinate_count_after"] = coordinate_count(enriched)
-            report["modules"].append(module_report)
-            continue
+                if len(pending) >= workers * 2:
+                    yield from merge_chunk_result(report, pending.popleft().result(), profiler)
 
-        fn = find_enricher(module)
+            while pending:
+                yield from merge_chunk_result(report, pending.popleft().result(), profiler)
+        finally:
+            closing = [pool.submit(close_enrich_worker) for _ in range(workers)]
+            report["closed_workers"] = len({future.result() for future in closing})
 
-        if fn is None:
-            enriched = fallback_enrich(name, enriched)
-            module_report["status"] = "fallback"
-            module_report["message"] = f"{name} has no supported enrichment function; fallback applied."
-            module_report["coordinate_count_after"] = coordinate_count(enriched)
-            report["modules"].append(module_report)
-            continue
 
-        try:
-            enriched = call_enricher(name, fn, enriched, context)
-
-            for node in enriched:
-                normalize_enrichment(node)
-                preserve_coordinate_mirrors(node)
-                host_port_mirrors(node)
-                network_fallback(node)
-                node["enrichment"][name] = {
-                    "status": "ok",
-                    "updated_at": utc_now(),
-                    "module_path": str(module_path(name)),
-                }
-
-            enriched = [normalize_node_record(node) for node in enriched]
-            module_report["status"] = "ok"
-            module_report["message"] = f"{name} enrichment completed."
-
-        except Exception as err:
-            module_report["status"] = "error"
-            module_report["message"] = str(err)
-            module_report["traceback"] = traceback.format_exc(limit=5)
+def new_report(selected_modules: list[str], context: dict[str, Any], chunk_size: int) -> dict[str, Any]:
+    return {
+        "schema": "zzx-bitnodes-enrichment-report-v8",
+        "generated_at": utc_now(),
+        "node_count": 0,
+        "chunk_size": chunk_size,
+        "chunk_count": 0,
+        "workers": 1,
+        "initial_coordinate_count": 0,
+        "final_coordinate_count": 0,
+        "selected_modules": selected_modules,
+        "modules": [],
+        "context": {
+            key: context.get(key, "")
+            for key in (
+                "source", "input", "output", "api_dir", "state_dir",
+                "geo_root", "geoip_dir", "city_db", "asn_db", "country_db",
+            )
+        },
+    }
 
-            if strict:
-                report["modules"].append(module_report)
-                raise
 
-            enriched = fallback_enrich(name, enriched)
+def iter_enrich_nodes(
+    nodes: Iterable[Any],
+    report: dict[str, Any],
+    *,
+    modules: list[str] | None = None,
+    context: dict[str, Any] | None = None,
+    strict: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    profiler: Any = None,
+) -> Iterator[dict[str, Any]]:
+    selected_modules = modules or ENRICHMENT_ORDER
+    context = context or {}
+    stages: list[dict[str, Any]] = []
+    report["workers"] = max(1, int(workers))
+
+    if report["workers"] > 1:
+        yield from parallel_enriched_nodes(
+            nodes,
+            report,
+            modules=list(selected_modules),
+            context=context,
+            strict=strict,
+            chunk_size=chunk_size,
+            workers=report["workers"],
+            profiler=profiler,
+        )
+        report["completed_at"] = utc_now()
+        return
 
-        module_report["coordinate_count_after"] = coordinate_count(enriched)
-        report["modules"].append(module_report)
+    try:
+        for name in selected_modules:
+            with profile_stage(profiler, "enrich_init", name):
+                stages.append(prepare_stage(name, context, strict))
+
+        report["modules"] = [stage["report"] for stage in stages]
+        yield from stream_enriched_nodes(
+            nodes,
+            stages,
+            report,
+            context=context,
+            strict=strict,
+            chunk_size=chunk_size,
+            profiler=profiler,
+        )
+    finally:
+        report["modules"] = [stage["report"] for stage in stages]
+        close_stages(stages)
+        kv_cache.close_caches()
 
-    report["node_count"] = len(enriched)
-    report["final_coordinate_count"] = coordinate_count(enriched)
     report["completed_at"] = utc_now()
 
-    return enriched, report
 
-
-def enrich_payload(
-    payload: Any,
+def enrich_nodes(
+    nodes: Iterable[Any],
     *,
     modules: list[str] | None = None,
     context: dict[str, Any] | None = None,
     strict: bool = False,
-) -> tuple[Any, dict[str, Any]]:
-    nodes = extract_nodes(payload)
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    profiler: Any = None,
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    context = context or {}
+    report = new_report(modules or ENRICHMENT_ORDER, context, chunk_size)
+    enriched = list(
+        iter_enrich_nodes(
+            nodes,
+            report,
+            modules=modules,
+            context=context,
+            strict=strict,
+            chunk_size=chunk_size,
+            workers=workers,
+            profiler=profiler,
+        )
+    )
+    return enriched, report
 
-    enriched_nodes, report = enrich_nodes(nodes, modules=modules, context=context, strict=strict)
-    output = put_nodes(payload, enriched_nodes)
 
+def stamp_output(output: Any, report: dict[str, Any], context: dict[str, Any] | None) -> Any:
     if isinstance(output, dict):
         output.setdefault("metadata", {})
         if not isinstance(output["metadata"], dict):
@@ -852,9 +1359,90 @@ def enrich_payload(
         output["metadata"]["coordinate_count"] = report["final_coordinate_count"]
         output["source"] = context.get("source", output.get("source", "zzxbitnodes")) if context else output.get("source", "zzxbitnodes")
 
+    return output
+
+
+def enrich_payload(
+    payload: Any,
+    *,
+    modules: list[str] | None = None,
+    context: dict[str, Any] | None = None,
+    strict: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    nodes: Iterable[Any] | None = None,
+    profiler: Any = None,
+) -> tuple[Any, dict[str, Any]]:
+    if nodes is None:
+        nodes = extract_nodes(payload)
+
+    enriched_nodes, report = enrich_nodes(
+        nodes,
+        modules=modules,
+        context=context,
+        strict=strict,
+        chunk_size=chunk_size,
+        workers=workers,
+        profiler=profiler,
+    )
+    output = stamp_output(put_nodes(snapshot_shell(payload), enriched_nodes), report, context)
+
     return output, report
 
 
+def write_enriched_json(
+    path: Path,
+    payload: Any,
+    nodes: Iterable[dict[str, Any]],
+    report: dict[str, Any],
+    context: dict[str, Any] | None,
+    compact: bool = False,
+) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f".{path.name}.tmp")
+    nodes = iter(nodes)
+    first = next(nodes, None)
+    head = itertools.chain(() if first is None else (first,), nodes)
+    shell = snapshot_shell(payload)
+    colon = ":" if compact else ": "
+    pad = "" if compact else "\n  "
+
+    try:
+        with temp.open("w", encoding="utf-8") as handle:
+            if isinstance(shell, list):
+                write_json_members(handle, ((None, node) for node in head), "[]", compact, 0)
+            else:
+                handle.write("{" + pad + json_text("nodes", compact) + colon)
+
+                if isinstance(shell, Mapping) and isinstance(shell.get("nodes"), Mapping):
+                    members = (
+                        (str(node.get("canonical_address") or node.get("address") or index), node)
+                        for index, node in enumerate(head)
+                    )
+                    write_json_members(handle, members, "{}", compact, 1)
+                else:
+                    write_json_members(handle, ((None, node) for node in head), "[]", compact, 1)
+
+                shell = snapshot_shell(payload)
+                trailer = stamp_output(
+                    {key: value for key, value in (shell.items() if isinstance(shell, Mapping) else ()) if key != "nodes"},
+                    report,
+                    context,
+                )
+
+                for key in trailer if compact else sorted(trailer):
+                    handle.write("," + pad + json_text(key, compact) + colon + json_text(trailer[key], compact, 1))
+
+                handle.write(("" if compact else "\n") + "}")
+
+            handle.write("\n")
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+
+    temp.replace(path)
+
+
 def parse_modules(value: str | None) -> list[str] | None:
     if not value:
         return None
@@ -871,7 +1459,7 @@ def db_status(path: Path) -> dict[str, Any]:
     }
 
 
-def main() -> int:
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Run ZZX Bitnodes enrichment modules over crawler JSON output.", allow_abbrev=False)
 
     parser.add_argument("--input", required=True)
@@ -898,22 +1486,20 @@ def main() -> int:
     parser.add_argument("--sanctions-policy", default=str(DEFAULT_SANCTIONS_POLICY))
     parser.add_argument("--strict", action="store_true")
     parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
 
-    args = parser.parse_args()
+    return parser
 
-    input_path = Path(args.input).resolve()
-    output_path = Path(args.output).resolve()
-    report_path = Path(args.report).resolve() if args.report else None
-
-    payload = read_json(input_path, fallback={})
 
+def build_context(args: argparse.Namespace, input_path: Path, output_path: Path) -> dict[str, Any]:
     geo_root = Path(args.geo_root).resolve()
     geoip_dir = Path(args.geoip_dir).resolve()
     city_db = Path(args.city_db).resolve() if args.city_db else geoip_dir / "dbip-city-lite.mmdb"
     asn_db = Path(args.asn_db).resolve() if args.asn_db else geoip_dir / "dbip-asn-lite.mmdb"
     country_db = Path(args.country_db).resolve() if args.country_db else geoip_dir / "dbip-country-lite.mmdb"
 
-    context = {
+    return {
         "app_root": str(APP_ROOT),
         "tools_dir": str(TOOLS_DIR),
         "bitnodes_root": str(BITNODES_ROOT),
@@ -949,19 +1535,85 @@ def main() -> int:
         "sanctions_policy": str(Path(args.sanctions_policy).resolve()),
     }
 
-    output, report = enrich_payload(payload, modules=parse_modules(args.modules), context=context, strict=args.strict)
+
+def run_from_args(
+    args: argparse.Namespace,
+    payload: Any = None,
+    nodes: Iterable[Any] | None = None,
+    profiler: Any = None,
+) -> tuple[Any, dict[str, Any]]:
+    input_path = Path(args.input).resolve()
+    output_path = Path(args.output).resolve()
+    report_path = Path(args.report).resolve() if args.report else None
+
+    if payload is None:
+        payload, nodes = open_snapshot(input_path)
+
+    context = build_context(args, input_path, output_path)
+
+    output, report = enrich_payload(
+        payload,
+        modules=parse_modules(args.modules),
+        context=context,
+        strict=args.strict,
+        chunk_size=max(1, args.chunk_size),
+        workers=max(1, args.workers),
+        nodes=nodes,
+        profiler=profiler,
+    )
     report["geoip_db_status"] = context["geoip_db_status"]
 
-    write_json(output_path, output, compact=args.compact)
+    with profile_stage(profiler, "enrich", "write", nodes_in=report["node_count"]):
+        write_json(output_path, output, compact=args.compact)
+
+    if report_path:
+        write_json(report_path, report, compact=args.compact)
+
+    return output, report
+
+
+def stream_from_args(args: argparse.Namespace) -> dict[str, Any]:
+    input_path = Path(args.input).resolve()
+    output_path = Path(args.output).resolve()
+    report_path = Path(args.report).resolve() if args.report else None
+    payload, nodes = open_snapshot(input_path)
+    context = build_context(args, input_path, output_path)
+    modules = parse_modules(args.modules)
+    chunk_size = max(1, args.chunk_size)
+    report = new_report(modules or ENRICHMENT_ORDER, context, chunk_size)
+
+    if nodes is None:
+        nodes = extract_nodes(payload)
+
+    enriched = iter_enrich_nodes(
+        nodes,
+        report,
+        modules=modules,
+        context=context,
+        strict=args.strict,
+        chunk_size=chunk_size,
+        workers=max(1, args.workers),
+    )
+    write_enriched_json(output_path, payload, enriched, report, context, compact=args.compact)
+    report["geoip_db_status"] = context["geoip_db_status"]
 
     if report_path:
         write_json(report_path, report, compact=args.compact)
 
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    report = stream_from_args(args)
+    output_path = Path(args.output).resolve()
+
     print(
         "enrichment complete: "
         f"{report['node_count']} nodes, "
         f"coordinates={report['final_coordinate_count']}, "
         f"{len(report['modules'])} modules, "
+        f"workers={report['workers']}, "
         f"output={output_path}"
     )
 
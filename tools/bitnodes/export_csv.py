@@ -8,7 +8,7 @@ import json
 from pathlib import Path
 from typing import Any
 
-from export_json import load_snapshot, node_rows, mkdir
+from export_json import load_snapshot, node_rows, node_table, mkdir
 
 
 CSV_FIELDS = [
@@ -120,19 +120,22 @@ def write_csv(path: Path, rows: list[dict[str, Any]], fields: list[str] = CSV_FI
     return entry
 
 
-def group_count(rows: list[dict[str, Any]], key: str, unknown: str = "Unknown") -> list[dict[str, Any]]:
-    counts: dict[str, int] = {}
+def group_count(rows: Any, key: str, unknown: str = "Unknown") -> list[dict[str, Any]]:
+    if hasattr(rows, "counts"):
+        counts = rows.counts(key, unknown)
+    else:
+        counts = {}
 
-    for row in rows:
-        value = str(row.get(key) or unknown)
-        counts[value] = counts.get(value, 0) + 1
+        for row in rows:
+            value = str(row.get(key) or unknown)
+            counts[value] = counts.get(value, 0) + 1
 
     output = [{key: value, "count": count} for value, count in counts.items()]
     output.sort(key=lambda item: item["count"], reverse=True)
     return output
 
 
-def write_group_csv(path: Path, rows: list[dict[str, Any]], key: str, unknown: str = "Unknown", gzip_copy: bool = True) -> dict[str, Any]:
+def write_group_csv(path: Path, rows: Any, key: str, unknown: str = "Unknown", gzip_copy: bool = True) -> dict[str, Any]:
     data = group_count(rows, key, unknown=unknown)
     mkdir(path.parent)
 
@@ -184,6 +187,7 @@ def export_csv(
         payload["source"] = source
 
     rows = node_rows(payload.get("nodes", {}))
+    table = node_table(rows)
     mkdir(output_dir)
 
     manifest: dict[str, Any] = {
@@ -252,7 +256,7 @@ def export_csv(
         ("zzxgcs", "zzxgcs.csv", "unknown"),
         ("zzxgms", "zzxgms.csv", "unknown"),
     ]:
-        files[filename] = write_group_csv(output_dir / filename, rows, key, unknown=unknown, gzip_copy=gzip_copy)
+        files[filename] = write_group_csv(output_dir / filename, table, key, unknown=unknown, gzip_copy=gzip_copy)
 
     status_rows = [
         {"metric": "total_nodes", "value": len(rows)},
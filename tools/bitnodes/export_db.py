@@ -5,12 +5,16 @@ import argparse
 import csv
 import gzip
 import hashlib
+import importlib.util
 import ipaddress
 import json
 import math
 import re
 import sqlite3
+import struct
+import sys
 import time
+import zlib
 from collections import Counter, defaultdict
 from datetime import datetime, timezone
 from pathlib import Path
@@ -27,6 +31,14 @@ DEFAULT_DATABASE = "zzx_bitnodes"
 DEFAULT_MAX_BYTES = 24_000_000
 SAFE_DB_RE = re.compile(r"^[a-zA-Z0-9_]+$")
 
+NODE_TABLE_PATH = Path(__file__).resolve().with_name("node_table.py")
+NODE_TABLE_MODULE = "zzx_bitnodes_node_table"
+
+MARIADB_INSERT_ROWS = 500
+MARIADB_INSERT_BYTES = 1_000_000
+GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+GZIP_TRAILER_RESERVE = 32
+
 DEFAULT_INPUTS = [
     DEFAULT_API_DIR / "aggregate" / "zzxbitnodes" / "latest.json",
     DEFAULT_API_DIR / "aggregate" / "originalbitnodes" / "latest.json",
@@ -101,6 +113,34 @@ def sha256_bytes(value: bytes) -> str:
     return hashlib.sha256(value).hexdigest()
 
 
+def load_node_table() -> Any:
+    module = sys.modules.get(NODE_TABLE_MODULE)
+
+    if module is not None:
+        return module
+
+    spec = importlib.util.spec_from_file_location(NODE_TABLE_MODULE, str(NODE_TABLE_PATH))
+
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"cannot load {NODE_TABLE_PATH}")
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[NODE_TABLE_MODULE] = module
+
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        sys.modules.pop(NODE_TABLE_MODULE, None)
+        raise
+
+    return module
+
+
+def node_table(records: Any) -> Any:
+    module = load_node_table()
+    return records if isinstance(records, module.NodeTable) else module.NodeTable(records)
+
+
 def read_json(path: Path) -> Any:
     if not path.exists():
         return {}
@@ -156,6 +196,57 @@ def gzip_text(path: Path, text: str) -> int:
     return path.stat().st_size
 
 
+def compress_bound(size: int) -> int:
+    return size + (size >> 12) + (size >> 14) + (size >> 25) + 13
+
+
+class GzipShardWriter:
+    def __init__(self, path: Path, compresslevel: int = 9) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.handle = path.open("wb")
+        self.digest = hashlib.sha256()
+        self.compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self.size = 0
+        self.crc = 0
+        self.plain_size = 0
+        self.node_count = 0
+        self.emit(GZIP_HEADER)
+
+    def emit(self, data: bytes) -> None:
+        if data:
+            self.handle.write(data)
+            self.digest.update(data)
+            self.size += len(data)
+
+    def write(self, data: bytes) -> None:
+        self.crc = zlib.crc32(data, self.crc)
+        self.plain_size += len(data)
+        self.emit(self.compressor.compress(data))
+        self.emit(self.compressor.flush(zlib.Z_SYNC_FLUSH))
+
+    def fits(self, data: bytes, limit: int, reserve: int = 0) -> bool:
+        tail = compress_bound(reserve) + GZIP_TRAILER_RESERVE
+
+        if self.size + compress_bound(len(data)) + tail <= limit:
+            return True
+
+        trial = self.compressor.copy()
+        added = len(trial.compress(data)) + len(trial.flush(zlib.Z_SYNC_FLUSH))
+        return self.size + added + tail <= limit
+
+    def close(self) -> dict[str, Any]:
+        self.emit(self.compressor.flush(zlib.Z_FINISH))
+        self.emit(struct.pack("<II", self.crc & 0xFFFFFFFF, self.plain_size & 0xFFFFFFFF))
+        self.handle.close()
+
+        return {
+            "size_bytes": self.size,
+            "node_count": self.node_count,
+            "sha256": self.digest.hexdigest(),
+        }
+
+
 def sql_string(value: Any) -> str:
     if value is None:
         return "NULL"
@@ -442,7 +533,21 @@ def normalize_array(address: str, row: list[Any]) -> dict[str, Any]:
     return record
 
 
-def normalize_record(source: str, address: str, value: Any, payload: Any, input_path: Path) -> dict[str, Any]:
+def payload_sha256(payload: Any) -> str | None:
+    if not isinstance(payload, dict):
+        return None
+
+    return sha256_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":"), sort_keys=True, default=str))
+
+
+def normalize_record(
+    source: str,
+    address: str,
+    value: Any,
+    payload: Any,
+    input_path: Path,
+    payload_hash: str | None = None,
+) -> dict[str, Any]:
     if isinstance(value, dict):
         row = dict(value)
     elif isinstance(value, list):
@@ -457,7 +562,8 @@ def normalize_record(source: str, address: str, value: Any, payload: Any, input_
     network = infer_network(canon, row)
 
     raw_json = json.dumps(row, ensure_ascii=False, separators=(",", ":"), sort_keys=True, default=str)
-    payload_hash = sha256_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":"), sort_keys=True, default=str)) if isinstance(payload, dict) else None
+    if payload_hash is None:
+        payload_hash = payload_sha256(payload)
 
     node_id = clean(first(row, ("node_id", "id", "map_node")))
     if not node_id:
@@ -543,6 +649,19 @@ def normalize_record(source: str, address: str, value: Any, payload: Any, input_
     }
 
 
+def payload_records(path: Path, payload: Any) -> list[dict[str, Any]]:
+    source = infer_source(path, payload)
+    payload_hash = payload_sha256(payload)
+    records: list[dict[str, Any]] = []
+
+    for address, value in node_items(payload):
+        record = normalize_record(source, address, value, payload, path, payload_hash)
+        if record["canonical_address"]:
+            records.append(record)
+
+    return records
+
+
 def load_records(inputs: list[Path]) -> list[dict[str, Any]]:
     records: list[dict[str, Any]] = []
 
@@ -550,14 +669,12 @@ def load_records(inputs: list[Path]) -> list[dict[str, Any]]:
         if not path.exists():
             continue
 
-        payload = read_json(path)
-        source = infer_source(path, payload)
+        records.extend(payload_records(path, read_json(path)))
+
+    return dedupe_records(records)
 
-        for address, value in node_items(payload):
-            record = normalize_record(source, address, value, payload, path)
-            if record["canonical_address"]:
-                records.append(record)
 
+def dedupe_records(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
     deduped: dict[tuple[str, str], dict[str, Any]] = {}
 
     for row in records:
@@ -577,8 +694,8 @@ def load_records(inputs: list[Path]) -> list[dict[str, Any]]:
     return list(deduped.values())
 
 
-def source_counts(records: list[dict[str, Any]]) -> dict[str, int]:
-    return dict(sorted(Counter(str(row.get("source") or "unknown") for row in records).items()))
+def source_counts(records: Any) -> dict[str, int]:
+    return dict(sorted(node_table(records).counts("source").items()))
 
 
 def public_row(row: dict[str, Any]) -> dict[str, Any]:
@@ -722,13 +839,17 @@ def sql_value(column: str, row: dict[str, Any]) -> str:
     return sql_string(row.get(key))
 
 
-def insert_node_sql(row: dict[str, Any]) -> str:
-    values = [sql_value(column, row) for column in SQL_COLUMNS]
+def node_values_sql(row: dict[str, Any]) -> str:
+    return f"({', '.join(sql_value(column, row) for column in SQL_COLUMNS)})"
+
+
+def insert_nodes_sql(values: list[str]) -> str:
     updates = [f"{column}=VALUES({column})" for column in SQL_COLUMNS if column not in {"node_id", "source_name"}]
 
     return (
-        f"INSERT INTO bitnodes_nodes ({', '.join(SQL_COLUMNS)}) VALUES ({', '.join(values)}) "
-        f"ON DUPLICATE KEY UPDATE {', '.join(updates)};"
+        f"INSERT INTO bitnodes_nodes ({', '.join(SQL_COLUMNS)}) VALUES\n"
+        + ",\n".join(values)
+        + f"\nON DUPLICATE KEY UPDATE {', '.join(updates)};\n"
     )
 
 
@@ -744,7 +865,15 @@ def insert_export_sql(export_id: str, source_count: int, node_count: int, shard_
     )
 
 
-def export_mariadb_shards(records: list[dict[str, Any]], output_dir: Path, database: str, max_bytes: int, compact: bool) -> dict[str, Any]:
+def export_mariadb_shards(
+    records: list[dict[str, Any]],
+    output_dir: Path,
+    database: str,
+    max_bytes: int,
+    compact: bool,
+    insert_rows: int = MARIADB_INSERT_ROWS,
+    insert_bytes: int = MARIADB_INSERT_BYTES,
+) -> dict[str, Any]:
     if not SAFE_DB_RE.match(database):
         raise SystemExit(f"unsafe database name: {database}")
 
@@ -764,54 +893,67 @@ def export_mariadb_shards(records: list[dict[str, Any]], output_dir: Path, datab
         "SET FOREIGN_KEY_CHECKS=0;",
         schema_sql(database),
         "",
-    ])
-    footer = "\nSET FOREIGN_KEY_CHECKS=1;\n"
+    ]).encode("utf-8")
+    footer = b"SET FOREIGN_KEY_CHECKS=1;\n"
 
-    shards = []
-    lines = [header]
-    plain_estimate = len(header.encode("utf-8"))
-    current_count = 0
-    shard_no = 0
-    plain_limit = max_bytes * 5
+    shards: list[dict[str, Any]] = []
+    writer: GzipShardWriter | None = None
+    values: list[str] = []
+    values_size = 0
 
-    def flush() -> None:
-        nonlocal lines, plain_estimate, current_count, shard_no
+    def close_shard() -> None:
+        nonlocal writer
 
-        if current_count <= 0:
+        if writer is None:
             return
 
-        text = "\n".join(lines) + footer
-        path = shard_dir / f"bitnodes_mariadb_{shard_no:04d}.sql.gz"
-        size = gzip_text(path, text)
+        writer.write(footer)
+        shard = writer.close()
 
         shards.append({
-            "file": path.name,
-            "path": path.relative_to(output_dir).as_posix(),
-            "size_bytes": size,
-            "node_count": current_count,
-            "sha256": sha256_bytes(path.read_bytes()),
+            "file": writer.path.name,
+            "path": writer.path.relative_to(output_dir).as_posix(),
+            **shard,
         })
+        writer = None
 
-        shard_no += 1
-        lines = [header]
-        plain_estimate = len(header.encode("utf-8"))
-        current_count = 0
+    def write_statement() -> None:
+        nonlocal writer, values, values_size
 
-    for row in records:
-        line = insert_node_sql(row)
-        line_size = len(line.encode("utf-8")) + 1
+        if not values:
+            return
+
+        statement = insert_nodes_sql(values).encode("utf-8")
+
+        if writer is not None and not writer.fits(statement, max_bytes, reserve=len(footer)):
+            close_shard()
 
-        if current_count > 0 and plain_estimate + line_size >= plain_limit:
-            flush()
+        if writer is None:
+            writer = GzipShardWriter(shard_dir / f"bitnodes_mariadb_{len(shards):04d}.sql.gz")
+            writer.write(header)
 
-        lines.append(line)
-        plain_estimate += line_size
-        current_count += 1
+        writer.write(statement)
+        writer.node_count += len(values)
+        values = []
+        values_size = 0
 
-    flush()
+    try:
+        for row in records:
+            value = node_values_sql(row)
+            values.append(value)
+            values_size += len(value) + 2
+
+            if len(values) >= insert_rows or values_size >= insert_bytes:
+                write_statement()
 
-    control_path = shard_dir / "bitnodes_mariadb_control.sql.gz"
-    control_text = "\n".join([
+        write_statement()
+        close_shard()
+    finally:
+        if writer is not None:
+            writer.handle.close()
+
+    control = GzipShardWriter(shard_dir / "bitnodes_mariadb_control.sql.gz")
+    control.write("\n".join([
         "-- ZZX-Labs Bitnodes MariaDB control file",
         f"-- generated_at_utc: {utc_now()}",
         "SET NAMES utf8mb4;",
@@ -820,8 +962,8 @@ def export_mariadb_shards(records: list[dict[str, Any]], output_dir: Path, datab
         insert_export_sql(export_id, len(source_counts(records)), len(records), len(shards)),
         "SET FOREIGN_KEY_CHECKS=1;",
         "",
-    ])
-    control_size = gzip_text(control_path, control_text)
+    ]).encode("utf-8"))
+    control_info = control.close()
 
     manifest = {
         "schema": SCHEMA,
@@ -831,17 +973,18 @@ def export_mariadb_shards(records: list[dict[str, Any]], output_dir: Path, datab
         "export_id": export_id,
         "format": "mariadb-sql-gzip-shards",
         "max_bytes": max_bytes,
+        "insert_rows": insert_rows,
         "node_count": len(records),
         "source_counts": source_counts(records),
         "control": {
-            "file": control_path.name,
-            "path": control_path.relative_to(output_dir).as_posix(),
-            "size_bytes": control_size,
-            "sha256": sha256_bytes(control_path.read_bytes()),
+            "file": control.path.name,
+            "path": control.path.relative_to(output_dir).as_posix(),
+            "size_bytes": control_info["size_bytes"],
+            "sha256": control_info["sha256"],
         },
         "shard_count": len(shards),
         "shards": shards,
-        "import_order": [f"mariadb/{control_path.name}", *[f"mariadb/{item['file']}" for item in shards]],
+        "import_order": [f"mariadb/{control.path.name}", *[f"mariadb/{item['file']}" for item in shards]],
     }
 
     write_json(output_dir / "mariadb_manifest.json", manifest, compact=compact)
@@ -1205,14 +1348,15 @@ def export_redis_artifacts(records: list[dict[str, Any]], output_dir: Path) -> d
     }
     json_size = write_gzip_json(json_path, redis_json, compact=True)
 
+    table = node_table(records)
     counters = {
-        "sources": Counter(str(row.get("source") or "unknown") for row in records),
-        "countries": Counter(str(row.get("country") or "unknown") for row in records),
-        "cities": Counter(str(row.get("city") or "unknown") for row in records),
-        "asns": Counter(str(row.get("asn") or "unknown") for row in records),
-        "networks": Counter(str(row.get("network") or "unknown") for row in records),
-        "organizations": Counter(str(row.get("organization") or "unknown") for row in records),
-        "providers": Counter(str(row.get("provider") or "unknown") for row in records),
+        "sources": table.counts("source"),
+        "countries": table.counts("country"),
+        "cities": table.counts("city"),
+        "asns": table.counts("asn"),
+        "networks": table.counts("network"),
+        "organizations": table.counts("organization"),
+        "providers": table.counts("provider"),
     }
 
     with gzip.open(command_path, "wb", compresslevel=9) as handle:
@@ -1266,27 +1410,34 @@ def normalized_key(value: Any) -> str:
     return text if text else "unknown"
 
 
-def group_stats(records: list[dict[str, Any]], key: str) -> list[dict[str, Any]]:
-    buckets: dict[str, list[dict[str, Any]]] = defaultdict(list)
+def flag_set(value: Any) -> bool:
+    return bool_int(value) == 1
 
-    for row in records:
-        buckets[normalized_key(row.get(key))].append(row)
+
+def group_stats(records: Any, key: str) -> list[dict[str, Any]]:
+    table = node_table(records)
+    counts = table.counts(key, key=normalized_key)
+    reachable_now = table.counts(key, key=normalized_key, mask=table.mask("reachable_now", flag_set))
+    reachable_24h = table.counts(key, key=normalized_key, mask=table.mask("reachable_24h", flag_set))
+    networks = table.crosstab(key, "network", key=normalized_key)
+    sources = table.crosstab(key, "source", key=normalized_key)
 
     output = []
-    for name, rows in buckets.items():
+    for name, count in counts.items():
         output.append({
             key: name,
-            "node_count": len(rows),
-            "reachable_now": sum(1 for row in rows if bool_int(row.get("reachable_now")) == 1),
-            "reachable_24h": sum(1 for row in rows if bool_int(row.get("reachable_24h")) == 1),
-            "networks": dict(sorted(Counter(str(row.get("network") or "unknown") for row in rows).items())),
-            "sources": dict(sorted(Counter(str(row.get("source") or "unknown") for row in rows).items())),
+            "node_count": count,
+            "reachable_now": reachable_now.get(name, 0),
+            "reachable_24h": reachable_24h.get(name, 0),
+            "networks": dict(sorted(networks[name].items())),
+            "sources": dict(sorted(sources[name].items())),
         })
 
     return sorted(output, key=lambda item: item["node_count"], reverse=True)
 
 
-def export_geo_indexes(records: list[dict[str, Any]], output_dir: Path, compact: bool) -> dict[str, Any]:
+def export_geo_indexes(records: Any, output_dir: Path, compact: bool) -> dict[str, Any]:
+    table = node_table(records)
     geo_dir = output_dir / "geo"
     geo_dir.mkdir(parents=True, exist_ok=True)
 
@@ -1303,8 +1454,8 @@ def export_geo_indexes(records: list[dict[str, Any]], output_dir: Path, compact:
             "schema": f"zzx-bitnodes-{key}-index-v2",
             "generated_at": utc_now(),
             "field": key,
-            "count": len(records),
-            "items": group_stats(records, key),
+            "count": len(table),
+            "items": group_stats(table, key),
         }
         size = write_gzip_json(path, payload, compact=True)
         artifacts[key] = {"path": f"geo/{path.name}", "size_bytes": size, "sha256": sha256_bytes(path.read_bytes())}
@@ -1314,10 +1465,6 @@ def export_geo_indexes(records: list[dict[str, Any]], output_dir: Path, compact:
     return manifest
 
 
-def has_coordinates(row: dict[str, Any]) -> bool:
-    return float_or_none(row.get("latitude")) is not None and float_or_none(row.get("longitude")) is not None
-
-
 def geojson_feature(row: dict[str, Any]) -> dict[str, Any]:
     lat = float_or_none(row.get("latitude"))
     lon = float_or_none(row.get("longitude"))
@@ -1332,24 +1479,29 @@ def export_map_artifacts(records: list[dict[str, Any]], output_dir: Path, compac
     map_dir = output_dir / "map"
     map_dir.mkdir(parents=True, exist_ok=True)
 
-    coordinate_records = [row for row in records if has_coordinates(row)]
-
-    layers = {
-        "nodes": coordinate_records,
-        "reachable": [row for row in coordinate_records if bool_int(row.get("reachable_now")) == 1],
-        "ipv4": [row for row in coordinate_records if row.get("network") == "ipv4"],
-        "ipv6": [row for row in coordinate_records if row.get("network") == "ipv6"],
-        "tor": [row for row in coordinate_records if row.get("network") == "tor" or bool_int(row.get("is_tor")) == 1],
-        "i2p": [row for row in coordinate_records if row.get("network") == "i2p" or bool_int(row.get("is_i2p")) == 1],
-        "vpn": [row for row in coordinate_records if bool_int(row.get("is_vpn")) == 1],
-        "proxy": [row for row in coordinate_records if bool_int(row.get("is_proxy")) == 1],
-        "government": [row for row in coordinate_records if bool_int(row.get("suspected_government")) == 1],
-        "military": [row for row in coordinate_records if bool_int(row.get("suspected_military")) == 1],
-        "datacenter": [row for row in coordinate_records if bool_int(row.get("suspected_datacenter")) == 1],
-        "apt": [row for row in coordinate_records if bool_int(row.get("suspected_apt_related")) == 1],
-        "sanctioned": [row for row in coordinate_records if bool_int(row.get("is_sanctioned_node")) == 1],
+    table = node_table(records)
+    located = table.all_of(table.finite("latitude", float_or_none), table.finite("longitude", float_or_none))
+    coordinate_records = table.select(located)
+
+    layer_masks = {
+        "reachable": table.mask("reachable_now", flag_set),
+        "ipv4": table.equals("network", "ipv4"),
+        "ipv6": table.equals("network", "ipv6"),
+        "tor": table.any_of(table.equals("network", "tor"), table.mask("is_tor", flag_set)),
+        "i2p": table.any_of(table.equals("network", "i2p"), table.mask("is_i2p", flag_set)),
+        "vpn": table.mask("is_vpn", flag_set),
+        "proxy": table.mask("is_proxy", flag_set),
+        "government": table.mask("suspected_government", flag_set),
+        "military": table.mask("suspected_military", flag_set),
+        "datacenter": table.mask("suspected_datacenter", flag_set),
+        "apt": table.mask("suspected_apt_related", flag_set),
+        "sanctioned": table.mask("is_sanctioned_node", flag_set),
     }
 
+    layers = {"nodes": coordinate_records}
+    for name, mask in layer_masks.items():
+        layers[name] = table.select(table.all_of(located, mask))
+
     artifacts = {}
     for name, rows in layers.items():
         path = map_dir / f"{name}.geojson.gz"
@@ -1551,7 +1703,7 @@ def main() -> int:
         print("no input files found")
         return 0
 
-    records = load_records(inputs)
+    records = node_table(load_records(inputs))
 
     if not records and args.strict:
         raise SystemExit("no records found")
@@ -3,17 +3,37 @@ from __future__ import annotations
 
 import argparse
 import gzip
+import importlib.util
 import ipaddress
 import json
 import math
 import statistics
+import sys
 import time
 from collections import Counter, defaultdict
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Callable, Iterable, Mapping
 
 
 APP_ROOT = Path(__file__).resolve().parents[2]
+MAP_TILES_PATH = Path(__file__).resolve().parent / "map" / "maptiles.py"
+MAP_TILES_MODULE = "zzx_bitnodes_map_maptiles"
+SNAPSHOT_STREAM_MODULE = "zzx_bitnodes_snapshot_stream"
+NODE_TABLE_MODULE = "zzx_bitnodes_node_table"
+
+MAP_TILE_FIELDS = (
+    "address",
+    "network",
+    "country",
+    "city",
+    "asn",
+    "organization",
+    "provider",
+    "geohashid",
+    "reachable",
+    "reachable_now",
+    "peer_index",
+)
 
 
 def utc_now() -> int:
@@ -389,6 +409,31 @@ def dict_to_node_array(value: dict[str, Any]) -> list[Any]:
     ]
 
 
+def normalize_node_entry(address: Any, value: Any, keyed: bool = True) -> tuple[str, list[Any]] | None:
+    if keyed and isinstance(value, list):
+        node_address: Any = address
+        row = normalize_node_array(value)
+    elif isinstance(value, dict):
+        if keyed:
+            node_address = value.get("address") or value.get("node") or value.get("addr") or address
+        else:
+            node_address = value.get("address") or value.get("node") or value.get("addr") or value.get("host")
+
+            if not node_address:
+                return None
+
+        row = dict_to_node_array(value)
+    else:
+        return None
+
+    node_address = str(node_address).strip()
+
+    if not node_address:
+        return None
+
+    return node_address, normalize_node_array(row)
+
+
 def normalize_nodes_object(raw: Any) -> dict[str, list[Any]]:
     nodes: dict[str, list[Any]] = {}
 
@@ -396,32 +441,118 @@ def normalize_nodes_object(raw: Any) -> dict[str, list[Any]]:
         if isinstance(raw.get("nodes"), dict):
             raw = raw["nodes"]
 
-        for address, value in raw.items():
-            if isinstance(value, list):
-                nodes[str(address)] = normalize_node_array(value)
-            elif isinstance(value, dict):
-                node_address = value.get("address") or value.get("node") or value.get("addr") or address
-                nodes[str(node_address)] = dict_to_node_array(value)
-
+        entries = (normalize_node_entry(address, value) for address, value in raw.items())
     elif isinstance(raw, list):
-        for item in raw:
-            if not isinstance(item, dict):
-                continue
+        entries = (normalize_node_entry(None, item, keyed=False) for item in raw)
+    else:
+        return nodes
 
-            address = item.get("address") or item.get("node") or item.get("addr") or item.get("host")
+    for entry in entries:
+        if entry is not None:
+            nodes[entry[0]] = entry[1]
 
-            if address:
-                nodes[str(address)] = dict_to_node_array(item)
+    return nodes
 
-    return {
-        str(address).strip(): normalize_node_array(row)
-        for address, row in nodes.items()
-        if str(address).strip()
-    }
 
+def load_snapshot_stream() -> Any | None:
+    module = sys.modules.get(SNAPSHOT_STREAM_MODULE)
+
+    if module is not None:
+        return module
+
+    path = Path(__file__).resolve().with_name("snapshot_stream.py")
+
+    if not path.exists():
+        return None
+
+    spec = importlib.util.spec_from_file_location(SNAPSHOT_STREAM_MODULE, str(path))
 
-def load_snapshot(input_path: Path) -> dict[str, Any]:
-    payload = read_json(input_path)
+    if spec is None or spec.loader is None:
+        return None
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[SNAPSHOT_STREAM_MODULE] = module
+
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        sys.modules.pop(SNAPSHOT_STREAM_MODULE, None)
+        return None
+
+    return module
+
+
+def load_node_table() -> Any | None:
+    module = sys.modules.get(NODE_TABLE_MODULE)
+
+    if module is not None:
+        return module
+
+    path = Path(__file__).resolve().with_name("node_table.py")
+
+    if not path.exists():
+        return None
+
+    spec = importlib.util.spec_from_file_location(NODE_TABLE_MODULE, str(path))
+
+    if spec is None or spec.loader is None:
+        return None
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[NODE_TABLE_MODULE] = module
+
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        sys.modules.pop(NODE_TABLE_MODULE, None)
+        return None
+
+    return module
+
+
+def node_table(rows: Any) -> Any:
+    module = load_node_table()
+
+    if module is None or isinstance(rows, module.NodeTable):
+        return rows
+
+    return module.NodeTable(rows)
+
+
+def collect_nodes(records: Iterable[tuple[str, Any]]) -> dict[str, list[Any]]:
+    nodes: dict[str, list[Any]] = {}
+
+    for address, value in records:
+        entry = normalize_node_entry(address, value, keyed=getattr(records, "container", "object") != "array")
+
+        if entry is not None:
+            nodes[entry[0]] = entry[1]
+
+    return nodes
+
+
+def load_snapshot(input_path: Path | Iterable[tuple[str, Any]]) -> dict[str, Any]:
+    stream = load_snapshot_stream()
+
+    if not isinstance(input_path, (str, Path)):
+        records: Any = input_path
+    elif stream is not None:
+        records = stream.SnapshotReader(Path(input_path))
+    else:
+        records = None
+
+    if records is not None:
+        nodes = collect_nodes(records)
+        header = getattr(records, "header", {})
+
+        if not isinstance(header, dict):
+            raise ValueError("Bitnodes export input must be a JSON object.")
+
+        payload = header
+        payload["nodes"] = nodes
+        return payload
+
+    payload = read_json(Path(input_path))
 
     if not isinstance(payload, dict):
         raise ValueError("Bitnodes export input must be a JSON object.")
@@ -543,8 +674,9 @@ def normalize_node(address: str, values: list[Any], rank: int | None = None) ->
     return item
 
 
-def node_rows(nodes: dict[str, list[Any]]) -> list[dict[str, Any]]:
-    rows = [normalize_node(address, values) for address, values in nodes.items()]
+def node_rows(nodes: Mapping[str, list[Any]] | Iterable[tuple[str, list[Any]]]) -> list[dict[str, Any]]:
+    pairs = nodes.items() if isinstance(nodes, Mapping) else nodes
+    rows = [normalize_node(address, values) for address, values in pairs]
 
     rows.sort(
         key=lambda row: (
@@ -606,7 +738,10 @@ def counter_top(values, limit: int = 25) -> list[dict[str, Any]]:
     return [{"value": key, "count": count} for key, count in counter.most_common(limit)]
 
 
-def group_rows(rows: list[dict[str, Any]], key_name: str, unknown: str = "Unknown") -> dict[str, list[dict[str, Any]]]:
+def group_rows(rows: Any, key_name: str, unknown: str = "Unknown") -> dict[str, list[dict[str, Any]]]:
+    if hasattr(rows, "groups"):
+        return rows.groups(key_name, unknown)
+
     grouped: dict[str, list[dict[str, Any]]] = defaultdict(list)
 
     for row in rows:
@@ -656,7 +791,7 @@ def summarize_group(name: str, rows: list[dict[str, Any]], include_nodes: bool =
 
 
 def build_group_payload(
-    rows: list[dict[str, Any]],
+    rows: Any,
     key_name: str,
     total_name: str,
     unknown: str = "Unknown",
@@ -1023,7 +1158,7 @@ def build_registry_statistics(rows: list[dict[str, Any]], payload: dict[str, Any
     }
 
 
-def build_networks_payload(rows: list[dict[str, Any]], include_nodes: bool = False) -> dict[str, Any]:
+def build_networks_payload(rows: Any, include_nodes: bool = False) -> dict[str, Any]:
     grouped = group_rows(rows, "network", unknown="unknown")
 
     results = [
@@ -1161,7 +1296,8 @@ def build_latest_payload(payload: dict[str, Any], rows: list[dict[str, Any]]) ->
     return latest
 
 
-def build_widget_payloads(rows: list[dict[str, Any]], payload: dict[str, Any]) -> dict[str, Any]:
+def build_widget_payloads(rows: Any, payload: dict[str, Any]) -> dict[str, Any]:
+    table = node_table(rows)
     counts = build_counts(rows, payload)
 
     return {
@@ -1194,11 +1330,37 @@ def build_widget_payloads(rows: list[dict[str, Any]], payload: dict[str, Any]) -
             "policy_restricted": counts["policy_restricted"],
         },
         "widget-heights.json": build_heights_payload(rows),
-        "widget-countries.json": build_group_payload(rows, "country", "total_countries", unknown="??"),
-        "widget-agents.json": build_group_payload(rows, "agent", "total_agents", unknown="UNKNOWN"),
+        "widget-countries.json": build_group_payload(table, "country", "total_countries", unknown="??"),
+        "widget-agents.json": build_group_payload(table, "agent", "total_agents", unknown="UNKNOWN"),
     }
 
 
+def load_map_tiles() -> Any | None:
+    module = sys.modules.get(MAP_TILES_MODULE)
+
+    if module is not None:
+        return module
+
+    if not MAP_TILES_PATH.exists():
+        return None
+
+    spec = importlib.util.spec_from_file_location(MAP_TILES_MODULE, str(MAP_TILES_PATH))
+
+    if spec is None or spec.loader is None:
+        return None
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[MAP_TILES_MODULE] = module
+
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        sys.modules.pop(MAP_TILES_MODULE, None)
+        return None
+
+    return module
+
+
 def write_payload_pair(output_dir: Path, filename: str, payload: dict[str, Any], pretty: bool, gzip_copy: bool) -> dict[str, Any]:
     path = output_dir / filename
     size = write_json(path, payload, pretty=pretty)
@@ -1218,7 +1380,7 @@ def write_payload_pair(output_dir: Path, filename: str, payload: dict[str, Any],
 
 
 def export_all(
-    input_path: Path,
+    input_path: Path | Iterable[tuple[str, Any]],
     output_dir: Path,
     source: str | None = None,
     pretty: bool = True,
@@ -1237,6 +1399,7 @@ def export_all(
 
     nodes = payload.get("nodes", {})
     rows = node_rows(nodes)
+    table = node_table(rows)
 
     peer_health = build_peer_health_payload(rows)
     leaderboard = build_leaderboard_payload(peer_health)
@@ -1253,25 +1416,25 @@ def export_all(
         "unreachable.json": build_subset_payload(rows, lambda row: row.get("reachable") is False, "total_unreachable_nodes"),
         "reachable-now.json": build_subset_payload(rows, lambda row: row.get("reachable_now") is True, "total_reachable_now_nodes"),
         "reachable-24h.json": build_subset_payload(rows, lambda row: row.get("reachable_24h") is True, "total_reachable_24h_nodes"),
-        "countries.json": build_group_payload(rows, "country", "total_countries", unknown="??", include_nodes=include_group_nodes),
-        "continents.json": build_group_payload(rows, "continent", "total_continents", include_nodes=include_group_nodes),
-        "regions.json": build_group_payload(rows, "region", "total_regions", include_nodes=include_group_nodes),
-        "territories.json": build_group_payload(rows, "territory", "total_territories", include_nodes=include_group_nodes),
-        "counties.json": build_group_payload(rows, "county", "total_counties", include_nodes=include_group_nodes),
+        "countries.json": build_group_payload(table, "country", "total_countries", unknown="??", include_nodes=include_group_nodes),
+        "continents.json": build_group_payload(table, "continent", "total_continents", include_nodes=include_group_nodes),
+        "regions.json": build_group_payload(table, "region", "total_regions", include_nodes=include_group_nodes),
+        "territories.json": build_group_payload(table, "territory", "total_territories", include_nodes=include_group_nodes),
+        "counties.json": build_group_payload(table, "county", "total_counties", include_nodes=include_group_nodes),
         "cities.json": build_city_payload(rows, include_nodes=include_group_nodes),
-        "zipcodes.json": build_group_payload(rows, "zip", "total_zipcodes", include_nodes=include_group_nodes),
-        "timezones.json": build_group_payload(rows, "timezone", "total_timezones", include_nodes=include_group_nodes),
-        "asns.json": build_group_payload(rows, "asn", "total_asns", unknown="UNKNOWN", include_nodes=include_group_nodes),
-        "agents.json": build_group_payload(rows, "agent", "total_agents", unknown="UNKNOWN", include_nodes=include_group_nodes),
-        "versions.json": build_group_payload(rows, "protocol", "total_versions", unknown="UNKNOWN", include_nodes=include_group_nodes),
-        "ports.json": build_group_payload(rows, "port", "total_ports", unknown="UNKNOWN", include_nodes=include_group_nodes),
-        "services.json": build_group_payload(rows, "services", "total_service_sets", unknown="UNKNOWN", include_nodes=include_group_nodes),
-        "organizations.json": build_group_payload(rows, "organization", "total_organizations", unknown="UNKNOWN", include_nodes=include_group_nodes),
-        "providers.json": build_group_payload(rows, "provider", "total_providers", unknown="UNKNOWN", include_nodes=include_group_nodes),
-        "provider-kinds.json": build_group_payload(rows, "provider_kind", "total_provider_kinds", unknown="unknown", include_nodes=include_group_nodes),
-        "organization-types.json": build_group_payload(rows, "organization_type", "total_organization_types", unknown="unknown", include_nodes=include_group_nodes),
-        "network-classifications.json": build_group_payload(rows, "network_classification", "total_network_classifications", unknown="unknown", include_nodes=include_group_nodes),
-        "networks.json": build_networks_payload(rows, include_nodes=include_group_nodes),
+        "zipcodes.json": build_group_payload(table, "zip", "total_zipcodes", include_nodes=include_group_nodes),
+        "timezones.json": build_group_payload(table, "timezone", "total_timezones", include_nodes=include_group_nodes),
+        "asns.json": build_group_payload(table, "asn", "total_asns", unknown="UNKNOWN", include_nodes=include_group_nodes),
+        "agents.json": build_group_payload(table, "agent", "total_agents", unknown="UNKNOWN", include_nodes=include_group_nodes),
+        "versions.json": build_group_payload(table, "protocol", "total_versions", unknown="UNKNOWN", include_nodes=include_group_nodes),
+        "ports.json": build_group_payload(table, "port", "total_ports", unknown="UNKNOWN", include_nodes=include_group_nodes),
+        "services.json": build_group_payload(table, "services", "total_service_sets", unknown="UNKNOWN", include_nodes=include_group_nodes),
+        "organizations.json": build_group_payload(table, "organization", "total_organizations", unknown="UNKNOWN", include_nodes=include_group_nodes),
+        "providers.json": build_group_payload(table, "provider", "total_providers", unknown="UNKNOWN", include_nodes=include_group_nodes),
+        "provider-kinds.json": build_group_payload(table, "provider_kind", "total_provider_kinds", unknown="unknown", include_nodes=include_group_nodes),
+        "organization-types.json": build_group_payload(table, "organization_type", "total_organization_types", unknown="unknown", include_nodes=include_group_nodes),
+        "network-classifications.json": build_group_payload(table, "network_classification", "total_network_classifications", unknown="unknown", include_nodes=include_group_nodes),
+        "networks.json": build_networks_payload(table, include_nodes=include_group_nodes),
         "ipv4.json": build_subset_payload(rows, lambda row: row.get("network") == "ipv4", "total_ipv4_nodes"),
         "ipv6.json": build_subset_payload(rows, lambda row: row.get("network") == "ipv6", "total_ipv6_nodes"),
         "cjdns.json": build_subset_payload(rows, lambda row: row.get("network") == "cjdns", "total_cjdns_nodes"),
@@ -1287,8 +1450,8 @@ def export_all(
         "apt-attribution.json": build_subset_payload(rows, lambda row: row.get("suspected_apt_related"), "total_apt_related_nodes"),
         "tag-attribution.json": build_subset_payload(rows, lambda row: row.get("suspected_threat_actor_group_related"), "total_threat_actor_group_related_nodes"),
         "known-malactor.json": build_subset_payload(rows, lambda row: row.get("suspected_known_malicious_actor"), "total_known_malactor_nodes"),
-        "geohashes.json": build_group_payload(rows, "geohash", "total_geohashes", include_nodes=include_group_nodes),
-        "what3words.json": build_group_payload(rows, "w3w", "total_what3words", include_nodes=include_group_nodes),
+        "geohashes.json": build_group_payload(table, "geohash", "total_geohashes", include_nodes=include_group_nodes),
+        "what3words.json": build_group_payload(table, "w3w", "total_what3words", include_nodes=include_group_nodes),
         "coordinates.json": build_coordinates_payload(rows),
         "latency.json": build_latency_payload(rows),
         "peer-health.json": peer_health,
@@ -1302,7 +1465,7 @@ def export_all(
         "registry-statistics.json": build_registry_statistics(rows, payload),
     }
 
-    exports.update(build_widget_payloads(rows, payload))
+    exports.update(build_widget_payloads(table, payload))
     exports["status.json"] = build_status_payload(payload, rows)
     exports["index.json"] = exports["status.json"]
 
@@ -1354,6 +1517,25 @@ def export_all(
         "bytes": write_json(maps_dir / "live-map.json", coordinates, pretty=pretty),
     }
 
+    tiler = load_map_tiles()
+
+    if tiler is not None:
+        tiles = tiler.write_tiles(
+            maps_dir / "tiles",
+            coordinates["results"],
+            fields=MAP_TILE_FIELDS,
+            gzip_variants=gzip_large,
+            url_prefix="./maps/tiles",
+            compact=not pretty,
+        )
+        manifest_files["maps/tiles/manifest.json"] = {
+            "path": "maps/tiles/manifest.json",
+            "tile_count": tiles["tile_count"],
+            "written": tiles["written"],
+            "skipped": tiles["skipped"],
+            "removed": tiles["removed"],
+        }
+
     if write_fanout:
         fanout_dir = output_dir / "_fanout_disabled_by_default"
         mkdir(fanout_dir)
@@ -1371,7 +1553,7 @@ def export_all(
         "schema": "zzx-bitnodes-static-api-export-manifest-v2",
         "generated_at": utc_iso(),
         "source": payload.get("source"),
-        "input": str(input_path),
+        "input": str(getattr(input_path, "path", input_path)),
         "output": str(output_dir),
         "node_count": len(rows),
         "fanout_enabled": bool(write_fanout),
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import argparse
 import gzip
+import importlib.util
 import json
 import subprocess
 import sys
@@ -19,6 +20,7 @@ DEFAULT_INPUT = DEFAULT_DATA_DIR / "json" / "latest.json.gz"
 DEFAULT_OUTPUT_DIR = DEFAULT_DATA_DIR / "redis"
 
 SCHEMA = "zzx-bitnodes-export-redis-v1"
+NODE_TABLE_MODULE = "zzx_bitnodes_node_table"
 
 PUBLIC_FIELDS = [
     "node_id",
@@ -156,11 +158,51 @@ def row_address(row: dict[str, Any]) -> str:
     ).strip()
 
 
-def source_counts(rows: list[dict[str, Any]]) -> dict[str, int]:
-    return dict(sorted(Counter(str(row.get("source") or "unknown") for row in rows).items()))
+def load_node_table() -> Any | None:
+    module = sys.modules.get(NODE_TABLE_MODULE)
 
+    if module is not None:
+        return module
+
+    path = TOOLS_DIR / "node_table.py"
+
+    if not path.exists():
+        return None
+
+    spec = importlib.util.spec_from_file_location(NODE_TABLE_MODULE, str(path))
+
+    if spec is None or spec.loader is None:
+        return None
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[NODE_TABLE_MODULE] = module
+
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        sys.modules.pop(NODE_TABLE_MODULE, None)
+        return None
+
+    return module
+
+
+def node_table(rows: Any) -> Any:
+    module = load_node_table()
+
+    if module is None or isinstance(rows, module.NodeTable):
+        return rows
+
+    return module.NodeTable(rows)
+
+
+def source_counts(rows: Any) -> dict[str, int]:
+    return counter_for(rows, "source")
+
+
+def counter_for(rows: Any, key: str) -> dict[str, int]:
+    if hasattr(rows, "counts"):
+        return dict(sorted(rows.counts(key).items()))
 
-def counter_for(rows: list[dict[str, Any]], key: str) -> dict[str, int]:
     return dict(sorted(Counter(str(row.get(key) or "unknown") for row in rows).items()))
 
 
@@ -177,25 +219,26 @@ def export_redis_files(
     commands_path = output_dir / "bitnodes.redis.commands.gz"
 
     public_rows = [public_row(row) for row in rows]
+    table = node_table(public_rows)
 
     json_payload = {
         "schema": SCHEMA,
         "key_prefix": key_prefix,
         "node_count": len(public_rows),
-        "source_counts": source_counts(public_rows),
-        "country_counts": counter_for(public_rows, "country"),
-        "network_counts": counter_for(public_rows, "network"),
-        "asn_counts": counter_for(public_rows, "asn"),
+        "source_counts": source_counts(table),
+        "country_counts": counter_for(table, "country"),
+        "network_counts": counter_for(table, "network"),
+        "asn_counts": counter_for(table, "asn"),
         "nodes": public_rows,
     }
 
     json_size = write_gzip_json(json_path, json_payload, compact=True)
 
-    sources = counter_for(public_rows, "source")
-    countries = counter_for(public_rows, "country")
-    networks = counter_for(public_rows, "network")
-    asns = counter_for(public_rows, "asn")
-    cities = counter_for(public_rows, "city")
+    sources = counter_for(table, "source")
+    countries = counter_for(table, "country")
+    networks = counter_for(table, "network")
+    asns = counter_for(table, "asn")
+    cities = counter_for(table, "city")
 
     with gzip.open(commands_path, "wb", compresslevel=9) as handle:
         handle.write(
@@ -8,7 +8,7 @@ from pathlib import Path
 from typing import Any
 from xml.etree.ElementTree import Element, ElementTree, SubElement
 
-from export_json import load_snapshot, node_rows, mkdir, utc_iso
+from export_json import load_snapshot, node_rows, node_table, mkdir, utc_iso
 
 
 XML_FIELDS = [
@@ -168,19 +168,22 @@ def nodes_root(rows: list[dict[str, Any]], root_name: str = "nodes") -> Element:
     return root
 
 
-def group_count(rows: list[dict[str, Any]], key: str, unknown: str = "Unknown") -> list[dict[str, Any]]:
-    counts: dict[str, int] = {}
+def group_count(rows: Any, key: str, unknown: str = "Unknown") -> list[dict[str, Any]]:
+    if hasattr(rows, "counts"):
+        counts = rows.counts(key, unknown)
+    else:
+        counts = {}
 
-    for row in rows:
-        value = str(row.get(key) or unknown)
-        counts[value] = counts.get(value, 0) + 1
+        for row in rows:
+            value = str(row.get(key) or unknown)
+            counts[value] = counts.get(value, 0) + 1
 
     out = [{key: value, "count": count} for value, count in counts.items()]
     out.sort(key=lambda item: item["count"], reverse=True)
     return out
 
 
-def group_root(rows: list[dict[str, Any]], key: str, root_name: str, unknown: str = "Unknown") -> Element:
+def group_root(rows: Any, key: str, root_name: str, unknown: str = "Unknown") -> Element:
     grouped = group_count(rows, key, unknown=unknown)
 
     root = Element(root_name)
@@ -244,6 +247,7 @@ def export_xml(
         payload["source"] = source
 
     rows = node_rows(payload.get("nodes", {}))
+    table = node_table(rows)
     mkdir(output_dir)
 
     manifest: dict[str, Any] = {
@@ -314,7 +318,7 @@ def export_xml(
     ]:
         files[filename] = write_xml(
             output_dir / filename,
-            group_root(rows, key, safe_tag(filename.replace(".xml", "")), unknown=unknown),
+            group_root(table, key, safe_tag(filename.replace(".xml", "")), unknown=unknown),
             gzip_copy=gzip_copy,
         )
 
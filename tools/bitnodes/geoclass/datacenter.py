@@ -3,11 +3,30 @@ from __future__ import annotations
 
 import argparse
 import gzip
+import importlib.util
 import json
 import re
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Mapping, MutableMapping
+from typing import Any, Callable, Mapping, MutableMapping
+
+
+TOOLS_DIR = Path(__file__).resolve().parents[1]
+
+
+def load_tool(filename: str) -> Any:
+    module_name = "zzx_bitnodes_" + Path(filename).stem
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, TOOLS_DIR / filename)
+        sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules[module_name])
+
+    return sys.modules[module_name]
+
+
+keyword_matcher = load_tool("keyword_matcher.py")
 
 
 SCHEMA = "zzx-bitnodes-datacenter-v2"
@@ -121,10 +140,6 @@ def boolish(value: Any) -> bool:
     }
 
 
-def keyword_hits(text: str, keywords: tuple[str, ...]) -> list[str]:
-    return [keyword for keyword in sorted(set(keywords), key=len, reverse=True) if keyword.lower() in text]
-
-
 def text_blob(row: Mapping[str, Any]) -> str:
     keys = (
         "provider", "organization", "org", "hostname", "reverse_dns", "rdns",
@@ -159,11 +174,11 @@ def datacenter_metadata(row: Mapping[str, Any]) -> dict[str, Any]:
 
     blob = text_blob(row)
 
-    datacenter_hits = keyword_hits(blob, DATACENTER_HINTS)
-    major_provider_hits = keyword_hits(blob, MAJOR_DATACENTER_PROVIDERS)
-    residential_hits = keyword_hits(blob, RESIDENTIAL_HINTS)
-    cdn_edge_hits = keyword_hits(blob, CDN_EDGE_HINTS)
-    vpn_proxy_hits = keyword_hits(blob, VPN_PROXY_HINTS)
+    datacenter_hits = keyword_matcher.keyword_hits(blob, DATACENTER_HINTS)
+    major_provider_hits = keyword_matcher.keyword_hits(blob, MAJOR_DATACENTER_PROVIDERS)
+    residential_hits = keyword_matcher.keyword_hits(blob, RESIDENTIAL_HINTS)
+    cdn_edge_hits = keyword_matcher.keyword_hits(blob, CDN_EDGE_HINTS)
+    vpn_proxy_hits = keyword_matcher.keyword_hits(blob, VPN_PROXY_HINTS)
 
     provider_kind = clean(first(row, "provider_kind", "provider_data.provider_kind", "metadata.provider_kind")).lower()
     network_classification = clean(first(row, "network_classification", "provider_data.network_classification", "metadata.network_classification")).lower()
@@ -306,6 +321,10 @@ def enrich_node(node: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
     return node
 
 
+def node_enricher(context: dict[str, Any] | None = None) -> Callable[[MutableMapping[str, Any]], MutableMapping[str, Any]]:
+    return enrich_node
+
+
 def enrich_nodes(nodes: Any, context: dict[str, Any] | None = None) -> Any:
     if isinstance(nodes, list):
         return [enrich_node(dict(node)) if isinstance(node, Mapping) else node for node in nodes]
@@ -2,11 +2,30 @@
 from __future__ import annotations
 
 import argparse
+import importlib.util
 import json
 import re
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Mapping, MutableMapping
+from typing import Any, Callable, Mapping, MutableMapping
+
+
+TOOLS_DIR = Path(__file__).resolve().parents[1]
+
+
+def load_tool(filename: str) -> Any:
+    module_name = "zzx_bitnodes_" + Path(filename).stem
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, TOOLS_DIR / filename)
+        sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules[module_name])
+
+    return sys.modules[module_name]
+
+
+keyword_matcher = load_tool("keyword_matcher.py")
 
 
 SCHEMA = "zzx-bitnodes-isp-v2"
@@ -258,23 +277,13 @@ def extract_asn(value: Any) -> str:
     return ""
 
 
-def keyword_hits(text: str, keywords: tuple[str, ...]) -> list[str]:
-    hits = []
-
-    for keyword in sorted(set(keywords), key=len, reverse=True):
-        if keyword.lower() in text:
-            hits.append(keyword)
-
-    return hits
-
-
 def classify_provider(text: str) -> dict[str, Any]:
-    major_hits = keyword_hits(text, MAJOR_HOSTS)
-    hosting_hits = keyword_hits(text, HOSTING_HINTS)
-    residential_hits = keyword_hits(text, RESIDENTIAL_HINTS)
-    mobile_hits = keyword_hits(text, MOBILE_HINTS)
-    government_hits = keyword_hits(text, GOVERNMENT_HINTS)
-    military_hits = keyword_hits(text, MILITARY_HINTS)
+    major_hits = keyword_matcher.keyword_hits(text, MAJOR_HOSTS)
+    hosting_hits = keyword_matcher.keyword_hits(text, HOSTING_HINTS)
+    residential_hits = keyword_matcher.keyword_hits(text, RESIDENTIAL_HINTS)
+    mobile_hits = keyword_matcher.keyword_hits(text, MOBILE_HINTS)
+    government_hits = keyword_matcher.keyword_hits(text, GOVERNMENT_HINTS)
+    military_hits = keyword_matcher.keyword_hits(text, MILITARY_HINTS)
 
     if military_hits:
         classification = "military"
@@ -442,6 +451,10 @@ def enrich_node(node: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
     return node
 
 
+def node_enricher(context: dict[str, Any] | None = None) -> Callable[[MutableMapping[str, Any]], MutableMapping[str, Any]]:
+    return enrich_node
+
+
 def enrich_nodes(
     nodes: Any,
     context: dict[str, Any] | None = None,
@@ -3,11 +3,30 @@ from __future__ import annotations
 
 import argparse
 import gzip
+import importlib.util
 import json
 import re
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Mapping, MutableMapping
+from typing import Any, Callable, Mapping, MutableMapping
+
+
+TOOLS_DIR = Path(__file__).resolve().parents[1]
+
+
+def load_tool(filename: str) -> Any:
+    module_name = "zzx_bitnodes_" + Path(filename).stem
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, TOOLS_DIR / filename)
+        sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules[module_name])
+
+    return sys.modules[module_name]
+
+
+keyword_matcher = load_tool("keyword_matcher.py")
 
 
 SCHEMA = "zzx-bitnodes-organization-v2"
@@ -133,10 +152,6 @@ def boolish(value: Any) -> bool:
     }
 
 
-def keyword_hits(text: str, keywords: tuple[str, ...]) -> list[str]:
-    return [keyword for keyword in sorted(set(keywords), key=len, reverse=True) if keyword.lower() in text]
-
-
 def organization_metadata(row: Mapping[str, Any]) -> dict[str, Any]:
     organization = first(
         row,
@@ -217,12 +232,12 @@ def organization_metadata(row: Mapping[str, Any]) -> dict[str, Any]:
 
     text = f"{organization} {provider} {provider_kind} {network_classification} {existing_type}".lower()
 
-    government_hits = keyword_hits(text, GOVERNMENT_HINTS)
-    military_hits = keyword_hits(text, MILITARY_HINTS)
-    university_hits = keyword_hits(text, UNIVERSITY_HINTS)
-    nonprofit_hits = keyword_hits(text, NONPROFIT_HINTS)
-    hosting_hits = keyword_hits(text, HOSTING_HINTS)
-    telecom_hits = keyword_hits(text, TELECOM_HINTS)
+    government_hits = keyword_matcher.keyword_hits(text, GOVERNMENT_HINTS)
+    military_hits = keyword_matcher.keyword_hits(text, MILITARY_HINTS)
+    university_hits = keyword_matcher.keyword_hits(text, UNIVERSITY_HINTS)
+    nonprofit_hits = keyword_matcher.keyword_hits(text, NONPROFIT_HINTS)
+    hosting_hits = keyword_matcher.keyword_hits(text, HOSTING_HINTS)
+    telecom_hits = keyword_matcher.keyword_hits(text, TELECOM_HINTS)
 
     if existing_type:
         org_type = existing_type
@@ -335,6 +350,10 @@ def enrich_node(node: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
     return node
 
 
+def node_enricher(context: dict[str, Any] | None = None) -> Callable[[MutableMapping[str, Any]], MutableMapping[str, Any]]:
+    return enrich_node
+
+
 def enrich_nodes(nodes: Any, context: dict[str, Any] | None = None) -> Any:
     if isinstance(nodes, list):
         return [enrich_node(dict(node)) if isinstance(node, Mapping) else node for node in nodes]
@@ -3,11 +3,30 @@ from __future__ import annotations
 
 import argparse
 import gzip
+import importlib.util
 import json
 import re
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Mapping, MutableMapping
+from typing import Any, Callable, Mapping, MutableMapping
+
+
+TOOLS_DIR = Path(__file__).resolve().parents[1]
+
+
+def load_tool(filename: str) -> Any:
+    module_name = "zzx_bitnodes_" + Path(filename).stem
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, TOOLS_DIR / filename)
+        sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules[module_name])
+
+    return sys.modules[module_name]
+
+
+keyword_matcher = load_tool("keyword_matcher.py")
 
 
 SCHEMA = "zzx-bitnodes-provider-v2"
@@ -238,22 +257,18 @@ def canonical_provider_name(value: Any) -> str:
     return raw
 
 
-def keyword_hits(text: str, keywords: tuple[str, ...]) -> list[str]:
-    return [keyword for keyword in sorted(set(keywords), key=len, reverse=True) if keyword.lower() in text]
-
-
 def classify_provider(provider: str, organization: str, blob: str) -> dict[str, Any]:
     provider = canonical_provider_name(provider)
     text = f"{provider} {organization} {blob}".lower()
 
-    hosting_hits = keyword_hits(text, HOSTING_HINTS)
-    residential_hits = keyword_hits(text, RESIDENTIAL_HINTS)
-    mobile_hits = keyword_hits(text, MOBILE_HINTS)
-    cdn_hits = keyword_hits(text, CDN_HINTS)
-    proxy_hits = keyword_hits(text, PROXY_HINTS)
-    vpn_hits = keyword_hits(text, VPN_HINTS)
-    gov_hits = keyword_hits(text, GOV_HINTS)
-    mil_hits = keyword_hits(text, MIL_HINTS)
+    hosting_hits = keyword_matcher.keyword_hits(text, HOSTING_HINTS)
+    residential_hits = keyword_matcher.keyword_hits(text, RESIDENTIAL_HINTS)
+    mobile_hits = keyword_matcher.keyword_hits(text, MOBILE_HINTS)
+    cdn_hits = keyword_matcher.keyword_hits(text, CDN_HINTS)
+    proxy_hits = keyword_matcher.keyword_hits(text, PROXY_HINTS)
+    vpn_hits = keyword_matcher.keyword_hits(text, VPN_HINTS)
+    gov_hits = keyword_matcher.keyword_hits(text, GOV_HINTS)
+    mil_hits = keyword_matcher.keyword_hits(text, MIL_HINTS)
 
     if mil_hits:
         kind = "military"
@@ -499,6 +514,10 @@ def enrich_node(node: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
     return node
 
 
+def node_enricher(context: dict[str, Any] | None = None) -> Callable[[MutableMapping[str, Any]], MutableMapping[str, Any]]:
+    return enrich_node
+
+
 def enrich_nodes(nodes: Any, context: dict[str, Any] | None = None) -> Any:
     if isinstance(nodes, list):
         return [enrich_node(dict(node)) if isinstance(node, Mapping) else node for node in nodes]
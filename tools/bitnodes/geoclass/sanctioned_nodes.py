@@ -7,7 +7,7 @@ import json
 import re
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Mapping, MutableMapping
+from typing import Any, Callable, Mapping, MutableMapping
 
 
 APP_ROOT = Path(__file__).resolve().parents[2]
@@ -542,7 +542,7 @@ def enrich_node(node: MutableMapping[str, Any], policy: Mapping[str, Any], polic
     return node
 
 
-def enrich_nodes(nodes: Any, context: dict[str, Any] | None = None) -> Any:
+def node_enricher(context: dict[str, Any] | None = None) -> Callable[[MutableMapping[str, Any]], MutableMapping[str, Any]]:
     context = context or {}
     policy_path = Path(
         context.get("sanctions_policy")
@@ -552,15 +552,24 @@ def enrich_nodes(nodes: Any, context: dict[str, Any] | None = None) -> Any:
     )
     policy = load_policy(policy_path)
 
+    def enrich(node: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
+        return enrich_node(node, policy, policy_path)
+
+    return enrich
+
+
+def enrich_nodes(nodes: Any, context: dict[str, Any] | None = None) -> Any:
+    enrich = node_enricher(context)
+
     if isinstance(nodes, list):
         return [
-            enrich_node(dict(node), policy, policy_path) if isinstance(node, Mapping) else node
+            enrich(dict(node)) if isinstance(node, Mapping) else node
             for node in nodes
         ]
 
     if isinstance(nodes, Mapping):
         return {
-            key: enrich_node(dict(value), policy, policy_path) if isinstance(value, Mapping) else value
+            key: enrich(dict(value)) if isinstance(value, Mapping) else value
             for key, value in nodes.items()
         }
 
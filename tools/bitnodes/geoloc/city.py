@@ -2,15 +2,35 @@
 from __future__ import annotations
 
 import argparse
+import importlib.util
 import json
 import math
 import re
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Mapping, MutableMapping
 
 
 APP_ROOT = Path(__file__).resolve().parents[3]
+TOOLS_DIR = APP_ROOT / "tools" / "bitnodes"
+
+
+def load_tool(filename: str) -> Any:
+    module_name = "zzx_bitnodes_" + Path(filename).stem
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, TOOLS_DIR / filename)
+        sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules[module_name])
+
+    return sys.modules[module_name]
+
+
+reference_cache = load_tool("reference_cache.py")
+spatial_index = load_tool("spatial_index.py")
+
+
 DEFAULT_GEO_ROOT = APP_ROOT / "bitcoin" / "bitnodes" / "data" / "geo"
 DEFAULT_CITY_DIR = DEFAULT_GEO_ROOT / "cities"
 
@@ -199,9 +219,18 @@ def row_lat_lon(row: Mapping[str, Any]) -> tuple[float | None, float | None]:
     return lat, lon
 
 
-def load_city_index(country: str, admin1: str, city_dir: Path) -> dict[str, Any]:
+def read_index_file(path: Path) -> tuple[tuple[str, int, int] | None, Any]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None, {}
+
+    return (str(path), stat.st_mtime_ns, stat.st_size), read_json(path, fallback={})
+
+
+def find_city_index(country: str, admin1: str, city_dir: Path) -> tuple[tuple[str, int, int] | None, dict[str, Any]]:
     if not country:
-        return {}
+        return None, {}
 
     candidates: list[Path] = []
 
@@ -223,11 +252,15 @@ def load_city_index(country: str, admin1: str, city_dir: Path) -> dict[str, Any]
     ])
 
     for path in candidates:
-        data = read_json(path, fallback={})
+        key, data = read_index_file(path)
         if isinstance(data, dict) and data:
-            return data
+            return key, data
 
-    return {}
+    return None, {}
+
+
+def load_city_index(country: str, admin1: str, city_dir: Path) -> dict[str, Any]:
+    return city_reference(country, admin1, city_dir)["index"]
 
 
 def city_rows(index: Mapping[str, Any]) -> list[dict[str, Any]]:
@@ -257,6 +290,16 @@ def build_name_lookup(cities: list[dict[str, Any]]) -> dict[str, dict[str, Any]]
     return lookup
 
 
+def build_city_reference(country: str, admin1: str, city_dir: Path) -> dict[str, Any]:
+    key, index = find_city_index(country, admin1, city_dir)
+    cities = city_rows(index)
+    return {"key": key, "index": index, "rows": cities, "lookup": build_name_lookup(cities)}
+
+
+def city_reference(country: str, admin1: str, city_dir: Path) -> dict[str, Any]:
+    return reference_cache.fetch("city", country, admin1, city_dir, lambda: build_city_reference(country, admin1, city_dir))
+
+
 def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     radius = 6371.0088
     phi1 = math.radians(lat1)
@@ -272,13 +315,25 @@ def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     return radius * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
 
-def nearest_city(cities: list[dict[str, Any]], lat: float, lon: float) -> tuple[dict[str, Any] | None, float | None]:
+def city_point(row: Mapping[str, Any]) -> tuple[float | None, float | None]:
+    return number(row.get("latitude")), number(row.get("longitude"))
+
+
+def nearest_city(
+    cities: list[dict[str, Any]],
+    lat: float,
+    lon: float,
+    *,
+    key: tuple[str, int, int] | None = None,
+) -> tuple[dict[str, Any] | None, float | None]:
+    if key is not None:
+        return spatial_index.cached_index(("city", *key), cities, city_point).nearest(lat, lon)
+
     best: dict[str, Any] | None = None
     best_distance: float | None = None
 
     for city in cities:
-        city_lat = number(city.get("latitude"))
-        city_lon = number(city.get("longitude"))
+        city_lat, city_lon = city_point(city)
 
         if city_lat is None or city_lon is None:
             continue
@@ -364,9 +419,10 @@ def resolve_city(row: Mapping[str, Any], city_dir: Path) -> dict[str, Any]:
     name = raw_city_name(row)
     lat, lon = row_lat_lon(row)
 
-    index = load_city_index(country, admin1, city_dir)
-    cities = city_rows(index)
-    lookup = build_name_lookup(cities)
+    reference = city_reference(country, admin1, city_dir)
+    index_key = reference["key"]
+    cities = reference["rows"]
+    lookup = reference["lookup"]
 
     if name:
         key = normalize_key(name)
@@ -395,7 +451,7 @@ def resolve_city(row: Mapping[str, Any], city_dir: Path) -> dict[str, Any]:
         }
 
     if lat is not None and lon is not None and cities:
-        city, distance = nearest_city(cities, lat, lon)
+        city, distance = nearest_city(cities, lat, lon, key=index_key)
 
         if city:
             confidence = "high" if distance is not None and distance <= 25 else "medium"
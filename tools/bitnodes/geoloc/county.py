@@ -2,14 +2,33 @@
 from __future__ import annotations
 
 import argparse
+import importlib.util
 import json
 import re
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Mapping, MutableMapping
 
 
 APP_ROOT = Path(__file__).resolve().parents[3]
+TOOLS_DIR = APP_ROOT / "tools" / "bitnodes"
+
+
+def load_tool(filename: str) -> Any:
+    module_name = "zzx_bitnodes_" + Path(filename).stem
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, TOOLS_DIR / filename)
+        sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules[module_name])
+
+    return sys.modules[module_name]
+
+
+reference_cache = load_tool("reference_cache.py")
+
+
 DEFAULT_GEO_ROOT = APP_ROOT / "bitcoin" / "bitnodes" / "data" / "geo"
 DEFAULT_COUNTY_DIR = DEFAULT_GEO_ROOT / "counties"
 
@@ -148,16 +167,29 @@ def raw_county_name(row: Mapping[str, Any]) -> str:
     ))
 
 
-def load_county_index(country: str, county_dir: Path) -> dict[str, Any]:
+def read_index_file(path: Path) -> tuple[tuple[str, int, int] | None, Any]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None, {}
+
+    return (str(path), stat.st_mtime_ns, stat.st_size), read_json(path, fallback={})
+
+
+def find_county_index(country: str, county_dir: Path) -> tuple[tuple[str, int, int] | None, dict[str, Any]]:
     if not country:
-        return {}
+        return None, {}
 
     for path in (county_dir / f"{country.upper()}.json", county_dir / f"{country.lower()}.json"):
-        data = read_json(path, fallback={})
+        key, data = read_index_file(path)
         if isinstance(data, dict) and data:
-            return data
+            return key, data
 
-    return {}
+    return None, {}
+
+
+def load_county_index(country: str, county_dir: Path) -> dict[str, Any]:
+    return county_reference(country, county_dir)["index"]
 
 
 def build_lookup(index: Mapping[str, Any], admin1: str) -> tuple[dict[str, str], dict[str, str]]:
@@ -212,6 +244,24 @@ def build_lookup(index: Mapping[str, Any], admin1: str) -> tuple[dict[str, str],
     return by_code, by_name
 
 
+def build_county_reference(country: str, county_dir: Path) -> dict[str, Any]:
+    key, index = find_county_index(country, county_dir)
+    return {"key": key, "index": index, "lookups": {}}
+
+
+def county_reference(country: str, county_dir: Path) -> dict[str, Any]:
+    return reference_cache.fetch("county", country, "", county_dir, lambda: build_county_reference(country, county_dir))
+
+
+def county_lookup(reference: dict[str, Any], admin1: str) -> tuple[dict[str, str], dict[str, str]]:
+    lookups = reference["lookups"]
+
+    if admin1 not in lookups:
+        lookups[admin1] = build_lookup(reference["index"], admin1)
+
+    return lookups[admin1]
+
+
 def resolve_county(row: Mapping[str, Any], county_dir: Path) -> dict[str, Any]:
     country = country_code(row)
 
@@ -245,8 +295,9 @@ def resolve_county(row: Mapping[str, Any], county_dir: Path) -> dict[str, Any]:
     code = raw_county_code(row)
     name = raw_county_name(row)
 
-    index = load_county_index(country, county_dir)
-    by_code, by_name = build_lookup(index, admin1)
+    reference = county_reference(country, county_dir)
+    index = reference["index"]
+    by_code, by_name = county_lookup(reference, admin1)
 
     label = clean(index.get("subdivision_label")) or clean(index.get("admin2_label")) or "county"
 
@@ -3,15 +3,39 @@ from __future__ import annotations
 
 import argparse
 import gzip
+import importlib.util
 import json
 import math
 import re
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Mapping, MutableMapping
+from typing import Any, Iterable, Mapping, MutableMapping
+
+try:
+    import numpy as np
+except Exception:
+    np = None  # type: ignore
 
 
 APP_ROOT = Path(__file__).resolve().parents[3]
+TOOLS_DIR = APP_ROOT / "tools" / "bitnodes"
+
+
+def load_tool(filename: str) -> Any:
+    module_name = "zzx_bitnodes_" + Path(filename).stem
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, TOOLS_DIR / filename)
+        sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules[module_name])
+
+    return sys.modules[module_name]
+
+
+kv_cache = load_tool("kv_cache.py")
+
+
 DEFAULT_GEO_ROOT = APP_ROOT / "bitcoin" / "bitnodes" / "data" / "geo"
 DEFAULT_GEOHASH_DIR = DEFAULT_GEO_ROOT / "geohash"
 DEFAULT_CACHE_PATH = DEFAULT_GEOHASH_DIR / "geohash-cache.json"
@@ -20,7 +44,20 @@ SCHEMA = "zzx-bitnodes-geohashid-v3"
 CACHE_SCHEMA = "zzx-bitnodes-geohashid-cache-v3"
 SUMMARY_SCHEMA = "zzx-bitnodes-geohashid-summary-v3"
 
+
 BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+BASE32_CODES = {char: index for index, char in enumerate(BASE32)}
+
+NEIGHBOR_OFFSETS = (
+    ("north", 1, 0),
+    ("south", -1, 0),
+    ("east", 0, 1),
+    ("west", 0, -1),
+    ("north_east", 1, 1),
+    ("north_west", 1, -1),
+    ("south_east", -1, 1),
+    ("south_west", -1, -1),
+)
 UNKNOWN_VALUES = {"", "unknown", "none", "null", "undefined", "—", "-", "n/a", "na"}
 
 
@@ -328,6 +365,219 @@ def geohash_neighbors(geohash: str) -> dict[str, str]:
     }
 
 
+def geohash_codes(latitudes: Any, longitudes: Any, precision: int) -> Any:
+    lat = np.asarray(latitudes, dtype=np.float64).ravel()
+    lon = np.asarray(longitudes, dtype=np.float64).ravel()
+    count = lat.shape[0]
+
+    lat_lo = np.full(count, -90.0)
+    lat_hi = np.full(count, 90.0)
+    lon_lo = np.full(count, -180.0)
+    lon_hi = np.full(count, 180.0)
+
+    codes = np.zeros((count, precision), dtype=np.uint8)
+    even = True
+
+    for position in range(precision):
+        for shift in (4, 3, 2, 1, 0):
+            if even:
+                mid = (lon_lo + lon_hi) / 2.0
+                bit = lon >= mid
+                lon_lo = np.where(bit, mid, lon_lo)
+                lon_hi = np.where(bit, lon_hi, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2.0
+                bit = lat >= mid
+                lat_lo = np.where(bit, mid, lat_lo)
+                lat_hi = np.where(bit, lat_hi, mid)
+
+            codes[:, position] |= bit.astype(np.uint8) << shift
+            even = not even
+
+    return codes
+
+
+def codes_to_geohashes(codes: Any) -> list[str]:
+    if not codes.size:
+        return [""] * codes.shape[0]
+
+    table = np.frombuffer(BASE32.encode("ascii"), dtype=np.uint8)
+    chars = np.ascontiguousarray(table[codes])
+    return chars.view(f"S{codes.shape[1]}").ravel().astype(str).tolist()
+
+
+def encode_geohash_levels(
+    latitudes: Iterable[float],
+    longitudes: Iterable[float],
+    precisions: Iterable[int] = (12,),
+) -> dict[int, list[str]]:
+    levels = sorted({max(1, min(32, int(precision))) for precision in precisions})
+
+    if not levels:
+        return {}
+
+    top = levels[-1]
+
+    if np is None:
+        hashes = [encode_geohash(lat, lon, top) for lat, lon in zip(latitudes, longitudes)]
+        return {level: [geohash[:level] for geohash in hashes] for level in levels}
+
+    codes = geohash_codes(list(latitudes), list(longitudes), top)
+    return {level: codes_to_geohashes(np.ascontiguousarray(codes[:, :level])) for level in levels}
+
+
+def encode_geohash_batch(latitudes: Iterable[float], longitudes: Iterable[float], precision: int = 12) -> list[str]:
+    level = max(1, min(32, int(precision)))
+    return encode_geohash_levels(latitudes, longitudes, (level,))[level]
+
+
+def geohash_text(geohash: Any) -> str:
+    text = clean(geohash).lower()
+
+    if ":" in text:
+        text = text.split(":", 1)[-1]
+
+    return text
+
+
+def decode_geohash_batch(geohashes: Iterable[Any]) -> dict[str, list[Any]]:
+    texts = [geohash_text(geohash) for geohash in geohashes]
+
+    if np is None or not texts:
+        decoded = [decode_geohash(text) for text in texts]
+        return {
+            key: [row[key] for row in decoded]
+            for key in ("geohash", "latitude", "longitude", "lat_min", "lat_max", "lon_min", "lon_max", "lat_error", "lon_error")
+        }
+
+    width = max(len(text) for text in texts)
+    lengths = np.array([len(text) for text in texts])
+    codes = np.zeros((len(texts), max(1, width)), dtype=np.uint8)
+
+    for row, text in enumerate(texts):
+        for position, char in enumerate(text):
+            if char not in BASE32_CODES:
+                raise ValueError(f"invalid geohash character: {char}")
+
+            codes[row, position] = BASE32_CODES[char]
+
+    count = len(texts)
+    lat_lo = np.full(count, -90.0)
+    lat_hi = np.full(count, 90.0)
+    lon_lo = np.full(count, -180.0)
+    lon_hi = np.full(count, 180.0)
+    even = True
+
+    for position in range(width):
+        active = lengths > position
+
+        for shift in (4, 3, 2, 1, 0):
+            bit = (codes[:, position] >> shift) & 1 == 1
+
+            if even:
+                mid = (lon_lo + lon_hi) / 2.0
+                lon_lo = np.where(active & bit, mid, lon_lo)
+                lon_hi = np.where(active & ~bit, mid, lon_hi)
+            else:
+                mid = (lat_lo + lat_hi) / 2.0
+                lat_lo = np.where(active & bit, mid, lat_lo)
+                lat_hi = np.where(active & ~bit, mid, lat_hi)
+
+            even = not even
+
+    return {
+        "geohash": texts,
+        "latitude": ((lat_lo + lat_hi) / 2.0).tolist(),
+        "longitude": ((lon_lo + lon_hi) / 2.0).tolist(),
+        "lat_min": lat_lo.tolist(),
+        "lat_max": lat_hi.tolist(),
+        "lon_min": lon_lo.tolist(),
+        "lon_max": lon_hi.tolist(),
+        "lat_error": ((lat_hi - lat_lo) / 2.0).tolist(),
+        "lon_error": ((lon_hi - lon_lo) / 2.0).tolist(),
+    }
+
+
+def geohash_neighbors_batch(geohashes: Iterable[Any], decoded: Mapping[str, list[Any]] | None = None) -> list[dict[str, str]]:
+    decoded = decoded or decode_geohash_batch(geohashes)
+    texts = decoded["geohash"]
+
+    if np is None:
+        return [geohash_neighbors(text) for text in texts]
+
+    neighbors: list[dict[str, str]] = [{} for _ in texts]
+    lat = np.asarray(decoded["latitude"], dtype=np.float64)
+    lon = np.asarray(decoded["longitude"], dtype=np.float64)
+    lat_step = np.asarray(decoded["lat_error"], dtype=np.float64) * 2.0
+    lon_step = np.asarray(decoded["lon_error"], dtype=np.float64) * 2.0
+    lengths = np.array([len(text) for text in texts])
+
+    for length in sorted(set(lengths.tolist())):
+        rows = np.nonzero(lengths == length)[0]
+
+        for name, dlat, dlon in NEIGHBOR_OFFSETS:
+            lats = np.minimum(90.0, np.maximum(-90.0, lat[rows] + dlat * lat_step[rows]))
+            lons = np.mod(lon[rows] + dlon * lon_step[rows] + 180.0, 360.0) - 180.0
+            hashes = codes_to_geohashes(geohash_codes(lats, lons, max(1, length)))
+
+            for row, geohash in zip(rows.tolist(), hashes):
+                neighbors[row][name] = geohash
+
+    return neighbors
+
+
+def geohashid_batch(
+    latitudes: Iterable[float],
+    longitudes: Iterable[float],
+    *,
+    precision: int = 12,
+    prefix: str = "gh",
+    overlay_networks: Iterable[str] | None = None,
+) -> list[dict[str, Any]]:
+    lats = list(latitudes)
+    lons = list(longitudes)
+    overlays = list(overlay_networks) if overlay_networks is not None else [""] * len(lats)
+
+    if np is None:
+        return [
+            geohashid_for(lat, lon, precision=precision, prefix=prefix, is_overlay=bool(overlay), overlay_network=overlay)
+            for lat, lon, overlay in zip(lats, lons, overlays)
+        ]
+
+    geohashes = encode_geohash_batch(lats, lons, precision)
+    decoded = decode_geohash_batch(geohashes)
+    neighbors = geohash_neighbors_batch(geohashes, decoded)
+    looked_up_at = utc_now()
+
+    return [
+        {
+            "schema": SCHEMA,
+            "geohash": geohash,
+            "geohashid": f"{prefix}:{geohash}",
+            "prefix": prefix,
+            "precision": precision,
+            "center_latitude": decoded["latitude"][index],
+            "center_longitude": decoded["longitude"][index],
+            "input_latitude": lats[index],
+            "input_longitude": lons[index],
+            "lat_min": decoded["lat_min"][index],
+            "lat_max": decoded["lat_max"][index],
+            "lon_min": decoded["lon_min"][index],
+            "lon_max": decoded["lon_max"][index],
+            "lat_error": decoded["lat_error"][index],
+            "lon_error": decoded["lon_error"][index],
+            "neighbors": neighbors[index],
+            "source": f"{overlays[index]}-overlay-geohash" if overlays[index] else "local-geohash",
+            "confidence": "overlay-deterministic" if overlays[index] else "deterministic",
+            "cache_hit": False,
+            "is_overlay": bool(overlays[index]),
+            "overlay_network": overlays[index],
+            "looked_up_at": looked_up_at,
+        }
+        for index, geohash in enumerate(geohashes)
+    ]
+
+
 def geohashid_for(
     latitude: float,
     longitude: float,
@@ -370,26 +620,18 @@ def cache_key(lat: float, lon: float, precision: int, prefix: str) -> str:
     return f"{lat:.8f},{lon:.8f}:p{precision}:{prefix}"
 
 
-def load_cache(cache_path: Path) -> dict[str, Any]:
-    cache = read_json(cache_path, fallback={})
-    return cache if isinstance(cache, dict) else {}
 
+def open_kv_cache(cache_path: Path, context: Mapping[str, Any] | None = None) -> Any | None:
+    return kv_cache.open_cache(cache_path, context)
 
-def cache_entries(cache: Mapping[str, Any]) -> dict[str, Any]:
-    entries = cache.get("entries")
-    return dict(entries) if isinstance(entries, Mapping) else dict(cache)
 
+def commit_kv_caches() -> None:
+    kv_cache.commit_caches()
 
-def save_cache(cache_path: Path, entries: dict[str, Any], compact: bool = False) -> None:
-    write_json(
-        cache_path,
-        {
-            "schema": CACHE_SCHEMA,
-            "updated_at": utc_now(),
-            "entries": entries,
-        },
-        compact=compact,
-    )
+
+def kv_cache_info(cache_path: Path) -> dict[str, Any]:
+    cache = open_kv_cache(cache_path)
+    return cache.info() if cache is not None else {}
 
 
 def existing_geohash(row: Mapping[str, Any]) -> str:
@@ -419,6 +661,7 @@ def resolve_geohashid(
     prefix: str = "gh",
     cache_path: Path = DEFAULT_CACHE_PATH,
     compact_cache: bool = False,
+    computed: Mapping[str, dict[str, Any]] | None = None,
 ) -> dict[str, Any]:
     existing = existing_geohash(row)
     lat, lon = row_lat_lon(row)
@@ -484,29 +727,31 @@ def resolve_geohashid(
             "looked_up_at": utc_now(),
         }
 
-    cache = load_cache(cache_path)
-    entries = cache_entries(cache)
+    cache = open_kv_cache(cache_path)
     key = cache_key(lat, lon, precision, prefix)
+    cached = cache.get(key) if cache is not None else None
 
-    if key in entries and isinstance(entries[key], Mapping):
-        cached = dict(entries[key])
+    if isinstance(cached, dict):
         cached.setdefault("schema", SCHEMA)
         cached.setdefault("is_overlay", bool(overlay_network))
         cached.setdefault("overlay_network", overlay_network)
         cached["cache_hit"] = True
         return cached
 
-    result = geohashid_for(
-        lat,
-        lon,
-        precision=precision,
-        prefix=prefix,
-        is_overlay=bool(overlay_network),
-        overlay_network=overlay_network,
-    )
+    if computed is not None and key in computed:
+        result = dict(computed[key], neighbors=dict(computed[key]["neighbors"]))
+    else:
+        result = geohashid_for(
+            lat,
+            lon,
+            precision=precision,
+            prefix=prefix,
+            is_overlay=bool(overlay_network),
+            overlay_network=overlay_network,
+        )
 
-    entries[key] = result
-    save_cache(cache_path, entries, compact=compact_cache)
+    if cache is not None:
+        cache.put(key, result)
 
     return result
 
@@ -521,18 +766,56 @@ def ensure_block(node: MutableMapping[str, Any], key: str) -> MutableMapping[str
     return block
 
 
-def enrich_node(node: MutableMapping[str, Any], context: Mapping[str, Any]) -> MutableMapping[str, Any]:
+def precompute_geohashids(nodes: Iterable[Any], context: Mapping[str, Any]) -> dict[str, dict[str, Any]]:
+    precision = int(context.get("geohash_precision") or context.get("precision") or 12)
+    prefix = str(context.get("geohash_prefix") or context.get("prefix") or "gh")
+    pending: dict[str, tuple[float, float, str]] = {}
+
+    for node in nodes:
+        if not isinstance(node, Mapping) or existing_geohash(node):
+            continue
+
+        lat, lon = row_lat_lon(node)
+        lat, lon, overlay_network = overlay_coordinates(node, lat, lon)
+
+        if lat is None or lon is None:
+            continue
+
+        pending.setdefault(cache_key(lat, lon, precision, prefix), (lat, lon, overlay_network))
+
+    if not pending:
+        return {}
+
+    results = geohashid_batch(
+        [item[0] for item in pending.values()],
+        [item[1] for item in pending.values()],
+        precision=precision,
+        prefix=prefix,
+        overlay_networks=[item[2] for item in pending.values()],
+    )
+
+    return dict(zip(pending, results))
+
+
+def enrich_node(
+    node: MutableMapping[str, Any],
+    context: Mapping[str, Any],
+    computed: Mapping[str, dict[str, Any]] | None = None,
+) -> MutableMapping[str, Any]:
     precision = int(context.get("geohash_precision") or context.get("precision") or 12)
     prefix = str(context.get("geohash_prefix") or context.get("prefix") or "gh")
     cache_path = Path(context.get("geohash_cache") or context.get("geohash_cache_path") or DEFAULT_CACHE_PATH)
     compact_cache = bool(context.get("compact", False))
 
+    open_kv_cache(cache_path, context)
+
     meta = resolve_geohashid(
         node,
         precision=precision,
         prefix=prefix,
         cache_path=cache_path,
         compact_cache=compact_cache,
+        computed=computed,
     )
 
     metadata = ensure_block(node, "metadata")
@@ -570,16 +853,22 @@ def enrich_nodes(nodes: Any, context: dict[str, Any] | None = None) -> Any:
     context = context or {}
 
     if isinstance(nodes, list):
-        return [
-            enrich_node(dict(node), context) if isinstance(node, Mapping) else node
+        computed = precompute_geohashids(nodes, context)
+        result: Any = [
+            enrich_node(dict(node), context, computed) if isinstance(node, Mapping) else node
             for node in nodes
         ]
+        commit_kv_caches()
+        return result
 
     if isinstance(nodes, Mapping):
-        return {
-            key: enrich_node(dict(value), context) if isinstance(value, Mapping) else value
+        computed = precompute_geohashids(nodes.values(), context)
+        result = {
+            key: enrich_node(dict(value), context, computed) if isinstance(value, Mapping) else value
             for key, value in nodes.items()
         }
+        commit_kv_caches()
+        return result
 
     return nodes
 
@@ -663,6 +952,7 @@ def put_nodes(payload: Any, nodes: list[dict[str, Any]], context: dict[str, Any]
         output["metadata"]["geohashid_enriched_at"] = utc_now()
         output["metadata"]["geohashid_schema"] = SCHEMA
         output["metadata"]["geohashid_cache"] = str(context.get("geohash_cache") or DEFAULT_CACHE_PATH)
+        output["metadata"]["geohashid_cache_stats"] = kv_cache_info(Path(context.get("geohash_cache") or DEFAULT_CACHE_PATH))
         output["metadata"]["geohash_precision"] = int(context.get("geohash_precision") or context.get("precision") or 12)
         output["metadata"]["geohash_prefix"] = str(context.get("geohash_prefix") or context.get("prefix") or "gh")
 
@@ -781,6 +1071,7 @@ def main() -> int:
         write_json(Path(args.summary), summarize(iter_nodes(enriched)), compact=args.compact)
 
     print(f"geohashid lookup enrichment complete: {len(iter_nodes(enriched))} nodes")
+    kv_cache.close_caches()
     return 0
 
 
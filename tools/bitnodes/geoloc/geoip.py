@@ -7,10 +7,11 @@ import ipaddress
 import json
 import math
 import re
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, replace
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, Callable, Iterable, Mapping
 
 
 APP_ROOT = Path(__file__).resolve().parents[2]
@@ -25,6 +26,14 @@ SCHEMA = "zzx-bitnodes-geoip-v4"
 DEFAULT_PORT = 8333
 UNKNOWN_VALUES = {"", "unknown", "none", "null", "undefined", "—", "-", "n/a", "na"}
 
+DEFAULT_PREFIX_CACHE_SIZE = 65536
+
+READER_FAMILIES = ("city", "asn", "country")
+READER_DB_TYPES = {"city": "City", "asn": "GeoLite2-ASN", "country": "Country"}
+
+DB_DIGESTS: dict[str, tuple[tuple[int, int], str]] = {}
+PREFIX_CACHES: dict[tuple[str, str], PrefixCache] = {}
+
 
 @dataclass
 class GeoIPRecord:
@@ -390,6 +399,120 @@ def fallback_record(host: str, network_type: str, scope: str, reason: str) -> Ge
     )
 
 
+def file_sha256(path: Path) -> str:
+    stat = path.stat()
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = DB_DIGESTS.get(str(path))
+
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    digest = hashlib.sha256()
+
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+
+    DB_DIGESTS[str(path)] = (signature, digest.hexdigest())
+    return DB_DIGESTS[str(path)][1]
+
+
+class PrefixCache:
+    def __init__(self, limit: int = DEFAULT_PREFIX_CACHE_SIZE) -> None:
+        self.limit = max(1, int(limit))
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[int, int, int], Any] = OrderedDict()
+        self._prefix_counts: dict[int, dict[int, int]] = {4: {}, 6: {}}
+        self._prefix_lens: dict[int, tuple[int, ...]] = {4: (), 6: ()}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, ip: ipaddress.IPv4Address | ipaddress.IPv6Address) -> tuple[bool, Any]:
+        value = int(ip)
+
+        version = ip.version
+        bits = ip.max_prefixlen
+
+        for prefix_len in self._prefix_lens[version]:
+            key = (version, prefix_len, value >> (bits - prefix_len))
+            found = self._entries.get(key, self)
+
+            if found is not self:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, found
+
+        self.misses += 1
+        return False, None
+
+    def put(self, ip: ipaddress.IPv4Address | ipaddress.IPv6Address, prefix_len: int, value: Any) -> None:
+        prefix_len = max(0, min(int(prefix_len), ip.max_prefixlen))
+        counts = self._prefix_counts[ip.version]
+        counts[prefix_len] = counts.get(prefix_len, 0) + 1
+        self._prefix_lens[ip.version] = tuple(sorted(counts, key=counts.__getitem__, reverse=True))
+        self._entries[(ip.version, prefix_len, int(ip) >> (ip.max_prefixlen - prefix_len))] = value
+
+        while len(self._entries) > self.limit:
+            version, evicted, _network = self._entries.popitem(last=False)[0]
+            counts = self._prefix_counts[version]
+            counts[evicted] -= 1
+
+            if not counts[evicted]:
+                del counts[evicted]
+                self._prefix_lens[version] = tuple(sorted(counts, key=counts.__getitem__, reverse=True))
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def prefix_cache(family: str, digest: str) -> PrefixCache:
+    key = (family, digest)
+
+    if key not in PREFIX_CACHES:
+        for stale in [item for item in PREFIX_CACHES if item[0] == family]:
+            del PREFIX_CACHES[stale]
+
+        PREFIX_CACHES[key] = PrefixCache()
+
+    return PREFIX_CACHES[key]
+
+
+def city_fields(record: Mapping[str, Any]) -> dict[str, Any]:
+    city = record.get("city") or {}
+    country = record.get("country") or {}
+    location = record.get("location") or {}
+
+    return {
+        "city": (city.get("names") or {}).get("en"),
+        "country_code": country.get("iso_code"),
+        "country_name": (country.get("names") or {}).get("en"),
+        "latitude": location.get("latitude"),
+        "longitude": location.get("longitude"),
+        "timezone": location.get("time_zone"),
+    }
+
+
+def country_fields(record: Mapping[str, Any]) -> dict[str, Any]:
+    country = record.get("country") or {}
+
+    return {
+        "country_code": country.get("iso_code"),
+        "country_name": (country.get("names") or {}).get("en"),
+    }
+
+
+def asn_fields(record: Mapping[str, Any]) -> dict[str, Any]:
+    org = clean(record.get("autonomous_system_organization"))
+
+    return {
+        "asn": normalize_asn(record.get("autonomous_system_number")),
+        "organization": org or None,
+        "provider": org or None,
+    }
+
+
 class GeoIPLookup:
     def __init__(
         self,
@@ -406,6 +529,9 @@ class GeoIPLookup:
         self.asn_reader = None
         self.country_reader = None
         self.open_error = ""
+        self.db_types: dict[str, str] = {}
+        self.db_digests: dict[str, str] = {}
+        self.caches: dict[str, PrefixCache] = {}
 
         if self.enabled:
             self.open()
@@ -415,22 +541,26 @@ class GeoIPLookup:
             return
 
         try:
-            import geoip2.database  # type: ignore
+            import maxminddb  # type: ignore
 
-            if self.city_db and self.city_db.exists() and self.city_db.stat().st_size > 0:
-                self.city_reader = geoip2.database.Reader(str(self.city_db))
+            for family in READER_FAMILIES:
+                path = getattr(self, f"{family}_db")
 
-            if self.asn_db and self.asn_db.exists() and self.asn_db.stat().st_size > 0:
-                self.asn_reader = geoip2.database.Reader(str(self.asn_db))
+                if not path or not path.exists() or path.stat().st_size <= 0:
+                    continue
 
-            if self.country_db and self.country_db.exists() and self.country_db.stat().st_size > 0:
-                self.country_reader = geoip2.database.Reader(str(self.country_db))
+                reader = maxminddb.open_database(str(path), maxminddb.MODE_MMAP)
+                setattr(self, f"{family}_reader", reader)
+                self.db_types[family] = str(reader.metadata().database_type)
+                self.db_digests[family] = file_sha256(path)
+                self.caches[family] = prefix_cache(family, self.db_digests[family])
 
         except Exception as exc:
             self.open_error = str(exc)
             self.city_reader = None
             self.asn_reader = None
             self.country_reader = None
+            self.caches = {}
 
         print(
             "[geoip] readers "
@@ -442,6 +572,15 @@ class GeoIPLookup:
         )
 
     def close(self) -> None:
+        stats = self.cache_stats()
+
+        if any(item["hits"] or item["misses"] for item in stats.values()):
+            print(
+                "[geoip] prefix cache "
+                + " ".join(f"{family}={item['hits']}/{item['hits'] + item['misses']}" for family, item in stats.items()),
+                flush=True,
+            )
+
         for reader in (self.city_reader, self.asn_reader, self.country_reader):
             try:
                 if reader:
@@ -461,58 +600,83 @@ class GeoIPLookup:
     def __exit__(self, exc_type, exc, tb) -> None:
         self.close()
 
-    def lookup_city(self, ip: str) -> dict[str, Any]:
-        if not self.city_reader:
+    def cached_lookup(
+        self,
+        family: str,
+        ip: str | ipaddress.IPv4Address | ipaddress.IPv6Address,
+        fields: Callable[[Mapping[str, Any]], dict[str, Any]],
+    ) -> dict[str, Any]:
+        reader = getattr(self, f"{family}_reader")
+
+        if not reader or READER_DB_TYPES[family] not in self.db_types.get(family, ""):
             return {}
 
         try:
-            response = self.city_reader.city(ip)
-            return {
-                "city": response.city.name,
-                "country_code": response.country.iso_code,
-                "country_name": response.country.name,
-                "latitude": response.location.latitude,
-                "longitude": response.location.longitude,
-                "timezone": response.location.time_zone,
-            }
-        except Exception:
-            return {}
+            address = ipaddress.ip_address(ip) if isinstance(ip, str) else ip
+            cache = self.caches.get(family)
 
-    def lookup_country(self, ip: str) -> dict[str, Any]:
-        if not self.country_reader:
-            return {}
+            if cache is not None:
+                found, value = cache.get(address)
 
-        try:
-            response = self.country_reader.country(ip)
-            return {
-                "country_code": response.country.iso_code,
-                "country_name": response.country.name,
-            }
-        except Exception:
-            return {}
+                if found:
+                    return dict(value)
 
-    def lookup_asn(self, ip: str) -> dict[str, Any]:
-        if not self.asn_reader:
-            return {}
+            record, prefix_len = reader.get_with_prefix_len(address)
+            value = fields(record) if isinstance(record, Mapping) else {}
 
-        try:
-            response = self.asn_reader.asn(ip)
-            org = clean(response.autonomous_system_organization)
-            return {
-                "asn": normalize_asn(response.autonomous_system_number),
-                "organization": org or None,
-                "provider": org or None,
-            }
+            if cache is not None:
+                cache.put(address, prefix_len, value)
+
+            return dict(value)
         except Exception:
             return {}
 
-    def lookup(self, address_or_host: Any, node: Mapping[str, Any] | None = None) -> GeoIPRecord:
+    def lookup_city(self, ip: str | ipaddress.IPv4Address | ipaddress.IPv6Address) -> dict[str, Any]:
+        return self.cached_lookup("city", ip, city_fields)
+
+    def lookup_country(self, ip: str | ipaddress.IPv4Address | ipaddress.IPv6Address) -> dict[str, Any]:
+        return self.cached_lookup("country", ip, country_fields)
+
+    def lookup_asn(self, ip: str | ipaddress.IPv4Address | ipaddress.IPv6Address) -> dict[str, Any]:
+        return self.cached_lookup("asn", ip, asn_fields)
+
+    def cache_stats(self) -> dict[str, Any]:
+        return {
+            family: {"sha256": self.db_digests.get(family, ""), **cache.stats()}
+            for family, cache in self.caches.items()
+        }
+
+    def lookup_host(self, address_or_host: Any, node: Mapping[str, Any] | None = None) -> str:
         node = node or {}
         host = extract_host_from_node(node) if isinstance(node, Mapping) else ""
         if not host:
             host, _port = parse_address_host_port(address_or_host)
 
-        host = strip_ipv6_brackets(host)
+        return strip_ipv6_brackets(host)
+
+    def lookup_many(
+        self,
+        addresses: Iterable[Any],
+        nodes: Iterable[Mapping[str, Any] | None] | None = None,
+    ) -> list[GeoIPRecord]:
+        node_iter = iter(nodes) if nodes is not None else None
+        resolved: dict[str, GeoIPRecord] = {}
+        records: list[GeoIPRecord] = []
+
+        for address in addresses:
+            node = next(node_iter, None) if node_iter is not None else None
+            host = self.lookup_host(address, node)
+
+            if host not in resolved:
+                resolved[host] = self.lookup(address, node)
+                records.append(resolved[host])
+            else:
+                records.append(replace(resolved[host]))
+
+        return records
+
+    def lookup(self, address_or_host: Any, node: Mapping[str, Any] | None = None) -> GeoIPRecord:
+        host = self.lookup_host(address_or_host, node)
 
         if not host:
             return fallback_record("empty", "unknown", "empty", "empty-host")
@@ -532,9 +696,10 @@ class GeoIPLookup:
         if scope != "public":
             return fallback_record(ip, network_type, scope, f"ip-{scope}")
 
-        city_data = self.lookup_city(ip)
-        country_data = self.lookup_country(ip)
-        asn_data = self.lookup_asn(ip)
+        address = ipaddress.ip_address(ip)
+        city_data = self.lookup_city(address)
+        country_data = self.lookup_country(address)
+        asn_data = self.lookup_asn(address)
 
         source_parts = []
 
@@ -774,6 +939,29 @@ def enrich_node_array(address: str, values: list[Any], geoip: GeoIPLookup) -> li
     return padded
 
 
+class GeoIPNodeEnricher:
+    def __init__(self, lookup: GeoIPLookup) -> None:
+        self.lookup = lookup
+
+    def __call__(self, node: Mapping[str, Any]) -> dict[str, Any]:
+        return enrich_node_dict(node, self.lookup)
+
+    def close(self) -> None:
+        self.lookup.close()
+
+
+def node_enricher(context: dict[str, Any] | None = None) -> GeoIPNodeEnricher:
+    context = context or {}
+
+    return GeoIPNodeEnricher(
+        GeoIPLookup(
+            city_db=context.get("city_db") or context.get("geoip_city_db") or DEFAULT_CITY_DB,
+            asn_db=context.get("asn_db") or context.get("geoip_asn_db") or DEFAULT_ASN_DB,
+            country_db=context.get("country_db") or context.get("geoip_country_db") or DEFAULT_COUNTRY_DB,
+        )
+    )
+
+
 def enrich_nodes(
     nodes: Any,
     context: dict[str, Any] | None = None,
@@ -3,14 +3,33 @@ from __future__ import annotations
 
 import argparse
 import gzip
+import importlib.util
 import json
 import re
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Mapping, MutableMapping
 
 
 APP_ROOT = Path(__file__).resolve().parents[3]
+TOOLS_DIR = APP_ROOT / "tools" / "bitnodes"
+
+
+def load_tool(filename: str) -> Any:
+    module_name = "zzx_bitnodes_" + Path(filename).stem
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, TOOLS_DIR / filename)
+        sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules[module_name])
+
+    return sys.modules[module_name]
+
+
+reference_cache = load_tool("reference_cache.py")
+
+
 DEFAULT_GEO_ROOT = APP_ROOT / "bitcoin" / "bitnodes" / "data" / "geo"
 DEFAULT_TERRITORY_DIR = DEFAULT_GEO_ROOT / "territories"
 
@@ -152,16 +171,29 @@ def raw_territory_name(row: Mapping[str, Any]) -> str:
     ))
 
 
-def load_territory_index(country: str, territory_dir: Path) -> dict[str, Any]:
+def read_index_file(path: Path) -> tuple[tuple[str, int, int] | None, Any]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None, {}
+
+    return (str(path), stat.st_mtime_ns, stat.st_size), read_json(path, fallback={})
+
+
+def find_territory_index(country: str, territory_dir: Path) -> tuple[tuple[str, int, int] | None, dict[str, Any]]:
     if not country:
-        return {}
+        return None, {}
 
     for path in (territory_dir / f"{country.upper()}.json", territory_dir / f"{country.lower()}.json"):
-        data = read_json(path, fallback={})
+        key, data = read_index_file(path)
         if isinstance(data, dict) and data:
-            return data
+            return key, data
+
+    return None, {}
 
-    return {}
+
+def load_territory_index(country: str, territory_dir: Path) -> dict[str, Any]:
+    return territory_reference(country, territory_dir)["index"]
 
 
 def build_lookup(index: Mapping[str, Any]) -> tuple[dict[str, str], dict[str, str]]:
@@ -208,6 +240,16 @@ def build_lookup(index: Mapping[str, Any]) -> tuple[dict[str, str], dict[str, st
     return by_code, by_name
 
 
+def build_territory_reference(country: str, territory_dir: Path) -> dict[str, Any]:
+    key, index = find_territory_index(country, territory_dir)
+    by_code, by_name = build_lookup(index)
+    return {"key": key, "index": index, "by_code": by_code, "by_name": by_name}
+
+
+def territory_reference(country: str, territory_dir: Path) -> dict[str, Any]:
+    return reference_cache.fetch("territory", country, "", territory_dir, lambda: build_territory_reference(country, territory_dir))
+
+
 def resolve_territory(row: Mapping[str, Any], territory_dir: Path) -> dict[str, Any]:
     country = country_code(row)
     code = raw_territory_code(row)
@@ -231,8 +273,9 @@ def resolve_territory(row: Mapping[str, Any], territory_dir: Path) -> dict[str,
             "is_unknown_territory": False, "updated_at": utc_now(),
         }
 
-    index = load_territory_index(country, territory_dir)
-    by_code, by_name = build_lookup(index)
+    reference = territory_reference(country, territory_dir)
+    index = reference["index"]
+    by_code, by_name = reference["by_code"], reference["by_name"]
 
     subdivision_label = clean(index.get("subdivision_label")) or clean(index.get("subdivision_type")) or "territory"
     country_name = clean(index.get("country_name")) or country or "Unknown"
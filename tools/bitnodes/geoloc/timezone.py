@@ -3,15 +3,35 @@ from __future__ import annotations
 
 import argparse
 import gzip
+import importlib.util
 import json
 import math
 import re
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Mapping, MutableMapping
 
 
 APP_ROOT = Path(__file__).resolve().parents[3]
+TOOLS_DIR = APP_ROOT / "tools" / "bitnodes"
+
+
+def load_tool(filename: str) -> Any:
+    module_name = "zzx_bitnodes_" + Path(filename).stem
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, TOOLS_DIR / filename)
+        sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules[module_name])
+
+    return sys.modules[module_name]
+
+
+reference_cache = load_tool("reference_cache.py")
+spatial_index = load_tool("spatial_index.py")
+
+
 DEFAULT_GEO_ROOT = APP_ROOT / "bitcoin" / "bitnodes" / "data" / "geo"
 DEFAULT_TIMEZONE_DIR = DEFAULT_GEO_ROOT / "timezones"
 
@@ -289,7 +309,16 @@ def raw_timezone(row: Mapping[str, Any]) -> str:
     return normalize_timezone(first(row, keys))
 
 
-def load_timezone_index(country: str, timezone_dir: Path) -> dict[str, Any]:
+def read_index_file(path: Path) -> tuple[tuple[str, int, int] | None, Any]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None, {}
+
+    return (str(path), stat.st_mtime_ns, stat.st_size), read_json(path, fallback={})
+
+
+def find_timezone_index(country: str, timezone_dir: Path) -> tuple[tuple[str, int, int] | None, dict[str, Any]]:
     candidates: list[Path] = []
 
     if country:
@@ -308,12 +337,16 @@ def load_timezone_index(country: str, timezone_dir: Path) -> dict[str, Any]:
     ])
 
     for path in candidates:
-        data = read_json(path, fallback={})
+        key, data = read_index_file(path)
 
         if isinstance(data, dict) and data:
-            return data
+            return key, data
 
-    return {}
+    return None, {}
+
+
+def load_timezone_index(country: str, timezone_dir: Path) -> dict[str, Any]:
+    return timezone_reference(country, timezone_dir)["index"]
 
 
 def timezone_rows(index: Mapping[str, Any]) -> list[dict[str, Any]]:
@@ -326,6 +359,15 @@ def timezone_rows(index: Mapping[str, Any]) -> list[dict[str, Any]]:
     return []
 
 
+def build_timezone_reference(country: str, timezone_dir: Path) -> dict[str, Any]:
+    key, index = find_timezone_index(country, timezone_dir)
+    return {"key": key, "index": index, "rows": timezone_rows(index)}
+
+
+def timezone_reference(country: str, timezone_dir: Path) -> dict[str, Any]:
+    return reference_cache.fetch("timezone", country, "", timezone_dir, lambda: build_timezone_reference(country, timezone_dir))
+
+
 def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     radius = 6371.0088
 
@@ -344,13 +386,27 @@ def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     return radius * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
 
-def nearest_timezone(rows: list[dict[str, Any]], lat: float, lon: float) -> tuple[dict[str, Any] | None, float | None]:
+def timezone_point(row: Mapping[str, Any]) -> tuple[float | None, float | None]:
+    lat = number(row.get("latitude") or row.get("lat"))
+    lon = number(row.get("longitude") or row.get("lon") or row.get("lng"))
+    return lat, lon
+
+
+def nearest_timezone(
+    rows: list[dict[str, Any]],
+    lat: float,
+    lon: float,
+    *,
+    key: tuple[str, int, int] | None = None,
+) -> tuple[dict[str, Any] | None, float | None]:
+    if key is not None:
+        return spatial_index.cached_index(("timezone", *key), rows, timezone_point).nearest(lat, lon)
+
     best: dict[str, Any] | None = None
     best_distance: float | None = None
 
     for row in rows:
-        row_lat = number(row.get("latitude") or row.get("lat"))
-        row_lon = number(row.get("longitude") or row.get("lon") or row.get("lng"))
+        row_lat, row_lon = timezone_point(row)
 
         if row_lat is None or row_lon is None:
             continue
@@ -450,11 +506,12 @@ def resolve_timezone(row: Mapping[str, Any], timezone_dir: Path) -> dict[str, An
         )
 
     lat, lon = row_lat_lon(row)
-    index = load_timezone_index(country, timezone_dir)
-    rows = timezone_rows(index)
+    reference = timezone_reference(country, timezone_dir)
+    index_key = reference["key"]
+    rows = reference["rows"]
 
     if lat is not None and lon is not None and rows:
-        nearest, distance = nearest_timezone(rows, lat, lon)
+        nearest, distance = nearest_timezone(rows, lat, lon, key=index_key)
 
         if nearest:
             timezone_name = normalize_timezone(
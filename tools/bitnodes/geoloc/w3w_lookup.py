@@ -3,10 +3,12 @@ from __future__ import annotations
 
 import argparse
 import gzip
+import importlib.util
 import json
 import math
 import os
 import re
+import sys
 import time
 import urllib.parse
 import urllib.request
@@ -16,6 +18,23 @@ from typing import Any, Mapping, MutableMapping
 
 
 APP_ROOT = Path(__file__).resolve().parents[3]
+TOOLS_DIR = APP_ROOT / "tools" / "bitnodes"
+
+
+def load_tool(filename: str) -> Any:
+    module_name = "zzx_bitnodes_" + Path(filename).stem
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, TOOLS_DIR / filename)
+        sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules[module_name])
+
+    return sys.modules[module_name]
+
+
+kv_cache = load_tool("kv_cache.py")
+
+
 DEFAULT_GEO_ROOT = APP_ROOT / "bitcoin" / "bitnodes" / "data" / "geo"
 DEFAULT_W3W_DIR = DEFAULT_GEO_ROOT / "w3w"
 DEFAULT_CACHE_PATH = DEFAULT_W3W_DIR / "w3w-cache.json"
@@ -24,6 +43,7 @@ SCHEMA = "zzx-bitnodes-w3w-v3"
 CACHE_SCHEMA = "zzx-bitnodes-w3w-cache-v3"
 SUMMARY_SCHEMA = "zzx-bitnodes-w3w-summary-v3"
 
+
 W3W_API_URL = "https://api.what3words.com/v3/convert-to-3wa"
 W3W_RE = re.compile(
     r"^(?:/{0,3})?([a-zA-ZÀ-ÿ0-9\-]+)\.([a-zA-ZÀ-ÿ0-9\-]+)\.([a-zA-ZÀ-ÿ0-9\-]+)$"
@@ -255,26 +275,18 @@ def cache_key(lat: float, lon: float, language: str) -> str:
     return f"{lat:.6f},{lon:.6f}:{language.lower()}"
 
 
-def load_cache(cache_path: Path) -> dict[str, Any]:
-    cache = read_json(cache_path, fallback={})
-    return cache if isinstance(cache, dict) else {}
 
+def open_kv_cache(cache_path: Path, context: Mapping[str, Any] | None = None) -> Any | None:
+    return kv_cache.open_cache(cache_path, context)
 
-def cache_entries(cache: Mapping[str, Any]) -> dict[str, Any]:
-    entries = cache.get("entries")
-    return dict(entries) if isinstance(entries, Mapping) else dict(cache)
 
+def commit_kv_caches() -> None:
+    kv_cache.commit_caches()
 
-def save_cache(cache_path: Path, entries: dict[str, Any], compact: bool = False) -> None:
-    write_json(
-        cache_path,
-        {
-            "schema": CACHE_SCHEMA,
-            "updated_at": utc_now(),
-            "entries": entries,
-        },
-        compact=compact,
-    )
+
+def kv_cache_info(cache_path: Path) -> dict[str, Any]:
+    cache = open_kv_cache(cache_path)
+    return cache.info() if cache is not None else {}
 
 
 def lookup_w3w_api(
@@ -458,12 +470,11 @@ def resolve_w3w(
             overlay_network=overlay_network,
         )
 
-    cache = load_cache(cache_path)
-    entries = cache_entries(cache)
+    cache = open_kv_cache(cache_path)
     key = cache_key(lat, lon, language)
+    cached = cache.get(key) if cache is not None else None
 
-    if key in entries and isinstance(entries[key], Mapping):
-        cached = dict(entries[key])
+    if isinstance(cached, dict):
         cached.setdefault("schema", SCHEMA)
         cached.setdefault("source", "cache")
         cached.setdefault("what3words", cached.get("words") or cached.get("w3w", ""))
@@ -499,8 +510,8 @@ def resolve_w3w(
 
         result = fallback_w3w(lat, lon, language=language, overlay_network=overlay_network)
 
-    entries[key] = result
-    save_cache(cache_path, entries, compact=compact_cache)
+    if cache is not None:
+        cache.put(key, result)
 
     return result
 
@@ -531,6 +542,8 @@ def enrich_node(node: MutableMapping[str, Any], context: Mapping[str, Any]) -> M
     sleep_seconds = float(context.get("w3w_sleep_seconds", 0.0) or 0.0)
     compact_cache = bool(context.get("compact", False))
 
+    open_kv_cache(cache_path, context)
+
     meta = resolve_w3w(
         node,
         api_key=str(api_key),
@@ -581,16 +594,20 @@ def enrich_nodes(nodes: Any, context: dict[str, Any] | None = None) -> Any:
     context = context or {}
 
     if isinstance(nodes, list):
-        return [
+        result: Any = [
             enrich_node(dict(node), context) if isinstance(node, Mapping) else node
             for node in nodes
         ]
+        commit_kv_caches()
+        return result
 
     if isinstance(nodes, Mapping):
-        return {
+        result = {
             key: enrich_node(dict(value), context) if isinstance(value, Mapping) else value
             for key, value in nodes.items()
         }
+        commit_kv_caches()
+        return result
 
     return nodes
 
@@ -674,6 +691,7 @@ def put_nodes(payload: Any, nodes: list[dict[str, Any]], context: dict[str, Any]
         output["metadata"]["w3w_enriched_at"] = utc_now()
         output["metadata"]["w3w_schema"] = SCHEMA
         output["metadata"]["w3w_cache"] = str(context.get("w3w_cache") or DEFAULT_CACHE_PATH)
+        output["metadata"]["w3w_cache_stats"] = kv_cache_info(Path(context.get("w3w_cache") or DEFAULT_CACHE_PATH))
         output["metadata"]["w3w_language"] = str(context.get("w3w_language") or context.get("language") or "en")
         output["metadata"]["w3w_api_enabled"] = bool(
             (
@@ -813,6 +831,7 @@ def main() -> int:
         write_json(Path(args.summary), summarize(iter_nodes(enriched)), compact=args.compact)
 
     print(f"w3w lookup enrichment complete: {len(iter_nodes(enriched))} nodes")
+    kv_cache.close_caches()
     return 0
 
 
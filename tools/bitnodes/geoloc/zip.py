@@ -3,15 +3,35 @@ from __future__ import annotations
 
 import argparse
 import gzip
+import importlib.util
 import json
 import math
 import re
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Mapping, MutableMapping
 
 
 APP_ROOT = Path(__file__).resolve().parents[3]
+TOOLS_DIR = APP_ROOT / "tools" / "bitnodes"
+
+
+def load_tool(filename: str) -> Any:
+    module_name = "zzx_bitnodes_" + Path(filename).stem
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, TOOLS_DIR / filename)
+        sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules[module_name])
+
+    return sys.modules[module_name]
+
+
+reference_cache = load_tool("reference_cache.py")
+spatial_index = load_tool("spatial_index.py")
+
+
 DEFAULT_GEO_ROOT = APP_ROOT / "bitcoin" / "bitnodes" / "data" / "geo"
 DEFAULT_ZIP_DIR = DEFAULT_GEO_ROOT / "postal"
 
@@ -332,9 +352,18 @@ def row_lat_lon(row: Mapping[str, Any]) -> tuple[float | None, float | None]:
     return lat, lon
 
 
-def load_postal_index(country: str, zip_dir: Path) -> dict[str, Any]:
+def read_index_file(path: Path) -> tuple[tuple[str, int, int] | None, Any]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None, {}
+
+    return (str(path), stat.st_mtime_ns, stat.st_size), read_json(path, fallback={})
+
+
+def find_postal_index(country: str, zip_dir: Path) -> tuple[tuple[str, int, int] | None, dict[str, Any]]:
     if not country:
-        return {}
+        return None, {}
 
     candidates = [
         zip_dir / f"{country.upper()}.json",
@@ -346,12 +375,16 @@ def load_postal_index(country: str, zip_dir: Path) -> dict[str, Any]:
     ]
 
     for path in candidates:
-        data = read_json(path, fallback={})
+        key, data = read_index_file(path)
 
         if isinstance(data, dict) and data:
-            return data
+            return key, data
 
-    return {}
+    return None, {}
+
+
+def load_postal_index(country: str, zip_dir: Path) -> dict[str, Any]:
+    return postal_reference(country, zip_dir)["index"]
 
 
 def postal_rows(index: Mapping[str, Any]) -> list[dict[str, Any]]:
@@ -382,6 +415,16 @@ def build_postal_lookup(rows: list[dict[str, Any]]) -> dict[str, dict[str, Any]]
     return lookup
 
 
+def build_postal_reference(country: str, zip_dir: Path) -> dict[str, Any]:
+    key, index = find_postal_index(country, zip_dir)
+    rows = postal_rows(index)
+    return {"key": key, "index": index, "rows": rows, "lookup": build_postal_lookup(rows)}
+
+
+def postal_reference(country: str, zip_dir: Path) -> dict[str, Any]:
+    return reference_cache.fetch("postal", country, "", zip_dir, lambda: build_postal_reference(country, zip_dir))
+
+
 def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     radius = 6371.0088
 
@@ -400,13 +443,27 @@ def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     return radius * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
 
-def nearest_postal(rows: list[dict[str, Any]], lat: float, lon: float) -> tuple[dict[str, Any] | None, float | None]:
+def postal_point(row: Mapping[str, Any]) -> tuple[float | None, float | None]:
+    lat = number(row.get("latitude") or row.get("lat"))
+    lon = number(row.get("longitude") or row.get("lon") or row.get("lng"))
+    return lat, lon
+
+
+def nearest_postal(
+    rows: list[dict[str, Any]],
+    lat: float,
+    lon: float,
+    *,
+    key: tuple[str, int, int] | None = None,
+) -> tuple[dict[str, Any] | None, float | None]:
+    if key is not None:
+        return spatial_index.cached_index(("postal", *key), rows, postal_point).nearest(lat, lon)
+
     best: dict[str, Any] | None = None
     best_distance: float | None = None
 
     for row in rows:
-        row_lat = number(row.get("latitude") or row.get("lat"))
-        row_lon = number(row.get("longitude") or row.get("lon") or row.get("lng"))
+        row_lat, row_lon = postal_point(row)
 
         if row_lat is None or row_lon is None:
             continue
@@ -499,9 +556,10 @@ def resolve_postal(row: Mapping[str, Any], zip_dir: Path) -> dict[str, Any]:
     place = raw_place_name(row)
     lat, lon = row_lat_lon(row)
 
-    index = load_postal_index(country, zip_dir)
-    rows = postal_rows(index)
-    lookup = build_postal_lookup(rows)
+    reference = postal_reference(country, zip_dir)
+    index_key = reference["key"]
+    rows = reference["rows"]
+    lookup = reference["lookup"]
 
     if postal:
         if postal in lookup:
@@ -534,7 +592,7 @@ def resolve_postal(row: Mapping[str, Any], zip_dir: Path) -> dict[str, Any]:
         }
 
     if lat is not None and lon is not None and rows:
-        nearest, distance = nearest_postal(rows, lat, lon)
+        nearest, distance = nearest_postal(rows, lat, lon, key=index_key)
 
         if nearest:
             confidence = "high" if distance is not None and distance <= 15 else "medium"
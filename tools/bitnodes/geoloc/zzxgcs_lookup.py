@@ -17,6 +17,23 @@ from typing import Any, Mapping, MutableMapping
 
 
 APP_ROOT = Path(__file__).resolve().parents[3]
+TOOLS_DIR = APP_ROOT / "tools" / "bitnodes"
+
+
+def load_tool(filename: str) -> Any:
+    module_name = "zzx_bitnodes_" + Path(filename).stem
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, TOOLS_DIR / filename)
+        sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules[module_name])
+
+    return sys.modules[module_name]
+
+
+kv_cache = load_tool("kv_cache.py")
+
+
 DEFAULT_GEO_ROOT = APP_ROOT / "bitcoin" / "bitnodes" / "data" / "geo"
 DEFAULT_ZZXGCS_DIR = DEFAULT_GEO_ROOT / "zzxgcs"
 DEFAULT_CACHE_PATH = DEFAULT_ZZXGCS_DIR / "zzxgcs-cache.json"
@@ -40,6 +57,7 @@ SCHEMA = "zzx-bitnodes-zzxgcs-v3"
 CACHE_SCHEMA = "zzx-gcs-cache-v3"
 SUMMARY_SCHEMA = "zzx-bitnodes-zzxgcs-summary-v3"
 
+
 UNKNOWN_VALUES = {"", "unknown", "none", "null", "undefined", "—", "-", "n/a", "na"}
 
 
@@ -241,26 +259,18 @@ def cache_key(lat: float, lon: float, precision: int, volume: str, version: str,
     return f"{lat:.8f},{lon:.8f}:p{precision}:{volume}:{version}:{language}"
 
 
-def load_cache(cache_path: Path) -> dict[str, Any]:
-    cache = read_json(cache_path, fallback={})
-    return cache if isinstance(cache, dict) else {}
 
+def open_kv_cache(cache_path: Path, context: Mapping[str, Any] | None = None) -> Any | None:
+    return kv_cache.open_cache(cache_path, context)
 
-def cache_entries(cache: Mapping[str, Any]) -> dict[str, Any]:
-    entries = cache.get("entries")
-    return dict(entries) if isinstance(entries, Mapping) else dict(cache)
 
+def commit_kv_caches() -> None:
+    kv_cache.commit_caches()
 
-def save_cache(cache_path: Path, entries: dict[str, Any], compact: bool = False) -> None:
-    write_json(
-        cache_path,
-        {
-            "schema": CACHE_SCHEMA,
-            "updated_at": utc_now(),
-            "entries": entries,
-        },
-        compact=compact,
-    )
+
+def kv_cache_info(cache_path: Path) -> dict[str, Any]:
+    cache = open_kv_cache(cache_path)
+    return cache.info() if cache is not None else {}
 
 
 def run_command(command: list[str], cwd: Path | None = None) -> int:
@@ -676,12 +686,11 @@ def resolve_zzxgcs(
             "looked_up_at": utc_now(),
         }
 
-    cache = load_cache(cache_path)
-    entries = cache_entries(cache)
+    cache = open_kv_cache(cache_path)
     key = cache_key(lat, lon, precision, volume, version, language)
+    cached = cache.get(key) if cache is not None else None
 
-    if key in entries and isinstance(entries[key], Mapping):
-        cached = dict(entries[key])
+    if isinstance(cached, dict):
         cached.setdefault("schema", SCHEMA)
         cached.setdefault("is_overlay", bool(overlay_network))
         cached.setdefault("overlay_network", overlay_network)
@@ -710,8 +719,9 @@ def resolve_zzxgcs(
             repo_result["repo_dir"] = str(repo_dir)
             repo_result["is_overlay"] = False
             repo_result["overlay_network"] = ""
-            entries[key] = repo_result
-            save_cache(cache_path, entries, compact=compact_cache)
+            if cache is not None:
+                cache.put(key, repo_result)
+
             return repo_result
 
     if repo_ready:
@@ -740,8 +750,8 @@ def resolve_zzxgcs(
         result["source"] = f"{overlay_network}-overlay-zzxgcs"
         result["confidence"] = "overlay-deterministic"
 
-    entries[key] = result
-    save_cache(cache_path, entries, compact=compact_cache)
+    if cache is not None:
+        cache.put(key, result)
 
     return result
 
@@ -770,6 +780,8 @@ def enrich_node(node: MutableMapping[str, Any], context: Mapping[str, Any]) -> M
     update_repo = bool(context.get("zzxgcs_update_repo", False))
     compact_cache = bool(context.get("compact", False))
 
+    open_kv_cache(cache_path, context)
+
     meta = resolve_zzxgcs(
         node,
         cache_path=cache_path,
@@ -825,13 +837,17 @@ def enrich_nodes(nodes: Any, context: dict[str, Any] | None = None) -> Any:
     context = context or {}
 
     if isinstance(nodes, list):
-        return [enrich_node(dict(node), context) if isinstance(node, Mapping) else node for node in nodes]
+        result: Any = [enrich_node(dict(node), context) if isinstance(node, Mapping) else node for node in nodes]
+        commit_kv_caches()
+        return result
 
     if isinstance(nodes, Mapping):
-        return {
+        result = {
             key: enrich_node(dict(value), context) if isinstance(value, Mapping) else value
             for key, value in nodes.items()
         }
+        commit_kv_caches()
+        return result
 
     return nodes
 
@@ -915,6 +931,7 @@ def put_nodes(payload: Any, nodes: list[dict[str, Any]], context: dict[str, Any]
         output["metadata"]["zzxgcs_enriched_at"] = utc_now()
         output["metadata"]["zzxgcs_schema"] = SCHEMA
         output["metadata"]["zzxgcs_cache"] = str(context.get("zzxgcs_cache") or DEFAULT_CACHE_PATH)
+        output["metadata"]["zzxgcs_cache_stats"] = kv_cache_info(Path(context.get("zzxgcs_cache") or DEFAULT_CACHE_PATH))
         output["metadata"]["zzxgcs_volume"] = str(context.get("zzxgcs_volume") or "zzxgcs-v1")
         output["metadata"]["zzxgcs_version"] = str(context.get("zzxgcs_version") or "1.0.0")
         output["metadata"]["zzxgcs_repo_dir"] = str(context.get("zzxgcs_repo_dir") or DEFAULT_ZZXGCS_REPO_DIR)
@@ -1063,6 +1080,7 @@ def main() -> int:
         write_json(Path(args.summary), summarize(iter_nodes(enriched)), compact=args.compact)
 
     print(f"zzx-gcs lookup enrichment complete: {len(iter_nodes(enriched))} nodes")
+    kv_cache.close_caches()
     return 0
 
 
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable
+
+
+DEFAULT_CACHE_SIZE = 512
+PLAIN_ALTERNATION_MIN_KEYS = 64
+
+TERMINAL = ""
+WHITESPACE_RE = re.compile(r"\s+")
+
+MATCHER_CACHE: OrderedDict[Hashable, tuple[Any, KeywordMatcher]] = OrderedDict()
+CACHE_STATS = {"hits": 0, "misses": 0, "evictions": 0, "scans": 0}
+
+
+def keyword_pattern(key: str, words: bool) -> str:
+    if not words or key.startswith("."):
+        return re.escape(key)
+
+    return r"\b" + re.escape(key).replace(r"\ ", r"\s+") + r"\b"
+
+
+def build_trie(keys: Iterable[str]) -> dict[str, Any]:
+    root: dict[str, Any] = {}
+
+    for key in keys:
+        node = root
+
+        for char in key:
+            node = node.setdefault(char, {})
+
+        node[TERMINAL] = True
+
+    return root
+
+
+def trie_pattern(node: dict[str, Any], boundary: bool) -> str:
+    branches: list[str] = []
+
+    for char in sorted(key for key in node if key != TERMINAL):
+        atom = r"\s+" if boundary and char == " " else re.escape(char)
+        branches.append(atom + trie_pattern(node[char], boundary))
+
+    if TERMINAL in node:
+        branches.append(r"\b" if boundary else "")
+
+    if len(branches) == 1:
+        return branches[0]
+
+    return "(?:" + "|".join(branches) + ")"
+
+
+class KeywordMatcher:
+    __slots__ = ("words", "ordered", "pairs", "patterns", "spellings", "prefixes", "direct", "regex")
+
+    def __init__(self, keywords: Iterable[str], *, words: bool = False) -> None:
+        self.words = bool(words)
+        self.ordered = sorted(set(keywords), key=len, reverse=True)
+        self.pairs = [(keyword, keyword.lower()) for keyword in self.ordered]
+        self.patterns: dict[str, re.Pattern[str]] = {}
+        self.spellings: dict[str, list[str]] = {}
+        self.prefixes: dict[str, list[str]] = {}
+        self.direct: list[str] = []
+        self.regex: re.Pattern[str] | None = None
+
+        self.compile()
+
+    def __len__(self) -> int:
+        return len(self.ordered)
+
+    def compile(self) -> None:
+        keys = list(dict.fromkeys(key for _, key in self.pairs))
+
+        if not self.words:
+            indexed = [key for key in keys if key]
+
+            if len(indexed) >= PLAIN_ALTERNATION_MIN_KEYS:
+                self.direct = [key for key in keys if not key]
+                self.prefixes = {key: [other for other in indexed if other != key and key.startswith(other)] for key in indexed}
+                self.regex = re.compile("(?=(" + trie_pattern(build_trie(indexed), False) + "))")
+
+            return
+
+        self.patterns = {key: re.compile(keyword_pattern(key, True)) for key in keys}
+        self.direct = [key for key in keys if not key or any(char.isspace() and char != " " for char in key)]
+        indexed = [key for key in keys if key not in self.direct]
+
+        for key in indexed:
+            self.spellings.setdefault(WHITESPACE_RE.sub(" ", key), []).append(key)
+            self.prefixes[key] = [other for other in indexed if other != key and key.startswith(other)]
+
+        branches: list[str] = []
+        plain = [key for key in indexed if not key.startswith(".")]
+        dotted = [key for key in indexed if key.startswith(".")]
+
+        if plain:
+            branches.append(r"\b(?:" + trie_pattern(build_trie(plain), True) + ")")
+
+        if dotted:
+            branches.append(trie_pattern(build_trie(dotted), False))
+
+        if branches:
+            self.regex = re.compile("(?=(" + "|".join(branches) + "))")
+
+    def found(self, text: str) -> set[str]:
+        found = {key for key in self.direct if self.patterns[key].search(text) is not None}
+
+        if self.regex is None:
+            return found
+
+        first = self.regex.search(text)
+
+        if first is None:
+            return found
+
+        captured = {WHITESPACE_RE.sub(" ", match.group(1)) for match in self.regex.finditer(text, first.start())}
+        candidates: set[str] = set()
+
+        for spelling in captured:
+            for key in self.spellings.get(spelling, ()):
+                candidates.add(key)
+                candidates.update(self.prefixes[key])
+
+        found.update(key for key in candidates if self.patterns[key].search(text) is not None)
+        return found
+
+    def substrings(self, text: str) -> set[str]:
+        if self.regex is None:
+            return {key for _, key in self.pairs if key in text}
+
+        found = set(self.direct)
+
+        first = self.regex.search(text)
+
+        if first is None:
+            return found
+
+        for match in self.regex.finditer(text, first.start()):
+            key = match.group(1)
+            found.add(key)
+            found.update(self.prefixes[key])
+
+        return found
+
+    def hits(self, text: str) -> list[str]:
+        CACHE_STATS["scans"] += 1
+        found = self.found(text) if self.words else self.substrings(text)
+
+        if not found:
+            return []
+
+        return [keyword for keyword, key in self.pairs if key in found]
+
+
+def matcher(keywords: Iterable[str], *, words: bool = False, limit: int = DEFAULT_CACHE_SIZE) -> KeywordMatcher:
+    if isinstance(keywords, (tuple, frozenset)):
+        key: Hashable = ("id", id(keywords), words)
+    else:
+        if iter(keywords) is keywords:
+            keywords = list(keywords)
+
+        key = ("items", tuple(keywords), words)
+
+    entry = MATCHER_CACHE.get(key)
+
+    if entry is not None and (key[0] == "items" or entry[0] is keywords):
+        MATCHER_CACHE.move_to_end(key)
+        CACHE_STATS["hits"] += 1
+        return entry[1]
+
+    CACHE_STATS["misses"] += 1
+    compiled = KeywordMatcher(keywords, words=words)
+    MATCHER_CACHE[key] = (keywords, compiled)
+    MATCHER_CACHE.move_to_end(key)
+
+    while len(MATCHER_CACHE) > max(1, limit):
+        MATCHER_CACHE.popitem(last=False)
+        CACHE_STATS["evictions"] += 1
+
+    return compiled
+
+
+def keyword_hits(text: str, keywords: Iterable[str], *, words: bool = False) -> list[str]:
+    return matcher(keywords, words=words).hits(text)
+
+
+def cache_info() -> dict[str, Any]:
+    return {"entries": len(MATCHER_CACHE), **CACHE_STATS}
+
+
+def clear_cache() -> None:
+    MATCHER_CACHE.clear()
+
+    for key in CACHE_STATS:
+        CACHE_STATS[key] = 0
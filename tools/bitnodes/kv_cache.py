@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Iterator, Mapping
+
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_MAX_ENTRIES = 1_000_000
+DEFAULT_MAX_AGE_DAYS = 180.0
+
+SQLITE_SUFFIXES = {".sqlite", ".sqlite3", ".db"}
+
+OPEN_CACHES: dict[str, KVCache] = {}
+
+
+def sqlite_path(cache_path: Path) -> Path:
+    path = Path(cache_path)
+
+    if path.suffix in SQLITE_SUFFIXES:
+        return path
+
+    return path.with_suffix(".sqlite3")
+
+
+def legacy_entries(path: Path) -> dict[str, Any]:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+    if not isinstance(payload, Mapping):
+        return {}
+
+    entries = payload.get("entries")
+    entries = entries if isinstance(entries, Mapping) else payload
+    return {str(key): value for key, value in entries.items() if isinstance(value, Mapping)}
+
+
+class KVCache:
+    def __init__(
+        self,
+        path: Path,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+        legacy_path: Path | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.batch_size = max(1, int(batch_size))
+        self.max_entries = max(0, int(max_entries))
+        self.max_age_seconds = max(0.0, float(max_age_days)) * 86400
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "writes": 0, "commits": 0, "evictions": 0, "imported": 0}
+        self._pending: dict[str, tuple[str, float]] = {}
+        self._touched: dict[str, float] = {}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entries_created_at ON entries(created_at);
+            CREATE INDEX IF NOT EXISTS idx_entries_accessed_at ON entries(accessed_at);
+            """
+        )
+        self.conn.commit()
+
+        if legacy_path is not None and Path(legacy_path).exists() and not len(self):
+            self.import_entries(legacy_entries(Path(legacy_path)))
+
+    def __len__(self) -> int:
+        return int(self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0])
+
+    def import_entries(self, entries: Mapping[str, Any]) -> None:
+        now = time.time()
+
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO entries (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (
+                (key, json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str), now, now)
+                for key, value in entries.items()
+            ),
+        )
+        self.conn.commit()
+        self.stats["imported"] += len(entries)
+
+    def expired(self, created_at: float, now: float) -> bool:
+        return bool(self.max_age_seconds) and now - created_at > self.max_age_seconds
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        now = time.time()
+        pending = self._pending.get(key)
+
+        if pending is not None:
+            self.stats["hits"] += 1
+            return json.loads(pending[0])
+
+        found = self.conn.execute("SELECT value, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+
+        if found is None:
+            self.stats["misses"] += 1
+            return None
+
+        if self.expired(float(found[1]), now):
+            self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            return None
+
+        try:
+            value = json.loads(found[0])
+        except ValueError:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        self._touched[key] = now
+        return value if isinstance(value, dict) else None
+
+    def put(self, key: str, value: Mapping[str, Any]) -> None:
+        self._pending[key] = (json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str), time.time())
+        self._touched.pop(key, None)
+        self.stats["writes"] += 1
+
+        if len(self._pending) >= self.batch_size:
+            self.commit()
+
+    def flush(self) -> None:
+        if self._pending:
+            self.conn.executemany(
+                """
+                INSERT INTO entries (key, value, created_at, accessed_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    value = excluded.value,
+                    created_at = excluded.created_at,
+                    accessed_at = excluded.accessed_at
+                """,
+                [(key, value, stamp, stamp) for key, (value, stamp) in self._pending.items()],
+            )
+            self._pending.clear()
+
+        if self._touched:
+            self.conn.executemany(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?",
+                [(stamp, key) for key, stamp in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def commit(self) -> None:
+        self.flush()
+        self.conn.commit()
+        self.stats["commits"] += 1
+
+    def evict(self) -> int:
+        self.flush()
+        removed = 0
+
+        if self.max_age_seconds:
+            cursor = self.conn.execute("DELETE FROM entries WHERE created_at < ?", (time.time() - self.max_age_seconds,))
+            removed += max(0, cursor.rowcount)
+
+        if self.max_entries:
+            overflow = len(self) - self.max_entries
+
+            if overflow > 0:
+                cursor = self.conn.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                removed += max(0, cursor.rowcount)
+
+        self.conn.commit()
+        self.stats["evictions"] += removed
+        return removed
+
+    def close(self) -> None:
+        self.evict()
+        self.conn.close()
+
+    def info(self) -> dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+
+        return {
+            "path": str(self.path),
+            "entries": len(self) + len(self._pending),
+            "hit_ratio": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            **self.stats,
+        }
+
+
+def cache_options(context: Mapping[str, Any] | None) -> dict[str, Any]:
+    context = context or {}
+    options: dict[str, Any] = {}
+
+    for name, key in (
+        ("batch_size", "geoloc_cache_batch_size"),
+        ("max_entries", "geoloc_cache_max_entries"),
+        ("max_age_days", "geoloc_cache_max_age_days"),
+    ):
+        if context.get(key) not in (None, ""):
+            options[name] = context[key]
+
+    return options
+
+
+def open_cache(cache_path: Path, context: Mapping[str, Any] | None = None) -> KVCache | None:
+    path = sqlite_path(cache_path)
+    key = str(path.resolve())
+    cache = OPEN_CACHES.get(key)
+
+    if cache is not None:
+        return cache
+
+    legacy_path = Path(cache_path) if Path(cache_path) != path else None
+
+    try:
+        cache = KVCache(path, legacy_path=legacy_path, **cache_options(context))
+    except (OSError, sqlite3.Error):
+        return None
+
+    OPEN_CACHES[key] = cache
+    return cache
+
+
+def commit_caches() -> None:
+    for cache in OPEN_CACHES.values():
+        cache.commit()
+
+
+def close_caches() -> None:
+    while OPEN_CACHES:
+        _, cache = OPEN_CACHES.popitem()
+
+        try:
+            cache.close()
+        except sqlite3.Error:
+            continue
+
+
+def cache_info() -> dict[str, Any]:
+    return {key: cache.info() for key, cache in OPEN_CACHES.items()}
+
+
+def read_entries(cache_path: Path) -> dict[str, dict[str, Any]]:
+    path = sqlite_path(cache_path)
+
+    if not path.exists():
+        return {}
+
+    cache = OPEN_CACHES.get(str(path.resolve()))
+
+    if cache is not None:
+        cache.commit()
+
+    entries: dict[str, dict[str, Any]] = {}
+
+    try:
+        conn = sqlite3.connect(path.resolve().as_uri() + "?mode=ro", uri=True)
+    except sqlite3.Error:
+        return entries
+
+    try:
+        for key, value in conn.execute("SELECT key, value FROM entries"):
+            try:
+                row = json.loads(value)
+            except ValueError:
+                continue
+
+            if isinstance(row, dict):
+                entries[str(key)] = row
+    except sqlite3.Error:
+        pass
+    finally:
+        conn.close()
+
+    return entries
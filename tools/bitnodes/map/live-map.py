@@ -9,11 +9,18 @@ import shutil
 import sqlite3
 import subprocess
 import sys
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Mapping
 
 
+try:
+    import resource
+except Exception:
+    resource = None  # type: ignore
+
+
 APP_ROOT = Path(__file__).resolve().parents[3]
 TOOLS_BITNODES = APP_ROOT / "tools" / "bitnodes"
 MAP_TOOLS = TOOLS_BITNODES / "map"
@@ -31,6 +38,8 @@ DEFAULT_DB_SHARDS = BITNODES_DATA / "mariadb"
 
 MAP_SCHEMA = "zzx-bitnodes-live-map-build-report-v4"
 
+BLOCK_BYTES = 512
+
 
 def utc_now() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
@@ -105,8 +114,24 @@ def py(script: Path, args: list[str]) -> list[str]:
     return [sys.executable, str(script), *args]
 
 
+def child_usage() -> dict[str, float]:
+    if resource is None:
+        return {"cpu": 0.0, "inblock": 0, "oublock": 0, "maxrss": 0}
+
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    return {
+        "cpu": usage.ru_utime + usage.ru_stime,
+        "inblock": usage.ru_inblock,
+        "oublock": usage.ru_oublock,
+        "maxrss": usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024,
+    }
+
+
 def run_step(name: str, command: list[str], cwd: Path) -> dict[str, Any]:
     started = utc_now()
+    before = child_usage()
+    wall = time.perf_counter()
 
     proc = subprocess.run(
         command,
@@ -116,6 +141,9 @@ def run_step(name: str, command: list[str], cwd: Path) -> dict[str, Any]:
         check=False,
     )
 
+    seconds = time.perf_counter() - wall
+    after = child_usage()
+
     stdout = proc.stdout.strip()
     stderr = proc.stderr.strip()
 
@@ -131,6 +159,11 @@ def run_step(name: str, command: list[str], cwd: Path) -> dict[str, Any]:
         "finished_at": utc_now(),
         "returncode": proc.returncode,
         "ok": proc.returncode == 0,
+        "seconds": round(seconds, 3),
+        "cpu_seconds": round(after["cpu"] - before["cpu"], 3),
+        "bytes_read": int(after["inblock"] - before["inblock"]) * BLOCK_BYTES,
+        "bytes_written": int(after["oublock"] - before["oublock"]) * BLOCK_BYTES,
+        "peak_rss_bytes": int(after["maxrss"]),
         "stdout": stdout,
         "stderr": stderr,
         "command": command,
@@ -805,6 +838,10 @@ def build_live_map(
 
     copy_if_exists(vectors_path, map_data_dir / "map-vectors.json")
     copy_if_exists(geojson_path, map_data_dir / "map-points.geojson")
+    copy_if_exists(data_dir / "map-clusters.json", map_data_dir / "map-clusters.json")
+
+    for cluster_path in sorted((data_dir / "clusters").glob("z*.json")):
+        copy_if_exists(cluster_path, map_data_dir / "clusters" / cluster_path.name)
 
     optional_simple_tools = [
         ("mapsettings", ["--map-dir", str(map_dir), "--live-map-dir", str(live_map_dir), "--settings", settings]),
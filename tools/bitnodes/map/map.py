@@ -486,6 +486,8 @@ def run_vectors_fallback(args: argparse.Namespace, input_path: Path | None) -> i
     for src, dst in (
         (vector_path, maps_data / "map-vectors.json"),
         (geojson_path, maps_data / "map-points.geojson"),
+        (live_data / "map-clusters.json", maps_data / "map-clusters.json"),
+        *((path, maps_data / "clusters" / path.name) for path in sorted((live_data / "clusters").glob("z*.json"))),
     ):
         if src.exists():
             dst.parent.mkdir(parents=True, exist_ok=True)
@@ -3,10 +3,12 @@ from __future__ import annotations
 
 import argparse
 import gzip
+import importlib.util
 import json
 import math
 import os
 import re
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Mapping
@@ -14,10 +16,28 @@ from typing import Any, Mapping
 
 APP_ROOT = Path(__file__).resolve().parents[3]
 BITNODES_ROOT = Path(os.environ.get("BITNODES_ROOT", str(APP_ROOT / "bitcoin" / "bitnodes")))
+TOOLS_DIR = APP_ROOT / "tools" / "bitnodes"
+
+
+def load_tool(filename: str) -> Any:
+    module_name = "zzx_bitnodes_" + Path(filename).stem
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, TOOLS_DIR / filename)
+        sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules[module_name])
+
+    return sys.modules[module_name]
+
+
+kv_cache = load_tool("kv_cache.py")
+
 
 DEFAULT_MAP_DIR = BITNODES_ROOT / "maps"
 DEFAULT_LIVE_MAP_DIR = BITNODES_ROOT / "live-map"
 DEFAULT_GEOHASH_DIR = BITNODES_ROOT / "data" / "geo" / "geohash"
+GEOHASH_LOOKUP_PATH = Path(__file__).resolve().parents[1] / "geoloc" / "geohashid_lookup.py"
+GEOHASH_LOOKUP_MODULE = "zzx_bitnodes_geoloc_geohashid_lookup"
 
 SCHEMA = "zzx-bitnodes-map-geohashids-v4"
 UNKNOWN_VALUES = {"", "unknown", "none", "null", "undefined", "—", "-", "n/a", "na"}
@@ -312,12 +332,72 @@ def is_threat(point: Mapping[str, Any]) -> bool:
     )) or level in {"confirmed", "high", "medium", "low"}
 
 
+def load_geohash_lookup() -> Any | None:
+    module = sys.modules.get(GEOHASH_LOOKUP_MODULE)
+
+    if module is not None:
+        return module
+
+    if not GEOHASH_LOOKUP_PATH.exists():
+        return None
+
+    spec = importlib.util.spec_from_file_location(GEOHASH_LOOKUP_MODULE, str(GEOHASH_LOOKUP_PATH))
+
+    if spec is None or spec.loader is None:
+        return None
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[GEOHASH_LOOKUP_MODULE] = module
+
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        sys.modules.pop(GEOHASH_LOOKUP_MODULE, None)
+        return None
+
+    return module
+
+
+def derive_geohashes(rows: list[dict[str, Any]], precision: int = 12) -> list[dict[str, Any]]:
+    pending: list[tuple[int, float, float]] = []
+
+    for index, row in enumerate(rows):
+        if point_geohash(row):
+            continue
+
+        lat, lon = point_lat_lon(row)
+
+        if lat is not None and lon is not None:
+            pending.append((index, lat, lon))
+
+    if not pending:
+        return rows
+
+    lookup = load_geohash_lookup()
+    encoder = getattr(lookup, "encode_geohash_batch", None)
+
+    if not callable(encoder):
+        return rows
+
+    geohashes = encoder([item[1] for item in pending], [item[2] for item in pending], precision)
+    output = list(rows)
+
+    for (index, _, _), geohash in zip(pending, geohashes):
+        item = dict(output[index])
+        item["map_geohash"] = geohash
+        item["map_geohashid"] = f"gh:{geohash}"
+        output[index] = item
+
+    return output
+
+
 def load_geohash_reference(geohash_dir: Path) -> dict[str, dict[str, Any]]:
     refs: dict[str, dict[str, Any]] = {}
 
     for candidate in (
         geohash_dir / "geohash-cache.json",
         geohash_dir / "geohash-cache.json.gz",
+        geohash_dir / "geohash-cache.sqlite3",
         geohash_dir / "geohashids.json",
         geohash_dir / "geohashids.json.gz",
         geohash_dir / "mapgeohashids.json",
@@ -325,7 +405,7 @@ def load_geohash_reference(geohash_dir: Path) -> dict[str, dict[str, Any]]:
         geohash_dir / "geohash.json",
         geohash_dir / "geohash.json.gz",
     ):
-        data = read_json(candidate, fallback={})
+        data = {"entries": kv_cache.read_entries(candidate)} if candidate.suffix == ".sqlite3" else read_json(candidate, fallback={})
         if not isinstance(data, dict):
             continue
 
@@ -608,7 +688,8 @@ def merge_geohashids(payload: dict[str, Any], context: dict[str, Any] | None = N
 
     output = dict(payload)
     vectors_payload = dict(output.get("vectors", {}))
-    rows = points(output)
+    precision = int(context.get("geohash_precision") or context.get("map_geohash_precision") or 12)
+    rows = derive_geohashes(points(output), precision)
     refs = load_geohash_reference(geohash_dir)
 
     raw_payload = build_geohash_summary(rows, refs)
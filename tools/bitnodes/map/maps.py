@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
 import gzip
 import importlib.util
 import json
@@ -906,6 +907,8 @@ def default_settings(tile_provider: str = DEFAULT_TILE_PROVIDER) -> dict[str, An
             "interval_seconds": 60,
             "vectors_url": "./data/map-vectors.json",
             "geojson_url": "./data/map-points.geojson",
+            "clusters_url": "./data/map-clusters.json",
+            "tiles_url": "./data/tiles/manifest.json",
             "settings_url": "./data/map-settings.json",
             "theme_url": "./data/map-theme.json",
             "layers_url": "./data/map-layers.json",
@@ -1008,6 +1011,13 @@ def payload_point_count(payload: Mapping[str, Any]) -> int:
     return max(vector_points, geojson_points)
 
 
+def profile_stage(profiler: Any, name: str, *, nodes_in: int | None = None) -> Any:
+    if profiler is None:
+        return contextlib.nullcontext({})
+
+    return profiler.stage("maps", name, nodes_in=nodes_in)
+
+
 def call_module(name: str, fn: Callable[..., Any], payload: dict[str, Any], context: dict[str, Any]) -> dict[str, Any]:
     before_count = payload_point_count(payload)
 
@@ -1055,7 +1065,11 @@ def call_module(name: str, fn: Callable[..., Any], payload: dict[str, Any], cont
     return payload
 
 
-def run_component_modules(payload: dict[str, Any], context: dict[str, Any]) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+def run_component_modules(
+    payload: dict[str, Any],
+    context: dict[str, Any],
+    profiler: Any = None,
+) -> tuple[dict[str, Any], list[dict[str, Any]]]:
     report = []
     current = payload
 
@@ -1079,8 +1093,12 @@ def run_component_modules(payload: dict[str, Any], context: dict[str, Any]) -> t
 
         try:
             before = payload_point_count(current)
-            current = call_module(name, fn, current, context)
-            after = payload_point_count(current)
+
+            with profile_stage(profiler, name, nodes_in=before) as span:
+                current = call_module(name, fn, current, context)
+                after = payload_point_count(current)
+                span["nodes_out"] = after
+
             module_report["status"] = "ok"
             module_report["message"] = f"{name}.py completed. points_before={before}, points_after={after}."
         except Exception as err:
@@ -1575,6 +1593,20 @@ def write_directory_output(out_dir: Path, title: str, map_payload: dict[str, Any
     write_json(data_dir / "map-polygons.geojson", map_payload.get("polygons", default_polygons()), compact=compact)
     write_json(data_dir / "vector-types.json", map_payload.get("vector_types", default_vector_types()), compact=compact)
 
+    clusters = map_payload.get("clusters")
+
+    if isinstance(clusters, dict) and isinstance(clusters.get("zooms"), dict):
+        for zoom, payload in clusters["zooms"].items():
+            write_json(data_dir / "clusters" / f"z{zoom}.json", payload, compact=compact)
+
+        write_json(data_dir / "map-clusters.json", clusters.get("index", {}), compact=compact)
+
+    vectors = map_payload.get("vectors")
+    tiler = load_module("maptiles")
+
+    if tiler is not None and isinstance(vectors, Mapping) and isinstance(vectors.get("points"), list):
+        tiler.write_tiles(data_dir / "tiles", vectors["points"], compact=compact)
+
     theme = map_payload.get("theme", default_theme())
     theme_id = theme.get("id", DEFAULT_THEME) if isinstance(theme, dict) else DEFAULT_THEME
 
@@ -1606,24 +1638,37 @@ def build_maps(
     run_modules: bool = True,
     compact: bool = False,
     prefer_db: bool = True,
+    payload: Any = None,
+    profiler: Any = None,
 ) -> dict[str, Any]:
-    nodes, input_mode, selected_input = load_best_nodes(
-        input_path=input_path,
-        api_dir=api_dir,
-        state_dir=state_dir,
-        sqlite_path=sqlite_path,
-        db_shards=db_shards,
-        source=source,
-        limit=limit,
-        prefer_db=prefer_db,
-    )
+    with profile_stage(profiler, "load") as span:
+        if payload is not None:
+            nodes = extract_nodes(payload)
+            nodes = nodes[:limit] if limit > 0 else nodes
+            input_mode = "memory"
+            selected_input = str(input_path or "")
+        else:
+            nodes, input_mode, selected_input = load_best_nodes(
+                input_path=input_path,
+                api_dir=api_dir,
+                state_dir=state_dir,
+                sqlite_path=sqlite_path,
+                db_shards=db_shards,
+                source=source,
+                limit=limit,
+                prefer_db=prefer_db,
+            )
+
+        span["nodes_out"] = len(nodes)
 
     if not nodes:
         raise FileNotFoundError("No Bitnodes node input found from MariaDB/SQLite/JSON sources.")
 
-    points = build_points(nodes)
-    vectors = build_vector_payload(points, source, input_mode)
-    geojson = build_geojson(points, source, input_mode)
+    with profile_stage(profiler, "points", nodes_in=len(nodes)) as span:
+        points = build_points(nodes)
+        vectors = build_vector_payload(points, source, input_mode)
+        geojson = build_geojson(points, source, input_mode)
+        span["nodes_out"] = len(points)
 
     if strict and not points:
         raise SystemExit(f"No plottable map points found in {selected_input}")
@@ -1671,12 +1716,13 @@ def build_maps(
     module_report: list[dict[str, Any]] = []
 
     if run_modules:
-        map_payload, module_report = run_component_modules(map_payload, context)
+        map_payload, module_report = run_component_modules(map_payload, context, profiler)
 
     map_payload = ensure_nonempty_outputs(map_payload, vectors, geojson)
 
-    write_directory_output(map_dir, "Bitcoin Node Map", map_payload, compact=compact)
-    write_directory_output(live_map_dir, "Live Bitcoin Node Map", map_payload, compact=compact)
+    with profile_stage(profiler, "write", nodes_in=payload_point_count(map_payload)):
+        write_directory_output(map_dir, "Bitcoin Node Map", map_payload, compact=compact)
+        write_directory_output(live_map_dir, "Live Bitcoin Node Map", map_payload, compact=compact)
 
     final_vectors = map_payload.get("vectors", vectors)
 
@@ -1711,7 +1757,7 @@ def build_maps(
     return report
 
 
-def main() -> int:
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Build OpenStreetMap-backed Bitnodes map and live-map static frontend data from MariaDB/SQLite/JSON.",
         allow_abbrev=False,
@@ -1736,9 +1782,11 @@ def main() -> int:
     parser.add_argument("--no-db", action="store_true")
     parser.add_argument("--compact", action="store_true")
 
-    args = parser.parse_args()
+    return parser
 
-    report = build_maps(
+
+def run_from_args(args: argparse.Namespace, payload: Any = None, profiler: Any = None) -> dict[str, Any]:
+    return build_maps(
         input_path=resolve_path(args.input) if args.input else None,
         api_dir=resolve_path(args.api_dir),
         state_dir=resolve_path(args.state_dir),
@@ -1757,8 +1805,14 @@ def main() -> int:
         run_modules=not args.no_modules,
         compact=args.compact,
         prefer_db=not args.no_db,
+        payload=payload,
+        profiler=profiler,
     )
 
+
+def main(argv: list[str] | None = None) -> int:
+    report = run_from_args(build_parser().parse_args(argv))
+
     print(
         "maps build complete: "
         f"{report['point_count']} points, "
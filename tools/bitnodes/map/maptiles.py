@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import time
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+
+SCHEMA = "zzx-bitnodes-map-tiles-v1"
+
+TILE_SIZE = 256
+MERCATOR_MAX_LATITUDE = 85.05112878
+DEFAULT_TILE_ZOOMS = (3, 5, 7)
+COORDINATE_PRECISION = 5
+
+DEFAULT_TILE_FIELDS = (
+    "id",
+    "address",
+    "network",
+    "status",
+    "status_label",
+    "color",
+    "marker_ring",
+    "duplicate_count",
+    "height",
+    "city",
+    "county",
+    "territory",
+    "country",
+    "country_name",
+    "asn",
+    "provider",
+    "w3w",
+    "zzxgcs",
+    "geohashid",
+    "is_vpn",
+    "is_proxy",
+    "is_sanctioned_node",
+    "is_policy_restricted_node",
+    "is_threat_infrastructure",
+)
+
+
+def utc_now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+def read_json(path: Path, fallback: Any = None) -> Any:
+    if fallback is None:
+        fallback = {}
+
+    try:
+        if not path.exists():
+            return fallback
+
+        if path.name.endswith(".gz"):
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                return json.load(handle)
+
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return fallback
+
+
+def write_json(path: Path, payload: Any, compact: bool = False) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    text = json.dumps(
+        payload,
+        ensure_ascii=False,
+        indent=None if compact else 2,
+        separators=(",", ":") if compact else None,
+        sort_keys=not compact,
+        default=str,
+    )
+    path.write_text(text + "\n", encoding="utf-8")
+
+
+def num(value: Any) -> float | None:
+    try:
+        if value in ("", None):
+            return None
+        n = float(value)
+    except Exception:
+        return None
+
+    if math.isnan(n) or math.isinf(n):
+        return None
+
+    return n
+
+
+def point_lat_lon(point: Mapping[str, Any]) -> tuple[float | None, float | None]:
+    geometry = point.get("geometry")
+
+    if isinstance(geometry, Mapping) and isinstance(geometry.get("coordinates"), list) and len(geometry["coordinates"]) >= 2:
+        lon = num(geometry["coordinates"][0])
+        lat = num(geometry["coordinates"][1])
+    else:
+        lat = num(point.get("latitude", point.get("lat")))
+        lon = num(point.get("longitude", point.get("lon", point.get("lng"))))
+
+    if lat is None or lon is None or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None, None
+
+    return lat, lon
+
+
+def point_properties(point: Mapping[str, Any]) -> Mapping[str, Any]:
+    properties = point.get("properties")
+    return properties if isinstance(properties, Mapping) else point
+
+
+def tile_for(latitude: float, longitude: float, zoom: int) -> tuple[int, int]:
+    lat = max(-MERCATOR_MAX_LATITUDE, min(MERCATOR_MAX_LATITUDE, latitude))
+    sin_lat = math.sin(math.radians(lat))
+    size = 1 << zoom
+    x = (longitude + 180.0) / 360.0
+    y = 0.5 - math.log((1.0 + sin_lat) / (1.0 - sin_lat)) / (4.0 * math.pi)
+    return min(size - 1, max(0, int(x * size))), min(size - 1, max(0, int(y * size)))
+
+
+def tile_key(zoom: int, x: int, y: int) -> str:
+    return f"{zoom}/{x}/{y}"
+
+
+def build_tiles(
+    points: Iterable[Mapping[str, Any]],
+    *,
+    zooms: Iterable[int] = DEFAULT_TILE_ZOOMS,
+    fields: Iterable[str] = DEFAULT_TILE_FIELDS,
+) -> dict[str, dict[str, Any]]:
+    levels = sorted({max(0, min(22, int(zoom))) for zoom in zooms})
+    columns = list(fields)
+    tiles: dict[str, dict[str, Any]] = {}
+
+    for point in points:
+        if not isinstance(point, Mapping):
+            continue
+
+        lat, lon = point_lat_lon(point)
+
+        if lat is None or lon is None:
+            continue
+
+        properties = point_properties(point)
+        row = [round(lon, COORDINATE_PRECISION), round(lat, COORDINATE_PRECISION)]
+        row.extend(properties.get(field) for field in columns)
+
+        for zoom in levels:
+            x, y = tile_for(lat, lon, zoom)
+            key = tile_key(zoom, x, y)
+            tile = tiles.get(key)
+
+            if tile is None:
+                tile = tiles[key] = {
+                    "schema": SCHEMA,
+                    "z": zoom,
+                    "x": x,
+                    "y": y,
+                    "fields": ["longitude", "latitude", *columns],
+                    "points": [],
+                }
+
+            tile["points"].append(row)
+
+    for tile in tiles.values():
+        tile["points"].sort(key=lambda row: (row[0], row[1], str(row[2:])))
+        tile["count"] = len(tile["points"])
+
+    return tiles
+
+
+def encode_tile(tile: Mapping[str, Any]) -> bytes:
+    return json.dumps(tile, ensure_ascii=False, separators=(",", ":"), sort_keys=True, default=str).encode("utf-8")
+
+
+def write_bytes(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f".{path.name}.tmp")
+    temp.write_bytes(data)
+    temp.replace(path)
+
+
+def remove_tile(tile_dir: Path, key: str) -> None:
+    for suffix in (".json", ".json.gz"):
+        path = tile_dir / f"{key}{suffix}"
+
+        if path.exists():
+            path.unlink()
+
+
+def write_tiles(
+    tile_dir: Path,
+    points: Iterable[Mapping[str, Any]],
+    *,
+    zooms: Iterable[int] = DEFAULT_TILE_ZOOMS,
+    fields: Iterable[str] = DEFAULT_TILE_FIELDS,
+    gzip_variants: bool = True,
+    url_prefix: str = "./data/tiles",
+    compact: bool = False,
+) -> dict[str, Any]:
+    tile_dir = Path(tile_dir)
+    levels = sorted({max(0, min(22, int(zoom))) for zoom in zooms})
+    columns = list(fields)
+    previous = read_json(tile_dir / "manifest.json", fallback={})
+    previous_tiles = previous.get("tiles", {}) if isinstance(previous, Mapping) else {}
+
+    if not isinstance(previous_tiles, Mapping):
+        previous_tiles = {}
+
+    tiles = build_tiles(points, zooms=levels, fields=columns)
+    entries: dict[str, dict[str, Any]] = {}
+    written = 0
+    skipped = 0
+
+    for key in sorted(tiles):
+        data = encode_tile(tiles[key])
+        digest = hashlib.sha256(data).hexdigest()
+        path = tile_dir / f"{key}.json"
+        gz_path = tile_dir / f"{key}.json.gz"
+        old = previous_tiles.get(key)
+        entry = {"count": tiles[key]["count"], "sha256": digest, "bytes": len(data)}
+
+        unchanged = (
+            isinstance(old, Mapping)
+            and old.get("sha256") == digest
+            and path.exists()
+            and (not gzip_variants or gz_path.exists())
+        )
+
+        if unchanged:
+            if gzip_variants:
+                entry["gzip_bytes"] = int(old.get("gzip_bytes") or gz_path.stat().st_size)
+
+            skipped += 1
+        else:
+            write_bytes(path, data)
+
+            if gzip_variants:
+                packed = gzip.compress(data, compresslevel=9, mtime=0)
+                write_bytes(gz_path, packed)
+                entry["gzip_bytes"] = len(packed)
+            elif gz_path.exists():
+                gz_path.unlink()
+
+            written += 1
+
+        entries[key] = entry
+
+    removed = [key for key in previous_tiles if key not in entries]
+
+    for key in removed:
+        remove_tile(tile_dir, key)
+
+    manifest = {
+        "schema": SCHEMA,
+        "generated_at": utc_now(),
+        "projection": "web-mercator",
+        "tile_size": TILE_SIZE,
+        "zooms": levels,
+        "fields": ["longitude", "latitude", *columns],
+        "url": f"{url_prefix}/{{z}}/{{x}}/{{y}}.json",
+        "gzip_url": f"{url_prefix}/{{z}}/{{x}}/{{y}}.json.gz" if gzip_variants else "",
+        "tile_count": len(entries),
+        "point_count": sum(tile["count"] for tile in tiles.values() if tile["z"] == levels[0]) if levels else 0,
+        "written": written,
+        "skipped": skipped,
+        "removed": len(removed),
+        "tiles": entries,
+    }
+
+    write_json(tile_dir / "manifest.json", manifest, compact=compact)
+    return manifest
+
+
+def tile_options(context: Mapping[str, Any] | None) -> dict[str, Any]:
+    context = context or {}
+    options: dict[str, Any] = {}
+    zooms = context.get("tile_zooms")
+
+    if isinstance(zooms, str):
+        zooms = [part for part in zooms.replace(",", " ").split() if part]
+
+    if zooms:
+        options["zooms"] = [int(zoom) for zoom in zooms]
+
+    if context.get("tile_gzip") is not None:
+        options["gzip_variants"] = bool(context["tile_gzip"])
+
+    return options
+
+
+def extract_points(payload: Any) -> list[Mapping[str, Any]]:
+    if isinstance(payload, list):
+        return [row for row in payload if isinstance(row, Mapping)]
+
+    if not isinstance(payload, Mapping):
+        return []
+
+    for key in ("features", "points", "results"):
+        rows = payload.get(key)
+
+        if isinstance(rows, list):
+            return [row for row in rows if isinstance(row, Mapping)]
+
+    vectors = payload.get("vectors")
+
+    if isinstance(vectors, Mapping):
+        return extract_points(vectors)
+
+    return []
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Partition Bitnodes map points into Web-Mercator z/x/y tiles.",
+        allow_abbrev=False,
+    )
+
+    parser.add_argument("--input", required=True)
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument("--zooms", default=",".join(str(zoom) for zoom in DEFAULT_TILE_ZOOMS))
+    parser.add_argument("--url-prefix", default="./data/tiles")
+    parser.add_argument("--no-gzip", action="store_true")
+    parser.add_argument("--compact", action="store_true")
+
+    args = parser.parse_args()
+
+    manifest = write_tiles(
+        Path(args.output_dir).resolve(),
+        extract_points(read_json(Path(args.input).resolve(), fallback={})),
+        zooms=[int(zoom) for zoom in args.zooms.replace(",", " ").split()],
+        gzip_variants=not args.no_gzip,
+        url_prefix=args.url_prefix,
+        compact=args.compact,
+    )
+
+    print(
+        "map tiles complete: "
+        f"{manifest['tile_count']} tiles, "
+        f"{manifest['written']} written, "
+        f"{manifest['skipped']} unchanged, "
+        f"{manifest['removed']} removed"
+    )
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -13,6 +13,13 @@ from typing import Any, Mapping
 
 
 SCHEMA = "zzx-bitnodes-map-vectors-v4"
+CLUSTER_SCHEMA = "zzx-bitnodes-map-clusters-v1"
+
+CLUSTER_MIN_ZOOM = 0
+CLUSTER_MAX_ZOOM = 16
+CLUSTER_CELL_PIXELS = 64
+TILE_SIZE = 256
+MERCATOR_MAX_LATITUDE = 85.05112878
 
 STATUS_ORDER = [
     "sanctioned-node",
@@ -702,7 +709,7 @@ def point_key(point: Mapping[str, Any], precision: int = 4) -> str:
     return f"{float(point['latitude']):.{precision}f},{float(point['longitude']):.{precision}f}"
 
 
-def sorted_counts(counter: Counter[str]) -> dict[str, int]:
+def sorted_counts(counter: Mapping[str, int]) -> dict[str, int]:
     return dict(sorted(counter.items(), key=lambda item: (-item[1], item[0])))
 
 
@@ -714,50 +721,257 @@ def count_flag(points: list[dict[str, Any]], key: str) -> int:
     return sum(1 for point in points if boolish(point.get(key)) is True)
 
 
-def cluster_points(points: list[dict[str, Any]], precision: int = 2) -> list[dict[str, Any]]:
-    buckets: dict[str, list[dict[str, Any]]] = {}
+def new_aggregate() -> dict[str, Any]:
+    return {
+        "count": 0,
+        "lat_sum": 0.0,
+        "lon_sum": 0.0,
+        "south": 90.0,
+        "north": -90.0,
+        "west": 180.0,
+        "east": -180.0,
+        "statuses": {},
+        "networks": {},
+        "countries": {},
+        "marker_ring": False,
+        "point_id": "",
+        "cluster": None,
+    }
 
-    for point in points:
-        key = point_key(point, precision=precision)
-        buckets.setdefault(key, []).append(point)
 
-    clusters = []
+def add_point(aggregate: dict[str, Any], point: Mapping[str, Any]) -> None:
+    lat = float(point["latitude"])
+    lon = float(point["longitude"])
+
+    aggregate["count"] += 1
+    aggregate["lat_sum"] += lat
+    aggregate["lon_sum"] += lon
+    aggregate["south"] = min(aggregate["south"], lat)
+    aggregate["north"] = max(aggregate["north"], lat)
+    aggregate["west"] = min(aggregate["west"], lon)
+    aggregate["east"] = max(aggregate["east"], lon)
+    for name, key in (("statuses", "status"), ("networks", "network"), ("countries", "country")):
+        value = clean(point.get(key)) or "Unknown"
+        aggregate[name][value] = aggregate[name].get(value, 0) + 1
+
+    aggregate["marker_ring"] = aggregate["marker_ring"] or bool(point.get("marker_ring"))
+    aggregate["point_id"] = str(point.get("id") or point.get("address") or "") if aggregate["count"] == 1 else ""
+
+
+def merge_aggregate(aggregate: dict[str, Any], child: Mapping[str, Any]) -> None:
+    aggregate["point_id"] = child["point_id"] if not aggregate["count"] else ""
+    aggregate["count"] += child["count"]
+    aggregate["lat_sum"] += child["lat_sum"]
+    aggregate["lon_sum"] += child["lon_sum"]
+    aggregate["south"] = min(aggregate["south"], child["south"])
+    aggregate["north"] = max(aggregate["north"], child["north"])
+    aggregate["west"] = min(aggregate["west"], child["west"])
+    aggregate["east"] = max(aggregate["east"], child["east"])
+    for name in ("statuses", "networks", "countries"):
+        counts = aggregate[name]
+
+        for value, count in child[name].items():
+            counts[value] = counts.get(value, 0) + count
+
+    aggregate["marker_ring"] = aggregate["marker_ring"] or child["marker_ring"]
+
+
+def aggregate_cluster(cluster_id: str, aggregate: dict[str, Any]) -> dict[str, Any]:
+    if aggregate["cluster"] is not None:
+        return {**aggregate["cluster"], "id": cluster_id}
+
+    lat = aggregate["lat_sum"] / aggregate["count"]
+    lon = aggregate["lon_sum"] / aggregate["count"]
+    statuses = sorted_counts(aggregate["statuses"])
+    networks = sorted_counts(aggregate["networks"])
+    countries = sorted_counts(aggregate["countries"])
+    dominant_status = next(iter(statuses), "unknown")
+    dominant_network = next(iter(networks), "unknown")
+
+    cluster = {
+        "id": cluster_id,
+        "latitude": lat,
+        "longitude": lon,
+        "lat": lat,
+        "lon": lon,
+        "point_count": aggregate["count"],
+        "status": dominant_status,
+        "status_label": dominant_status.replace("-", " ").title(),
+        "network": dominant_network,
+        "color": color_for_status(dominant_status),
+        "priority": priority_for_status(dominant_status),
+        "marker_ring": aggregate["marker_ring"],
+        "statuses": statuses,
+        "networks": networks,
+        "countries": countries,
+    }
+    aggregate["cluster"] = cluster
 
-    for key, rows in buckets.items():
-        lat = sum(float(row["latitude"]) for row in rows) / len(rows)
-        lon = sum(float(row["longitude"]) for row in rows) / len(rows)
-        statuses = count_by(rows, "status")
-        networks = count_by(rows, "network")
-        countries = count_by(rows, "country")
-        dominant_status = next(iter(statuses), "unknown")
-        dominant_network = next(iter(networks), "unknown")
+    return dict(cluster)
 
-        clusters.append(
-            {
-                "id": f"cluster:{key}",
-                "latitude": lat,
-                "longitude": lon,
-                "lat": lat,
-                "lon": lon,
-                "point_count": len(rows),
-                "status": dominant_status,
-                "status_label": dominant_status.replace("-", " ").title(),
-                "network": dominant_network,
-                "color": color_for_status(dominant_status),
-                "priority": priority_for_status(dominant_status),
-                "marker_ring": any(row.get("marker_ring") for row in rows),
-                "statuses": statuses,
-                "networks": networks,
-                "countries": countries,
-            }
-        )
 
+def sort_clusters(clusters: list[dict[str, Any]]) -> list[dict[str, Any]]:
     return sorted(
         clusters,
         key=lambda item: (-int(item["point_count"]), -int(item["priority"]), item["id"]),
     )
 
 
+def cluster_points(points: list[dict[str, Any]], precision: int = 2) -> list[dict[str, Any]]:
+    buckets: dict[str, dict[str, Any]] = {}
+
+    for point in points:
+        key = point_key(point, precision=precision)
+        aggregate = buckets.get(key)
+
+        if aggregate is None:
+            aggregate = buckets[key] = new_aggregate()
+
+        add_point(aggregate, point)
+
+    return sort_clusters([aggregate_cluster(f"cluster:{key}", aggregate) for key, aggregate in buckets.items()])
+
+
+def mercator_xy(latitude: float, longitude: float) -> tuple[float, float]:
+    lat = max(-MERCATOR_MAX_LATITUDE, min(MERCATOR_MAX_LATITUDE, latitude))
+    sin_lat = math.sin(math.radians(lat))
+    x = (longitude + 180.0) / 360.0
+    y = 0.5 - math.log((1.0 + sin_lat) / (1.0 - sin_lat)) / (4.0 * math.pi)
+    return min(max(x, 0.0), 1.0), min(max(y, 0.0), 1.0)
+
+
+def cluster_grid_size(zoom: int, cell_pixels: int = CLUSTER_CELL_PIXELS) -> int:
+    return max(1, TILE_SIZE // max(1, cell_pixels)) << zoom
+
+
+def build_cluster_index(
+    points: list[dict[str, Any]],
+    *,
+    min_zoom: int = CLUSTER_MIN_ZOOM,
+    max_zoom: int = CLUSTER_MAX_ZOOM,
+    cell_pixels: int = CLUSTER_CELL_PIXELS,
+) -> dict[int, list[dict[str, Any]]]:
+    min_zoom = max(0, int(min_zoom))
+    max_zoom = max(min_zoom, int(max_zoom))
+    size = cluster_grid_size(max_zoom, cell_pixels)
+    level: dict[tuple[int, int], dict[str, Any]] = {}
+
+    for point in points:
+        x, y = mercator_xy(float(point["latitude"]), float(point["longitude"]))
+        cell = (min(size - 1, int(x * size)), min(size - 1, int(y * size)))
+        aggregate = level.get(cell)
+
+        if aggregate is None:
+            aggregate = level[cell] = new_aggregate()
+
+        add_point(aggregate, point)
+
+    expansion: dict[tuple[int, int], int | None] = {cell: None for cell in level}
+    index: dict[int, list[dict[str, Any]]] = {}
+
+    for zoom in range(max_zoom, min_zoom - 1, -1):
+        clusters = []
+
+        for (cx, cy), aggregate in level.items():
+            cluster = aggregate_cluster(f"cluster:z{zoom}:{cx}:{cy}", aggregate)
+            cluster["zoom"] = zoom
+            cluster["cell"] = [cx, cy]
+            cluster["bounds"] = [aggregate["west"], aggregate["south"], aggregate["east"], aggregate["north"]]
+            cluster["parent_id"] = f"cluster:z{zoom - 1}:{cx >> 1}:{cy >> 1}" if zoom > min_zoom else ""
+            cluster["expansion_zoom"] = expansion[(cx, cy)]
+
+            if aggregate["point_id"]:
+                cluster["point_id"] = aggregate["point_id"]
+
+            clusters.append(cluster)
+
+        index[zoom] = sort_clusters(clusters)
+
+        if zoom == min_zoom:
+            break
+
+        parents: dict[tuple[int, int], dict[str, Any]] = {}
+        children: dict[tuple[int, int], list[tuple[int, int]]] = {}
+
+        for (cx, cy), aggregate in level.items():
+            parent = (cx >> 1, cy >> 1)
+            cells = children.setdefault(parent, [])
+            cells.append((cx, cy))
+
+            if len(cells) == 1:
+                parents[parent] = aggregate
+                continue
+
+            if len(cells) == 2:
+                merged = new_aggregate()
+                merge_aggregate(merged, parents[parent])
+                parents[parent] = merged
+
+            merge_aggregate(parents[parent], aggregate)
+
+        expansion = {
+            parent: zoom if len(cells) > 1 else expansion[cells[0]]
+            for parent, cells in children.items()
+        }
+        level = parents
+
+    return dict(sorted(index.items()))
+
+
+def cluster_artifacts(
+    index: Mapping[int, list[dict[str, Any]]],
+    *,
+    cell_pixels: int = CLUSTER_CELL_PIXELS,
+    url_prefix: str = "./data/clusters",
+) -> dict[str, Any]:
+    generated_at = utc_now()
+    zooms = {
+        zoom: {
+            "schema": CLUSTER_SCHEMA,
+            "generated_at": generated_at,
+            "zoom": zoom,
+            "cell_pixels": cell_pixels,
+            "grid_size": cluster_grid_size(zoom, cell_pixels),
+            "cluster_count": len(clusters),
+            "point_count": sum(int(cluster["point_count"]) for cluster in clusters),
+            "clusters": clusters,
+        }
+        for zoom, clusters in index.items()
+    }
+
+    manifest = {
+        "schema": CLUSTER_SCHEMA,
+        "generated_at": generated_at,
+        "projection": "web-mercator",
+        "min_zoom": min(index) if index else CLUSTER_MIN_ZOOM,
+        "max_zoom": max(index) if index else CLUSTER_MAX_ZOOM,
+        "cell_pixels": cell_pixels,
+        "tile_size": TILE_SIZE,
+        "zooms": {
+            str(zoom): {
+                "url": f"{url_prefix}/z{zoom}.json",
+                "cluster_count": payload["cluster_count"],
+                "point_count": payload["point_count"],
+            }
+            for zoom, payload in zooms.items()
+        },
+    }
+
+    return {"index": manifest, "zooms": zooms}
+
+
+def write_cluster_artifacts(data_dir: Path, artifacts: Mapping[str, Any], compact: bool = False) -> None:
+    zooms = artifacts.get("zooms", {})
+
+    if not isinstance(zooms, Mapping):
+        return
+
+    for zoom, payload in zooms.items():
+        write_json(data_dir / "clusters" / f"z{zoom}.json", payload, compact=compact)
+
+    write_json(data_dir / "map-clusters.json", artifacts.get("index", {}), compact=compact)
+
+
 def build_bounds(points: list[dict[str, Any]]) -> dict[str, Any]:
     if not points:
         return {
@@ -1025,9 +1239,22 @@ def build(payload: dict[str, Any], context: dict[str, Any] | None = None) -> dic
         vectors_payload = {}
 
     built = build_vectors(vectors_payload)
+    context = context or {}
+    cell_pixels = integer(context.get("cluster_cell_pixels"), CLUSTER_CELL_PIXELS) or CLUSTER_CELL_PIXELS
+    artifacts = cluster_artifacts(
+        build_cluster_index(
+            built["points"],
+            min_zoom=integer(context.get("cluster_min_zoom"), CLUSTER_MIN_ZOOM),
+            max_zoom=integer(context.get("cluster_max_zoom"), CLUSTER_MAX_ZOOM),
+            cell_pixels=cell_pixels,
+        ),
+        cell_pixels=cell_pixels,
+    )
+    built["cluster_index"] = artifacts["index"]
 
     output["vectors"] = built
     output["geojson"] = build_geojson(built)
+    output["clusters"] = artifacts
 
     return output
 
@@ -1063,10 +1290,14 @@ def build_standalone(
     built = build_vectors(vectors_payload)
     built["source"] = source
 
+    artifacts = cluster_artifacts(build_cluster_index(built["points"]))
+    built["cluster_index"] = artifacts["index"]
+
     geojson = build_geojson(built)
 
     write_json(output_path, built, compact=compact)
     write_json(geojson_path, geojson, compact=compact)
+    write_cluster_artifacts(output_path.parent, artifacts, compact=compact)
 
     return {
         "schema": "zzx-bitnodes-mapvectors-build-report-v4",
@@ -1075,6 +1306,7 @@ def build_standalone(
         "output": str(output_path),
         "geojson": str(geojson_path),
         "point_count": built["point_count"],
+        "cluster_zooms": len(artifacts["zooms"]),
         "source": source,
     }
 
@@ -3,10 +3,12 @@ from __future__ import annotations
 
 import argparse
 import gzip
+import importlib.util
 import json
 import math
 import os
 import re
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Mapping
@@ -14,6 +16,22 @@ from typing import Any, Mapping
 
 APP_ROOT = Path(__file__).resolve().parents[3]
 BITNODES_ROOT = Path(os.environ.get("BITNODES_ROOT", str(APP_ROOT / "bitcoin" / "bitnodes")))
+TOOLS_DIR = APP_ROOT / "tools" / "bitnodes"
+
+
+def load_tool(filename: str) -> Any:
+    module_name = "zzx_bitnodes_" + Path(filename).stem
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, TOOLS_DIR / filename)
+        sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules[module_name])
+
+    return sys.modules[module_name]
+
+
+kv_cache = load_tool("kv_cache.py")
+
 
 DEFAULT_MAP_DIR = BITNODES_ROOT / "maps"
 DEFAULT_LIVE_MAP_DIR = BITNODES_ROOT / "live-map"
@@ -301,10 +319,11 @@ def load_w3w_reference(w3w_dir: Path) -> dict[str, dict[str, Any]]:
         w3w_dir / "mapw3waddresses.json.gz",
         w3w_dir / "w3w-cache.json",
         w3w_dir / "w3w-cache.json.gz",
+        w3w_dir / "w3w-cache.sqlite3",
         w3w_dir / "what3words.json",
         w3w_dir / "what3words.json.gz",
     ):
-        data = read_json(candidate, fallback={})
+        data = {"entries": kv_cache.read_entries(candidate)} if candidate.suffix == ".sqlite3" else read_json(candidate, fallback={})
         if not isinstance(data, dict):
             continue
 
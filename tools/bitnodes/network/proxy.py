@@ -3,13 +3,32 @@ from __future__ import annotations
 
 import argparse
 import gzip
+import importlib.util
 import ipaddress
 import json
 import os
 import re
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Iterable, Mapping, MutableMapping
+from typing import Any, Callable, Mapping, MutableMapping
+
+
+TOOLS_DIR = Path(__file__).resolve().parents[1]
+
+
+def load_tool(filename: str) -> Any:
+    module_name = "zzx_bitnodes_" + Path(filename).stem
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, TOOLS_DIR / filename)
+        sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules[module_name])
+
+    return sys.modules[module_name]
+
+
+keyword_matcher = load_tool("keyword_matcher.py")
 
 
 SCHEMA = "zzx-bitnodes-proxy-heuristic-v2"
@@ -238,25 +257,6 @@ def provider_text(node: Mapping[str, Any]) -> str:
     return norm(" ".join(as_text(first_value(node, key)) for key in keys))
 
 
-def keyword_hits(text: str, keywords: Iterable[str]) -> list[str]:
-    hits: list[str] = []
-
-    for keyword in sorted(set(keywords), key=len, reverse=True):
-        key = keyword.lower()
-
-        if key.startswith("."):
-            if key in text:
-                hits.append(keyword)
-            continue
-
-        pattern = r"\b" + re.escape(key).replace(r"\ ", r"\s+") + r"\b"
-
-        if re.search(pattern, text):
-            hits.append(keyword)
-
-    return hits
-
-
 def classify_confidence(score: float) -> str:
     if score >= 0.85:
         return "high"
@@ -332,25 +332,25 @@ def inspect_provider(node: Mapping[str, Any]) -> tuple[float, list[str]]:
     if not text:
         return score, evidence
 
-    proxy_hits = keyword_hits(text, PROXY_PROVIDER_KEYWORDS)
+    proxy_hits = keyword_matcher.keyword_hits(text, PROXY_PROVIDER_KEYWORDS, words=True)
 
     if proxy_hits:
         score += min(0.65, 0.18 + 0.08 * len(proxy_hits))
         evidence.append(f"proxy provider keywords: {', '.join(proxy_hits[:8])}")
 
-    cdn_hits = keyword_hits(text, CDN_OR_REVERSE_PROXY_KEYWORDS)
+    cdn_hits = keyword_matcher.keyword_hits(text, CDN_OR_REVERSE_PROXY_KEYWORDS, words=True)
 
     if cdn_hits:
         score += min(0.45, 0.15 + 0.06 * len(cdn_hits))
         evidence.append(f"cdn/reverse-proxy keywords: {', '.join(cdn_hits[:8])}")
 
-    residential_hits = keyword_hits(text, RESIDENTIAL_PROXY_KEYWORDS)
+    residential_hits = keyword_matcher.keyword_hits(text, RESIDENTIAL_PROXY_KEYWORDS, words=True)
 
     if residential_hits:
         score += min(0.55, 0.22 + 0.08 * len(residential_hits))
         evidence.append(f"residential/mobile proxy keywords: {', '.join(residential_hits[:8])}")
 
-    hosting_hits = keyword_hits(text, HOSTING_PROXY_CONTEXT_KEYWORDS)
+    hosting_hits = keyword_matcher.keyword_hits(text, HOSTING_PROXY_CONTEXT_KEYWORDS, words=True)
 
     if hosting_hits and (proxy_hits or cdn_hits):
         score += 0.14
@@ -379,7 +379,7 @@ def inspect_reverse_dns(node: Mapping[str, Any]) -> tuple[float, list[str]]:
         "anonymous",
     }
 
-    hits = keyword_hits(text.replace("-", " ").replace(".", " "), keywords)
+    hits = keyword_matcher.keyword_hits(text.replace("-", " ").replace(".", " "), keywords, words=True)
 
     if not hits:
         return 0.0, []
@@ -495,6 +495,10 @@ def enrich_node(node: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
     return node
 
 
+def node_enricher(context: dict[str, Any] | None = None) -> Callable[[MutableMapping[str, Any]], MutableMapping[str, Any]]:
+    return enrich_node
+
+
 def enrich_nodes(nodes: Any, context: dict[str, Any] | None = None) -> Any:
     if isinstance(nodes, list):
         return [enrich_node(dict(node)) if isinstance(node, Mapping) else node for node in nodes]
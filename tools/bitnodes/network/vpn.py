@@ -3,13 +3,32 @@ from __future__ import annotations
 
 import argparse
 import gzip
+import importlib.util
 import ipaddress
 import json
 import os
 import re
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Mapping, MutableMapping
+from typing import Any, Callable, Mapping, MutableMapping
+
+
+TOOLS_DIR = Path(__file__).resolve().parents[1]
+
+
+def load_tool(filename: str) -> Any:
+    module_name = "zzx_bitnodes_" + Path(filename).stem
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, TOOLS_DIR / filename)
+        sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules[module_name])
+
+    return sys.modules[module_name]
+
+
+keyword_matcher = load_tool("keyword_matcher.py")
 
 
 SCHEMA = "zzx-bitnodes-vpn-heuristic-v3"
@@ -153,25 +172,6 @@ def boolish(value: Any) -> bool:
     }
 
 
-def keyword_hits(text: str, keywords: tuple[str, ...]) -> list[str]:
-    hits = []
-
-    for keyword in sorted(set(keywords), key=len, reverse=True):
-        keyword_l = keyword.lower()
-
-        if keyword_l.startswith("."):
-            if keyword_l in text:
-                hits.append(keyword)
-            continue
-
-        pattern = r"\b" + re.escape(keyword_l).replace(r"\ ", r"\s+") + r"\b"
-
-        if re.search(pattern, text):
-            hits.append(keyword)
-
-    return hits
-
-
 def clamp(value: float, lo: float = 0.0, hi: float = 100.0) -> float:
     return max(lo, min(hi, value))
 
@@ -262,13 +262,13 @@ def vpn_metadata(row: Mapping[str, Any]) -> dict[str, Any]:
     evidence: list[str] = []
     score = 0.0
 
-    vpn_keyword_hits = keyword_hits(text, VPN_KEYWORDS)
-    vpn_provider_hits = keyword_hits(text, KNOWN_VPN_PROVIDERS)
-    datacenter_hits = keyword_hits(text, DATACENTER_KEYWORDS) + keyword_hits(text, KNOWN_HOSTING_PROVIDERS)
-    residential_hits = keyword_hits(text, RESIDENTIAL_KEYWORDS)
-    mobile_hits = keyword_hits(text, MOBILE_KEYWORDS)
-    tor_hits = keyword_hits(text, TOR_KEYWORDS)
-    i2p_hits = keyword_hits(text, I2P_KEYWORDS)
+    vpn_keyword_hits = keyword_matcher.keyword_hits(text, VPN_KEYWORDS, words=True)
+    vpn_provider_hits = keyword_matcher.keyword_hits(text, KNOWN_VPN_PROVIDERS, words=True)
+    datacenter_hits = keyword_matcher.keyword_hits(text, DATACENTER_KEYWORDS, words=True) + keyword_matcher.keyword_hits(text, KNOWN_HOSTING_PROVIDERS, words=True)
+    residential_hits = keyword_matcher.keyword_hits(text, RESIDENTIAL_KEYWORDS, words=True)
+    mobile_hits = keyword_matcher.keyword_hits(text, MOBILE_KEYWORDS, words=True)
+    tor_hits = keyword_matcher.keyword_hits(text, TOR_KEYWORDS, words=True)
+    i2p_hits = keyword_matcher.keyword_hits(text, I2P_KEYWORDS, words=True)
 
     is_tor = bool(
         boolish(first_value(row, "is_tor", "suspected_tor", "tor.is_tor", "metadata.is_tor"))
@@ -411,6 +411,10 @@ def enrich_node(node: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
     return node
 
 
+def node_enricher(context: dict[str, Any] | None = None) -> Callable[[MutableMapping[str, Any]], MutableMapping[str, Any]]:
+    return enrich_node
+
+
 def enrich_nodes(nodes: Any, context: dict[str, Any] | None = None) -> Any:
     if isinstance(nodes, list):
         return [enrich_node(dict(node)) if isinstance(node, Mapping) else node for node in nodes]
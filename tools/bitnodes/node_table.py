@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import math
+from typing import Any, Callable, Iterable, Iterator, Mapping
+
+
+try:
+    import numpy as np
+except Exception:
+    np = None  # type: ignore
+
+
+def to_float(value: Any) -> float | None:
+    try:
+        if value in ("", None):
+            return None
+        out = float(value)
+        return out if math.isfinite(out) else None
+    except Exception:
+        return None
+
+
+class NodeTable:
+    def __init__(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        self.rows = rows if isinstance(rows, list) else list(rows)
+        self.encoded: dict[tuple[Any, ...], tuple[Any, list[str]]] = {}
+        self.numbers: dict[tuple[Any, ...], Any] = {}
+        self.masks: dict[tuple[Any, ...], Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[Mapping[str, Any]]:
+        return iter(self.rows)
+
+    def __getitem__(self, index: Any) -> Any:
+        return self.rows[index]
+
+    def encode(
+        self,
+        field: str,
+        unknown: str = "unknown",
+        key: Callable[[Any], str] | None = None,
+    ) -> tuple[Any, list[str]]:
+        cache_key = (field, unknown, key)
+        cached = self.encoded.get(cache_key)
+
+        if cached is not None:
+            return cached
+
+        index: dict[str, int] = {}
+        codes = []
+
+        for row in self.rows:
+            value = row.get(field)
+            label = key(value) if key is not None else str(value or unknown)
+            code = index.get(label)
+
+            if code is None:
+                code = index[label] = len(index)
+
+            codes.append(code)
+
+        encoded = (np.asarray(codes, dtype=np.int32) if np is not None else codes, list(index))
+        self.encoded[cache_key] = encoded
+        return encoded
+
+    def floats(self, field: str, convert: Callable[[Any], float | None] = to_float) -> Any:
+        cache_key = (field, convert)
+        cached = self.numbers.get(cache_key)
+
+        if cached is not None:
+            return cached
+
+        values = [convert(row.get(field)) for row in self.rows]
+
+        if np is not None:
+            values = np.asarray([math.nan if value is None else value for value in values], dtype=np.float64)
+
+        self.numbers[cache_key] = values
+        return values
+
+    def mask(self, field: str, test: Callable[[Any], bool] = bool) -> Any:
+        cache_key = (field, test)
+        cached = self.masks.get(cache_key)
+
+        if cached is not None:
+            return cached
+
+        values = [bool(test(row.get(field))) for row in self.rows]
+
+        if np is not None:
+            values = np.asarray(values, dtype=np.bool_)
+
+        self.masks[cache_key] = values
+        return values
+
+    def equals(self, field: str, value: str, unknown: str = "unknown") -> Any:
+        codes, values = self.encode(field, unknown)
+
+        if value not in values:
+            return np.zeros(len(self.rows), dtype=np.bool_) if np is not None else [False] * len(self.rows)
+
+        code = values.index(value)
+
+        if np is not None:
+            return codes == code
+
+        return [item == code for item in codes]
+
+    def finite(self, field: str, convert: Callable[[Any], float | None] = to_float) -> Any:
+        values = self.floats(field, convert)
+
+        if np is not None:
+            return np.isfinite(values)
+
+        return [value is not None for value in values]
+
+    def any_of(self, *masks: Any) -> Any:
+        if np is not None:
+            return np.logical_or.reduce(masks)
+
+        return [any(items) for items in zip(*masks)]
+
+    def all_of(self, *masks: Any) -> Any:
+        if np is not None:
+            return np.logical_and.reduce(masks)
+
+        return [all(items) for items in zip(*masks)]
+
+    def count(self, mask: Any) -> int:
+        if np is not None:
+            return int(np.count_nonzero(mask))
+
+        return sum(1 for item in mask if item)
+
+    def select(self, mask: Any) -> list[Mapping[str, Any]]:
+        if np is not None:
+            return [self.rows[index] for index in np.flatnonzero(mask).tolist()]
+
+        return [row for row, item in zip(self.rows, mask) if item]
+
+    def tally(self, codes: Any, size: int, mask: Any = None) -> list[int]:
+        if np is not None:
+            selected = codes if mask is None else codes[mask]
+            return np.bincount(selected, minlength=size).tolist()
+
+        totals = [0] * size
+
+        for index, code in enumerate(codes):
+            if mask is None or mask[index]:
+                totals[code] += 1
+
+        return totals
+
+    def counts(
+        self,
+        field: str,
+        unknown: str = "unknown",
+        key: Callable[[Any], str] | None = None,
+        mask: Any = None,
+    ) -> dict[str, int]:
+        codes, values = self.encode(field, unknown, key)
+        totals = self.tally(codes, len(values), mask)
+        return {value: total for value, total in zip(values, totals) if total}
+
+    def crosstab(
+        self,
+        field: str,
+        other: str,
+        key: Callable[[Any], str] | None = None,
+        unknown: str = "unknown",
+    ) -> dict[str, dict[str, int]]:
+        codes, values = self.encode(field, unknown, key)
+        other_codes, other_values = self.encode(other)
+        width = len(other_values)
+
+        if np is not None:
+            cells = codes.astype(np.int64) * width + other_codes
+            matrix = np.bincount(cells, minlength=len(values) * width).reshape(len(values), width).tolist()
+        else:
+            matrix = [[0] * width for _ in values]
+
+            for code, other_code in zip(codes, other_codes):
+                matrix[code][other_code] += 1
+
+        return {
+            value: {name: total for name, total in zip(other_values, totals) if total}
+            for value, totals in zip(values, matrix)
+        }
+
+    def groups(
+        self,
+        field: str,
+        unknown: str = "unknown",
+        key: Callable[[Any], str] | None = None,
+    ) -> dict[str, list[Mapping[str, Any]]]:
+        codes, values = self.encode(field, unknown, key)
+
+        if np is None:
+            grouped: dict[str, list[Mapping[str, Any]]] = {value: [] for value in values}
+
+            for row, code in zip(self.rows, codes):
+                grouped[values[code]].append(row)
+
+            return grouped
+
+        order = np.argsort(codes, kind="stable").tolist()
+        bounds = np.cumsum(np.bincount(codes, minlength=len(values))).tolist()
+        grouped = {}
+        start = 0
+
+        for value, end in zip(values, bounds):
+            grouped[value] = [self.rows[index] for index in order[start:end]]
+            start = end
+
+        return grouped
@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import gzip
+import json
+import queue
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Mapping
+
+
+SCHEMA = "zzx-bitnodes-pipeline-v1"
+STREAM_SCHEMA = "zzx-bitnodes-stream-pipeline-v1"
+
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 1
+
+END_OF_STREAM = object()
+
+DONE_STATES = {"ok", "checkpoint", "disabled"}
+FAILED_STATES = {"failed", "skipped"}
+
+
+def utc_iso() -> str:
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+
+def read_json(path: Path, fallback: Any = None) -> Any:
+    try:
+        if path.suffix == ".gz":
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                return json.load(handle)
+
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return fallback
+
+
+def write_json(path: Path, payload: Any, compact: bool = False) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f".{path.name}.tmp")
+    temp.write_text(
+        json.dumps(
+            payload,
+            ensure_ascii=False,
+            indent=None if compact else 2,
+            separators=(",", ":") if compact else None,
+            sort_keys=not compact,
+            default=str,
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+    temp.replace(path)
+    return path.stat().st_size
+
+
+class Stage:
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[dict[str, Any]], Any],
+        *,
+        after: Iterable[str] = (),
+        enabled: bool = True,
+        checkpoint: Path | None = None,
+        required: bool = True,
+    ) -> None:
+        self.name = name
+        self.fn = fn
+        self.after = tuple(after)
+        self.enabled = enabled
+        self.checkpoint = Path(checkpoint) if checkpoint else None
+        self.required = required
+
+
+def timed_call(
+    label: str,
+    stage: Stage,
+    arg: Any,
+    log: Callable[[str], None],
+    profiler: Any = None,
+) -> tuple[Any, dict[str, Any]]:
+    timing: dict[str, Any] = {"status": "running", "started_at": utc_iso()}
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    value = None
+
+    try:
+        if profiler is None:
+            value = stage.fn(arg)
+        else:
+            with profiler.stage("pipeline", stage.name):
+                value = stage.fn(arg)
+
+        timing["status"] = "ok"
+    except (Exception, SystemExit) as err:
+        timing["status"] = "failed"
+        timing["error"] = f"{type(err).__name__}: {err}"
+        log(f"[{label}] stage {stage.name} failed: {timing['error']}")
+        log(traceback.format_exc().rstrip())
+
+    timing["finished_at"] = utc_iso()
+    timing["seconds"] = round(time.perf_counter() - wall, 3)
+    timing["cpu_seconds"] = round(time.thread_time() - cpu, 3)
+    return value, timing
+
+
+class Pipeline:
+    def __init__(
+        self,
+        name: str = "pipeline",
+        *,
+        workers: int = DEFAULT_WORKERS,
+        checkpoint_dir: Path | None = None,
+        compact: bool = False,
+        log: Callable[[str], None] | None = None,
+        profiler: Any = None,
+    ) -> None:
+        self.name = name
+        self.workers = max(1, int(workers))
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else None
+        self.compact = compact
+        self.log = log or (lambda message: print(message, flush=True))
+        self.profiler = profiler
+        self.stages: dict[str, Stage] = {}
+        self.results: dict[str, Any] = {}
+        self.timings: dict[str, dict[str, Any]] = {}
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[[dict[str, Any]], Any],
+        *,
+        after: Iterable[str] = (),
+        enabled: bool = True,
+        checkpoint: Path | None = None,
+        required: bool = True,
+    ) -> Stage:
+        if name in self.stages:
+            raise ValueError(f"duplicate pipeline stage: {name}")
+
+        stage = Stage(name, fn, after=after, enabled=enabled, checkpoint=checkpoint, required=required)
+        self.stages[name] = stage
+        return stage
+
+    def levels(self) -> list[list[str]]:
+        for stage in self.stages.values():
+            for dep in stage.after:
+                if dep not in self.stages:
+                    raise ValueError(f"stage {stage.name} depends on unknown stage {dep}")
+
+        placed: set[str] = set()
+        levels: list[list[str]] = []
+
+        while len(placed) < len(self.stages):
+            level = [
+                name
+                for name, stage in self.stages.items()
+                if name not in placed and all(dep in placed for dep in stage.after)
+            ]
+
+            if not level:
+                raise ValueError("pipeline stages contain a dependency cycle: " + ", ".join(sorted(set(self.stages) - placed)))
+
+            levels.append(level)
+            placed.update(level)
+
+        return levels
+
+    def resolve_disabled(self, stage: Stage, inputs: dict[str, Any]) -> None:
+        timing = {"status": "disabled", "seconds": 0.0}
+
+        if stage.checkpoint and stage.checkpoint.exists():
+            value = read_json(stage.checkpoint)
+
+            if value is not None:
+                self.results[stage.name] = value
+                timing.update({"status": "checkpoint", "checkpoint": str(stage.checkpoint)})
+
+        if stage.name not in self.results and stage.after and stage.after[0] in inputs:
+            self.results[stage.name] = inputs[stage.after[0]]
+
+        self.timings[stage.name] = timing
+
+    def call(self, stage: Stage, inputs: dict[str, Any]) -> tuple[Any, dict[str, Any]]:
+        return timed_call(self.name, stage, inputs, self.log, self.profiler)
+
+    def checkpoint(self, name: str, value: Any) -> None:
+        if self.checkpoint_dir is None or value is None:
+            return
+
+        try:
+            self.timings[name]["checkpoint_bytes"] = write_json(self.checkpoint_dir / f"{name}.json", value, self.compact)
+        except (OSError, TypeError, ValueError) as err:
+            self.log(f"[{self.name}] checkpoint for {name} failed: {err}")
+
+    def schedule(self, pool: ThreadPoolExecutor, pending: dict[str, Stage], running: dict[Future, str]) -> bool:
+        progressed = False
+
+        for name in list(pending):
+            stage = pending[name]
+            states = [self.timings.get(dep, {}).get("status") for dep in stage.after]
+
+            if any(state in FAILED_STATES for state in states):
+                pending.pop(name)
+                self.timings[name] = {"status": "skipped", "seconds": 0.0, "reason": "upstream stage failed"}
+                progressed = True
+                continue
+
+            if not all(state in DONE_STATES for state in states):
+                continue
+
+            pending.pop(name)
+            inputs = {dep: self.results[dep] for dep in stage.after if dep in self.results}
+            progressed = True
+
+            if not stage.enabled:
+                self.resolve_disabled(stage, inputs)
+                continue
+
+            self.timings[name] = {"status": "running", "started_at": utc_iso()}
+            self.log(f"[{self.name}] stage {name} started")
+            running[pool.submit(self.call, stage, inputs)] = name
+
+        return progressed
+
+    def run(self) -> dict[str, Any]:
+        levels = self.levels()
+        started = utc_iso()
+        wall = time.perf_counter()
+        pending = dict(self.stages)
+        running: dict[Future, str] = {}
+
+        self.results.clear()
+        self.timings.clear()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"{self.name}-stage") as pool:
+            while pending or running:
+                while self.schedule(pool, pending, running):
+                    pass
+
+                if not running:
+                    break
+
+                done, _waiting = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    name = running.pop(future)
+                    value, timing = future.result()
+                    self.timings[name] = timing
+
+                    if timing["status"] == "ok":
+                        self.results[name] = value
+                        self.checkpoint(name, value)
+
+                    self.log(f"[{self.name}] stage {name} {timing['status']} in {timing['seconds']:.3f}s")
+
+        failed = [name for name, timing in self.timings.items() if timing["status"] == "failed"]
+
+        return {
+            "schema": SCHEMA,
+            "name": self.name,
+            "started_at": started,
+            "finished_at": utc_iso(),
+            "seconds": round(time.perf_counter() - wall, 3),
+            "workers": self.workers,
+            "levels": levels,
+            "ok": not any(self.stages[name].required for name in failed),
+            "failed": failed,
+            "stages": {name: self.timings.get(name, {"status": "pending"}) for name in self.stages},
+        }
+
+
+class SharedLock:
+    def __init__(self) -> None:
+        self.condition = threading.Condition()
+        self.readers = 0
+        self.writer = False
+        self.waiting = 0
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        with self.condition:
+            while self.writer or self.waiting:
+                self.condition.wait()
+
+            self.readers += 1
+
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.readers -= 1
+
+                if not self.readers:
+                    self.condition.notify_all()
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        with self.condition:
+            self.waiting += 1
+
+            while self.writer or self.readers:
+                self.condition.wait()
+
+            self.waiting -= 1
+            self.writer = True
+
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.writer = False
+                self.condition.notify_all()
+
+
+class StreamPipeline:
+    def __init__(
+        self,
+        name: str = "stream",
+        *,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        log: Callable[[str], None] | None = None,
+    ) -> None:
+        self.name = name
+        self.queue_size = max(1, int(queue_size))
+        self.log = log or (lambda message: print(message, flush=True))
+        self.stages: list[Stage] = []
+        self.inboxes: dict[str, queue.Queue] = {}
+        self.branches: dict[str, list[queue.Queue]] = {}
+        self.stats: dict[str, dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.gate = SharedLock()
+        self.produced = 0
+        self.completed = 0
+        self.latency: dict[str, float] = {"last": 0.0, "max": 0.0}
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[[dict[str, Any]], Any],
+        *,
+        enabled: bool = True,
+        after: str | None = None,
+    ) -> Stage:
+        if any(stage.name == name for stage in self.stages):
+            raise ValueError(f"duplicate stream stage: {name}")
+
+        stage = Stage(name, fn, after=[after] if after else [], enabled=enabled)
+        self.stages.append(stage)
+        return stage
+
+    def record(self, name: str, timing: Mapping[str, Any]) -> None:
+        with self.lock:
+            stats = self.stats.setdefault(name, {"batches": 0, "failed": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            stats["batches"] += 1
+            stats["failed"] += int(timing.get("status") == "failed")
+            stats["last_seconds"] = timing.get("seconds", 0.0)
+            stats["total_seconds"] = round(stats["total_seconds"] + float(timing.get("seconds") or 0.0), 3)
+            stats["max_seconds"] = max(stats["max_seconds"], float(timing.get("seconds") or 0.0))
+            stats["last_finished_at"] = timing.get("finished_at")
+
+            if timing.get("error"):
+                stats["last_error"] = timing["error"]
+
+    def report(self) -> dict[str, Any]:
+        with self.lock:
+            stages = {name: dict(stats) for name, stats in self.stats.items()}
+
+        for name, inbox in self.inboxes.items():
+            stages.setdefault(name, {"batches": 0, "failed": 0})["queue_depth"] = inbox.qsize()
+
+        return {
+            "schema": STREAM_SCHEMA,
+            "name": self.name,
+            "queue_size": self.queue_size,
+            "produced": self.produced,
+            "completed": self.completed,
+            "in_flight": self.produced - self.completed,
+            "last_latency_seconds": self.latency["last"],
+            "max_latency_seconds": self.latency["max"],
+            "stages": stages,
+        }
+
+    def finish(self, batch: dict[str, Any], on_batch: Callable[[dict[str, Any], dict[str, Any]], None] | None) -> None:
+        latency = round(time.perf_counter() - batch["created"], 3)
+
+        with self.lock:
+            self.completed += 1
+            self.latency["last"] = latency
+            self.latency["max"] = max(self.latency["max"], latency)
+
+        batch["latency_seconds"] = latency
+        self.log(f"[{self.name}] batch {batch['batch']} {'failed at ' + batch['failed'] if batch.get('failed') else 'complete'} in {latency:.3f}s")
+
+        if on_batch is None:
+            return
+
+        try:
+            with self.gate.exclusive():
+                on_batch(batch, self.report())
+        except Exception as err:
+            self.log(f"[{self.name}] batch callback failed: {err}")
+
+    def worker(
+        self,
+        stage: Stage,
+        inbox: queue.Queue,
+        outbox: queue.Queue | None,
+        on_batch: Callable[[dict[str, Any], dict[str, Any]], None] | None,
+    ) -> None:
+        while True:
+            batch = inbox.get()
+
+            if batch is END_OF_STREAM:
+                self.branch(stage.name, END_OF_STREAM)
+
+                if outbox is not None:
+                    outbox.put(END_OF_STREAM)
+                return
+
+            if not batch.get("failed"):
+                with self.gate.shared():
+                    value, timing = timed_call(self.name, stage, batch, self.log, batch.get("profiler"))
+
+                self.record(stage.name, timing)
+
+                if timing["status"] == "ok":
+                    batch[stage.name] = value
+                    self.branch(stage.name, batch)
+                else:
+                    batch["failed"] = stage.name
+
+            if outbox is not None:
+                outbox.put(batch)
+            else:
+                self.finish(batch, on_batch)
+
+    def branch(self, name: str, batch: Any) -> None:
+        for inbox in self.branches.get(name, []):
+            inbox.put(batch)
+
+    def side_worker(self, stage: Stage, inbox: queue.Queue) -> None:
+        while True:
+            batch = inbox.get()
+
+            if batch is END_OF_STREAM:
+                self.branch(stage.name, END_OF_STREAM)
+                return
+
+            with self.gate.shared():
+                value, timing = timed_call(self.name, stage, batch, self.log, batch.get("profiler"))
+
+            self.record(stage.name, timing)
+
+            if timing["status"] == "ok":
+                batch[stage.name] = value
+                self.branch(stage.name, batch)
+
+    def run(
+        self,
+        source: Stage | Callable[[], Any],
+        stop: threading.Event,
+        *,
+        interval: float = 0.0,
+        on_batch: Callable[[dict[str, Any], dict[str, Any]], None] | None = None,
+    ) -> dict[str, Any]:
+        if not isinstance(source, Stage):
+            produce = source
+            source = Stage("source", lambda _batch: produce())
+
+        stages = [stage for stage in self.stages if stage.enabled and not stage.after]
+        sides = [stage for stage in self.stages if stage.enabled and stage.after]
+        known = {source.name, *(stage.name for stage in stages), *(stage.name for stage in sides)}
+
+        for stage in sides:
+            if stage.after[0] not in known:
+                raise ValueError(f"stream stage {stage.name} follows unknown stage: {stage.after[0]}")
+
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in stages]
+        self.inboxes = {stage.name: inbox for stage, inbox in zip(stages, queues)}
+        self.branches = {}
+        threads = [
+            threading.Thread(
+                target=self.worker,
+                args=(stage, queues[index], queues[index + 1] if index + 1 < len(stages) else None, on_batch),
+                name=f"{self.name}-{stage.name}",
+                daemon=True,
+            )
+            for index, stage in enumerate(stages)
+        ]
+
+        for stage in sides:
+            inbox = self.inboxes[stage.name] = queue.Queue(maxsize=self.queue_size)
+            self.branches.setdefault(stage.after[0], []).append(inbox)
+            threads.append(
+                threading.Thread(
+                    target=self.side_worker,
+                    args=(stage, inbox),
+                    name=f"{self.name}-{stage.name}",
+                    daemon=True,
+                )
+            )
+
+        for thread in threads:
+            thread.start()
+
+        next_start = 0.0
+
+        try:
+            while not stop.is_set():
+                delay = next_start - time.monotonic()
+
+                if delay > 0 and stop.wait(delay):
+                    break
+
+                next_start = time.monotonic() + max(0.0, float(interval))
+                batch: dict[str, Any] = {"batch": self.produced + 1, "created": time.perf_counter()}
+
+                with self.gate.shared():
+                    value, timing = timed_call(self.name, source, batch, self.log)
+
+                self.record(source.name, timing)
+                self.produced += 1
+
+                if timing["status"] == "ok":
+                    batch[source.name] = value
+                    self.branch(source.name, batch)
+                else:
+                    batch["failed"] = source.name
+
+                if queues:
+                    queues[0].put(batch)
+                else:
+                    self.finish(batch, on_batch)
+        finally:
+            self.branch(source.name, END_OF_STREAM)
+
+            if queues:
+                queues[0].put(END_OF_STREAM)
+
+            for thread in threads:
+                thread.join()
+
+        return self.report()
+
+
+def stage_summary(report: Mapping[str, Any]) -> str:
+    stages = report.get("stages", {}) if isinstance(report, Mapping) else {}
+
+    return " ".join(
+        f"{name}={timing.get('status')}:{float(timing.get('seconds') or 0.0):.1f}s"
+        for name, timing in stages.items()
+    )
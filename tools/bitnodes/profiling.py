@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import contextlib
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Mapping
+
+
+try:
+    import resource
+except Exception:
+    resource = None  # type: ignore
+
+
+SCHEMA = "zzx-bitnodes-profile-v1"
+METRIC_PREFIX = "zzx_bitnodes"
+
+THREAD_IO = Path("/proc/thread-self/io")
+PROCESS_IO = Path("/proc/self/io")
+
+COUNTERS = ("calls", "seconds", "cpu_seconds", "nodes_in", "nodes_out", "bytes_read", "bytes_written")
+PEAKS = ("peak_rss_bytes",)
+
+METRICS = {
+    "calls": "Number of times the stage ran during the cycle.",
+    "seconds": "Wall-clock seconds spent in the stage during the cycle.",
+    "cpu_seconds": "CPU seconds spent in the stage during the cycle.",
+    "nodes_in": "Node records passed into the stage during the cycle.",
+    "nodes_out": "Node records produced by the stage during the cycle.",
+    "bytes_read": "Bytes read by the stage during the cycle.",
+    "bytes_written": "Bytes written by the stage during the cycle.",
+    "peak_rss_bytes": "Peak resident set size of the process when the stage finished.",
+}
+
+
+def utc_iso() -> str:
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+
+def peak_rss_bytes() -> int:
+    if resource is None:
+        return 0
+
+    try:
+        peak = int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    except Exception:
+        return 0
+
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def io_bytes(scope: str = "thread") -> tuple[int, int]:
+    path = THREAD_IO if scope == "thread" and THREAD_IO.exists() else PROCESS_IO
+    read = 0
+    written = 0
+
+    try:
+        with path.open("r", encoding="ascii") as handle:
+            for line in handle:
+                key, _sep, value = line.partition(":")
+
+                if key == "rchar":
+                    read = int(value)
+                elif key == "wchar":
+                    written = int(value)
+    except (OSError, ValueError):
+        return 0, 0
+
+    return read, written
+
+
+def sample(scope: str = "thread") -> dict[str, float]:
+    read, written = io_bytes(scope)
+
+    return {
+        "wall": time.perf_counter(),
+        "cpu": time.thread_time() if scope == "thread" else time.process_time(),
+        "read": read,
+        "written": written,
+    }
+
+
+def measure(start: Mapping[str, float], scope: str = "thread") -> dict[str, Any]:
+    end = sample(scope)
+
+    return {
+        "seconds": end["wall"] - start["wall"],
+        "cpu_seconds": end["cpu"] - start["cpu"],
+        "bytes_read": max(0, int(end["read"] - start["read"])),
+        "bytes_written": max(0, int(end["written"] - start["written"])),
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def stage_key(group: str, name: str) -> str:
+    return f"{group}/{name}"
+
+
+class Profiler:
+    def __init__(self, name: str = "cycle") -> None:
+        self.name = name
+        self.lock = threading.Lock()
+        self.stages: dict[str, dict[str, Any]] = {}
+        self.started_at = utc_iso()
+        self.start = sample("process")
+
+    def record(self, group: str, name: str, metrics: Mapping[str, Any]) -> dict[str, Any]:
+        with self.lock:
+            entry = self.stages.get(stage_key(group, name))
+
+            if entry is None:
+                entry = self.stages[stage_key(group, name)] = {"group": group, "stage": name}
+                entry.update({key: 0 for key in COUNTERS + PEAKS})
+
+            entry["calls"] += int(metrics.get("calls") or 1)
+
+            for key in COUNTERS[1:]:
+                entry[key] += metrics.get(key) or 0
+
+            for key in PEAKS:
+                entry[key] = max(entry[key], int(metrics.get(key) or 0))
+
+            return entry
+
+    @contextlib.contextmanager
+    def stage(
+        self,
+        group: str,
+        name: str,
+        *,
+        nodes_in: int | None = None,
+        scope: str = "thread",
+    ) -> Iterator[dict[str, Any]]:
+        span: dict[str, Any] = {"nodes_in": nodes_in, "nodes_out": None}
+        start = sample(scope)
+
+        try:
+            yield span
+        finally:
+            self.record(group, name, {**span, **measure(start, scope)})
+
+    def entries(self) -> list[dict[str, Any]]:
+        with self.lock:
+            return [dict(entry) for entry in self.stages.values()]
+
+    def merge(self, entries: Iterable[Mapping[str, Any]]) -> None:
+        for entry in entries:
+            self.record(str(entry["group"]), str(entry["stage"]), entry)
+
+    def report(self) -> dict[str, Any]:
+        totals = measure(self.start, "process")
+        stages = sorted(self.entries(), key=lambda entry: (-entry["seconds"], entry["group"], entry["stage"]))
+
+        for entry in stages:
+            entry["seconds"] = round(entry["seconds"], 6)
+            entry["cpu_seconds"] = round(entry["cpu_seconds"], 6)
+
+        return {
+            "schema": SCHEMA,
+            "name": self.name,
+            "started_at": self.started_at,
+            "generated_at": utc_iso(),
+            "pid": os.getpid(),
+            "seconds": round(totals["seconds"], 6),
+            "cpu_seconds": round(totals["cpu_seconds"], 6),
+            "bytes_read": totals["bytes_read"],
+            "bytes_written": totals["bytes_written"],
+            "peak_rss_bytes": totals["peak_rss_bytes"],
+            "stage_count": len(stages),
+            "stages": stages,
+        }
+
+
+def label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def prometheus_text(report: Mapping[str, Any]) -> str:
+    lines: list[str] = []
+    name = label_value(report.get("name", "cycle"))
+
+    for key, help_text in (
+        ("seconds", "Wall-clock seconds of the last profiled cycle."),
+        ("cpu_seconds", "Process CPU seconds of the last profiled cycle."),
+        ("bytes_read", "Bytes read by the process during the last profiled cycle."),
+        ("bytes_written", "Bytes written by the process during the last profiled cycle."),
+        ("peak_rss_bytes", "Peak resident set size of the process."),
+    ):
+        metric = f"{METRIC_PREFIX}_cycle_{key}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f'{metric}{{cycle="{name}"}} {report.get(key) or 0}')
+
+    stages = report.get("stages") or []
+
+    for key, help_text in METRICS.items():
+        metric = f"{METRIC_PREFIX}_stage_{key}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} gauge")
+
+        for entry in stages:
+            labels = f'cycle="{name}",group="{label_value(entry["group"])}",stage="{label_value(entry["stage"])}"'
+            lines.append(f"{metric}{{{labels}}} {entry.get(key) or 0}")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: Path, report: Mapping[str, Any]) -> int:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f".{path.name}.tmp")
+    temp.write_text(prometheus_text(report), encoding="utf-8")
+    temp.replace(path)
+    return path.stat().st_size
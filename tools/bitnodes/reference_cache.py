@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Hashable
+
+
+DEFAULT_CACHE_SIZE = 512
+DEFAULT_RECHECK_SECONDS = 300
+
+CACHE_STATS = {"hits": 0, "misses": 0, "negative_hits": 0, "reloads": 0, "evictions": 0}
+
+
+def file_signature(path: str) -> tuple[int, int] | None:
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return None
+
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ReferenceCache:
+    def __init__(self, limit: int = DEFAULT_CACHE_SIZE, recheck_seconds: float = DEFAULT_RECHECK_SECONDS) -> None:
+        self.limit = max(1, int(limit))
+        self.recheck_seconds = float(recheck_seconds)
+        self._entries: OrderedDict[Hashable, dict[str, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stale(self, entry: dict[str, Any], now: float) -> bool:
+        if now - entry["checked_at"] < self.recheck_seconds:
+            return False
+
+        key = entry.get("key")
+
+        if key is None or file_signature(key[0]) != tuple(key[1:]):
+            return True
+
+        entry["checked_at"] = now
+        return False
+
+    def fetch(self, key: Hashable, build: Callable[[], dict[str, Any]]) -> dict[str, Any]:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+
+        if entry is not None and not self.stale(entry, now):
+            self._entries.move_to_end(key)
+            CACHE_STATS["hits"] += 1
+
+            if entry.get("key") is None:
+                CACHE_STATS["negative_hits"] += 1
+
+            return entry
+
+        CACHE_STATS["reloads" if entry is not None else "misses"] += 1
+        entry = build()
+        entry["checked_at"] = now
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.limit:
+            self._entries.popitem(last=False)
+            CACHE_STATS["evictions"] += 1
+
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+REFERENCE_CACHE = ReferenceCache()
+
+
+def fetch(family: str, country: str, admin1: str, directory: Path, build: Callable[[], dict[str, Any]]) -> dict[str, Any]:
+    return REFERENCE_CACHE.fetch((family, country, admin1, str(directory)), build)
+
+
+def cache_info() -> dict[str, Any]:
+    return {"entries": len(REFERENCE_CACHE), "limit": REFERENCE_CACHE.limit, **CACHE_STATS}
+
+
+def clear_cache() -> None:
+    REFERENCE_CACHE.clear()
+
+    for key in CACHE_STATS:
+        CACHE_STATS[key] = 0
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import heapq
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Mapping
+
+
+NETWORK_WEIGHTS = {
+    "ipv4": 1.0,
+    "ipv6": 0.85,
+    "tor": 0.6,
+    "i2p": 0.45,
+    "cjdns": 0.4,
+}
+DEFAULT_NETWORK_WEIGHT = 0.3
+
+DEFAULT_BACKOFF_BASE = 900
+DEFAULT_BACKOFF_MAX = 7 * 86400
+DEFAULT_SUCCESS_HALF_LIFE = 3 * 86400
+DEFAULT_DISCOVERY_HALF_LIFE = 6 * 3600
+
+SUCCESS_FLOOR = 0.15
+SUCCESS_SPAN = 0.8
+FRESH_BASE = 0.3
+FRESH_FLOOR = 0.05
+UNKNOWN_PROBABILITY = 0.05
+
+SCHEDULE_HISTORY_LIMIT = 48
+
+SCHEDULER_MODES = ("priority", "sequential")
+DEFAULT_SCHEDULER_MODE = "priority"
+
+
+def to_ts(value: Any) -> int:
+    try:
+        return int(float(value or 0))
+    except Exception:
+        return 0
+
+
+def backoff_seconds(failures: int, *, base: int = DEFAULT_BACKOFF_BASE, cap: int = DEFAULT_BACKOFF_MAX) -> int:
+    if failures <= 0:
+        return 0
+    return int(min(cap, base * (2 ** min(failures - 1, 32))))
+
+
+def consecutive_failures(record: Any) -> int:
+    if record is None:
+        return 0
+
+    value = record.get("consecutive_failures")
+
+    if value is not None:
+        return max(0, to_ts(value))
+
+    last_failure = to_ts(record.get("last_failure"))
+    last_success = to_ts(record.get("last_success"))
+    return 1 if last_failure and last_failure > last_success else 0
+
+
+def decay(age: float, half_life: float) -> float:
+    if half_life <= 0:
+        return 0.0
+    return 0.5 ** (max(0.0, age) / half_life)
+
+
+@dataclass(order=True)
+class ScheduledCandidate:
+    sort_key: tuple[Any, ...] = field(repr=False)
+    address: str = field(compare=False)
+    probability: float = field(compare=False)
+    network: str = field(compare=False)
+    source: str = field(compare=False)
+    failures: int = field(compare=False, default=0)
+    next_attempt: int = field(compare=False, default=0)
+
+    @property
+    def ready(self) -> bool:
+        return self.sort_key[0] == 0
+
+
+class CrawlScheduler:
+    def __init__(
+        self,
+        *,
+        now: int | None = None,
+        backoff_base: int = DEFAULT_BACKOFF_BASE,
+        backoff_max: int = DEFAULT_BACKOFF_MAX,
+        success_half_life: int = DEFAULT_SUCCESS_HALF_LIFE,
+        discovery_half_life: int = DEFAULT_DISCOVERY_HALF_LIFE,
+        network_weights: Mapping[str, float] | None = None,
+    ) -> None:
+        self.now = int(now or time.time())
+        self.backoff_base = int(backoff_base)
+        self.backoff_max = int(backoff_max)
+        self.success_half_life = int(success_half_life)
+        self.discovery_half_life = int(discovery_half_life)
+        self.network_weights = dict(network_weights or NETWORK_WEIGHTS)
+        self._heap: list[ScheduledCandidate] = []
+        self._seen: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, address: object) -> bool:
+        return address in self._seen
+
+    def probability(self, record: Any, *, network: str, failures: int, discovered_at: int | None) -> float:
+        last_success = to_ts(record.get("last_success")) if record is not None else 0
+
+        if last_success:
+            base = SUCCESS_FLOOR + SUCCESS_SPAN * decay(self.now - last_success, self.success_half_life)
+        elif discovered_at:
+            base = FRESH_FLOOR + FRESH_BASE * decay(self.now - discovered_at, self.discovery_half_life)
+        else:
+            base = UNKNOWN_PROBABILITY
+
+        base *= 0.5 ** min(failures, 32)
+        return round(base * self.network_weights.get(network, DEFAULT_NETWORK_WEIGHT), 6)
+
+    def push(
+        self,
+        address: str,
+        record: Any = None,
+        *,
+        network: str,
+        discovered_at: int | None = None,
+        source: str = "known",
+    ) -> ScheduledCandidate | None:
+        if address in self._seen:
+            return None
+
+        failures = consecutive_failures(record)
+        last_failure = to_ts(record.get("last_failure")) if record is not None else 0
+        next_attempt = last_failure + backoff_seconds(failures, base=self.backoff_base, cap=self.backoff_max) if failures else 0
+        probability = self.probability(record, network=network, failures=failures, discovered_at=discovered_at)
+
+        if next_attempt > self.now:
+            sort_key: tuple[Any, ...] = (1, next_attempt, -probability, address)
+        else:
+            sort_key = (0, -probability, 0, address)
+
+        candidate = ScheduledCandidate(
+            sort_key=sort_key,
+            address=address,
+            probability=probability,
+            network=network,
+            source=source,
+            failures=failures,
+            next_attempt=next_attempt,
+        )
+
+        heapq.heappush(self._heap, candidate)
+        self._seen.add(address)
+        return candidate
+
+    def pop(self) -> ScheduledCandidate:
+        candidate = heapq.heappop(self._heap)
+        self._seen.discard(candidate.address)
+        return candidate
+
+    def take(self, limit: int = 0, *, include_deferred: bool = True) -> list[ScheduledCandidate]:
+        output: list[ScheduledCandidate] = []
+
+        while self._heap and (limit <= 0 or len(output) < limit):
+            if not include_deferred and not self._heap[0].ready:
+                break
+
+            output.append(self.pop())
+
+        return output
+
+
+def schedule_outcome(
+    scheduled: Mapping[str, float],
+    attempted: Iterable[str],
+    successes: Iterable[str],
+    *,
+    deferred: int = 0,
+) -> dict[str, Any]:
+    attempted = [address for address in attempted if address in scheduled]
+    hits = len(set(attempted) & set(successes))
+    expected = sum(scheduled[address] for address in attempted)
+    count = len(attempted)
+    predicted = expected / count if count else 0.0
+    actual = hits / count if count else 0.0
+
+    return {
+        "scheduled": len(scheduled),
+        "attempted": count,
+        "deferred": deferred,
+        "expected_hits": round(expected, 3),
+        "hits": hits,
+        "predicted_hit_rate": round(predicted, 4),
+        "actual_hit_rate": round(actual, 4),
+        "calibration_error": round(actual - predicted, 4),
+    }
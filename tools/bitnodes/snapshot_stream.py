@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import gzip
+import io
+import json
+from pathlib import Path
+from typing import Any, Iterator, TextIO
+
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+GZIP_MAGIC = b"\x1f\x8b"
+WHITESPACE = " \t\r\n"
+
+NODE_KEYS = ("nodes", "rows", "results", "data", "node_records", "reachable", "unreachable", "peers", "reachable_nodes")
+ADDRESS_KEYS = ("address", "node", "addr", "host")
+
+
+def open_snapshot(path: Path) -> TextIO:
+    path = Path(path)
+
+    with path.open("rb") as handle:
+        magic = handle.read(2)
+
+    if magic == GZIP_MAGIC:
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8")
+
+    return path.open("r", encoding="utf-8")
+
+
+class JsonStream:
+    def __init__(self, handle: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self.handle = handle
+        self.chunk_size = max(1024, int(chunk_size))
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size: int | None = None) -> bool:
+        if self.eof:
+            return False
+
+        if self.pos > self.chunk_size:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+
+        data = self.handle.read(max(self.chunk_size, size or 0))
+
+        if not data:
+            self.eof = True
+            return False
+
+        self.buf += data
+        return True
+
+    def skip_ws(self) -> None:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+
+            if self.pos < len(self.buf) or not self.fill():
+                return
+
+    def peek(self) -> str:
+        self.skip_ws()
+        return self.buf[self.pos] if self.pos < len(self.buf) else ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} at offset {self.pos}")
+
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.skip_ws()
+
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill(len(self.buf) - self.pos):
+                    continue
+
+                raise
+
+            if end >= len(self.buf) and not self.eof and self.fill():
+                continue
+
+            self.pos = end
+            return value
+
+    def next_member(self, closing: str) -> bool:
+        char = self.peek()
+
+        if char == ",":
+            self.pos += 1
+            return True
+
+        if char == closing:
+            self.pos += 1
+            return False
+
+        raise ValueError(f"expected ',' or {closing!r} at offset {self.pos}")
+
+    def iter_object(self) -> Iterator[tuple[str, Any]]:
+        self.expect("{")
+
+        if self.peek() == "}":
+            self.pos += 1
+            return
+
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield str(key), self.value()
+
+            if not self.next_member("}"):
+                return
+
+    def iter_array(self) -> Iterator[Any]:
+        self.expect("[")
+
+        if self.peek() == "]":
+            self.pos += 1
+            return
+
+        while True:
+            yield self.value()
+
+            if not self.next_member("]"):
+                return
+
+
+def item_address(item: Any) -> str:
+    if not isinstance(item, dict):
+        return ""
+
+    for key in ADDRESS_KEYS:
+        if item.get(key):
+            return str(item[key])
+
+    return ""
+
+
+class SnapshotReader:
+    def __init__(self, path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self.header: dict[str, Any] | None = None
+        self.node_key = ""
+        self.container = ""
+        self.count = 0
+
+    def __iter__(self) -> Iterator[tuple[str, Any]]:
+        self.header = None
+        self.node_key = ""
+        self.container = ""
+        self.count = 0
+
+        with open_snapshot(self.path) as handle:
+            stream = JsonStream(handle, self.chunk_size)
+            char = stream.peek()
+
+            if char == "[":
+                self.container = "array"
+
+                for item in stream.iter_array():
+                    self.count += 1
+                    yield item_address(item), item
+
+                return
+
+            if char != "{":
+                raise ValueError(f"{self.path} is not a JSON object or array")
+
+            self.header = {}
+            stream.expect("{")
+
+            if stream.peek() == "}":
+                return
+
+            while True:
+                key = str(stream.value())
+                stream.expect(":")
+                char = stream.peek()
+
+                if not self.node_key and key == "nodes" and char == "{":
+                    self.node_key = key
+                    self.container = "object"
+
+                    for address, value in stream.iter_object():
+                        self.count += 1
+                        yield address, value
+                elif not self.node_key and key in NODE_KEYS and char == "[":
+                    self.node_key = key
+                    self.container = "array"
+
+                    for item in stream.iter_array():
+                        self.count += 1
+                        yield item_address(item), item
+                else:
+                    self.header[key] = stream.value()
+
+                if not stream.next_member("}"):
+                    return
+
+
+def iter_snapshot_nodes(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple[str, Any]]:
+    yield from SnapshotReader(path, chunk_size)
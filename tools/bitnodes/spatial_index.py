@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import math
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Mapping, Sequence
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+DEFAULT_CACHE_SIZE = 256
+
+INDEX_CACHE: OrderedDict[Hashable, SpatialIndex] = OrderedDict()
+CACHE_STATS = {"hits": 0, "misses": 0, "builds": 0, "evictions": 0}
+
+PointGetter = Callable[[Mapping[str, Any]], "tuple[float | None, float | None]"]
+
+
+def unit_vector(lat: float, lon: float) -> tuple[float, float, float]:
+    phi = math.radians(lat)
+    lam = math.radians(lon)
+    cos_phi = math.cos(phi)
+    return cos_phi * math.cos(lam), cos_phi * math.sin(lam), math.sin(phi)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    delta_phi = math.radians(lat2 - lat1)
+    delta_lambda = math.radians(lon2 - lon1)
+
+    a = (
+        math.sin(delta_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) ** 2
+    )
+
+    return EARTH_RADIUS_KM * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def build_tree(entries: list[tuple[Any, ...]]) -> tuple[Any, ...] | None:
+    if not entries:
+        return None
+
+    spans = [
+        max(entry[0][axis] for entry in entries) - min(entry[0][axis] for entry in entries)
+        for axis in range(3)
+    ]
+    axis = spans.index(max(spans))
+    entries.sort(key=lambda entry: (entry[0][axis], entry[1]))
+    middle = len(entries) // 2
+
+    return (
+        entries[middle],
+        axis,
+        build_tree(entries[:middle]),
+        build_tree(entries[middle + 1:]),
+    )
+
+
+class SpatialIndex:
+    __slots__ = ("rows", "size", "tree")
+
+    def __init__(self, rows: Sequence[Mapping[str, Any]], point: PointGetter) -> None:
+        entries: list[tuple[Any, ...]] = []
+
+        for position, row in enumerate(rows):
+            lat, lon = point(row)
+
+            if lat is None or lon is None:
+                continue
+
+            entries.append((unit_vector(lat, lon), position, lat, lon))
+
+        self.rows = rows
+        self.size = len(entries)
+        self.tree = build_tree(entries)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def nearest(self, lat: float, lon: float) -> tuple[Mapping[str, Any] | None, float | None]:
+        if self.tree is None:
+            return None, None
+
+        target = unit_vector(lat, lon)
+        best: list[Any] = [math.inf, -1, None]
+        stack: list[tuple[tuple[Any, ...], float]] = [(self.tree, 0.0)]
+
+        while stack:
+            node, bound = stack.pop()
+
+            if bound > best[0]:
+                continue
+
+            entry, axis, left, right = node
+            point = entry[0]
+            dx = point[0] - target[0]
+            dy = point[1] - target[1]
+            dz = point[2] - target[2]
+            distance = dx * dx + dy * dy + dz * dz
+
+            if distance < best[0] or (distance == best[0] and entry[1] < best[1]):
+                best[0] = distance
+                best[1] = entry[1]
+                best[2] = entry
+
+            delta = target[axis] - point[axis]
+            near, far = (left, right) if delta < 0 else (right, left)
+
+            if far is not None:
+                stack.append((far, delta * delta))
+
+            if near is not None:
+                stack.append((near, 0.0))
+
+        entry = best[2]
+
+        if entry is None:
+            return None, None
+
+        return self.rows[entry[1]], haversine_km(lat, lon, entry[2], entry[3])
+
+
+def cached_index(key: Hashable, rows: Sequence[Mapping[str, Any]], point: PointGetter, *, limit: int = DEFAULT_CACHE_SIZE) -> SpatialIndex:
+    index = INDEX_CACHE.get(key)
+
+    if index is not None:
+        INDEX_CACHE.move_to_end(key)
+        CACHE_STATS["hits"] += 1
+        return index
+
+    CACHE_STATS["misses"] += 1
+    CACHE_STATS["builds"] += 1
+    index = SpatialIndex(rows, point)
+    INDEX_CACHE[key] = index
+
+    while len(INDEX_CACHE) > max(1, limit):
+        INDEX_CACHE.popitem(last=False)
+        CACHE_STATS["evictions"] += 1
+
+    return index
+
+
+def cache_info() -> dict[str, Any]:
+    return {"entries": len(INDEX_CACHE), **CACHE_STATS}
+
+
+def clear_cache() -> None:
+    INDEX_CACHE.clear()
+
+    for key in CACHE_STATS:
+        CACHE_STATS[key] = 0
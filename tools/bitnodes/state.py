@@ -2,15 +2,22 @@
 from __future__ import annotations
 
 import gzip
+import hashlib
 import ipaddress
 import json
 import math
+import os
 import re
+import sqlite3
+import sys
 import time
 from collections import deque
+from collections.abc import MutableMapping
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Iterable, Mapping
+from typing import Any, Iterable, Iterator, Mapping
+
+from scheduler import SCHEDULE_HISTORY_LIMIT, CrawlScheduler, schedule_outcome
 
 
 DEFAULT_PORT = 8333
@@ -18,6 +25,16 @@ DEFAULT_PORT = 8333
 DEFAULT_STATE_DIR = Path("bitcoin/bitnodes/data/state")
 DEFAULT_SNAPSHOT_24H_DIR = Path("bitcoin/bitnodes/data/snapshots/24h")
 
+DEFAULT_JOURNAL_COMPACT_MIN = 50_000
+DEFAULT_JOURNAL_COMPACT_RATIO = 0.5
+
+CHANGE_FIELDS = ("reachable", "height", "agent", "services", "port")
+
+STATE_BACKENDS = ("json", "sqlite")
+DEFAULT_STATE_BACKEND = "json"
+SQLITE_WRITE_BATCH = 5000
+SQLITE_CHECKPOINT_BYTES = 64 * 1024 * 1024
+
 NODE_FIELD_NAMES = [
     "protocol_version",
     "user_agent",
@@ -205,11 +222,33 @@ def write_json(path: Path, payload: Any, pretty: bool = True) -> None:
             indent=2 if pretty else None,
             separators=None if pretty else (",", ":"),
             sort_keys=pretty,
-            default=str,
+            default=json_default,
         )
         handle.write("\n")
 
 
+def replace_json(path: Path, payload: Any, pretty: bool = False) -> None:
+    path = Path(path)
+    mkdir(path.parent)
+    scratch = path.with_name(path.name + ".tmp")
+
+    with scratch.open("w", encoding="utf-8") as handle:
+        json.dump(
+            payload,
+            handle,
+            ensure_ascii=False,
+            indent=2 if pretty else None,
+            separators=None if pretty else (",", ":"),
+            sort_keys=pretty,
+            default=json_default,
+        )
+        handle.write("\n")
+        handle.flush()
+        os.fsync(handle.fileno())
+
+    os.replace(scratch, path)
+
+
 def write_gzip_json(path: Path, payload: Any, pretty: bool = False) -> None:
     path = Path(path)
     mkdir(path.parent)
@@ -222,7 +261,7 @@ def write_gzip_json(path: Path, payload: Any, pretty: bool = False) -> None:
             indent=2 if pretty else None,
             separators=None if pretty else (",", ":"),
             sort_keys=pretty,
-            default=str,
+            default=json_default,
         )
         handle.write("\n")
 
@@ -829,6 +868,857 @@ def validate_nodes(nodes: dict[str, list[Any]]) -> tuple[dict[str, list[Any]], l
     return valid, errors
 
 
+def record_dict_from_row(address: str, row: list[Any], extra: Mapping[str, Any] | None = None) -> dict[str, Any]:
+    normalized = normalize_address(address=address) or address
+    values = normalize_node_array(row)
+    metadata = normalize_metadata(values[19])
+    network = metadata.get("network") or classify_network(normalized)
+    host, port = parse_address_port(normalized)
+
+    metadata["network"] = network
+    metadata["canonical_address"] = normalized
+    metadata["host"] = host
+    metadata["port"] = port
+    values[19] = metadata
+
+    record = {
+        "address": normalized,
+        "canonical_address": normalized,
+        "host": host,
+        "port": port,
+        "network": network,
+        "row": values,
+        "protocol_version": values[0],
+        "protocol": values[0],
+        "user_agent": values[1],
+        "agent": values[1],
+        "connected_since": values[2],
+        "services": values[3],
+        "height": values[4],
+        "hostname": values[5],
+        "city": values[6],
+        "country": values[7],
+        "country_code": values[7],
+        "latitude": values[8],
+        "longitude": values[9],
+        "timezone": values[10],
+        "asn": values[11],
+        "organization": values[12],
+        "provider": values[13],
+        "county": values[14],
+        "zip": values[15],
+        "postal_code": values[15],
+        "w3w": values[16],
+        "geohash": values[17],
+        "geohashid": metadata.get("geohashid") or values[17],
+        "asn_location": values[18],
+        "metadata": metadata,
+        "reachable": metadata.get("reachable"),
+        "reachable_now": metadata.get("reachable_now"),
+        "reachable_24h": metadata.get("reachable_24h"),
+        "reachable_week": metadata.get("reachable_week"),
+        "reachable_month": metadata.get("reachable_month"),
+        "latency_ms": metadata.get("latency_ms"),
+        "uptime_seconds": metadata.get("uptime_seconds") or metadata.get("total_uptime"),
+        "first_seen": metadata.get("first_seen"),
+        "last_seen": metadata.get("last_seen"),
+        "last_success": metadata.get("last_success"),
+        "last_failure": metadata.get("last_failure"),
+        "success_count": int(metadata.get("success_count") or 0),
+        "failure_count": int(metadata.get("failure_count") or 0),
+        "peer_index": metadata.get("peer_index"),
+        "is_tor": network == "tor" or boolish(metadata.get("is_tor") or metadata.get("tor")),
+        "is_i2p": network == "i2p" or boolish(metadata.get("is_i2p") or metadata.get("i2p")),
+        "is_ipv4": network == "ipv4",
+        "is_ipv6": network == "ipv6",
+        "is_cjdns": network == "cjdns",
+        "is_vpn": boolish(metadata.get("is_vpn") or metadata.get("suspected_vpn") or metadata.get("vpn")),
+        "is_proxy": boolish(metadata.get("is_proxy") or metadata.get("suspected_proxy") or metadata.get("proxy")),
+    }
+
+    for key in METADATA_KEYS:
+        if key in metadata and key not in record:
+            record[key] = metadata[key]
+
+    if extra:
+        for key, value in extra.items():
+            if key not in {"row", "metadata"} and value is not None:
+                record[key] = value
+
+    return record
+
+
+NODE_VALUE_FIELDS = tuple(NODE_FIELD_NAMES[:19])
+NODE_VALUE_SET = frozenset(NODE_VALUE_FIELDS)
+NODE_GEO_FIELDS = tuple(NODE_FIELD_NAMES[6:19])
+
+GEOIP_MARKER_KEYS = ("last_geoip_update", "geoip_db_version", "geoip_host")
+
+NODE_STATUS_FIELDS = (
+    "reachable",
+    "reachable_now",
+    "reachable_24h",
+    "first_seen",
+    "last_seen",
+    "last_success",
+    "last_failure",
+    "success_count",
+    "failure_count",
+    "consecutive_failures",
+    "latency_ms",
+)
+NODE_STATUS_SET = frozenset(NODE_STATUS_FIELDS)
+
+NODE_KEY_ALIASES = {
+    "protocol": "protocol_version",
+    "agent": "user_agent",
+    "country": "country_code",
+    "postal_code": "zip",
+}
+
+NODE_INTERNED_FIELDS = frozenset(
+    {
+        "user_agent",
+        "city",
+        "country_code",
+        "timezone",
+        "asn",
+        "organization",
+        "provider",
+        "county",
+        "asn_location",
+    }
+)
+
+NODE_ADDRESS_KEYS = frozenset({"address", "canonical_address", "host", "port"})
+NODE_DERIVED_KEYS = frozenset(
+    {
+        "row",
+        "metadata",
+        "geohashid",
+        "uptime_seconds",
+        "is_tor",
+        "is_i2p",
+        "is_ipv4",
+        "is_ipv6",
+        "is_cjdns",
+        "is_vpn",
+        "is_proxy",
+    }
+)
+
+NODE_FLAG_KEYS = ("is_tor", "is_i2p", "is_ipv4", "is_ipv6", "is_cjdns", "is_vpn", "is_proxy")
+
+METADATA_KEY_SET = frozenset(METADATA_KEYS)
+
+
+def intern_text(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def coerce_node_value(name: str, value: Any) -> Any:
+    if name == "user_agent":
+        return intern_text(value) if value not in ("", None) else "unknown"
+    if name == "connected_since":
+        return to_int(value, now_ts())
+    if name in {"protocol_version", "services", "height"}:
+        return to_int(value)
+    if name == "country_code":
+        return intern_text(normalize_country(value))
+    if name == "latitude":
+        return valid_lat(value)
+    if name == "longitude":
+        return valid_lon(value)
+    if name == "asn":
+        return intern_text(normalize_asn(value))
+    if value in ("", None):
+        return None
+    if name in NODE_INTERNED_FIELDS:
+        return intern_text(value)
+    return value
+
+
+class NodeRecord:
+    __slots__ = ("address", "network", *NODE_VALUE_FIELDS, *NODE_STATUS_FIELDS, "meta", "extra", "owner")
+
+    def __init__(self, address: str, network: str | None = None) -> None:
+        self.address = address
+        self.network = sys.intern(str(network or classify_network(address)))
+
+        for name in NODE_VALUE_FIELDS:
+            setattr(self, name, None)
+
+        for name in NODE_STATUS_FIELDS:
+            setattr(self, name, None)
+
+        self.user_agent = "unknown"
+        self.connected_since = now_ts()
+        self.meta: dict[str, Any] | None = None
+        self.extra: dict[str, Any] | None = None
+        self.owner: MutableMapping[str, Any] | None = None
+
+    @classmethod
+    def from_row(cls, address: str, row: list[Any], extra: Mapping[str, Any] | None = None) -> NodeRecord:
+        padded = list(row) + [None] * max(0, len(NODE_FIELD_NAMES) - len(row))
+        metadata = padded[19] if isinstance(padded[19], Mapping) else {}
+        record = cls(address, metadata.get("network"))
+        record.assign_row(padded)
+
+        if extra:
+            for key, value in extra.items():
+                if value is None or key in NODE_DERIVED_KEYS or key in NODE_ADDRESS_KEYS:
+                    continue
+                record[key] = value
+
+        return record
+
+    def set_metadata(self, key: str, value: Any) -> None:
+        if key in NODE_STATUS_SET:
+            setattr(self, key, value)
+        elif key == "network":
+            if value:
+                self.network = sys.intern(str(value))
+        elif key in NODE_ADDRESS_KEYS or key in {"latitude", "longitude"}:
+            return
+        else:
+            if self.meta is None:
+                self.meta = {}
+            self.meta[sys.intern(key)] = intern_text(value) if key in METADATA_KEY_SET else value
+
+    def observe_row(self, row: list[Any]) -> None:
+        for index, name in enumerate(NODE_VALUE_FIELDS):
+            if index < len(row) and row[index] not in ("", None):
+                setattr(self, name, coerce_node_value(name, row[index]))
+
+        metadata = row[19] if len(row) > 19 and isinstance(row[19], Mapping) else None
+
+        if metadata:
+            for key, value in metadata.items():
+                if value is not None or key in NODE_STATUS_SET:
+                    self.set_metadata(key, value)
+
+    def assign_row(self, row: list[Any]) -> None:
+        metadata = row[19] if len(row) > 19 and isinstance(row[19], Mapping) else {}
+
+        for index, name in enumerate(NODE_VALUE_FIELDS):
+            setattr(self, name, coerce_node_value(name, row[index] if index < len(row) else None))
+
+        for name in NODE_STATUS_FIELDS:
+            setattr(self, name, None)
+
+        self.meta = None
+
+        for key, value in metadata.items():
+            self.set_metadata(key, value)
+
+    def assign_crawl_row(self, row: list[Any]) -> None:
+        geo = [getattr(self, name) for name in NODE_GEO_FIELDS]
+        markers = {key: self.extra[key] for key in GEOIP_MARKER_KEYS if self.extra and key in self.extra}
+
+        self.assign_row(row)
+        self.extra = markers or None
+
+        for name, value in zip(NODE_GEO_FIELDS, geo):
+            if getattr(self, name) is None:
+                setattr(self, name, value)
+
+    def update_from(self, other: NodeRecord) -> None:
+        if other.network:
+            self.network = other.network
+
+        for name in NODE_VALUE_FIELDS + NODE_STATUS_FIELDS:
+            setattr(self, name, getattr(other, name))
+
+        self.meta = dict(other.meta) if other.meta else None
+
+        if other.extra:
+            if self.extra is None:
+                self.extra = {}
+            self.extra.update(other.extra)
+
+    def host_port(self) -> tuple[str | None, int]:
+        return parse_address_port(self.address)
+
+    def values(self) -> list[Any]:
+        return [getattr(self, name) for name in NODE_VALUE_FIELDS]
+
+    def metadata(self) -> dict[str, Any]:
+        metadata = dict(self.meta) if self.meta else {}
+
+        for name in NODE_STATUS_FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                metadata[name] = value
+
+        metadata["success_count"] = int(self.success_count or 0)
+        metadata["failure_count"] = int(self.failure_count or 0)
+
+        for name in NODE_FLAG_KEYS:
+            metadata.setdefault(name, self[name])
+
+        host, port = self.host_port()
+        metadata["network"] = self.network
+        metadata["canonical_address"] = self.address
+        metadata["host"] = host
+        metadata["port"] = port
+
+        return metadata
+
+    def row(self) -> list[Any]:
+        return self.values() + [self.metadata()]
+
+    def to_dict(self) -> dict[str, Any]:
+        return record_dict_from_row(self.address, self.row(), self.extra)
+
+    def to_storage(self) -> dict[str, Any]:
+        payload = dict(self.extra) if self.extra else {}
+        payload["address"] = self.address
+        payload["row"] = self.row()
+        return payload
+
+    def meta_value(self, key: str) -> Any:
+        return self.meta.get(key) if self.meta else None
+
+    def quality(self) -> int:
+        score = sum(1 for name in NODE_VALUE_FIELDS if getattr(self, name) not in ("", None))
+
+        if self.height:
+            score += 10
+        if self.latitude is not None and self.longitude is not None:
+            score += 30
+        if boolish(self.reachable) is True:
+            score += 20
+        if boolish(self.reachable_now) is True:
+            score += 20
+        if boolish(self.reachable_24h) is True:
+            score += 10
+        if self.last_seen or self.last_success:
+            score += 10
+        if self.meta_value("peer_index"):
+            score += 5
+
+        return score + 5
+
+    def __getitem__(self, key: str) -> Any:
+        name = NODE_KEY_ALIASES.get(key, key)
+
+        if name in NODE_VALUE_SET or name in NODE_STATUS_SET:
+            value = getattr(self, name)
+
+            if name in {"success_count", "failure_count"}:
+                return int(value or 0)
+
+            return value
+
+        if name in {"address", "canonical_address"}:
+            return self.address
+        if name == "network":
+            return self.network
+        if name == "host":
+            return self.host_port()[0]
+        if name == "port":
+            return self.host_port()[1]
+        if name == "row":
+            return self.row()
+        if name == "metadata":
+            return self.metadata()
+        if name == "geohashid":
+            return self.meta_value("geohashid") or self.geohash
+        if name == "uptime_seconds":
+            return self.meta_value("uptime_seconds") or self.meta_value("total_uptime")
+        if name == "is_tor":
+            return self.network == "tor" or boolish(self.meta_value("is_tor") or self.meta_value("tor"))
+        if name == "is_i2p":
+            return self.network == "i2p" or boolish(self.meta_value("is_i2p") or self.meta_value("i2p"))
+        if name == "is_ipv4":
+            return self.network == "ipv4"
+        if name == "is_ipv6":
+            return self.network == "ipv6"
+        if name == "is_cjdns":
+            return self.network == "cjdns"
+        if name == "is_vpn":
+            return boolish(self.meta_value("is_vpn") or self.meta_value("suspected_vpn") or self.meta_value("vpn"))
+        if name == "is_proxy":
+            return boolish(self.meta_value("is_proxy") or self.meta_value("suspected_proxy") or self.meta_value("proxy"))
+
+        if self.extra and name in self.extra:
+            return self.extra[name]
+
+        if self.meta and name in METADATA_KEY_SET and name in self.meta:
+            return self.meta[name]
+
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        name = NODE_KEY_ALIASES.get(key, key)
+
+        if name in NODE_VALUE_SET:
+            setattr(self, name, coerce_node_value(name, value))
+        elif name in NODE_STATUS_SET or name == "network":
+            self.set_metadata(name, value)
+        elif name in NODE_ADDRESS_KEYS:
+            return
+        elif name == "row":
+            if isinstance(value, list):
+                self.observe_row(value)
+        elif name == "metadata":
+            if isinstance(value, Mapping):
+                for meta_key, meta_value in value.items():
+                    self.set_metadata(meta_key, meta_value)
+        elif name in METADATA_KEY_SET or name == "geohashid":
+            self.set_metadata(name, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[sys.intern(name)] = value
+
+        if self.owner is not None:
+            self.owner[self.address] = self
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            self[str(key)]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> Iterable[str]:
+        return self.to_dict().keys()
+
+    def items(self) -> Iterable[tuple[str, Any]]:
+        return self.to_dict().items()
+
+    def __repr__(self) -> str:
+        return f"NodeRecord({self.address!r}, network={self.network!r}, height={self.height!r})"
+
+
+def node_record(address: str, value: Any) -> NodeRecord:
+    normalized = normalize_address(address=address) or address
+
+    if isinstance(value, NodeRecord):
+        return value
+
+    if isinstance(value, Mapping):
+        record = dict(value)
+        record["address"] = normalize_address(address=record.get("address") or normalized) or normalized
+        record.setdefault("network", classify_network(record["address"]))
+
+        if "row" not in record:
+            record["row"] = normalize_node_dict(record)
+
+        return NodeRecord.from_row(record["address"], record.get("row") or [], extra=record)
+
+    if isinstance(value, list):
+        return NodeRecord.from_row(normalized, value)
+
+    return NodeRecord(normalized)
+
+
+def record_storage(record: Any) -> Any:
+    if isinstance(record, NodeRecord):
+        return record.to_storage()
+    return record
+
+
+def json_default(value: Any) -> Any:
+    if isinstance(value, NodeRecord):
+        return value.to_dict()
+    return str(value)
+
+
+def row_from_record(record: Mapping[str, Any]) -> list[Any]:
+    if isinstance(record, NodeRecord):
+        return record.row()
+
+    row = record.get("row")
+
+    if isinstance(row, list):
+        values = normalize_node_array(row)
+    else:
+        values = normalize_node_dict(record)
+
+    metadata = normalize_metadata(values[19])
+
+    for key in METADATA_KEYS:
+        if key in record and record.get(key) is not None:
+            metadata.setdefault(key, record.get(key))
+
+    normalized = normalize_address(address=record.get("address") or record.get("canonical_address")) or str(record.get("address") or "")
+    host, port = parse_address_port(normalized)
+    metadata.setdefault("canonical_address", normalized)
+    metadata.setdefault("host", host)
+    metadata.setdefault("port", port)
+    metadata.setdefault("network", record.get("network") or classify_network(normalized))
+    values[19] = metadata
+
+    return values
+
+
+def node_flags(record: Mapping[str, Any], row: list[Any]) -> dict[str, Any]:
+    metadata = normalize_metadata(row[19])
+    raw_reachable = record.get("reachable")
+    reachable_now = boolish(metadata.get("reachable_now") or record.get("reachable_now"))
+
+    return {
+        "network": str(record.get("network") or metadata.get("network") or "unknown"),
+        "reachable_state": 1 if raw_reachable is True else 0 if raw_reachable is False else None,
+        "reachable": boolish(metadata.get("reachable") or record.get("reachable")),
+        "reachable_now": reachable_now,
+        "reachable_24h": boolish(metadata.get("reachable_24h") or record.get("reachable_24h") or reachable_now),
+        "last_seen": to_int(record.get("last_seen") or metadata.get("last_seen")),
+        "last_failure": to_int(record.get("last_failure") or metadata.get("last_failure")),
+        "plottable": row[8] is not None and row[9] is not None,
+    }
+
+
+def normalize_mode(mode: str) -> str:
+    return str(mode or "all").lower().replace("-", "_")
+
+
+def mode_accepts(flags: Mapping[str, Any], mode: str) -> bool:
+    if mode in {"reachable", "reachable_now"} and not flags["reachable_now"]:
+        return False
+    if mode in {"reachable_24h", "24h"} and not flags["reachable_24h"]:
+        return False
+    if mode in {"unreachable", "failed"} and flags["reachable"]:
+        return False
+    if mode in {"stale"} and flags["reachable_now"]:
+        return False
+    if mode in {"plottable", "map"} and not flags["plottable"]:
+        return False
+
+    return True
+
+
+def candidate_accepts(
+    record: Mapping[str, Any],
+    *,
+    include_reachable: bool,
+    include_unreachable: bool,
+    include_recent_failures: bool,
+) -> bool:
+    reachable = record.get("reachable")
+
+    if reachable is True and not include_reachable:
+        return False
+    if reachable is False and not include_unreachable:
+        return False
+    if record.get("last_failure") and not include_recent_failures:
+        return False
+
+    return True
+
+
+class MemoryNodeStore(dict):
+    backend = "json"
+
+    def select_addresses(
+        self,
+        *,
+        include_reachable: bool = True,
+        include_unreachable: bool = True,
+        include_recent_failures: bool = True,
+    ) -> Iterator[str]:
+        for address, record in self.items():
+            if candidate_accepts(
+                record,
+                include_reachable=include_reachable,
+                include_unreachable=include_unreachable,
+                include_recent_failures=include_recent_failures,
+            ):
+                yield address
+
+    def select_records(
+        self,
+        *,
+        include_reachable: bool = True,
+        include_unreachable: bool = True,
+        include_recent_failures: bool = True,
+    ) -> Iterator[tuple[str, NodeRecord]]:
+        for address, record in self.items():
+            if candidate_accepts(
+                record,
+                include_reachable=include_reachable,
+                include_unreachable=include_unreachable,
+                include_recent_failures=include_recent_failures,
+            ):
+                yield address, record
+
+    def select_rows(self, mode: str = "all") -> Iterator[tuple[str, list[Any]]]:
+        mode = normalize_mode(mode)
+
+        for address, record in self.items():
+            row = row_from_record(record)
+
+            if mode_accepts(node_flags(record, row), mode):
+                yield address, row
+
+    def commit(self) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+
+class SQLiteNodeStore(MutableMapping):
+    backend = "sqlite"
+
+    MODE_CLAUSES = {
+        "reachable": "reachable_now = 1",
+        "reachable_now": "reachable_now = 1",
+        "reachable_24h": "reachable_24h = 1",
+        "24h": "reachable_24h = 1",
+        "unreachable": "reachable = 0",
+        "failed": "reachable = 0",
+        "stale": "reachable_now = 0",
+        "plottable": "plottable = 1",
+        "map": "plottable = 1",
+    }
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        write_batch: int = SQLITE_WRITE_BATCH,
+        checkpoint_bytes: int = SQLITE_CHECKPOINT_BYTES,
+    ) -> None:
+        self.path = Path(path)
+        self.wal_path = self.path.with_name(self.path.name + "-wal")
+        self.write_batch = max(1, int(write_batch))
+        self.checkpoint_bytes = max(0, int(checkpoint_bytes))
+        self._pending: dict[str, dict[str, Any] | None] = {}
+
+        mkdir(self.path.parent)
+
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS nodes (
+                address TEXT PRIMARY KEY,
+                network TEXT,
+                reachable_state INTEGER,
+                reachable INTEGER NOT NULL DEFAULT 0,
+                reachable_now INTEGER NOT NULL DEFAULT 0,
+                reachable_24h INTEGER NOT NULL DEFAULT 0,
+                last_seen INTEGER,
+                last_failure INTEGER,
+                plottable INTEGER NOT NULL DEFAULT 0,
+                record TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_nodes_reachable_now ON nodes(reachable_now);
+            CREATE INDEX IF NOT EXISTS idx_nodes_reachable_24h ON nodes(reachable_24h);
+            CREATE INDEX IF NOT EXISTS idx_nodes_reachable_state ON nodes(reachable_state);
+            CREATE INDEX IF NOT EXISTS idx_nodes_last_seen ON nodes(last_seen);
+            CREATE INDEX IF NOT EXISTS idx_nodes_last_failure ON nodes(last_failure);
+            CREATE INDEX IF NOT EXISTS idx_nodes_network ON nodes(network);
+            """
+        )
+        self.conn.commit()
+
+    def _decode(self, address: str, payload: str) -> NodeRecord:
+        record = node_record(address, json.loads(payload))
+        record.owner = self
+        return record
+
+    def _encode(self, address: str, record: Any) -> tuple[Any, ...]:
+        row = row_from_record(record)
+        flags = node_flags(record, row)
+
+        return (
+            address,
+            flags["network"],
+            flags["reachable_state"],
+            int(flags["reachable"]),
+            int(flags["reachable_now"]),
+            int(flags["reachable_24h"]),
+            flags["last_seen"],
+            flags["last_failure"],
+            int(flags["plottable"]),
+            json.dumps(record_storage(record), ensure_ascii=False, separators=(",", ":"), default=json_default),
+        )
+
+    def flush(self) -> None:
+        self._write_pending()
+
+    def _write_pending(self) -> None:
+        if not self._pending:
+            return
+
+        upserts = [self._encode(address, record) for address, record in self._pending.items() if record is not None]
+        deletes = [(address,) for address, record in self._pending.items() if record is None]
+
+        if upserts:
+            self.conn.executemany(
+                """
+                INSERT INTO nodes (
+                    address, network, reachable_state, reachable, reachable_now,
+                    reachable_24h, last_seen, last_failure, plottable, record
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(address) DO UPDATE SET
+                    network = excluded.network,
+                    reachable_state = excluded.reachable_state,
+                    reachable = excluded.reachable,
+                    reachable_now = excluded.reachable_now,
+                    reachable_24h = excluded.reachable_24h,
+                    last_seen = excluded.last_seen,
+                    last_failure = excluded.last_failure,
+                    plottable = excluded.plottable,
+                    record = excluded.record
+                """,
+                upserts,
+            )
+
+        if deletes:
+            self.conn.executemany("DELETE FROM nodes WHERE address = ?", deletes)
+
+        self._pending.clear()
+
+    def commit(self) -> None:
+        self.flush()
+        self.conn.commit()
+
+    def checkpoint(self) -> None:
+        self.commit()
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def wal_bytes(self) -> int:
+        try:
+            return self.wal_path.stat().st_size
+        except OSError:
+            return 0
+
+    def needs_checkpoint(self) -> bool:
+        return self.wal_bytes() >= self.checkpoint_bytes
+
+    def close(self) -> None:
+        self.commit()
+        self.conn.close()
+
+    def __getitem__(self, address: str) -> NodeRecord:
+        if address in self._pending:
+            record = self._pending[address]
+
+            if record is None:
+                raise KeyError(address)
+
+            return record
+
+        found = self.conn.execute("SELECT record FROM nodes WHERE address = ?", (address,)).fetchone()
+
+        if found is None:
+            raise KeyError(address)
+
+        return self._decode(address, found[0])
+
+    def __setitem__(self, address: str, record: NodeRecord) -> None:
+        self._pending[address] = record
+
+        if len(self._pending) >= self.write_batch:
+            self._write_pending()
+
+    def __delitem__(self, address: str) -> None:
+        if address not in self:
+            raise KeyError(address)
+
+        self._pending[address] = None
+
+    def __contains__(self, address: object) -> bool:
+        if address in self._pending:
+            return self._pending[address] is not None
+
+        return self.conn.execute("SELECT 1 FROM nodes WHERE address = ?", (address,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        self._write_pending()
+
+        for (address,) in self.conn.execute("SELECT address FROM nodes ORDER BY rowid"):
+            yield address
+
+    def __len__(self) -> int:
+        self._write_pending()
+        return int(self.conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0])
+
+    def items(self) -> Iterator[tuple[str, NodeRecord]]:  # type: ignore[override]
+        self.flush()
+
+        for address, record in self.conn.execute("SELECT address, record FROM nodes ORDER BY rowid"):
+            yield address, self._decode(address, record)
+
+    def values(self) -> Iterator[NodeRecord]:  # type: ignore[override]
+        for _address, record in self.items():
+            yield record
+
+    def candidate_where(
+        self,
+        *,
+        include_reachable: bool = True,
+        include_unreachable: bool = True,
+        include_recent_failures: bool = True,
+    ) -> str:
+        clauses: list[str] = []
+
+        if not include_reachable:
+            clauses.append("(reachable_state IS NULL OR reachable_state != 1)")
+        if not include_unreachable:
+            clauses.append("(reachable_state IS NULL OR reachable_state != 0)")
+        if not include_recent_failures:
+            clauses.append("(last_failure IS NULL OR last_failure = 0)")
+
+        return " WHERE " + " AND ".join(clauses) if clauses else ""
+
+    def select_addresses(
+        self,
+        *,
+        include_reachable: bool = True,
+        include_unreachable: bool = True,
+        include_recent_failures: bool = True,
+    ) -> Iterator[str]:
+        self.flush()
+        where = self.candidate_where(
+            include_reachable=include_reachable,
+            include_unreachable=include_unreachable,
+            include_recent_failures=include_recent_failures,
+        )
+
+        for (address,) in self.conn.execute(f"SELECT address FROM nodes{where} ORDER BY rowid"):
+            yield address
+
+    def select_records(
+        self,
+        *,
+        include_reachable: bool = True,
+        include_unreachable: bool = True,
+        include_recent_failures: bool = True,
+    ) -> Iterator[tuple[str, NodeRecord]]:
+        self.flush()
+        where = self.candidate_where(
+            include_reachable=include_reachable,
+            include_unreachable=include_unreachable,
+            include_recent_failures=include_recent_failures,
+        )
+
+        for address, record in self.conn.execute(f"SELECT address, record FROM nodes{where} ORDER BY rowid"):
+            yield address, self._decode(address, record)
+
+    def select_rows(self, mode: str = "all") -> Iterator[tuple[str, list[Any]]]:
+        self.flush()
+        clause = self.MODE_CLAUSES.get(normalize_mode(mode))
+        where = f" WHERE {clause}" if clause else ""
+
+        for address, record in self.conn.execute(f"SELECT address, record FROM nodes{where} ORDER BY rowid"):
+            yield address, self._decode(address, record).row()
+
+
 class BitnodesState:
     def __init__(
         self,
@@ -837,11 +1727,22 @@ class BitnodesState:
         *,
         source: str = "",
         max_queue: int = 250000,
+        journal: bool = True,
+        compact_min_entries: int = DEFAULT_JOURNAL_COMPACT_MIN,
+        compact_ratio: float = DEFAULT_JOURNAL_COMPACT_RATIO,
+        backend: str = DEFAULT_STATE_BACKEND,
     ) -> None:
         self.source = str(source or "zzxbitnodes").strip()
         self.state_dir = Path(state_dir)
         self.snapshot_24h_dir = Path(snapshot_24h_dir)
         self.max_queue = int(max_queue)
+        self.journal = bool(journal)
+        self.compact_min_entries = max(0, int(compact_min_entries))
+        self.compact_ratio = max(0.0, float(compact_ratio))
+        self.backend = str(backend or DEFAULT_STATE_BACKEND).strip().lower()
+
+        if self.backend not in STATE_BACKENDS:
+            raise ValueError(f"unknown state backend: {backend}")
 
         mkdir(self.state_dir)
         mkdir(self.snapshot_24h_dir)
@@ -849,14 +1750,60 @@ class BitnodesState:
         self.nodes_path = self.state_dir / "nodes.json"
         self.queue_path = self.state_dir / "queue.json"
         self.meta_path = self.state_dir / "meta.json"
+        self.journal_path = self.state_dir / "nodes.journal"
+        self.sqlite_path = self.state_dir / "nodes.sqlite3"
+
+        self._dirty: set[str] = set()
+        self._journal_entries = 0
+        self._snapshot_digest = ""
+        self._journal_base: str | None = None
+        self._changes: dict[str, tuple[Any, ...] | None] | None = None
+        self._change_baseline = 0
 
-        self.nodes: dict[str, dict[str, Any]] = self._load_nodes(read_json(self.nodes_path, {}))
+        self.nodes: MemoryNodeStore | SQLiteNodeStore = self._open_nodes()
         self.queue: deque[str] = deque(self._normalize_addresses(read_json(self.queue_path, [])))
         self.meta: dict[str, Any] = read_json(self.meta_path, {})
         self._queue_set = set(self.queue)
+        self._discovered: dict[str, int] = self._queue_discovery()
+        self._scheduled: dict[str, float] = {}
+        self._deferred = 0
+
+    def _queue_discovery(self) -> dict[str, int]:
+        try:
+            ts = int(self.queue_path.stat().st_mtime)
+        except OSError:
+            ts = now_ts()
+
+        return dict.fromkeys(self.queue, ts)
+
+    def _open_nodes(self) -> MemoryNodeStore | SQLiteNodeStore:
+        if self.backend == "json" and self.sqlite_path.exists():
+            raise ValueError(
+                f"{self.sqlite_path} holds newer node state than {self.nodes_path.name}; "
+                "open it with the sqlite backend or remove it to fall back to json"
+            )
+
+        memory = MemoryNodeStore()
+
+        if self.backend == "json" or not self.sqlite_path.exists():
+            memory.update(self._load_nodes(self._read_snapshot()))
+            self.nodes = memory
+            self._replay_journal()
+
+        if self.backend == "json":
+            return memory
 
-    def _load_nodes(self, payload: Any) -> dict[str, dict[str, Any]]:
-        output: dict[str, dict[str, Any]] = {}
+        store = SQLiteNodeStore(self.sqlite_path)
+
+        if memory and len(store) == 0:
+            for address, record in memory.items():
+                store[address] = record
+            store.commit()
+
+        return store
+
+    def _load_nodes(self, payload: Any) -> dict[str, NodeRecord]:
+        output: dict[str, NodeRecord] = {}
 
         if isinstance(payload, Mapping):
             source = payload.get("nodes", payload)
@@ -889,138 +1836,246 @@ class BitnodesState:
 
         return sorted(set(addresses))
 
-    def _record_from_any(self, address: str, value: Any) -> dict[str, Any]:
+    def _record_from_any(self, address: str, value: Any) -> NodeRecord:
+        return node_record(address, value)
+
+    def _record_from_row(self, address: str, row: list[Any], extra: Mapping[str, Any] | None = None) -> NodeRecord:
         normalized = normalize_address(address=address) or address
+        return NodeRecord.from_row(normalized, row, extra)
+
+    def _row_from_record(self, record: Mapping[str, Any]) -> list[Any]:
+        return row_from_record(record)
 
-        if isinstance(value, Mapping):
-            record = dict(value)
-            record["address"] = normalize_address(address=record.get("address") or normalized) or normalized
-            record.setdefault("canonical_address", record["address"])
-            record.setdefault("network", classify_network(record["address"]))
+    def mark_dirty(self, address: str) -> None:
+        normalized = normalize_address(address=address)
 
-            if "row" not in record:
-                record["row"] = normalize_node_dict(record)
+        if normalized:
+            self._dirty.add(normalized)
 
-            record["row"] = normalize_node_array(record.get("row") or record)
-            return self._record_from_row(record["address"], record["row"], extra=record)
+    def track_changes(self) -> None:
+        self._changes = {}
+        self._change_baseline = len(self.nodes)
 
-        if isinstance(value, list):
-            return self._record_from_row(normalized, value)
+    def _track(self, address: str, record: Any) -> None:
+        if self._changes is None or address in self._changes:
+            return
 
-        return self._record_from_row(normalized, [])
+        self._changes[address] = None if record is None else tuple(record.get(name) for name in CHANGE_FIELDS)
 
-    def _record_from_row(self, address: str, row: list[Any], extra: Mapping[str, Any] | None = None) -> dict[str, Any]:
-        normalized = normalize_address(address=address) or address
-        values = normalize_node_array(row)
-        metadata = normalize_metadata(values[19])
-        network = metadata.get("network") or classify_network(normalized)
-        host, port = parse_address_port(normalized)
+    def tracked_changes(self) -> tuple[int, dict[str, dict[str, Any] | None]]:
+        changes = self._changes or {}
 
-        metadata["network"] = network
-        metadata["canonical_address"] = normalized
-        metadata["host"] = host
-        metadata["port"] = port
-        values[19] = metadata
-
-        record = {
-            "address": normalized,
-            "canonical_address": normalized,
-            "host": host,
-            "port": port,
-            "network": network,
-            "row": values,
-            "protocol_version": values[0],
-            "protocol": values[0],
-            "user_agent": values[1],
-            "agent": values[1],
-            "connected_since": values[2],
-            "services": values[3],
-            "height": values[4],
-            "hostname": values[5],
-            "city": values[6],
-            "country": values[7],
-            "country_code": values[7],
-            "latitude": values[8],
-            "longitude": values[9],
-            "timezone": values[10],
-            "asn": values[11],
-            "organization": values[12],
-            "provider": values[13],
-            "county": values[14],
-            "zip": values[15],
-            "postal_code": values[15],
-            "w3w": values[16],
-            "geohash": values[17],
-            "geohashid": metadata.get("geohashid") or values[17],
-            "asn_location": values[18],
-            "metadata": metadata,
-            "reachable": metadata.get("reachable"),
-            "reachable_now": metadata.get("reachable_now"),
-            "reachable_24h": metadata.get("reachable_24h"),
-            "reachable_week": metadata.get("reachable_week"),
-            "reachable_month": metadata.get("reachable_month"),
-            "latency_ms": metadata.get("latency_ms"),
-            "uptime_seconds": metadata.get("uptime_seconds") or metadata.get("total_uptime"),
-            "first_seen": metadata.get("first_seen"),
-            "last_seen": metadata.get("last_seen"),
-            "last_success": metadata.get("last_success"),
-            "last_failure": metadata.get("last_failure"),
-            "success_count": int(metadata.get("success_count") or 0),
-            "failure_count": int(metadata.get("failure_count") or 0),
-            "peer_index": metadata.get("peer_index"),
-            "is_tor": network == "tor" or boolish(metadata.get("is_tor") or metadata.get("tor")),
-            "is_i2p": network == "i2p" or boolish(metadata.get("is_i2p") or metadata.get("i2p")),
-            "is_ipv4": network == "ipv4",
-            "is_ipv6": network == "ipv6",
-            "is_cjdns": network == "cjdns",
-            "is_vpn": boolish(metadata.get("is_vpn") or metadata.get("suspected_vpn") or metadata.get("vpn")),
-            "is_proxy": boolish(metadata.get("is_proxy") or metadata.get("suspected_proxy") or metadata.get("proxy")),
+        return self._change_baseline, {
+            address: None if values is None else dict(zip(CHANGE_FIELDS, values))
+            for address, values in changes.items()
         }
 
-        for key in METADATA_KEYS:
-            if key in metadata and key not in record:
-                record[key] = metadata[key]
+    def store_record(self, address: str, record: Any) -> None:
+        normalized = normalize_address(address=address)
 
-        if extra:
-            for key, value in extra.items():
-                if key not in {"row", "metadata"} and value is not None:
-                    record[key] = value
+        if not normalized:
+            return
 
-        return record
+        if self._changes is not None and normalized not in self._changes:
+            self._track(normalized, self.nodes.get(normalized))
 
-    def _row_from_record(self, record: Mapping[str, Any]) -> list[Any]:
-        row = record.get("row")
+        self.nodes[normalized] = self._record_from_any(normalized, record)
+        self._dirty.add(normalized)
 
-        if isinstance(row, list):
-            values = normalize_node_array(row)
-        else:
-            values = normalize_node_dict(record)
+    def _read_snapshot(self) -> Any:
+        try:
+            data = self.nodes_path.read_bytes()
+        except OSError:
+            self._snapshot_digest = ""
+            return {}
+
+        self._snapshot_digest = hashlib.sha256(data).hexdigest()
+
+        try:
+            return json.loads(data)
+        except Exception:
+            return {}
+
+    def _write_snapshot(self, pretty: bool = False) -> None:
+        data = json.dumps(
+            self.nodes,
+            ensure_ascii=False,
+            indent=2 if pretty else None,
+            separators=None if pretty else (",", ":"),
+            sort_keys=pretty,
+            default=json_default,
+        ).encode("utf-8") + b"\n"
+
+        mkdir(self.nodes_path.parent)
+        scratch = self.nodes_path.with_name(self.nodes_path.name + ".tmp")
+
+        with scratch.open("wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+
+        os.replace(scratch, self.nodes_path)
+        self._snapshot_digest = hashlib.sha256(data).hexdigest()
+        self._reset_journal()
+
+    def _reset_journal(self) -> None:
+        mkdir(self.journal_path.parent)
+        scratch = self.journal_path.with_name(self.journal_path.name + ".tmp")
+
+        with scratch.open("w", encoding="utf-8") as handle:
+            handle.write(json.dumps({"base": self._snapshot_digest}, separators=(",", ":")))
+            handle.write("\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+
+        os.replace(scratch, self.journal_path)
+        self._journal_base = self._snapshot_digest
+        self._journal_entries = 0
+
+    def _replay_journal(self) -> int:
+        self._journal_entries = 0
+        self._journal_base = None
+
+        if not self.journal_path.exists():
+            return 0
+
+        replayed = 0
+        header = True
 
-        metadata = normalize_metadata(values[19])
+        with self.journal_path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
 
-        for key in METADATA_KEYS:
-            if key in record and record.get(key) is not None:
-                metadata.setdefault(key, record.get(key))
+                if not line:
+                    continue
+
+                try:
+                    entry = json.loads(line)
+                except Exception:
+                    continue
+
+                if not isinstance(entry, Mapping):
+                    continue
+
+                if header:
+                    header = False
+
+                    if "base" in entry and "address" not in entry:
+                        self._journal_base = str(entry.get("base") or "")
+
+                        if self._journal_base != self._snapshot_digest:
+                            return 0
+
+                        continue
+
+                    self._journal_base = self._snapshot_digest
+
+                normalized = normalize_address(address=entry.get("address"))
+
+                if not normalized:
+                    continue
+
+                record = entry.get("record")
+
+                if record is None:
+                    self.nodes.pop(normalized, None)
+                elif isinstance(record, Mapping):
+                    self.nodes[normalized] = self._record_from_any(normalized, record)
+                else:
+                    continue
+
+                replayed += 1
+
+        self._journal_entries = replayed
+        return replayed
+
+    def _append_journal(self) -> int:
+        if not self._dirty:
+            return 0
+
+        if self._journal_base != self._snapshot_digest:
+            self._reset_journal()
+
+        ts = utc_now()
+
+        with self.journal_path.open("a", encoding="utf-8") as handle:
+            for address in sorted(self._dirty):
+                entry = {"address": address, "ts": ts, "record": record_storage(self.nodes.get(address))}
+                handle.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=json_default))
+                handle.write("\n")
 
-        normalized = normalize_address(address=record.get("address") or record.get("canonical_address")) or str(record.get("address") or "")
-        host, port = parse_address_port(normalized)
-        metadata.setdefault("canonical_address", normalized)
-        metadata.setdefault("host", host)
-        metadata.setdefault("port", port)
-        metadata.setdefault("network", record.get("network") or classify_network(normalized))
-        values[19] = metadata
+            handle.flush()
+            os.fsync(handle.fileno())
 
-        return values
+        written = len(self._dirty)
+        self._journal_entries += written
+        self._dirty.clear()
+        return written
 
-    def save(self) -> None:
+    def journal_needs_compaction(self) -> bool:
+        if isinstance(self.nodes, SQLiteNodeStore):
+            return self.nodes.needs_checkpoint()
+
+        threshold = max(self.compact_min_entries, int(len(self.nodes) * self.compact_ratio))
+        return self._journal_entries + len(self._dirty) >= threshold
+
+    def compact(self) -> None:
+        if isinstance(self.nodes, SQLiteNodeStore):
+            self.nodes.checkpoint()
+            self._dirty.clear()
+            self.meta["last_compacted_at"] = utc_iso()
+            return
+
+        self._write_snapshot()
+        self._dirty.clear()
+        self.meta["last_compacted_at"] = utc_iso()
+
+    def save(self, *, compact: bool | None = None) -> None:
         self.meta["saved_at"] = utc_iso()
         self.meta["source"] = self.source
         self.meta["state_dir"] = str(self.state_dir)
         self.meta["snapshot_24h_dir"] = str(self.snapshot_24h_dir)
         self.meta["node_count"] = len(self.nodes)
         self.meta["queue_count"] = len(self.queue)
+        self.meta["storage_backend"] = self.backend
+
+        if self.backend == "sqlite":
+            self.meta["last_save_dirty"] = len(self._dirty)
+
+            self.nodes.commit()
+            self._dirty.clear()
+
+            if compact is None:
+                compact = self.journal_needs_compaction()
+
+            if compact:
+                self.compact()
+                self.meta["last_save_mode"] = "checkpoint"
+            else:
+                self.meta["last_save_mode"] = "sqlite"
+
+            self.meta["wal_bytes"] = self.nodes.wal_bytes()
+
+        elif not self.journal:
+            self._write_snapshot(pretty=True)
+            self._dirty.clear()
+            self.meta["last_save_mode"] = "snapshot"
+        else:
+            dirty = len(self._dirty)
+
+            if compact is None:
+                compact = self.journal_needs_compaction() or not self.nodes_path.exists()
+
+            if compact:
+                self.compact()
+                self.meta["last_save_mode"] = "compaction"
+            else:
+                self._append_journal()
+                self.meta["last_save_mode"] = "journal"
+
+            self.meta["last_save_dirty"] = dirty
+            self.meta["journal_entries"] = self._journal_entries
 
-        write_json(self.nodes_path, self.nodes)
         write_json(self.queue_path, list(self.queue))
         write_json(self.meta_path, self.meta)
 
@@ -1028,10 +2083,16 @@ class BitnodesState:
         self.save()
 
     def load(self) -> None:
-        self.nodes = self._load_nodes(read_json(self.nodes_path, {}))
+        self.nodes.close()
+        self._dirty.clear()
+        self.nodes = self._open_nodes()
         self.queue = deque(self._normalize_addresses(read_json(self.queue_path, [])))
         self.meta = read_json(self.meta_path, {})
         self._queue_set = set(self.queue)
+        self._discovered = self._queue_discovery()
+
+    def close(self) -> None:
+        self.nodes.close()
 
     def add_to_queue(self, addresses: Iterable[Any]) -> None:
         added = 0
@@ -1050,6 +2111,7 @@ class BitnodesState:
 
             self.queue.append(normalized)
             self._queue_set.add(normalized)
+            self._discovered[normalized] = now_ts()
             added += 1
 
         self.meta["queue_last_added"] = added
@@ -1061,6 +2123,7 @@ class BitnodesState:
         while self.queue and len(batch) < size:
             address = self.queue.popleft()
             self._queue_set.discard(address)
+            self._discovered.pop(address, None)
             normalized = normalize_address(address=address)
 
             if normalized:
@@ -1080,8 +2143,24 @@ class BitnodesState:
         include_unreachable: bool = True,
         include_reachable: bool = True,
         include_recent_failures: bool = True,
+        prioritize: bool = False,
+        include_deferred: bool = True,
+        now: int | None = None,
         **_kwargs: Any,
     ) -> list[str]:
+        if prioritize:
+            return self.scheduled_candidate_addresses(
+                limit,
+                seed_addresses=seed_addresses,
+                include_queue=include_queue,
+                include_known=include_known,
+                include_unreachable=include_unreachable,
+                include_reachable=include_reachable,
+                include_recent_failures=include_recent_failures,
+                include_deferred=include_deferred,
+                now=now,
+            )
+
         candidates: list[str] = []
 
         if seed_addresses:
@@ -1091,21 +2170,90 @@ class BitnodesState:
             candidates.extend(list(self.queue))
 
         if include_known:
-            for address, record in self.nodes.items():
-                reachable = record.get("reachable")
-
-                if reachable is True and not include_reachable:
-                    continue
-                if reachable is False and not include_unreachable:
-                    continue
-                if record.get("last_failure") and not include_recent_failures:
-                    continue
-
-                candidates.append(address)
+            candidates.extend(
+                self.nodes.select_addresses(
+                    include_reachable=include_reachable,
+                    include_unreachable=include_unreachable,
+                    include_recent_failures=include_recent_failures,
+                )
+            )
 
         normalized = self._normalize_addresses(candidates)
         return normalized[:limit] if limit and limit > 0 else normalized
 
+    def scheduled_candidate_addresses(
+        self,
+        limit: int = 0,
+        *,
+        seed_addresses: Iterable[Any] | None = None,
+        include_queue: bool = True,
+        include_known: bool = True,
+        include_unreachable: bool = True,
+        include_reachable: bool = True,
+        include_recent_failures: bool = True,
+        include_deferred: bool = True,
+        now: int | None = None,
+    ) -> list[str]:
+        scheduler = CrawlScheduler(now=now)
+        ts = scheduler.now
+
+        for address in self._normalize_addresses(seed_addresses or []):
+            scheduler.push(
+                address,
+                self.nodes.get(address),
+                network=classify_network(address),
+                discovered_at=self._discovered.get(address, ts),
+                source="seed",
+            )
+
+        if include_queue:
+            for address in list(self.queue):
+                scheduler.push(
+                    address,
+                    self.nodes.get(address),
+                    network=classify_network(address),
+                    discovered_at=self._discovered.get(address, ts),
+                    source="queue",
+                )
+
+        if include_known:
+            for address, record in self.nodes.select_records(
+                include_reachable=include_reachable,
+                include_unreachable=include_unreachable,
+                include_recent_failures=include_recent_failures,
+            ):
+                scheduler.push(
+                    address,
+                    record,
+                    network=record.network,
+                    discovered_at=to_int(record.first_seen),
+                    source="known",
+                )
+
+        queued = len(scheduler)
+        selected = scheduler.take(limit if limit and limit > 0 else 0, include_deferred=include_deferred)
+        self._deferred = sum(1 for candidate in selected if not candidate.ready)
+        self._scheduled = {candidate.address: candidate.probability for candidate in selected}
+
+        self.meta["scheduler_last_queued"] = queued
+        self.meta["scheduler_last_selected"] = len(selected)
+        self.meta["scheduler_last_deferred"] = self._deferred
+        self.meta["scheduler_last_run_at"] = utc_iso(ts)
+
+        return [candidate.address for candidate in selected]
+
+    def record_schedule_outcome(self, attempted: Iterable[str], successes: Iterable[str]) -> dict[str, Any]:
+        stats = schedule_outcome(self._scheduled, attempted, successes, deferred=self._deferred)
+        stats["recorded_at"] = utc_iso()
+
+        history = self.meta.get("scheduler_history")
+        history = list(history) if isinstance(history, list) else []
+        history.append(stats)
+
+        self.meta["scheduler"] = stats
+        self.meta["scheduler_history"] = history[-SCHEDULE_HISTORY_LIMIT:]
+        return stats
+
     def merge_node(self, address: str, values: Any, *, reachable: bool | None = None) -> None:
         normalized = normalize_address(address=address)
 
@@ -1115,16 +2263,14 @@ class BitnodesState:
         incoming = self._record_from_any(normalized, values)
         previous = self.nodes.get(normalized)
 
+        self._track(normalized, previous)
+        self._dirty.add(normalized)
+
         if previous is None:
             self.nodes[normalized] = incoming
-        else:
-            previous_row = self._row_from_record(previous)
-            incoming_row = self._row_from_record(incoming)
-
-            if node_quality(incoming_row) >= node_quality(previous_row):
-                merged = dict(previous)
-                merged.update(incoming)
-                self.nodes[normalized] = merged
+        elif incoming.quality() >= previous.quality():
+            previous.update_from(incoming)
+            self.nodes[normalized] = previous
 
         if reachable is not None:
             if reachable:
@@ -1132,6 +2278,15 @@ class BitnodesState:
             else:
                 self.mark_unreachable(normalized)
 
+    def _existing_record(self, address: str) -> NodeRecord:
+        record = self.nodes.get(address)
+        self._track(address, record)
+
+        if record is None:
+            record = NodeRecord(address)
+
+        return record
+
     def update_successes(
         self,
         successes: Mapping[str, Any],
@@ -1152,36 +2307,25 @@ class BitnodesState:
             if not normalized:
                 continue
 
-            record = self._record_from_any(normalized, row)
-            metadata = normalize_metadata(record.get("metadata"))
+            record = self.nodes.get(normalized)
+            self._track(normalized, record)
 
-            metadata["reachable"] = True
-            metadata["reachable_now"] = True
-            metadata["reachable_24h"] = True
-            metadata["last_seen"] = ts
-            metadata["last_success"] = ts
-            metadata["success_count"] = int(metadata.get("success_count") or record.get("success_count") or 0) + 1
-            metadata["first_seen"] = metadata.get("first_seen") or record.get("first_seen") or ts
-            metadata.setdefault("network", classify_network(normalized))
-            metadata.setdefault("canonical_address", normalized)
-
-            record["metadata"] = metadata
-            record["row"] = self._row_from_record(record)
-            record.update(
-                {
-                    "reachable": True,
-                    "reachable_now": True,
-                    "reachable_24h": True,
-                    "last_seen": ts,
-                    "last_success": ts,
-                    "first_seen": metadata["first_seen"],
-                    "success_count": metadata["success_count"],
-                    "network": metadata["network"],
-                    "canonical_address": normalized,
-                }
-            )
+            if record is not None and isinstance(row, list):
+                record.assign_crawl_row(row)
+            else:
+                record = self._record_from_any(normalized, row)
+
+            record.reachable = True
+            record.reachable_now = True
+            record.reachable_24h = True
+            record.last_seen = ts
+            record.last_success = ts
+            record.success_count = int(record.success_count or 0) + 1
+            record.consecutive_failures = 0
+            record.first_seen = record.first_seen or ts
 
             self.nodes[normalized] = record
+            self._dirty.add(normalized)
 
             if normalized in self._queue_set:
                 try:
@@ -1189,6 +2333,7 @@ class BitnodesState:
                 except ValueError:
                     pass
                 self._queue_set.discard(normalized)
+                self._discovered.pop(normalized, None)
 
         self.meta["last_success_update_at"] = utc_iso(ts)
         self.meta["last_success_count"] = len(successes)
@@ -1210,32 +2355,16 @@ class BitnodesState:
             if not normalized:
                 continue
 
-            record = self.nodes.get(normalized) or self._record_from_row(normalized, [])
-            metadata = normalize_metadata(record.get("metadata"))
-
-            metadata["reachable"] = False
-            metadata["reachable_now"] = False
-            metadata["last_failure"] = ts
-            metadata["failure_count"] = int(metadata.get("failure_count") or record.get("failure_count") or 0) + 1
-            metadata["first_seen"] = metadata.get("first_seen") or ts
-            metadata.setdefault("network", classify_network(normalized))
-            metadata.setdefault("canonical_address", normalized)
-
-            record["metadata"] = metadata
-            record["row"] = self._row_from_record(record)
-            record.update(
-                {
-                    "reachable": False,
-                    "reachable_now": False,
-                    "last_failure": ts,
-                    "failure_count": metadata["failure_count"],
-                    "first_seen": metadata["first_seen"],
-                    "network": metadata["network"],
-                    "canonical_address": normalized,
-                }
-            )
+            record = self._existing_record(normalized)
+            record.reachable = False
+            record.reachable_now = False
+            record.last_failure = ts
+            record.failure_count = int(record.failure_count or 0) + 1
+            record.consecutive_failures = int(record.consecutive_failures or 0) + 1
+            record.first_seen = record.first_seen or ts
 
             self.nodes[normalized] = record
+            self._dirty.add(normalized)
             count += 1
 
         self.meta["last_failure_update_at"] = utc_iso(ts)
@@ -1252,31 +2381,15 @@ class BitnodesState:
             return
 
         ts = int(now or utc_now())
-        record = self.nodes.get(normalized) or self._record_from_row(normalized, [])
-        metadata = normalize_metadata(record.get("metadata"))
-
-        metadata["reachable"] = True
-        metadata["reachable_now"] = True
-        metadata["reachable_24h"] = True
-        metadata["last_seen"] = ts
-        metadata["last_success"] = ts
-        metadata.setdefault("network", classify_network(normalized))
-        metadata.setdefault("canonical_address", normalized)
-
-        record["metadata"] = metadata
-        record.update(
-            {
-                "reachable": True,
-                "reachable_now": True,
-                "reachable_24h": True,
-                "last_seen": ts,
-                "last_success": ts,
-                "network": metadata["network"],
-                "canonical_address": normalized,
-            }
-        )
-        record["row"] = self._row_from_record(record)
+        record = self._existing_record(normalized)
+        record.reachable = True
+        record.reachable_now = True
+        record.reachable_24h = True
+        record.last_seen = ts
+        record.last_success = ts
+
         self.nodes[normalized] = record
+        self._dirty.add(normalized)
 
     def mark_unreachable(self, address: str, *, now: int | None = None) -> None:
         self.update_failures([address], now=now)
@@ -1288,11 +2401,9 @@ class BitnodesState:
             return
 
         record = self.nodes[normalized]
-        metadata = normalize_metadata(record.get("metadata"))
-        metadata["latency_ms"] = latency_ms
-        record["latency_ms"] = latency_ms
-        record["metadata"] = metadata
-        record["row"] = self._row_from_record(record)
+        record.latency_ms = latency_ms
+        self.nodes[normalized] = record
+        self._dirty.add(normalized)
 
     def record_peer(self, address: str, peer_index: Any = None) -> None:
         normalized = normalize_address(address=address)
@@ -1301,38 +2412,12 @@ class BitnodesState:
             return
 
         record = self.nodes[normalized]
-        metadata = normalize_metadata(record.get("metadata"))
-        metadata["peer_index"] = peer_index
         record["peer_index"] = peer_index
-        record["metadata"] = metadata
-        record["row"] = self._row_from_record(record)
+        self.nodes[normalized] = record
+        self._dirty.add(normalized)
 
     def to_bitnodes_nodes(self, mode: str = "all") -> dict[str, list[Any]]:
-        mode = str(mode or "all").lower().replace("-", "_")
-        output: dict[str, list[Any]] = {}
-
-        for address, record in self.nodes.items():
-            row = self._row_from_record(record)
-            metadata = normalize_metadata(row[19])
-
-            reachable = boolish(metadata.get("reachable") or record.get("reachable"))
-            reachable_now = boolish(metadata.get("reachable_now") or record.get("reachable_now"))
-            reachable_24h = boolish(metadata.get("reachable_24h") or record.get("reachable_24h") or reachable_now)
-
-            if mode in {"reachable", "reachable_now"} and not reachable_now:
-                continue
-            if mode in {"reachable_24h", "24h"} and not reachable_24h:
-                continue
-            if mode in {"unreachable", "failed"} and reachable:
-                continue
-            if mode in {"stale"} and reachable_now:
-                continue
-            if mode in {"plottable", "map"} and (row[8] is None or row[9] is None):
-                continue
-
-            output[address] = row
-
-        return output
+        return dict(self.nodes.select_rows(mode))
 
     def reachable_nodes(self) -> dict[str, list[Any]]:
         return self.to_bitnodes_nodes("reachable")
@@ -1496,7 +2581,7 @@ class BitnodesState:
             "schema": "zzx-bitnodes-state-v3",
             "source": self.source,
             "saved_at": utc_iso(),
-            "nodes": self.nodes,
+            "nodes": {address: record.to_dict() for address, record in self.nodes.items()},
             "queue": list(self.queue),
             "meta": self.meta,
             "summary": self.state_summary(),
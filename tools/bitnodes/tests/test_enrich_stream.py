@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import enrich
+
+
+MODULES = "ipv4,tor,peer_index"
+
+
+def strip_times(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: strip_times(item) for key, item in value.items() if key not in ("updated_at", "enriched_at")}
+
+    if isinstance(value, list):
+        return [strip_times(item) for item in value]
+
+    return value
+
+
+def run_both(tmp_path: Path, payload: Any, *extra: str) -> tuple[Any, Any]:
+    source = tmp_path / "snapshot.json"
+    source.write_text(json.dumps(payload), encoding="utf-8")
+    streamed = tmp_path / "streamed.json"
+    buffered = tmp_path / "buffered.json"
+
+    assert enrich.main(["--input", str(source), "--output", str(streamed), "--modules", MODULES, "--chunk-size", "2", *extra]) == 0
+    enrich.run_from_args(
+        enrich.build_parser().parse_args(["--input", str(source), "--output", str(buffered), "--modules", MODULES, *extra])
+    )
+
+    return (
+        json.loads(streamed.read_text(encoding="utf-8")),
+        json.loads(buffered.read_text(encoding="utf-8")),
+    )
+
+
+@pytest.mark.parametrize("compact", [(), ("--compact",)])
+def test_streamed_object_snapshot_matches_buffered(tmp_path: Path, compact: tuple[str, ...]) -> None:
+    payload = {
+        "timestamp": 1700000000,
+        "nodes": {
+            f"198.51.100.{index}:8333": [70016, "/Satoshi:27.0.0/", 1700000000, 1037, 850000]
+            for index in range(1, 6)
+        },
+        "latest_height": 850000,
+    }
+
+    streamed, buffered = run_both(tmp_path, payload, *compact)
+
+    assert list(streamed["nodes"]) == list(payload["nodes"])
+    assert streamed["latest_height"] == 850000
+    assert streamed["metadata"]["enrichment_modules"] == MODULES.split(",")
+    assert strip_times(streamed) == strip_times(buffered)
+
+
+def test_streamed_array_snapshot_matches_buffered(tmp_path: Path) -> None:
+    payload = [{"address": "198.51.100.7:8333"}, {"address": "exampleonionaddress.onion:8333"}]
+
+    streamed, buffered = run_both(tmp_path, payload)
+
+    assert len(streamed) == 2
+    assert strip_times(streamed) == strip_times(buffered)
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import zzxbitnodes
+from state import BitnodesState
+
+
+ADDRESSES = ("203.0.113.10:8333", "198.51.100.7:8333", "[2001:db8::1]:8333")
+
+
+class FakeLookup:
+    db_digests = {"city": "c1", "asn": "a1"}
+
+    def __init__(self, **_kwargs: Any) -> None:
+        pass
+
+    def __enter__(self) -> FakeLookup:
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        pass
+
+
+def crawl_row(height: int) -> list[Any]:
+    return [70016, "/Satoshi:27.0.0/", 1700000000, 1033, height] + [None] * 14 + [{"latency_ms": 12.5}]
+
+
+def fake_enrich(calls: list[str]) -> Any:
+    def enrich(address: str, row: list[Any], _lookup: Any) -> list[Any]:
+        calls.append(address)
+        row = list(row)
+        row[6:19] = ["Zurich", "CH", 47.37, 8.54, "Europe/Zurich", 64496, "Example AG", "Example", "Zurich", "8001", None, "u0qj", None]
+        return row
+
+    return enrich
+
+
+@pytest.fixture
+def geoip(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    calls: list[str] = []
+    monkeypatch.setattr(zzxbitnodes, "geoip_available", lambda *_args: True)
+    monkeypatch.setattr(zzxbitnodes, "GeoIPLookup", FakeLookup)
+    monkeypatch.setattr(zzxbitnodes, "enrich_node_array", fake_enrich(calls))
+    return calls
+
+
+def crawl_cycle(state: BitnodesState, height: int) -> dict[str, Any]:
+    state.update_successes({address: crawl_row(height) for address in ADDRESSES})
+    return zzxbitnodes.enrich_state_records(state, True, Path("city"), Path("asn"), Path("country"))
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_second_crawl_skips_unchanged_hosts(tmp_path: Path, geoip: list[str], backend: str) -> None:
+    state = BitnodesState(tmp_path / "state", tmp_path / "24h", backend=backend)
+
+    first = crawl_cycle(state, 900000)
+    assert first["geolocated"] == len(ADDRESSES)
+
+    del geoip[:]
+    second = crawl_cycle(state, 900001)
+
+    assert geoip == []
+    assert second["geolocated"] == 0
+    assert second["skipped"] == len(ADDRESSES)
+    assert second["skip_ratio"] == 1.0
+
+    for address in ADDRESSES:
+        record = state.nodes[address]
+        assert record.get("height") == 900001
+        assert record.get("city") == "Zurich"
+        assert record.get("last_geoip_update")
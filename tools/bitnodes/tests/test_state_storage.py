@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from state import BitnodesState, SQLiteNodeStore
+
+
+def crawl_row(height: int) -> list[Any]:
+    return [70016, "/Satoshi:27.0.0/", 1700000000, 1033, height] + [None] * 14 + [{"latency_ms": 12.5}]
+
+
+def open_state(tmp_path: Path, **kwargs: Any) -> BitnodesState:
+    return BitnodesState(tmp_path / "state", tmp_path / "24h", **kwargs)
+
+
+def test_sqlite_persists_in_place_edits(tmp_path: Path) -> None:
+    state = open_state(tmp_path, backend="sqlite")
+    state.update_successes({"203.0.113.10:8333": crawl_row(900000)})
+    state.save()
+
+    state.nodes["203.0.113.10:8333"]["city"] = "Zurich"
+
+    for _address, record in state.nodes.items():
+        record["geoip_host"] = "203.0.113.10"
+
+    state.save()
+    state.close()
+
+    reopened = open_state(tmp_path, backend="sqlite")
+    record = reopened.nodes["203.0.113.10:8333"]
+    assert record.get("city") == "Zurich"
+    assert record.get("geoip_host") == "203.0.113.10"
+    reopened.close()
+
+
+def test_sqlite_read_only_walk_keeps_nothing(tmp_path: Path) -> None:
+    state = open_state(tmp_path, backend="sqlite")
+    state.update_successes({f"203.0.113.{index}:8333": crawl_row(900000) for index in range(1, 50)})
+    state.save()
+    state.close()
+
+    store = SQLiteNodeStore(tmp_path / "state" / "nodes.sqlite3")
+    heights = [record.get("height") for _address, record in store.items()]
+    addresses = list(store.select_addresses())
+
+    assert heights == [900000] * 49
+    assert len(addresses) == 49
+    assert not store._pending
+    store.close()
+
+
+def test_journal_replays_after_crash(tmp_path: Path) -> None:
+    state = open_state(tmp_path, compact_min_entries=1000)
+    state.update_successes({"203.0.113.10:8333": crawl_row(900000)})
+    state.save()
+
+    state.update_successes({"203.0.113.10:8333": crawl_row(900001), "198.51.100.7:8333": crawl_row(900001)})
+    state.save()
+    assert state.meta["last_save_mode"] == "journal"
+
+    with state.journal_path.open("a", encoding="utf-8") as handle:
+        handle.write('{"address":"192.0.2.1:8333","record":{"hei')
+
+    reopened = open_state(tmp_path, compact_min_entries=1000)
+
+    assert set(reopened.nodes) == {"203.0.113.10:8333", "198.51.100.7:8333"}
+    assert reopened.nodes["203.0.113.10:8333"].get("height") == 900001
+
+
+def test_journal_for_another_snapshot_is_skipped(tmp_path: Path) -> None:
+    state = open_state(tmp_path, compact_min_entries=1000)
+    state.update_successes({"203.0.113.10:8333": crawl_row(900000)})
+    state.save()
+
+    state.update_successes({"203.0.113.10:8333": crawl_row(900001), "198.51.100.7:8333": crawl_row(900001)})
+    state.save()
+    stale_journal = state.journal_path.read_bytes()
+
+    state.update_successes({"203.0.113.10:8333": crawl_row(900002)})
+    state.nodes.pop("198.51.100.7:8333")
+    state.save(compact=True)
+    state.journal_path.write_bytes(stale_journal)
+
+    reopened = open_state(tmp_path, compact_min_entries=1000)
+
+    assert set(reopened.nodes) == {"203.0.113.10:8333"}
+    assert reopened.nodes["203.0.113.10:8333"].get("height") == 900002
+
+
+def test_sqlite_migrates_json_state_and_reloads(tmp_path: Path) -> None:
+    state = open_state(tmp_path)
+    state.update_successes({f"203.0.113.{index}:8333": crawl_row(900000 + index) for index in range(1, 6)})
+    state.save()
+    expected = {address: record.row() for address, record in state.nodes.items()}
+
+    migrated = open_state(tmp_path, backend="sqlite")
+    assert {address: record.row() for address, record in migrated.nodes.items()} == expected
+
+    migrated.update_successes({"203.0.113.1:8333": crawl_row(910000)})
+    migrated.save()
+    migrated.close()
+
+    reloaded = open_state(tmp_path, backend="sqlite")
+    assert len(reloaded.nodes) == 5
+    assert reloaded.nodes["203.0.113.1:8333"].get("height") == 910000
+    reloaded.close()
+
+    with pytest.raises(ValueError):
+        open_state(tmp_path)
@@ -3,13 +3,32 @@ from __future__ import annotations
 
 import argparse
 import gzip
+import importlib.util
 import json
 import re
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Mapping, MutableMapping
 
 
+TOOLS_DIR = Path(__file__).resolve().parents[1]
+
+
+def load_tool(filename: str) -> Any:
+    module_name = "zzx_bitnodes_" + Path(filename).stem
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, TOOLS_DIR / filename)
+        sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules[module_name])
+
+    return sys.modules[module_name]
+
+
+keyword_matcher = load_tool("keyword_matcher.py")
+
+
 SCHEMA = "zzx-bitnodes-threat-infrastructure-v2"
 SUMMARY_SCHEMA = "zzx-bitnodes-threat-infrastructure-summary-v2"
 
@@ -215,16 +234,6 @@ def boolish(value: Any) -> bool:
     }
 
 
-def keyword_hits(text: str, keywords: tuple[str, ...] | list[str]) -> list[str]:
-    hits: list[str] = []
-
-    for keyword in sorted(set(keywords), key=len, reverse=True):
-        if keyword.lower() in text:
-            hits.append(keyword)
-
-    return hits
-
-
 def text_blob(row: Mapping[str, Any]) -> str:
     keys = (
         "address",
@@ -413,8 +422,8 @@ def infrastructure_signals(row: Mapping[str, Any]) -> dict[str, Any]:
     policy_watch = flag(row, "policy_watch", "is_policy_watch_node", "sanctions_data.is_policy_watch")
     sanctioned = flag(row, "is_sanctioned_node", "sanctions_data.is_sanctioned")
 
-    infra_hits = keyword_hits(blob, HIGH_RISK_INFRA_HINTS)
-    strategic_hits = keyword_hits(blob, STRATEGIC_INFRA_HINTS)
+    infra_hits = keyword_matcher.keyword_hits(blob, HIGH_RISK_INFRA_HINTS)
+    strategic_hits = keyword_matcher.keyword_hits(blob, STRATEGIC_INFRA_HINTS)
 
     return {
         "high_risk_infra_hits": infra_hits,
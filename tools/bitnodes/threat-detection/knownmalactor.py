@@ -2,14 +2,35 @@
 from __future__ import annotations
 
 import argparse
+import bisect
 import hashlib
+import importlib.util
 import ipaddress
 import json
 import os
 import re
+import socket
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Mapping, MutableMapping
+from typing import Any, Callable, Mapping, MutableMapping
+
+
+SHARED_DIR = Path(__file__).resolve().parents[1]
+
+
+def load_tool(filename: str) -> Any:
+    module_name = "zzx_bitnodes_" + Path(filename).stem
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, SHARED_DIR / filename)
+        sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules[module_name])
+
+    return sys.modules[module_name]
+
+
+keyword_matcher = load_tool("keyword_matcher.py")
 
 
 SCHEMA = "zzx-bitnodes-known-malicious-actor-v1"
@@ -33,6 +54,12 @@ BITNODES_DATA = Path(os.environ.get("BITNODES_DATA", str(BITNODES_ROOT / "data")
 
 DEFAULT_WATCHLIST = TOOLS_DIR / "data" / "threatintel" / "known-malicious-actors.json"
 
+WATCHLIST_TABLES = ("hosts", "host_hashes", "asns", "providers", "organizations", "countries")
+
+ADDRESS_FAMILIES = {4: (socket.AF_INET, 32), 6: (socket.AF_INET6, 128)}
+
+WATCHLIST_CACHE: dict[str, tuple[tuple[int, int] | None, dict[str, Any]]] = {}
+
 MALICIOUS_HINTS = (
     "malware",
     "botnet",
@@ -255,37 +282,240 @@ def text_blob(row: Mapping[str, Any]) -> str:
     return " ".join(chunk for chunk in chunks if chunk).lower()
 
 
-def keyword_hits(text: str, keywords: tuple[str, ...]) -> list[str]:
-    hits = []
+class PrefixIndex:
+    __slots__ = ("tables", "lengths", "size")
 
-    for keyword in sorted(set(keywords), key=len, reverse=True):
-        if keyword.lower() in text:
-            hits.append(keyword)
+    def __init__(self) -> None:
+        self.tables: dict[int, dict[int, dict[int, tuple[str, Any]]]] = {4: {}, 6: {}}
+        self.lengths: dict[int, list[int]] = {4: [], 6: []}
+        self.size = 0
 
-    return hits
+    def __len__(self) -> int:
+        return self.size
 
+    def add(self, version: int, value: int, prefixlen: int, item: Any) -> None:
+        family, bits = ADDRESS_FAMILIES[version]
+        tables = self.tables[version]
 
-def load_watchlist(path: Path) -> dict[str, Any]:
-    raw = read_json(path, fallback={})
+        if prefixlen not in tables:
+            tables[prefixlen] = {}
+            self.lengths[version] = sorted(tables, reverse=True)
+
+        table = tables[prefixlen]
+        key = value >> (bits - prefixlen)
+
+        if key not in table:
+            self.size += 1
+
+        network = socket.inet_ntop(family, (key << (bits - prefixlen)).to_bytes(bits // 8, "big"))
+        table[key] = (f"{network}/{prefixlen}", item)
+
+    def lookup(self, version: int, value: int) -> tuple[str, Any] | None:
+        if version == 6 and value >> 32 == 0xFFFF and self.tables[4]:
+            version = 4
+            value &= 0xFFFFFFFF
+
+        bits = ADDRESS_FAMILIES[version][1]
+        tables = self.tables[version]
+
+        for length in self.lengths[version]:
+            entry = tables[length].get(value >> (bits - length))
+
+            if entry is not None:
+                return entry
+
+        return None
+
+    def lookup_host(self, host: str) -> tuple[str, Any] | None:
+        if not self.size or "/" in host:
+            return None
+
+        prefix = parse_prefix(host)
+
+        if prefix is None:
+            return None
+
+        return self.lookup(prefix[0], prefix[1])
+
+
+class AsnRangeIndex:
+    __slots__ = ("starts", "ends", "reach", "labels", "items")
+
+    def __init__(self, ranges: list[tuple[int, int, str, Any]]) -> None:
+        ranges.sort(key=lambda entry: (entry[0], entry[1]))
+        self.starts = [entry[0] for entry in ranges]
+        self.ends = [entry[1] for entry in ranges]
+        self.labels = [entry[2] for entry in ranges]
+        self.items = [entry[3] for entry in ranges]
+        self.reach: list[int] = []
+
+        for end in self.ends:
+            self.reach.append(max(end, self.reach[-1]) if self.reach else end)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def lookup(self, number: int) -> tuple[str, Any] | None:
+        position = bisect.bisect_right(self.starts, number) - 1
+        best = -1
+
+        while position >= 0 and self.reach[position] >= number:
+            if self.ends[position] >= number and (
+                best < 0 or self.ends[position] - self.starts[position] < self.ends[best] - self.starts[best]
+            ):
+                best = position
+
+            position -= 1
+
+        if best < 0:
+            return None
+
+        return self.labels[best], self.items[best]
+
+
+def watchlist_entries(raw: Any, keys: tuple[str, ...]) -> list[tuple[str, Any]]:
+    if isinstance(raw, Mapping):
+        return [(str(key), item) for key, item in raw.items()]
+
+    if not isinstance(raw, list):
+        return []
+
+    entries: list[tuple[str, Any]] = []
+
+    for item in raw:
+        if not isinstance(item, Mapping):
+            continue
+
+        for key in keys:
+            if item.get(key):
+                entries.append((str(item[key]), item))
+                break
+
+    return entries
+
+
+def parse_prefix(text: str) -> tuple[int, int, int] | None:
+    address, _, length = text.strip().partition("/")
+    version = 6 if ":" in address else 4
+    family, bits = ADDRESS_FAMILIES[version]
+
+    try:
+        value = int.from_bytes(socket.inet_pton(family, address), "big")
+        prefixlen = int(length) if length else bits
+    except (OSError, ValueError):
+        return None
+
+    if not 0 <= prefixlen <= bits:
+        return None
+
+    return version, value, prefixlen
 
+
+def build_prefix_index(raw: Any) -> PrefixIndex:
+    index = PrefixIndex()
+
+    for key, item in watchlist_entries(raw, ("cidr", "prefix", "network")):
+        prefix = parse_prefix(key)
+
+        if prefix is not None:
+            index.add(*prefix, item)
+
+    return index
+
+
+def parse_asn_number(value: Any) -> int | None:
+    text = normalize_asn(value)
+
+    if not text:
+        return None
+
+    return int(text[2:])
+
+
+def parse_asn_range(key: str, item: Any) -> tuple[int, int] | None:
+    if isinstance(item, Mapping) and item.get("start") is not None:
+        start = parse_asn_number(item.get("start"))
+        end = parse_asn_number(item.get("end") or item.get("start"))
+    else:
+        first, _, last = key.strip().partition("-")
+        start = parse_asn_number(first)
+        end = parse_asn_number(last or first)
+
+    if start is None or end is None:
+        return None
+
+    return min(start, end), max(start, end)
+
+
+def build_asn_range_index(raw: Any) -> AsnRangeIndex:
+    ranges: list[tuple[int, int, str, Any]] = []
+
+    for key, item in watchlist_entries(raw, ("range", "start")):
+        bounds = parse_asn_range(key, item)
+
+        if bounds is None:
+            continue
+
+        ranges.append((bounds[0], bounds[1], f"AS{bounds[0]}-AS{bounds[1]}", item))
+
+    return AsnRangeIndex(ranges)
+
+
+def build_watchlist(raw: Any) -> dict[str, Any]:
     if not isinstance(raw, Mapping):
+        raw = {}
+
+    watchlist: dict[str, Any] = {
+        name: raw.get(name, {}) if isinstance(raw.get(name), Mapping) else {}
+        for name in WATCHLIST_TABLES
+    }
+
+    watchlist["cidr_index"] = build_prefix_index(raw.get("cidrs"))
+    watchlist["asn_range_index"] = build_asn_range_index(raw.get("asn_ranges"))
+    return watchlist
+
+
+def load_watchlist(path: Path) -> dict[str, Any]:
+    try:
+        stat = path.stat()
+        signature: tuple[int, int] | None = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        signature = None
+
+    cached = WATCHLIST_CACHE.get(str(path))
+
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    watchlist = build_watchlist(read_json(path, fallback={}))
+    WATCHLIST_CACHE[str(path)] = (signature, watchlist)
+    return watchlist
+
+
+def watchlist_match(kind: str, value: str, item: Any) -> dict[str, Any] | None:
+    if isinstance(item, Mapping):
         return {
-            "hosts": {},
-            "host_hashes": {},
-            "asns": {},
-            "providers": {},
-            "organizations": {},
-            "countries": {},
+            "match_type": kind,
+            "value": value,
+            "label": clean(item.get("label")) or value,
+            "severity": clean(item.get("severity")) or "unknown",
+            "confidence": clean(item.get("confidence")) or "unknown",
+            "source": clean(item.get("source")) or "local_watchlist",
+            "reason": clean(item.get("reason")) or "",
         }
 
-    return {
-        "hosts": raw.get("hosts", {}) if isinstance(raw.get("hosts"), Mapping) else {},
-        "host_hashes": raw.get("host_hashes", {}) if isinstance(raw.get("host_hashes"), Mapping) else {},
-        "asns": raw.get("asns", {}) if isinstance(raw.get("asns"), Mapping) else {},
-        "providers": raw.get("providers", {}) if isinstance(raw.get("providers"), Mapping) else {},
-        "organizations": raw.get("organizations", {}) if isinstance(raw.get("organizations"), Mapping) else {},
-        "countries": raw.get("countries", {}) if isinstance(raw.get("countries"), Mapping) else {},
-    }
+    if item:
+        return {
+            "match_type": kind,
+            "value": value,
+            "label": str(item),
+            "severity": "unknown",
+            "confidence": "unknown",
+            "source": "local_watchlist",
+            "reason": "",
+        }
+
+    return None
 
 
 def lookup_watchlist(row: Mapping[str, Any], watchlist: Mapping[str, Any]) -> list[dict[str, Any]]:
@@ -312,27 +542,31 @@ def lookup_watchlist(row: Mapping[str, Any], watchlist: Mapping[str, Any]) -> li
             continue
 
         item = table.get(value) or table.get(value.upper()) or table.get(value.lower())
+        match = watchlist_match(kind, value, item)
+
+        if match is not None:
+            matches.append(match)
+
+    kinds = {match["match_type"] for match in matches}
+    cidr_index = watchlist.get("cidr_index")
+
+    if host and "host" not in kinds and isinstance(cidr_index, PrefixIndex):
+        entry = cidr_index.lookup_host(host)
+        match = watchlist_match("cidr", host, entry[1]) if entry is not None else None
+
+        if match is not None:
+            match["prefix"] = entry[0]
+            matches.append(match)
+
+    asn_range_index = watchlist.get("asn_range_index")
+
+    if asn and "asn" not in kinds and isinstance(asn_range_index, AsnRangeIndex) and len(asn_range_index):
+        entry = asn_range_index.lookup(int(asn[2:]))
+        match = watchlist_match("asn_range", asn, entry[1]) if entry is not None else None
 
-        if isinstance(item, Mapping):
-            matches.append({
-                "match_type": kind,
-                "value": value,
-                "label": clean(item.get("label")) or value,
-                "severity": clean(item.get("severity")) or "unknown",
-                "confidence": clean(item.get("confidence")) or "unknown",
-                "source": clean(item.get("source")) or "local_watchlist",
-                "reason": clean(item.get("reason")) or "",
-            })
-        elif item:
-            matches.append({
-                "match_type": kind,
-                "value": value,
-                "label": str(item),
-                "severity": "unknown",
-                "confidence": "unknown",
-                "source": "local_watchlist",
-                "reason": "",
-            })
+        if match is not None:
+            match["range"] = entry[0]
+            matches.append(match)
 
     return matches
 
@@ -343,9 +577,9 @@ def malactor_metadata(row: Mapping[str, Any], watchlist: Mapping[str, Any] | Non
     blob = text_blob(row)
     watchlist_matches = lookup_watchlist(row, watchlist)
 
-    malicious_hits = keyword_hits(blob, MALICIOUS_HINTS)
-    severe_hits = keyword_hits(blob, SEVERE_HINTS)
-    privacy_hits = keyword_hits(blob, PRIVACY_INFRA_HINTS)
+    malicious_hits = keyword_matcher.keyword_hits(blob, MALICIOUS_HINTS)
+    severe_hits = keyword_matcher.keyword_hits(blob, SEVERE_HINTS)
+    privacy_hits = keyword_matcher.keyword_hits(blob, PRIVACY_INFRA_HINTS)
 
     suspected_apt = boolish(row.get("suspected_apt_related") or deep_get(row, "apt_attribution.suspected_apt_related"))
     suspected_tag = boolish(row.get("suspected_threat_actor_group_related") or deep_get(row, "tag_attribution.suspected_threat_actor_group_related"))
@@ -457,20 +691,29 @@ def enrich_node(node: MutableMapping[str, Any], watchlist: Mapping[str, Any] | N
     return node
 
 
-def enrich_nodes(nodes: Any, context: dict[str, Any] | None = None) -> Any:
+def node_enricher(context: dict[str, Any] | None = None) -> Callable[[MutableMapping[str, Any]], MutableMapping[str, Any]]:
     context = context or {}
     watchlist_path = Path(context.get("knownmalactor_watchlist", DEFAULT_WATCHLIST))
     watchlist = load_watchlist(watchlist_path)
 
+    def enrich(node: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
+        return enrich_node(node, watchlist=watchlist)
+
+    return enrich
+
+
+def enrich_nodes(nodes: Any, context: dict[str, Any] | None = None) -> Any:
+    enrich = node_enricher(context)
+
     if isinstance(nodes, list):
         return [
-            enrich_node(dict(node), watchlist=watchlist) if isinstance(node, Mapping) else node
+            enrich(dict(node)) if isinstance(node, Mapping) else node
             for node in nodes
         ]
 
     if isinstance(nodes, Mapping):
         return {
-            key: enrich_node(dict(value), watchlist=watchlist) if isinstance(value, Mapping) else value
+            key: enrich(dict(value)) if isinstance(value, Mapping) else value
             for key, value in nodes.items()
         }
 
@@ -3,11 +3,30 @@ from __future__ import annotations
 
 import argparse
 import gzip
+import importlib.util
 import json
 import re
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Mapping, MutableMapping
+from typing import Any, Callable, Mapping, MutableMapping
+
+
+TOOLS_DIR = Path(__file__).resolve().parents[1]
+
+
+def load_tool(filename: str) -> Any:
+    module_name = "zzx_bitnodes_" + Path(filename).stem
+
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, TOOLS_DIR / filename)
+        sys.modules[module_name] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules[module_name])
+
+    return sys.modules[module_name]
+
+
+keyword_matcher = load_tool("keyword_matcher.py")
 
 
 SCHEMA = "zzx-bitnodes-tag-attribution-v2"
@@ -274,14 +293,6 @@ def boolish(value: Any) -> bool:
     }
 
 
-def keyword_hits(text: str, keywords: tuple[str, ...]) -> list[str]:
-    return [
-        keyword
-        for keyword in sorted(set(keywords), key=len, reverse=True)
-        if keyword.lower() in text
-    ]
-
-
 def canonical_group(name: str) -> str:
     raw = clean(name)
 
@@ -512,9 +523,9 @@ def tag_attribution_metadata(row: Mapping[str, Any]) -> dict[str, Any]:
 
     explicit_groups = sorted(set([*trusted_groups, *feed_groups]), key=str.lower)
 
-    risk_hits = keyword_hits(blob, RISK_INFRA_HINTS)
-    privacy_hits = keyword_hits(blob, PRIVACY_INFRA_HINTS)
-    tactical_hits = keyword_hits(blob, TACTICAL_HINTS)
+    risk_hits = keyword_matcher.keyword_hits(blob, RISK_INFRA_HINTS)
+    privacy_hits = keyword_matcher.keyword_hits(blob, PRIVACY_INFRA_HINTS)
+    tactical_hits = keyword_matcher.keyword_hits(blob, TACTICAL_HINTS)
 
     threat_meta = deep_get(row, "threat_infrastructure")
     threat_score = 0.0
@@ -703,6 +714,10 @@ def enrich_node(node: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
     return node
 
 
+def node_enricher(context: dict[str, Any] | None = None) -> Callable[[MutableMapping[str, Any]], MutableMapping[str, Any]]:
+    return enrich_node
+
+
 def enrich_nodes(nodes: Any, context: dict[str, Any] | None = None) -> Any:
     if isinstance(nodes, list):
         return [enrich_node(dict(node)) if isinstance(node, Mapping) else node for node in nodes]
@@ -2,13 +2,16 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import contextlib
 import gzip
+import hashlib
 import json
 import socket
 import subprocess
 import sys
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
@@ -19,6 +22,11 @@ try:
 except Exception:
     dns = None  # type: ignore
 
+try:
+    import resource
+except Exception:
+    resource = None  # type: ignore
+
 
 APP_ROOT = Path(__file__).resolve().parents[2]
 TOOLS_DIR = APP_ROOT / "tools" / "bitnodes"
@@ -30,14 +38,31 @@ for import_path in (TOOLS_DIR, MAP_TOOLS_DIR, GEOLOC_TOOLS_DIR):
         sys.path.insert(0, str(import_path))
 
 
-from bitcoin_p2p import getaddr, handshake, version_info_to_bitnodes_array
-from state import BitnodesState, normalize_address, utc_iso, utc_now
+from bitcoin_p2p import (
+    PeerSessionResult,
+    peer_session,
+    peer_session_async,
+    version_info_to_bitnodes_array,
+)
+from scheduler import DEFAULT_SCHEDULER_MODE, SCHEDULER_MODES
+from state import (
+    DEFAULT_STATE_BACKEND,
+    STATE_BACKENDS,
+    BitnodesState,
+    normalize_address,
+    row_from_record,
+    to_int,
+    utc_iso,
+    utc_now,
+)
 
 
 try:
-    from geoip import enrich_snapshot_payload
+    from geoip import GeoIPLookup, enrich_node_array, extract_host_from_node
 except Exception:
-    enrich_snapshot_payload = None  # type: ignore
+    GeoIPLookup = None  # type: ignore
+    enrich_node_array = None  # type: ignore
+    extract_host_from_node = None  # type: ignore
 
 
 BITNODES_ROOT = APP_ROOT / "bitcoin" / "bitnodes"
@@ -75,6 +100,7 @@ DEFAULT_EXPORT_DIR = API_DIR / "data"
 DEFAULT_REGISTRY_DIR = DATA_DIR / "registry" / SOURCE
 DEFAULT_REGISTRY_LATEST_DIR = DEFAULT_REGISTRY_DIR / "latest"
 
+DEFAULT_GEOIP_TTL = 30 * 86400
 DEFAULT_CITY_DB = DEFAULT_GEOIP_DIR / "dbip-city-lite.mmdb"
 DEFAULT_ASN_DB = DEFAULT_GEOIP_DIR / "dbip-asn-lite.mmdb"
 DEFAULT_COUNTRY_DB = DEFAULT_GEOIP_DIR / "dbip-country-lite.mmdb"
@@ -82,6 +108,10 @@ DEFAULT_COUNTRY_DB = DEFAULT_GEOIP_DIR / "dbip-country-lite.mmdb"
 DEFAULT_MAX_PUBLIC_JSON_BYTES = 24_000_000
 DEFAULT_DATAPLANE_DATABASE = "zzx_bitnodes"
 
+CRAWL_ENGINES = ("threads", "asyncio")
+DEFAULT_CRAWL_ENGINE = "threads"
+DEFAULT_ASYNC_CONCURRENCY = 4096
+
 ENRICH = TOOLS_DIR / "enrich.py"
 AGGREGATE = TOOLS_DIR / "aggregate.py"
 EXPORT = TOOLS_DIR / "export.py"
@@ -113,6 +143,13 @@ def mkdir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
+def profile_stage(profiler: Any, name: str, *, nodes_in: int | None = None) -> Any:
+    if profiler is None:
+        return contextlib.nullcontext({})
+
+    return profiler.stage("crawl", name, nodes_in=nodes_in, scope="process")
+
+
 def py(script: Path, *args: str) -> list[str]:
     return [sys.executable, str(script), *args]
 
@@ -457,69 +494,229 @@ def discover_dns(limit: int, timeout: float = 5.0) -> list[str]:
     ]
 
 
-def getaddr_from_node(address: str, timeout: float) -> list[str]:
+def raise_open_file_limit(concurrency: int) -> None:
+    if resource is None:
+        return
+
     try:
-        return [
-            normalized
-            for item in getaddr(address, timeout=timeout)
-            for normalized in [normalize_address(item)]
-            if normalized
-        ]
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        wanted = int(concurrency) + 256
+
+        if soft != resource.RLIM_INFINITY and soft < wanted:
+            target = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
     except Exception:
-        return []
+        pass
+
+
+def crawl_result_from_info(info: Any, latency_ms: float) -> tuple[str, list[Any]] | None:
+    if not info.connected:
+        return None
+
+    row = version_info_to_bitnodes_array(info)
+
+    while len(row) < 20:
+        row.append(None)
+
+    metadata = row[19] if isinstance(row[19], dict) else {}
+    metadata["latency_ms"] = latency_ms
+    metadata["reachable"] = True
+    metadata["reachable_now"] = True
+    metadata["reachable_24h"] = True
+    metadata["network"] = info.network
+    metadata["is_tor"] = info.network == "tor"
+    metadata["is_i2p"] = info.network == "i2p"
+    metadata["is_ipv4"] = info.network == "ipv4"
+    metadata["is_ipv6"] = info.network == "ipv6"
+    metadata["is_cjdns"] = info.network == "cjdns"
+    metadata["last_seen"] = utc_now()
+    metadata["crawler"] = SOURCE
+    metadata["source"] = SOURCE
+    metadata["crawler_version"] = "zzxbitnodes-enhanced-v4"
+    metadata["crawl_observed_at"] = iso_now()
+
+    row[19] = metadata
+
+    normalized = normalize_address(info.address)
+
+    if not normalized:
+        return None
+
+    return normalized, row
+
+
+def session_outcome(result: PeerSessionResult | None) -> tuple[tuple[str, list[Any]] | None, list[str]]:
+    if result is None:
+        return None, []
+
+    discovered = [
+        normalized
+        for item in result.addresses
+        for normalized in [normalize_address(item)]
+        if normalized
+    ]
+
+    try:
+        crawled = crawl_result_from_info(result.info, result.latency_ms or 0.0)
+    except Exception:
+        crawled = None
+
+    return crawled, discovered
+
+
+def run_session(address: str, timeout: float, harvest: bool, deadline: float | None = None) -> PeerSessionResult | None:
+    try:
+        return peer_session(address, timeout=timeout, harvest=harvest, deadline=deadline)
+    except Exception:
+        return None
+
+
+async def run_session_async(
+    address: str,
+    timeout: float,
+    semaphore: asyncio.Semaphore,
+    harvest: bool,
+    deadline: float | None = None,
+) -> PeerSessionResult | None:
+    async with semaphore:
+        try:
+            return await peer_session_async(address, timeout=timeout, harvest=harvest, deadline=deadline)
+        except Exception:
+            return None
+
+
+async def session_results_async(
+    addresses: list[str],
+    timeout: float,
+    concurrency: int,
+    harvest: bool,
+    deadline: float | None = None,
+) -> list[PeerSessionResult | None]:
+    semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+
+    results = await asyncio.gather(
+        *(run_session_async(address, timeout, semaphore, harvest, deadline) for address in addresses),
+        return_exceptions=True,
+    )
 
+    return [result if isinstance(result, PeerSessionResult) else None for result in results]
 
-def expand_getaddr(
+
+def session_results(
+    addresses: list[str],
+    timeout: float,
+    workers: int,
+    *,
+    harvest: bool,
+    engine: str = DEFAULT_CRAWL_ENGINE,
+    concurrency: int = DEFAULT_ASYNC_CONCURRENCY,
+    deadline: float | None = None,
+) -> list[PeerSessionResult | None]:
+    if engine == "asyncio":
+        raise_open_file_limit(concurrency)
+        return asyncio.run(session_results_async(addresses, timeout, concurrency, harvest, deadline))
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return list(executor.map(lambda address: run_session(address, timeout, harvest, deadline), addresses))
+
+
+def session_batch(
+    addresses: list[str],
+    timeout: float,
+    workers: int,
+    *,
+    harvest: bool = True,
+    engine: str = DEFAULT_CRAWL_ENGINE,
+    concurrency: int = DEFAULT_ASYNC_CONCURRENCY,
+    deadline: float | None = None,
+) -> tuple[dict[str, list[Any]], list[str], list[str]]:
+    successes: dict[str, list[Any]] = {}
+    failures: list[str] = []
+    discovered: list[str] = []
+
+    results = session_results(
+        addresses,
+        timeout,
+        workers,
+        harvest=harvest,
+        engine=engine,
+        concurrency=concurrency,
+        deadline=deadline,
+    )
+
+    for requested_address, result in zip(addresses, results):
+        crawled, found = session_outcome(result)
+        discovered.extend(found)
+
+        if not crawled:
+            normalized_failure = normalize_address(requested_address)
+            if normalized_failure:
+                failures.append(normalized_failure)
+            continue
+
+        address, row = crawled
+
+        if address:
+            successes[address] = row
+
+    return successes, failures, discovered
+
+
+def expand_sessions(
     state: BitnodesState,
     seed_addresses: list[str],
     limit: int,
     timeout: float,
     workers: int,
     rounds: int,
-) -> list[str]:
+    *,
+    engine: str = DEFAULT_CRAWL_ENGINE,
+    concurrency: int = DEFAULT_ASYNC_CONCURRENCY,
+    deadline: float | None = None,
+    profiler: Any = None,
+) -> tuple[list[str], dict[str, list[Any]], list[str]]:
     state.add_to_queue(seed_addresses)
     discovered_total: list[str] = []
+    successes: dict[str, list[Any]] = {}
+    failures: list[str] = []
+    batch_width = concurrency if engine == "asyncio" else workers
 
     for round_index in range(rounds):
         if len(state.nodes) + len(state.queue) >= limit:
             break
 
-        batch = state.pop_batch(max(1, workers))
+        batch = state.pop_batch(max(1, batch_width))
 
         if not batch:
             break
 
-        discovered_round: list[str] = []
-
-        with ThreadPoolExecutor(max_workers=workers) as executor:
-            futures = [executor.submit(getaddr_from_node, address, timeout) for address in batch]
-
-            for future in as_completed(futures):
-                try:
-                    found = future.result()
-                except Exception:
-                    found = []
-
-                for address in found:
-                    normalized = normalize_address(address)
-
-                    if not normalized:
-                        continue
-
-                    discovered_round.append(normalized)
+        with profile_stage(profiler, "getaddr", nodes_in=len(batch)) as span:
+            round_successes, round_failures, found = session_batch(
+                batch,
+                timeout,
+                workers,
+                harvest=True,
+                engine=engine,
+                concurrency=concurrency,
+                deadline=deadline,
+            )
+            span["nodes_out"] = len(round_successes)
 
-                    if len(discovered_total) + len(discovered_round) >= limit:
-                        break
+        successes.update(round_successes)
+        failures.extend(round_failures)
 
-                if len(discovered_total) + len(discovered_round) >= limit:
-                    break
+        room = max(0, limit - len(discovered_total))
+        discovered_round = found[:room]
 
         state.add_to_queue(discovered_round)
         discovered_total.extend(discovered_round)
 
         printf(
-            f"[getaddr] round={round_index + 1} "
+            f"[session] round={round_index + 1} "
+            f"engine={engine} "
             f"batch={len(batch)} "
+            f"reachable={len(round_successes)} "
+            f"failed={len(round_failures)} "
             f"discovered={len(set(discovered_round))} "
             f"queue={len(state.queue)} "
             f"known={len(state.nodes)}"
@@ -528,85 +725,7 @@ def expand_getaddr(
         if not discovered_round:
             break
 
-    return sorted(set(discovered_total))[:limit]
-
-
-def crawl_address(address: str, timeout: float) -> tuple[str, list[Any]] | None:
-    try:
-        start = time.perf_counter()
-        info = handshake(address, timeout=timeout)
-        latency_ms = round((time.perf_counter() - start) * 1000.0, 2)
-
-        if not info.connected:
-            return None
-
-        row = version_info_to_bitnodes_array(info)
-
-        while len(row) < 20:
-            row.append(None)
-
-        metadata = row[19] if isinstance(row[19], dict) else {}
-        metadata["latency_ms"] = latency_ms
-        metadata["reachable"] = True
-        metadata["reachable_now"] = True
-        metadata["reachable_24h"] = True
-        metadata["network"] = info.network
-        metadata["is_tor"] = info.network == "tor"
-        metadata["is_i2p"] = info.network == "i2p"
-        metadata["is_ipv4"] = info.network == "ipv4"
-        metadata["is_ipv6"] = info.network == "ipv6"
-        metadata["is_cjdns"] = info.network == "cjdns"
-        metadata["last_seen"] = utc_now()
-        metadata["crawler"] = SOURCE
-        metadata["source"] = SOURCE
-        metadata["crawler_version"] = "zzxbitnodes-enhanced-v4"
-        metadata["crawl_observed_at"] = iso_now()
-
-        row[19] = metadata
-
-        normalized = normalize_address(info.address)
-
-        if not normalized:
-            return None
-
-        return normalized, row
-
-    except (socket.timeout, TimeoutError, OSError, ValueError):
-        return None
-    except Exception:
-        return None
-
-
-def crawl_batch(addresses: list[str], timeout: float, workers: int) -> tuple[dict[str, list[Any]], list[str]]:
-    successes: dict[str, list[Any]] = {}
-    failures: list[str] = []
-
-    with ThreadPoolExecutor(max_workers=workers) as executor:
-        future_map = {
-            executor.submit(crawl_address, address, timeout): address
-            for address in addresses
-        }
-
-        for future in as_completed(future_map):
-            requested_address = future_map[future]
-
-            try:
-                result = future.result()
-            except Exception:
-                result = None
-
-            if not result:
-                normalized_failure = normalize_address(requested_address)
-                if normalized_failure:
-                    failures.append(normalized_failure)
-                continue
-
-            address, row = result
-
-            if address:
-                successes[address] = row
-
-    return successes, failures
+    return sorted(set(discovered_total))[:limit], successes, failures
 
 
 def build_changes(state_before: dict[str, dict[str, Any]], state_after: dict[str, dict[str, Any]]) -> dict[str, Any]:
@@ -669,8 +788,24 @@ def build_changes(state_before: dict[str, dict[str, Any]], state_after: dict[str
     }
 
 
+def build_tracked_changes(state: BitnodesState) -> dict[str, Any]:
+    baseline, previous = state.tracked_changes()
+    before = {address: values for address, values in previous.items() if values is not None}
+    after: dict[str, Any] = {}
+
+    for address in previous:
+        record = state.nodes.get(address)
+
+        if record is not None:
+            after[address] = record
+
+    changes = build_changes(state_before=before, state_after=after)
+    changes["retained_count"] = baseline - changes["removed_count"]
+    return changes
+
+
 def geoip_available(geoip_enabled: bool, city_db: Path, asn_db: Path, country_db: Path) -> bool:
-    if not geoip_enabled or enrich_snapshot_payload is None:
+    if not geoip_enabled or GeoIPLookup is None:
         return False
 
     if city_db.exists() and asn_db.exists():
@@ -684,51 +819,105 @@ def geoip_available(geoip_enabled: bool, city_db: Path, asn_db: Path, country_db
     return False
 
 
-def enrich_state_records(state: BitnodesState, geoip_enabled: bool, city_db: Path, asn_db: Path, country_db: Path) -> None:
-    if not geoip_available(geoip_enabled, city_db, asn_db, country_db):
-        return
+def geoip_db_version(lookup: Any) -> str:
+    digests = getattr(lookup, "db_digests", None) or {}
+    text = "|".join(f"{family}:{digests[family]}" for family in sorted(digests))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16] if text else ""
 
-    payload = {"nodes": state.to_bitnodes_nodes("all")}
 
-    payload = enrich_snapshot_payload(
-        payload,
-        city_db=city_db,
-        asn_db=asn_db,
-        country_db=country_db,
-        enabled=True,
-    )
+def geoip_refresh_reason(record: Any, host: str, version: str, now: int, ttl: int) -> str:
+    updated = to_int(record.get("last_geoip_update"), 0) or 0
+
+    if not updated:
+        return "new"
+
+    if str(record.get("geoip_host") or "") != host:
+        return "host"
+
+    if str(record.get("geoip_db_version") or "") != version:
+        return "db_version"
+
+    if ttl <= 0 or now - updated >= ttl:
+        return "ttl"
+
+    return ""
+
+
+def enrich_state_records(
+    state: BitnodesState,
+    geoip_enabled: bool,
+    city_db: Path,
+    asn_db: Path,
+    country_db: Path,
+    ttl: int = DEFAULT_GEOIP_TTL,
+) -> dict[str, Any]:
+    if not geoip_available(geoip_enabled, city_db, asn_db, country_db):
+        return {"enabled": False}
 
-    enriched_nodes = payload.get("nodes", {})
     now = utc_now()
+    started = time.time()
 
-    if not isinstance(enriched_nodes, dict):
-        return
+    with GeoIPLookup(city_db=city_db, asn_db=asn_db, country_db=country_db, enabled=True) as lookup:
+        version = geoip_db_version(lookup)
+        reasons: dict[str, int] = {}
+        pending: list[tuple[str, str]] = []
+        checked = 0
 
-    for address, values in enriched_nodes.items():
-        record = state.nodes.get(address)
+        for address, record in state.nodes.items():
+            checked += 1
+            host = extract_host_from_node({"hostname": record.get("hostname"), "address": address})
+            reason = geoip_refresh_reason(record, host, version, now, ttl)
 
-        if not record:
-            continue
+            if reason:
+                reasons[reason] = reasons.get(reason, 0) + 1
+                pending.append((address, host))
 
-        row = list(values) if isinstance(values, list) else []
+        for address, host in pending:
+            record = state.nodes.get(address)
 
-        while len(row) < 20:
-            row.append(None)
+            if not record:
+                continue
+
+            row = enrich_node_array(address, row_from_record(record), lookup)
+
+            record["city"] = row[6]
+            record["country"] = row[7]
+            record["latitude"] = row[8]
+            record["longitude"] = row[9]
+            record["timezone"] = row[10]
+            record["asn"] = row[11]
+            record["organization"] = row[12]
+            record["provider"] = row[13]
+            record["county"] = row[14]
+            record["zip"] = row[15]
+            record["w3w"] = row[16]
+            record["geohash"] = row[17]
+            record["asn_location"] = row[18]
+            record["last_geoip_update"] = now
+            record["geoip_db_version"] = version
+            record["geoip_host"] = host
+            state.store_record(address, record)
+
+    skipped = checked - len(pending)
+    report = {
+        "enabled": True,
+        "updated_at": now,
+        "db_version": version,
+        "ttl": ttl,
+        "checked": checked,
+        "geolocated": len(pending),
+        "skipped": skipped,
+        "skip_ratio": round(skipped / checked, 4) if checked else 0.0,
+        "reasons": reasons,
+        "seconds": round(time.time() - started, 3),
+    }
 
-        record["city"] = row[6]
-        record["country"] = row[7]
-        record["latitude"] = row[8]
-        record["longitude"] = row[9]
-        record["timezone"] = row[10]
-        record["asn"] = row[11]
-        record["organization"] = row[12]
-        record["provider"] = row[13]
-        record["county"] = row[14]
-        record["zip"] = row[15]
-        record["w3w"] = row[16]
-        record["geohash"] = row[17]
-        record["asn_location"] = row[18]
-        record["last_geoip_update"] = now
+    printf(
+        f"[geoip] checked={checked} geolocated={len(pending)} skipped={skipped} "
+        f"skip_ratio={report['skip_ratio']:.2%} db={version or 'none'}"
+    )
+
+    return report
 
 
 def export_state_direct(
@@ -1117,6 +1306,14 @@ def crawl_once(
     max_segment_bytes: int,
     git_push: bool,
     strict: bool = False,
+    engine: str = DEFAULT_CRAWL_ENGINE,
+    concurrency: int = DEFAULT_ASYNC_CONCURRENCY,
+    deadline: float | None = None,
+    state_journal: bool = True,
+    state_backend: str = DEFAULT_STATE_BACKEND,
+    scheduler: str = DEFAULT_SCHEDULER_MODE,
+    geoip_ttl: int = DEFAULT_GEOIP_TTL,
+    profiler: Any = None,
 ) -> dict[str, Any]:
     ensure_layout(SOURCE)
 
@@ -1132,49 +1329,98 @@ def crawl_once(
     ):
         mkdir(path)
 
-    state = BitnodesState(state_dir=state_dir, snapshot_24h_dir=snapshot_24h_dir, source=SOURCE)
-    before = json.loads(json.dumps(state.nodes, default=str))
+    state = BitnodesState(
+        state_dir=state_dir,
+        snapshot_24h_dir=snapshot_24h_dir,
+        source=SOURCE,
+        journal=state_journal,
+        backend=state_backend,
+    )
+    state.track_changes()
 
     now = utc_now()
     dns_limit = min(limit, max(dns_seed_limit, batch_size, workers * 4, 1000))
-    seed_addresses = discover_dns(limit=dns_limit, timeout=timeout)
 
-    expanded_seed_addresses = seed_state_before_crawl(
-        state=state,
-        seed_addresses=seed_addresses,
-        archive_dir=archive_dir,
-        seeder_dir=seeder_dir,
-        output_dir=output_dir,
-        state_dir=state_dir,
-        snapshot_root=SNAPSHOTS_ROOT,
-        limit=limit,
-        replay_archives=replay_archives,
-        archive_replay_files=archive_replay_files,
-    )
+    with profile_stage(profiler, "dns") as span:
+        seed_addresses = discover_dns(limit=dns_limit, timeout=timeout)
+        span["nodes_out"] = len(seed_addresses)
+
+    with profile_stage(profiler, "seed", nodes_in=len(seed_addresses)) as span:
+        expanded_seed_addresses = seed_state_before_crawl(
+            state=state,
+            seed_addresses=seed_addresses,
+            archive_dir=archive_dir,
+            seeder_dir=seeder_dir,
+            output_dir=output_dir,
+            state_dir=state_dir,
+            snapshot_root=SNAPSHOTS_ROOT,
+            limit=limit,
+            replay_archives=replay_archives,
+            archive_replay_files=archive_replay_files,
+        )
+        span["nodes_out"] = len(expanded_seed_addresses)
 
-    discovered = expand_getaddr(
+    discovered, successes, failures = expand_sessions(
         state=state,
         seed_addresses=expanded_seed_addresses,
         limit=limit,
         timeout=timeout,
         workers=workers,
         rounds=getaddr_rounds,
+        engine=engine,
+        concurrency=concurrency,
+        deadline=deadline,
+        profiler=profiler,
     )
 
-    candidates = state.all_candidate_addresses(
-        seed_addresses=expanded_seed_addresses + discovered,
-        limit=limit,
-    )
+    session_count = len(successes) + len(failures)
+    visited = set(successes) | set(failures)
+
+    candidates = [
+        address
+        for address in state.all_candidate_addresses(
+            seed_addresses=expanded_seed_addresses + discovered,
+            limit=limit,
+            prioritize=scheduler == "priority",
+            now=now,
+        )
+        if address not in visited
+    ]
 
     if batch_size > 0:
         candidates = candidates[:batch_size]
 
-    successes, failures = crawl_batch(addresses=candidates, timeout=timeout, workers=workers)
+    with profile_stage(profiler, "handshakes", nodes_in=len(candidates)) as span:
+        swept_successes, swept_failures, _found = session_batch(
+            candidates,
+            timeout,
+            workers,
+            harvest=False,
+            engine=engine,
+            concurrency=concurrency,
+            deadline=deadline,
+        )
+        span["nodes_out"] = len(swept_successes)
+
+    schedule_stats = state.record_schedule_outcome(candidates, swept_successes)
+
+    successes.update(swept_successes)
+    failures.extend(swept_failures)
+    failures = sorted(set(failures) - set(successes))
 
     state.update_successes(successes, now=now)
     state.update_failures(failures, now=now)
 
-    enrich_state_records(state, geoip_enabled=geoip_enabled, city_db=city_db, asn_db=asn_db, country_db=country_db)
+    with profile_stage(profiler, "geoip", nodes_in=len(state.nodes)) as span:
+        geoip_stats = enrich_state_records(
+            state,
+            geoip_enabled=geoip_enabled,
+            city_db=city_db,
+            asn_db=asn_db,
+            country_db=country_db,
+            ttl=geoip_ttl,
+        )
+        span["nodes_out"] = len(state.nodes)
 
     state.meta.update(
         {
@@ -1184,6 +1430,7 @@ def crawl_once(
             "last_crawl": now,
             "last_crawl_iso": utc_iso(now),
             "last_candidate_count": len(candidates),
+            "last_session_count": session_count,
             "last_success_count": len(successes),
             "last_failure_count": len(failures),
             "last_dns_seed_count": len(seed_addresses),
@@ -1194,10 +1441,17 @@ def crawl_once(
             "last_batch_size": batch_size,
             "last_workers": workers,
             "last_timeout": timeout,
+            "last_engine": engine,
+            "last_concurrency": concurrency if engine == "asyncio" else workers,
+            "last_deadline": deadline,
+            "state_backend": state_backend,
+            "last_scheduler": scheduler,
             "archive_replay_enabled": replay_archives,
             "archive_replay_files": archive_replay_files,
             "geoip_enabled": geoip_enabled,
             "geoip_dir": str(geoip_dir),
+            "geoip_ttl": geoip_ttl,
+            "last_geoip": geoip_stats,
             "geo_root": str(geo_root),
             "geoip_city_db": str(city_db),
             "geoip_asn_db": str(asn_db),
@@ -1209,19 +1463,22 @@ def crawl_once(
         }
     )
 
-    state.write_24h_snapshot()
-    state.save()
+    with profile_stage(profiler, "state", nodes_in=len(state.nodes)):
+        state.write_24h_snapshot()
+        state.save()
 
-    changes = build_changes(state_before=before, state_after=state.nodes)
+    changes = build_tracked_changes(state)
 
-    payload = export_state_direct(
-        state=state,
-        output_dir=output_dir,
-        archive_dir=archive_dir,
-        mode=export_mode,
-        changes=changes,
-        pretty=pretty,
-    )
+    with profile_stage(profiler, "export", nodes_in=len(state.nodes)) as span:
+        payload = export_state_direct(
+            state=state,
+            output_dir=output_dir,
+            archive_dir=archive_dir,
+            mode=export_mode,
+            changes=changes,
+            pretty=pretty,
+        )
+        span["nodes_out"] = len(payload.get("nodes") or [])
 
     latest_path = output_dir / "latest.json"
 
@@ -1347,14 +1604,19 @@ def crawl_once(
         f"vpn={summary.get('vpn_nodes', 0)} "
         f"proxy={summary.get('proxy_nodes', 0)} "
         f"queue={summary.get('queue_size', 0)} "
+        f"engine={engine} "
         f"dns={len(seed_addresses)} "
         f"seeds={len(expanded_seed_addresses)} "
         f"discovered={len(discovered)} "
+        f"sessions={session_count} "
         f"candidates={len(candidates)} "
+        f"predicted={schedule_stats['predicted_hit_rate']:.3f} "
+        f"actual={schedule_stats['actual_hit_rate']:.3f} "
         f"successes={len(successes)} "
         f"failures={len(failures)}"
     )
 
+    state.close()
     return payload
 
 
@@ -1411,9 +1673,15 @@ def build_parser(description: str = "ZZX-Labs persistent enhanced Bitnodes globa
     add_argument_if_missing(parser, "--batch-size", type=int, default=4096)
     add_argument_if_missing(parser, "--timeout", type=float, default=5.0)
     add_argument_if_missing(parser, "--workers", type=int, default=256)
+    add_argument_if_missing(parser, "--engine", choices=list(CRAWL_ENGINES), default=DEFAULT_CRAWL_ENGINE)
+    add_argument_if_missing(parser, "--concurrency", type=int, default=DEFAULT_ASYNC_CONCURRENCY)
+    add_argument_if_missing(parser, "--deadline", type=float, default=0.0)
     add_argument_if_missing(parser, "--getaddr-rounds", type=int, default=16)
     add_argument_if_missing(parser, "--dns-seed-limit", type=int, default=4096)
 
+    add_argument_if_missing(parser, "--no-state-journal", action="store_true")
+    add_argument_if_missing(parser, "--state-backend", choices=list(STATE_BACKENDS), default=DEFAULT_STATE_BACKEND)
+    add_argument_if_missing(parser, "--scheduler", choices=list(SCHEDULER_MODES), default=DEFAULT_SCHEDULER_MODE)
     add_argument_if_missing(parser, "--disable-archive-replay", action="store_true")
     add_argument_if_missing(parser, "--archive-replay-files", type=int, default=250)
 
@@ -1423,6 +1691,7 @@ def build_parser(description: str = "ZZX-Labs persistent enhanced Bitnodes globa
 
     add_argument_if_missing(parser, "--disable-geoip", action="store_true")
     add_argument_if_missing(parser, "--geoip-dir", default=str(DEFAULT_GEOIP_DIR))
+    add_argument_if_missing(parser, "--geoip-ttl", type=int, default=DEFAULT_GEOIP_TTL)
     add_argument_if_missing(parser, "--geo-root", default=str(DEFAULT_GEO_ROOT))
     add_argument_if_missing(parser, "--city-db", default="")
     add_argument_if_missing(parser, "--asn-db", default="")
@@ -1461,6 +1730,7 @@ def apply_profile(args: argparse.Namespace) -> argparse.Namespace:
     if args.profile == "github":
         args.timeout = min(float(args.timeout), 5.0)
         args.workers = min(int(args.workers), 256)
+        args.concurrency = min(int(args.concurrency), 4096)
         args.batch_size = min(int(args.batch_size), 4096)
         args.getaddr_rounds = min(int(args.getaddr_rounds), 16)
         args.dns_seed_limit = min(int(args.dns_seed_limit), 4096)
@@ -1469,6 +1739,7 @@ def apply_profile(args: argparse.Namespace) -> argparse.Namespace:
     elif args.profile == "local":
         args.timeout = min(float(args.timeout), 8.0)
         args.workers = min(int(args.workers), 1024)
+        args.concurrency = min(int(args.concurrency), 16384)
         args.batch_size = min(int(args.batch_size), 12000)
         args.getaddr_rounds = min(int(args.getaddr_rounds), 64)
         args.dns_seed_limit = min(int(args.dns_seed_limit), 12000)
@@ -1476,6 +1747,7 @@ def apply_profile(args: argparse.Namespace) -> argparse.Namespace:
     elif args.profile == "aggressive":
         args.timeout = min(float(args.timeout), 10.0)
         args.workers = min(int(args.workers), 2048)
+        args.concurrency = min(int(args.concurrency), 32768)
         args.batch_size = min(int(args.batch_size), 20000)
         args.getaddr_rounds = min(int(args.getaddr_rounds), 128)
         args.dns_seed_limit = min(int(args.dns_seed_limit), 20000)
@@ -1497,8 +1769,14 @@ def normalize_args(args: argparse.Namespace) -> argparse.Namespace:
         "batch_size": 4096,
         "timeout": 5.0,
         "workers": 256,
+        "engine": DEFAULT_CRAWL_ENGINE,
+        "concurrency": DEFAULT_ASYNC_CONCURRENCY,
+        "deadline": 0.0,
         "getaddr_rounds": 16,
         "dns_seed_limit": 4096,
+        "no_state_journal": False,
+        "state_backend": DEFAULT_STATE_BACKEND,
+        "scheduler": DEFAULT_SCHEDULER_MODE,
         "disable_archive_replay": False,
         "archive_replay_files": 250,
         "interval": 3600,
@@ -1506,6 +1784,7 @@ def normalize_args(args: argparse.Namespace) -> argparse.Namespace:
         "daemon": False,
         "disable_geoip": False,
         "geoip_dir": str(DEFAULT_GEOIP_DIR),
+        "geoip_ttl": DEFAULT_GEOIP_TTL,
         "geo_root": str(DEFAULT_GEO_ROOT),
         "city_db": "",
         "asn_db": "",
@@ -1534,9 +1813,7 @@ def normalize_args(args: argparse.Namespace) -> argparse.Namespace:
     return args
 
 
-def run_from_args(args: argparse.Namespace) -> int:
-    ensure_layout(SOURCE)
-
+def crawl_kwargs(args: argparse.Namespace) -> dict[str, Any]:
     args = normalize_args(args)
     args = apply_profile(args)
 
@@ -1554,7 +1831,7 @@ def run_from_args(args: argparse.Namespace) -> int:
     if args.history_dir and args.state_dir == str(DEFAULT_STATE_DIR):
         state_dir = Path(args.history_dir)
 
-    common = {
+    return {
         "state_dir": state_dir,
         "snapshot_24h_dir": Path(args.snapshot_24h_dir),
         "output_dir": Path(args.output),
@@ -1590,8 +1867,21 @@ def run_from_args(args: argparse.Namespace) -> int:
         "max_segment_bytes": int(args.max_segment_bytes),
         "git_push": bool(args.git_push),
         "strict": bool(args.strict),
+        "engine": str(args.engine),
+        "concurrency": int(args.concurrency),
+        "deadline": float(args.deadline) if float(args.deadline) > 0 else None,
+        "state_journal": not bool(args.no_state_journal),
+        "state_backend": str(args.state_backend),
+        "scheduler": str(args.scheduler),
+        "geoip_ttl": int(args.geoip_ttl),
     }
 
+
+def run_from_args(args: argparse.Namespace) -> int:
+    ensure_layout(SOURCE)
+
+    common = crawl_kwargs(args)
+
     if args.daemon:
         daemon_loop(**common, interval=int(args.interval), run_seconds=int(args.run_seconds))
         return 0